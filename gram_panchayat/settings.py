@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'portal_app.instrumentation.InstrumentationMiddleware',  # Off unless PERFORMANCE_INSTRUMENTATION
+    'portal_app.routers.ReplicaPinMiddleware',  # Off unless REPLICA_DATABASES
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,7 +61,8 @@ ROOT_URLCONF = 'gram_panchayat.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that also times renders for portal_app.instrumentation
+        'BACKEND': 'portal_app.instrumentation.InstrumentedTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -82,7 +85,7 @@ DATABASE_URL = config('DATABASE_URL', default=None)
 
 if DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.config(default=DATABASE_URL, conn_max_age=600)
+        'default': dj_database_url.config(default=DATABASE_URL)
     }
 else:
     DB_ENGINE = config('DB_ENGINE', default='mysql')
@@ -105,6 +108,59 @@ else:
         }
     }
 
+# Read replicas (portal_app.routers): DATABASE_URL_REPLICA_1, _2, ... add
+# read-only copies of the primary. Dashboards, statistics, exports and
+# public tracking read from them, except for clients that wrote within
+# the last REPLICA_PIN_SECONDS, who stay on the primary to read their
+# own writes. Keep it above the replicas' usual replication lag.
+REPLICA_DATABASES = []
+for number in range(1, 10):
+    replica_url = config(f'DATABASE_URL_REPLICA_{number}', default=None)
+    if replica_url:
+        DATABASES[f'replica{number}'] = dj_database_url.parse(replica_url)
+        # Tests read the test primary instead
+        DATABASES[f'replica{number}']['TEST'] = {'MIRROR': 'default'}
+        REPLICA_DATABASES.append(f'replica{number}')
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+DATABASE_ROUTERS = ['portal_app.routers.ReplicaRouter']
+
+# Partial indexes (Meta.indexes with a condition) serve hot subsets on
+# PostgreSQL and SQLite; MySQL cannot build them and Django skips them
+# there, which is expected rather than worth a warning
+SILENCED_SYSTEM_CHECKS = ['models.W037']
+
+# Connection pooling (portal_app.pooling): each worker process keeps up
+# to DB_POOL_MAX_SIZE connections shared by its threads, health-checked
+# on checkout and replaced after DB_POOL_MAX_LIFETIME seconds. Without
+# it (DB_POOL=False, or SQLite) each thread keeps one connection open
+# for DB_CONN_MAX_AGE seconds. Only PostgreSQL (psycopg_pool) pools by
+# default; the hand-written MySQL pool is opt-in with DB_POOL=True until
+# it has been verified against a production MySQL server.
+DB_POOL = config(
+    'DB_POOL', default=DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql', cast=bool
+)
+DB_POOL_OPTIONS = {
+    'min_size': config('DB_POOL_MIN_SIZE', default=0, cast=int),
+    'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+    'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+    'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=1800, cast=float),
+    'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+}
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+POOLED_ENGINES = {
+    'django.db.backends.mysql': 'portal_app.backends.mysql',
+    'django.db.backends.postgresql': 'portal_app.backends.postgresql',
+}
+
+for database in DATABASES.values():
+    database['CONN_HEALTH_CHECKS'] = True
+    if DB_POOL and database['ENGINE'] in POOLED_ENGINES:
+        database['ENGINE'] = POOLED_ENGINES[database['ENGINE']]
+        database['CONN_MAX_AGE'] = 0  # The pool decides how long connections live
+        database.setdefault('OPTIONS', {})['pool'] = dict(DB_POOL_OPTIONS)
+    else:
+        database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+
 # Custom User Model
 AUTH_USER_MODEL = 'portal_app.CustomUser'
 
@@ -153,6 +209,14 @@ STATICFILES_DIRS = [
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Listing pagination (portal_app.pagination): 'cursor' (keyset) or 'offset'
+PAGINATION_MODE = config('PAGINATION_MODE', default='cursor')
+# Stop counting listing totals here ("1000+"); 0 disables totals
+PAGINATION_COUNT_LIMIT = config('PAGINATION_COUNT_LIMIT', default=1000, cast=int)
+
+# Rendered certificate PDFs (portal_app.certificates); safe to delete
+CERTIFICATE_CACHE_DIR = config('CERTIFICATE_CACHE_DIR', default=str(BASE_DIR / 'certificate_cache'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -169,7 +233,7 @@ LOGOUT_REDIRECT_URL = 'home'
 
 # Session Security Settings
 SESSION_COOKIE_AGE = 3600  # 1 hour (3600 seconds)
-SESSION_SAVE_EVERY_REQUEST = True  # Extend session on each request
+SESSION_SAVE_EVERY_REQUEST = True  # Extend session on each request (see SESSION_ENGINE)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True  # Session expires when browser closes
 SESSION_COOKIE_HTTPONLY = True  # Prevent JavaScript access to session cookie
 SESSION_COOKIE_SAMESITE = 'Lax'  # CSRF protection
@@ -236,7 +300,113 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@grampanchayat
 EMAIL_TIMEOUT = 10  # seconds
 EMAIL_SUBJECT_PREFIX = '[Gram Panchayat] '
 
+# Queue outgoing emails in the database and deliver them with
+# `python manage.py send_queued_emails --loop` (see Procfile worker)
+EMAIL_QUEUE_ENABLED = config('EMAIL_QUEUE_ENABLED', default=True, cast=bool)
+
 # OTP Configuration
 OTP_EXPIRY_MINUTES = 10  # OTP expires after 10 minutes
 OTP_MAX_ATTEMPTS = 3     # Maximum verification attempts per OTP
 OTP_LENGTH = 6           # 6-digit OTP
+
+
+# ============================================
+# IDENTIFIER ALLOCATION
+# ============================================
+
+# Application/complaint/receipt/certificate numbers are reserved in blocks
+# per worker process. Larger blocks mean fewer sequence-row updates but
+# bigger gaps in numbering when a worker restarts.
+NUMBER_BLOCK_SIZE = config('NUMBER_BLOCK_SIZE', default=20, cast=int)
+
+
+# ============================================
+# ARCHIVAL
+# ============================================
+
+# Approved/rejected applications and closed complaints reviewed/resolved
+# more than ARCHIVE_AFTER_DAYS ago are moved to the archive tables by
+# `python manage.py archive_records` (schedule it off-peak), in
+# transactions of ARCHIVE_BATCH_SIZE records. Archived applications stay
+# reachable on the tracking page and by certificate download.
+ARCHIVE_AFTER_DAYS = config('ARCHIVE_AFTER_DAYS', default=730, cast=int)
+ARCHIVE_BATCH_SIZE = config('ARCHIVE_BATCH_SIZE', default=500, cast=int)
+
+
+# ============================================
+# CACHE & RATE LIMITING
+# ============================================
+
+# Optional Redis server shared by all workers (requires `pip install redis`)
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    # Per-process cache: fine for caching, NOT for cross-worker limits
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Rate limit storage for login/OTP endpoints. Options:
+#   portal_app.rate_limit.DatabaseBackend  (shared via the database, default)
+#   portal_app.rate_limit.RedisBackend     (shared via REDIS_URL)
+#   portal_app.rate_limit.FileBackend      (shared by workers on one machine)
+#   portal_app.rate_limit.CacheBackend     (uses CACHES['default'])
+RATE_LIMIT_BACKEND = config(
+    'RATE_LIMIT_BACKEND',
+    default='portal_app.rate_limit.RedisBackend' if REDIS_URL else 'portal_app.rate_limit.DatabaseBackend'
+)
+RATE_LIMIT_OPTIONS = {}
+
+# Reverse proxies in front of the app that append to X-Forwarded-For
+# (e.g. 1 behind the Heroku router or one nginx). Per-IP rate limits
+# key on the address the outermost of them saw; anything further left
+# in the header is client-supplied and ignored. 0 uses REMOTE_ADDR.
+TRUSTED_PROXY_COUNT = config('TRUSTED_PROXY_COUNT', default=0, cast=int)
+
+# Public application tracking (/track/): cached status lookups and a
+# per-IP limit on lookups. Status changes clear the cache entry; with the
+# per-process LocMemCache other workers may show the old status until
+# the entry expires, so keep the timeout short without Redis.
+TRACK_CACHE_TIMEOUT = config('TRACK_CACHE_TIMEOUT', default=300 if REDIS_URL else 60, cast=int)
+TRACK_NOT_FOUND_TIMEOUT = config('TRACK_NOT_FOUND_TIMEOUT', default=60, cast=int)
+TRACK_RATE_LIMIT = config('TRACK_RATE_LIMIT', default=60, cast=int)    # lookups per IP ...
+TRACK_RATE_PERIOD = config('TRACK_RATE_PERIOD', default=60, cast=int)  # ... per this many seconds
+# Counted in the cache rather than RATE_LIMIT_BACKEND: a database counter
+# costs several queries and writes on every lookup. Shared across workers
+# with Redis; per worker with LocMemCache, which is enough for a throttle.
+TRACK_RATE_LIMIT_BACKEND = config('TRACK_RATE_LIMIT_BACKEND', default='portal_app.rate_limit.CacheBackend')
+TRACK_POLL_INTERVAL = 30  # Seconds between status polls on the tracking page
+
+# Complaint assignee picker (portal_app.assignment): seconds a page of
+# staff search results, with each member's open-complaint load, is cached
+STAFF_AUTOCOMPLETE_CACHE_TIMEOUT = config('STAFF_AUTOCOMPLETE_CACHE_TIMEOUT', default=30, cast=int)
+
+# Dashboard trend charts (portal_app.rollups): seconds a time-series
+# response is cached, and how many recent days the nightly
+# `python manage.py rebuild_rollups` recomputes from the source tables
+ROLLUP_CACHE_TIMEOUT = config('ROLLUP_CACHE_TIMEOUT', default=300, cast=int)
+ROLLUP_RECONCILE_DAYS = config('ROLLUP_RECONCILE_DAYS', default=3, cast=int)
+
+# Per-request timing (portal_app.instrumentation): Server-Timing headers,
+# JSON log lines on the 'portal_app.instrumentation' logger, and per-view
+# percentiles over the last PERFORMANCE_SAMPLE_SIZE requests at /metrics/
+PERFORMANCE_INSTRUMENTATION = config('PERFORMANCE_INSTRUMENTATION', default=False, cast=bool)
+PERFORMANCE_SAMPLE_SIZE = config('PERFORMANCE_SAMPLE_SIZE', default=1000, cast=int)
+
+# Sessions (portal_app.session_store): SESSION_SAVE_EVERY_REQUEST slides the
+# expiry, but the session row is only rewritten when its data changes or the
+# expiry has moved by SESSION_REFRESH_THRESHOLD x SESSION_COOKIE_AGE.
+# SESSION_WRITE_BEHIND also keeps sessions in the cache and needs a shared
+# cache, so it is on only with Redis. Purge old rows with `purge_sessions`.
+SESSION_ENGINE = config('SESSION_ENGINE', default='portal_app.session_store')
+SESSION_WRITE_BEHIND = config('SESSION_WRITE_BEHIND', default=bool(REDIS_URL), cast=bool)
+SESSION_REFRESH_THRESHOLD = config('SESSION_REFRESH_THRESHOLD', default=0.1, cast=float)
@@ -7,8 +7,10 @@ from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # Portal routes first: staff pages live under /admin/applications/ etc.
+    # and would otherwise be swallowed by the Django admin catch-all view
     path('', include('portal_app.urls')),
+    path('admin/', admin.site.urls),
 ]
 
 # Serve media files during development
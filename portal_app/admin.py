@@ -4,11 +4,46 @@ Admin Configuration for Portal App
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db import transaction
 from .models import (
     CustomUser, Application, BirthCertificate, DeathCertificate,
     IncomeCertificate, TaxPayment, Complaint, ApplicationStatusHistory,
-    ComplaintHistory, EmailOTP
+    ComplaintHistory, EmailOTP, StatisticCounter, DailyRollup, OutboundEmail,
+    ArchivedApplication, ArchivedComplaint
 )
+from . import counters, search
+
+
+# ============================================
+# INDEXED SEARCH
+# ============================================
+
+class IndexedSearchMixin:
+    """
+    Widen the changelist search box with the full-text index: objects
+    whose indexed text matches every term (e.g. an application by its
+    child's name) are added to the regular search_fields lookup
+
+    search_kind: index kind to query
+    search_lookup: field holding that kind's object id (default 'pk')
+    
+    The index hits (at most search_limit) are unioned with, never
+    substituted for, the search_fields results, so substring matches and
+    terms the index does not cover (e.g. an applicant's email on the
+    application list) still show up.
+    """
+    search_kind = None
+    search_lookup = 'pk'
+    search_limit = 1000
+    
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if not search_term.strip():
+            return results, may_have_duplicates
+        ids = search.matching_object_ids(search_term, self.search_kind, self.search_limit)
+        if not ids:
+            return results, may_have_duplicates
+        return queryset.filter(**{f'{self.search_lookup}__in': ids}) | results, may_have_duplicates
 
 
 # ============================================
@@ -16,13 +51,14 @@ from .models import (
 # ============================================
 
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(IndexedSearchMixin, UserAdmin):
     """
     Custom admin interface for CustomUser model
     """
     list_display = ['username', 'email', 'first_name', 'last_name', 'role', 'phone_number', 'email_verified', 'is_active', 'created_at']
     list_filter = ['role', 'email_verified', 'is_active', 'is_staff', 'created_at']
     search_fields = ['username', 'email', 'first_name', 'last_name', 'phone_number', 'aadhar_number']
+    search_kind = 'user'
     ordering = ['-created_at']
     
     fieldsets = UserAdmin.fieldsets + (
@@ -49,15 +85,18 @@ class CustomUserAdmin(UserAdmin):
 # ============================================
 
 @admin.register(Application)
-class ApplicationAdmin(admin.ModelAdmin):
+class ApplicationAdmin(IndexedSearchMixin, admin.ModelAdmin):
     """
     Admin interface for Application model
     """
     list_display = ['application_number', 'applicant', 'application_type', 'status', 'applied_date', 'reviewed_by']
-    list_filter = ['status', 'application_type', 'applied_date']
+    list_select_related = ['applicant', 'reviewed_by']
+    list_filter = ['status', 'application_type', 'applied_date', 'reviewed_date', 'applicant__village']
     search_fields = ['application_number', 'applicant__username', 'applicant__email']
+    search_kind = 'application'
     readonly_fields = ['application_number', 'applied_date']
     ordering = ['-applied_date']
+    actions = ['approve_selected', 'reject_selected', 'print_certificates_zip', 'print_certificates_pdf']
     
     fieldsets = (
         ('Application Details', {
@@ -67,6 +106,88 @@ class ApplicationAdmin(admin.ModelAdmin):
             'fields': ('applied_date', 'reviewed_date', 'reviewed_by', 'admin_remarks')
         }),
     )
+    
+    def _bulk_review(self, request, queryset, status):
+        """Review the selection in one transaction (see portal_app.reviews)"""
+        from .reviews import bulk_review
+        
+        result = bulk_review(queryset.values_list('id', flat=True), status, request.user)
+        self.message_user(
+            request,
+            f"{result['updated']} application(s) marked {status}, "
+            f"{result['unchanged']} unchanged, {result['certificates']} certificate number(s) issued.",
+        )
+    
+    @admin.action(description='Approve selected applications')
+    def approve_selected(self, request, queryset):
+        self._bulk_review(request, queryset, 'approved')
+    
+    @admin.action(description='Reject selected applications')
+    def reject_selected(self, request, queryset):
+        self._bulk_review(request, queryset, 'rejected')
+    
+    def _print_certificates(self, request, queryset, fmt):
+        """Render approved certificates among the selection into one download"""
+        import tempfile
+        from django.http import FileResponse
+        from .bulk_certificates import CERTIFICATE_TYPES, write_certificates
+        
+        application_ids = list(
+            queryset.filter(status='approved', application_type__in=CERTIFICATE_TYPES)
+            .order_by('reviewed_date', 'id')
+            .values_list('id', flat=True)
+        )
+        if not application_ids:
+            self.message_user(request, 'No approved certificates selected.', level='warning')
+            return None
+        
+        # Render in this process: a web worker must not fork a pool or
+        # close its connections mid-request. print_certificates is the
+        # parallel path for large batches
+        output = tempfile.TemporaryFile()
+        write_certificates(application_ids, output, fmt=fmt, workers=1)
+        output.seek(0)
+        return FileResponse(output, as_attachment=True, filename=f'certificates.{fmt}')
+    
+    @admin.action(description='Print selected certificates (ZIP)')
+    def print_certificates_zip(self, request, queryset):
+        return self._print_certificates(request, queryset, 'zip')
+    
+    @admin.action(description='Print selected certificates (merged PDF)')
+    def print_certificates_pdf(self, request, queryset):
+        return self._print_certificates(request, queryset, 'pdf')
+    
+    # Edits and deletes here keep the statistic counters in step, like
+    # the portal's own views (portal_app.counters)
+    
+    def get_readonly_fields(self, request, obj=None):
+        # Counted per type and applicant, which are fixed once submitted
+        if obj is not None:
+            return [*self.readonly_fields, 'applicant', 'application_type']
+        return self.readonly_fields
+    
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old = (
+                Application.objects.filter(pk=obj.pk).values('status', 'reviewed_date').first()
+                if change else None
+            )
+            super().save_model(request, obj, form, change)
+            if old is None:
+                counters.record_application_created(obj)
+            else:
+                counters.record_application_status_change(obj, old['status'], old['reviewed_date'])
+    
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            counters.record_application_deleted(obj)
+            super().delete_model(request, obj)
+    
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            for application in queryset.select_related('applicant'):
+                counters.record_application_deleted(application)
+            super().delete_queryset(request, queryset)
 
 
 # ============================================
@@ -74,37 +195,46 @@ class ApplicationAdmin(admin.ModelAdmin):
 # ============================================
 
 @admin.register(BirthCertificate)
-class BirthCertificateAdmin(admin.ModelAdmin):
+class BirthCertificateAdmin(IndexedSearchMixin, admin.ModelAdmin):
     """
     Admin interface for Birth Certificate
     """
     list_display = ['child_name', 'date_of_birth', 'application', 'certificate_number', 'issued_date']
+    list_select_related = ['application']
     list_filter = ['date_of_birth', 'issued_date']
     search_fields = ['child_name', 'father_name', 'mother_name', 'certificate_number']
+    search_kind = 'application'
+    search_lookup = 'application_id'
     readonly_fields = ['application']
     ordering = ['-application__applied_date']
 
 
 @admin.register(DeathCertificate)
-class DeathCertificateAdmin(admin.ModelAdmin):
+class DeathCertificateAdmin(IndexedSearchMixin, admin.ModelAdmin):
     """
     Admin interface for Death Certificate
     """
     list_display = ['deceased_name', 'date_of_death', 'deceased_age', 'application', 'certificate_number', 'issued_date']
+    list_select_related = ['application']
     list_filter = ['date_of_death', 'issued_date']
     search_fields = ['deceased_name', 'informant_name', 'certificate_number']
+    search_kind = 'application'
+    search_lookup = 'application_id'
     readonly_fields = ['application']
     ordering = ['-application__applied_date']
 
 
 @admin.register(IncomeCertificate)
-class IncomeCertificateAdmin(admin.ModelAdmin):
+class IncomeCertificateAdmin(IndexedSearchMixin, admin.ModelAdmin):
     """
     Admin interface for Income Certificate
     """
     list_display = ['applicant_name', 'annual_income', 'income_source', 'application', 'certificate_number', 'issued_date']
+    list_select_related = ['application']
     list_filter = ['income_source', 'issued_date']
     search_fields = ['applicant_name', 'father_husband_name', 'certificate_number']
+    search_kind = 'application'
+    search_lookup = 'application_id'
     readonly_fields = ['application']
     ordering = ['-application__applied_date']
 
@@ -119,6 +249,7 @@ class TaxPaymentAdmin(admin.ModelAdmin):
     Admin interface for Tax Payment
     """
     list_display = ['property_number', 'tax_type', 'financial_year', 'tax_amount', 'payment_status', 'application']
+    list_select_related = ['application']
     list_filter = ['tax_type', 'payment_status', 'financial_year']
     search_fields = ['property_number', 'transaction_id', 'receipt_number']
     readonly_fields = ['application', 'total_amount']
@@ -130,13 +261,15 @@ class TaxPaymentAdmin(admin.ModelAdmin):
 # ============================================
 
 @admin.register(Complaint)
-class ComplaintAdmin(admin.ModelAdmin):
+class ComplaintAdmin(IndexedSearchMixin, admin.ModelAdmin):
     """
     Admin interface for Complaint
     """
     list_display = ['complaint_number', 'complainant', 'category', 'subject', 'priority', 'status', 'filed_date']
+    list_select_related = ['complainant']
     list_filter = ['status', 'priority', 'category', 'filed_date']
     search_fields = ['complaint_number', 'subject', 'complainant__username']
+    search_kind = 'complaint'
     readonly_fields = ['complaint_number', 'filed_date']
     ordering = ['-filed_date']
     
@@ -154,6 +287,36 @@ class ComplaintAdmin(admin.ModelAdmin):
             'fields': ('complaint_photo',)
         }),
     )
+    
+    def get_readonly_fields(self, request, obj=None):
+        # Counted per complainant, who is fixed once filed
+        if obj is not None:
+            return [*self.readonly_fields, 'complainant']
+        return self.readonly_fields
+    
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old = Complaint.objects.select_related('complainant').get(pk=obj.pk) if change else None
+            super().save_model(request, obj, form, change)
+            if old is None:
+                counters.record_complaint_created(obj)
+            elif old.category != obj.category:
+                # Trend rollups count complaints per category
+                counters.record_complaint_deleted(old)
+                counters.record_complaint_created(obj)
+            else:
+                counters.record_complaint_status_change(obj, old.status)
+    
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            counters.record_complaint_deleted(obj)
+            super().delete_model(request, obj)
+    
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            for complaint in queryset.select_related('complainant'):
+                counters.record_complaint_deleted(complaint)
+            super().delete_queryset(request, queryset)
 
 
 # ============================================
@@ -166,6 +329,7 @@ class ApplicationStatusHistoryAdmin(admin.ModelAdmin):
     Admin interface for Application Status History
     """
     list_display = ['application', 'old_status', 'new_status', 'changed_by', 'changed_at']
+    list_select_related = ['application', 'changed_by']
     list_filter = ['new_status', 'changed_at']
     search_fields = ['application__application_number']
     readonly_fields = ['changed_at']
@@ -178,6 +342,7 @@ class ComplaintHistoryAdmin(admin.ModelAdmin):
     Admin interface for Complaint History
     """
     list_display = ['complaint', 'action', 'old_value', 'new_value', 'performed_by', 'performed_at']
+    list_select_related = ['complaint', 'performed_by']
     list_filter = ['action', 'performed_at']
     search_fields = ['complaint__complaint_number', 'notes']
     readonly_fields = ['performed_at']
@@ -199,6 +364,7 @@ class EmailOTPAdmin(admin.ModelAdmin):
     - Filterable by verification status
     """
     list_display = ['user', 'email', 'otp_code', 'is_verified', 'is_used', 'verification_attempts', 'created_at', 'expires_at', 'time_status']
+    list_select_related = ['user']
     list_filter = ['is_verified', 'is_used', 'created_at', 'expires_at']
     search_fields = ['user__username', 'user__email', 'email', 'otp_code']
     readonly_fields = ['user', 'email', 'otp_code', 'created_at', 'expires_at', 'verified_at', 'verification_attempts', 'is_verified', 'is_used', 'time_status']
@@ -246,3 +412,105 @@ class EmailOTPAdmin(admin.ModelAdmin):
         """Make OTPs read-only"""
         return False
 
+
+
+# ============================================
+# STATISTIC COUNTERS ADMIN
+# ============================================
+
+@admin.register(StatisticCounter)
+class StatisticCounterAdmin(admin.ModelAdmin):
+    """
+    Read-only view of denormalized dashboard counters
+    Use `manage.py rebuild_counters` to correct drift
+    """
+    list_display = ['name', 'value']
+    search_fields = ['name']
+    ordering = ['name']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the daily rollups behind the trend charts
+    Use `manage.py rebuild_rollups` to correct drift
+    """
+    list_display = ['day', 'metric', 'kind', 'village', 'count', 'amount']
+    list_filter = ['metric', 'kind']
+    search_fields = ['village']
+    date_hierarchy = 'day'
+    ordering = ['-day', 'metric', 'kind', 'village']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# ============================================
+# OUTBOUND EMAIL QUEUE ADMIN
+# ============================================
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    """
+    Delivery status of queued emails
+    """
+    list_display = ['subject', 'recipients', 'status', 'attempts', 'created_at', 'sent_at', 'next_attempt_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['recipients', 'subject']
+    readonly_fields = ['subject', 'body', 'html_body', 'from_email', 'recipients', 'attempts', 'last_error', 'created_at', 'sent_at']
+    ordering = ['-created_at']
+    actions = ['retry_now']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.action(description='Retry selected emails now')
+    def retry_now(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} email(s) queued for retry.')
+
+
+# ============================================
+# ARCHIVE ADMIN
+# ============================================
+
+class ArchiveAdmin(admin.ModelAdmin):
+    """
+    Read-only archive tables, filled by `manage.py archive_records`
+    """
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedApplication)
+class ArchivedApplicationAdmin(ArchiveAdmin):
+    list_display = ['application_number', 'applicant', 'application_type', 'status', 'applied_date', 'archived_at']
+    list_filter = ['application_type', 'status']
+    search_fields = ['=application_number', '=certificate_number', 'applicant__username']
+    list_select_related = ['applicant']
+    ordering = ['-applied_date']
+
+
+@admin.register(ArchivedComplaint)
+class ArchivedComplaintAdmin(ArchiveAdmin):
+    list_display = ['complaint_number', 'complainant', 'category', 'subject', 'filed_date', 'archived_at']
+    list_filter = ['category']
+    search_fields = ['=complaint_number', 'complainant__username']
+    list_select_related = ['complainant']
+    ordering = ['-filed_date']
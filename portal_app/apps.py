@@ -5,3 +5,6 @@ class PortalAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'portal_app'
     verbose_name = 'Gram Panchayat Portal'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,217 @@
+"""
+Archival of Closed Applications and Complaints
+
+Moves old, closed records out of the live tables, so list views, counts
+and indexes only work through records that can still change:
+- Approved/rejected applications reviewed more than ARCHIVE_AFTER_DAYS
+  ago go to ArchivedApplication, with their certificate/tax detail row
+  and status history
+- Closed complaints resolved that long ago go to ArchivedComplaint,
+  with their history
+
+Each batch is copied and deleted in one transaction, so a record is
+always in exactly one of the two places. Archived records keep their
+primary key and number: the tracking page and certificate downloads
+fall back to the archive, and the dashboard counters keep counting
+them. Their search documents are dropped with the live rows.
+
+Run with `python manage.py archive_records`.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import counters
+from .models import (
+    Application, ArchivedApplication, ArchivedComplaint, Complaint, archive_fields
+)
+
+
+APPLICATION_STATUSES = ('approved', 'rejected')
+COMPLAINT_STATUSES = ('closed',)
+
+
+def cutoff(days=None):
+    """
+    Records closed before this moment are due for archiving
+
+    Args:
+        days (int): Age in days (default ARCHIVE_AFTER_DAYS)
+
+    Returns:
+        datetime: Cutoff timestamp
+    """
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_applications(before):
+    """Live applications closed before `before` (review date, else applied date)"""
+    return Application.objects.filter(status__in=APPLICATION_STATUSES).filter(
+        Q(reviewed_date__lt=before) | Q(reviewed_date__isnull=True, applied_date__lt=before)
+    )
+
+
+def archivable_complaints(before):
+    """Live complaints closed before `before` (resolution date, else filing date)"""
+    return Complaint.objects.filter(status__in=COMPLAINT_STATUSES).filter(
+        Q(resolved_date__lt=before) | Q(resolved_date__isnull=True, filed_date__lt=before)
+    )
+
+
+# ============================================
+# RECORD CONVERSION
+# ============================================
+
+def archived_application(application):
+    """
+    Archive row for a live application
+
+    Args:
+        application: Application with its detail row and status_history
+            loaded (with_details() and prefetch_related)
+
+    Returns:
+        ArchivedApplication: Unsaved archive row
+    """
+    detail = application.get_detail()
+    return ArchivedApplication(
+        id=application.pk,
+        application_number=application.application_number,
+        applicant_id=application.applicant_id,
+        application_type=application.application_type,
+        status=application.status,
+        applied_date=application.applied_date,
+        reviewed_date=application.reviewed_date,
+        reviewed_by_id=application.reviewed_by_id,
+        admin_remarks=application.admin_remarks,
+        certificate_number=getattr(detail, 'certificate_number', None),
+        detail=archive_fields(detail, exclude=('application',)) if detail else {},
+        status_history=[
+            archive_fields(entry, exclude=('application',))
+            for entry in application.status_history.all()
+        ],
+    )
+
+
+def archived_complaint(complaint):
+    """
+    Archive row for a live complaint
+
+    Args:
+        complaint: Complaint with history prefetched
+
+    Returns:
+        ArchivedComplaint: Unsaved archive row
+    """
+    return ArchivedComplaint(
+        id=complaint.pk,
+        complaint_number=complaint.complaint_number,
+        complainant_id=complaint.complainant_id,
+        category=complaint.category,
+        subject=complaint.subject,
+        description=complaint.description,
+        location=complaint.location,
+        priority=complaint.priority,
+        status=complaint.status,
+        complaint_photo=complaint.complaint_photo.name or '',
+        filed_date=complaint.filed_date,
+        assigned_to_id=complaint.assigned_to_id,
+        resolved_date=complaint.resolved_date,
+        resolution_remarks=complaint.resolution_remarks,
+        history=[archive_fields(entry, exclude=('complaint',)) for entry in complaint.history.all()],
+    )
+
+
+def archived_statistic_deltas(rows):
+    """
+    Counter deltas keeping archived tax payments and certificates in
+    the dashboard statistics (the live tables no longer hold them)
+
+    Args:
+        rows (list): ArchivedApplication rows
+
+    Returns:
+        Counter: {counter name: delta}
+    """
+    deltas = Counter()
+    for row in rows:
+        if row.detail.get('tax_type'):
+            deltas[f"archived:tax:{row.detail['tax_type']}"] += 1
+        elif row.certificate_number:
+            deltas[f'archived:certificate:{row.application_type}'] += 1
+    return deltas
+
+
+# ============================================
+# BATCHED MOVES
+# ============================================
+
+def _archive_in_batches(queryset, move_batch, batch_size, limit):
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    moved = 0
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        with transaction.atomic():
+            # Locked so a concurrent edit cannot be lost between copy and delete
+            ids = list(queryset.select_for_update().order_by('pk').values_list('pk', flat=True)[:size])
+            if ids:
+                move_batch(ids)
+        moved += len(ids)
+        if len(ids) < size:
+            break
+    return moved
+
+
+def _move_applications(ids):
+    applications = Application.objects.with_details().prefetch_related('status_history').filter(pk__in=ids)
+    rows = [archived_application(application) for application in applications]
+    ArchivedApplication.objects.bulk_create(rows)
+    # Cascades to detail rows and histories; signals drop search documents
+    # and cached tracking entries and renders
+    Application.objects.filter(pk__in=ids).delete()
+    counters.increment_many(archived_statistic_deltas(rows))
+
+
+def _move_complaints(ids):
+    complaints = Complaint.objects.prefetch_related('history').filter(pk__in=ids)
+    ArchivedComplaint.objects.bulk_create([archived_complaint(complaint) for complaint in complaints])
+    Complaint.objects.filter(pk__in=ids).delete()
+
+
+def archive_applications(before=None, batch_size=None, limit=None):
+    """
+    Move closed applications older than the cutoff into the archive
+
+    Args:
+        before (datetime): Cutoff (default cutoff())
+        batch_size (int): Applications per transaction (default ARCHIVE_BATCH_SIZE)
+        limit (int): Stop after this many (default: all due)
+
+    Returns:
+        int: Number of applications archived
+    """
+    queryset = archivable_applications(before or cutoff())
+    return _archive_in_batches(queryset, _move_applications, batch_size, limit)
+
+
+def archive_complaints(before=None, batch_size=None, limit=None):
+    """
+    Move closed complaints older than the cutoff into the archive
+
+    Args:
+        before (datetime): Cutoff (default cutoff())
+        batch_size (int): Complaints per transaction (default ARCHIVE_BATCH_SIZE)
+        limit (int): Stop after this many (default: all due)
+
+    Returns:
+        int: Number of complaints archived
+    """
+    queryset = archivable_complaints(before or cutoff())
+    return _archive_in_batches(queryset, _move_complaints, batch_size, limit)
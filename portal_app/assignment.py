@@ -0,0 +1,115 @@
+"""
+Staff Assignment Lookup for Complaints
+
+Backs the assignee picker on the complaint update page without loading
+every user into the form:
+- Only active staff and admins can be assigned
+- Autocomplete search by name or username, one page at a time, each
+  entry showing the staff member's open-complaint load
+- Result pages are cached for STAFF_AUTOCOMPLETE_CACHE_TIMEOUT seconds,
+  so loads shown may lag assignments by that much
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Complaint, CustomUser
+
+
+ASSIGNABLE_ROLES = ('staff', 'admin')
+OPEN_STATUSES = ('open', 'in_progress')
+PAGE_SIZE = 20
+MAX_PAGE = 1000  # Deeper pages are never useful in a picker
+CACHE_PREFIX = 'staff-autocomplete'
+
+
+def assignable_staff(include=None):
+    """
+    Users a complaint may be assigned to
+
+    Args:
+        include (int): Also allow this user id (the current assignee,
+            who may since have been deactivated)
+
+    Returns:
+        QuerySet: Active staff and admins
+    """
+    allowed = Q(role__in=ASSIGNABLE_ROLES, is_active=True)
+    if include:
+        allowed |= Q(pk=include)
+    return CustomUser.objects.filter(allowed)
+
+
+def staff_label(user, open_complaints=None):
+    """'Full Name (username)', plus the open-complaint load when given"""
+    label = f"{user.get_full_name()} ({user.username})" if user.first_name or user.last_name else user.username
+    if open_complaints is not None:
+        label += f" · {open_complaints} open"
+    return label
+
+
+def open_complaint_loads(user_ids):
+    """
+    Open and in-progress complaints assigned to each user
+
+    Returns:
+        dict: {user id: count}, users without open complaints omitted
+    """
+    return dict(
+        Complaint.objects.filter(assigned_to__in=user_ids, status__in=OPEN_STATUSES)
+        .values('assigned_to').annotate(n=Count('id')).values_list('assigned_to', 'n')
+    )
+
+
+def search_staff(query='', page=1):
+    """
+    One page of assignable staff matching a search, with their loads
+
+    Args:
+        query (str): Text matched against username, first and last name
+        page (int): 1-based page number
+
+    Returns:
+        dict: {'results': [{'id', 'text', 'username', 'open_complaints'}],
+               'page', 'has_more'}
+    """
+    query = ' '.join(query.split())[:100]
+    page = max(page, 1)
+    key = f"{CACHE_PREFIX}:{page}:{hashlib.md5(query.lower().encode('utf-8')).hexdigest()}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    staff = assignable_staff()
+    for term in query.split():
+        staff = staff.filter(
+            Q(username__icontains=term) | Q(first_name__icontains=term) | Q(last_name__icontains=term)
+        )
+    offset = (page - 1) * PAGE_SIZE
+    # One extra row tells whether another page exists
+    users = list(
+        staff.order_by('first_name', 'last_name', 'username', 'id')
+        .only('id', 'username', 'first_name', 'last_name')[offset:offset + PAGE_SIZE + 1]
+    )
+    has_more = len(users) > PAGE_SIZE
+    users = users[:PAGE_SIZE]
+    loads = open_complaint_loads([user.pk for user in users]) if users else {}
+
+    data = {
+        'results': [
+            {
+                'id': user.pk,
+                'text': staff_label(user, loads.get(user.pk, 0)),
+                'username': user.username,
+                'open_complaints': loads.get(user.pk, 0),
+            }
+            for user in users
+        ],
+        'page': page,
+        'has_more': has_more,
+    }
+    cache.set(key, data, settings.STAFF_AUTOCOMPLETE_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,6 @@
+"""
+Pooled database backends (see portal_app.pooling)
+
+ENGINE 'portal_app.backends.mysql' or 'portal_app.backends.postgresql',
+with OPTIONS['pool'] set. settings.DB_POOL selects them.
+"""
@@ -0,0 +1,40 @@
+"""
+MySQL backend with a per-process connection pool (portal_app.pooling)
+"""
+
+import functools
+
+from django.db.backends.mysql import base, creation
+
+from portal_app.pooling import ConnectionPool, PooledDatabaseCreationMixin, PooledDatabaseWrapperMixin
+
+
+def reset_connection(connection):
+    """Roll back whatever a request left open and restore autocommit"""
+    # Django runs in autocommit between requests; anything else was
+    # interrupted mid-transaction
+    if not connection.get_autocommit():
+        connection.rollback()
+        connection.autocommit(True)
+
+
+def check_connection(connection):
+    """Raise if the server has gone away"""
+    connection.ping()
+
+
+class DatabaseCreation(PooledDatabaseCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def create_pool(self, conn_params, options):
+        return ConnectionPool(
+            functools.partial(base.DatabaseWrapper.get_new_connection, self, conn_params),
+            check=check_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+            reset=reset_connection,
+            name=self.alias,
+            **options,
+        )
@@ -0,0 +1,60 @@
+"""
+PostgreSQL backend with a per-process psycopg_pool (portal_app.pooling)
+
+A backport of the pooling Django 5.1 builds into its own PostgreSQL
+backend, configured the same way, so upgrading only changes ENGINE.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base, creation
+
+from portal_app.pooling import PooledDatabaseCreationMixin, PooledDatabaseWrapperMixin
+
+
+class DatabaseCreation(PooledDatabaseCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def create_pool(self, conn_params, options):
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError:
+            raise ImproperlyConfigured(
+                'PostgreSQL connection pooling requires psycopg_pool. '
+                'Install it with: pip install "psycopg[pool]"'
+            )
+        # Connections wait in the pool in autocommit; Django sets its
+        # own mode on checkout
+        pool = ConnectionPool(
+            kwargs={**conn_params, 'autocommit': True},
+            open=False,
+            check=ConnectionPool.check_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+            name=self.alias,
+            **options,
+        )
+        pool.open(wait=False)
+        return pool
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        if pool is None:
+            self._pool = None
+            return super().get_new_connection(conn_params)
+        # As Django's get_new_connection, with the connection from the pool
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        try:
+            self.isolation_level = base.IsolationLevel(
+                base.IsolationLevel.READ_COMMITTED if isolation_level is None else isolation_level
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"Invalid transaction isolation level {isolation_level} "
+                f"specified. Use one of the psycopg.IsolationLevel values."
+            )
+        connection = self.checkout(pool)
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
@@ -0,0 +1,121 @@
+"""
+Benchmark Helpers for Digital Gram Panchayat Portal
+
+Small utilities shared by the benchmark management commands:
+- Wall-clock timing over repeated runs
+- SQL query counting per run
+- Percentile summaries
+"""
+
+import math
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile of a list of numbers
+
+    Args:
+        samples (list): Measured values
+        pct (float): Percentile between 0 and 100
+
+    Returns:
+        float: Percentile value (0.0 for an empty list)
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples_ms):
+    """
+    Summarize timing samples in milliseconds
+
+    Returns:
+        dict: {'runs', 'min_ms', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}
+    """
+    runs = len(samples_ms)
+    return {
+        'runs': runs,
+        'min_ms': round(min(samples_ms), 3) if runs else 0.0,
+        'mean_ms': round(sum(samples_ms) / runs, 3) if runs else 0.0,
+        'p50_ms': round(percentile(samples_ms, 50), 3),
+        'p95_ms': round(percentile(samples_ms, 95), 3),
+        'p99_ms': round(percentile(samples_ms, 99), 3),
+        'max_ms': round(max(samples_ms), 3) if runs else 0.0,
+    }
+
+
+def measure(func, repeat=5, warmup=1):
+    """
+    Time a callable and count the SQL queries it issues
+
+    Args:
+        func (callable): Zero-argument callable to benchmark
+        repeat (int): Number of measured runs
+        warmup (int): Number of unmeasured runs before timing
+
+    Returns:
+        dict: summarize() output plus 'queries' (queries per run)
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    queries = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        queries = len(ctx.captured_queries)
+
+    result = summarize(samples)
+    result['queries'] = queries
+    return result
+
+
+def measure_prepared(prepare, repeat=20, warmup=2):
+    """
+    Time runs that each need their own untimed setup
+
+    Queries are counted with an execute wrapper, so long runs are not
+    limited by the debug query log.
+
+    Args:
+        prepare (callable): prepare(run_index) does any setup and returns
+            the zero-argument callable to time
+        repeat (int): Number of measured runs
+        warmup (int): Number of unmeasured runs before timing
+
+    Returns:
+        dict: summarize() output plus 'queries_mean', 'queries_max' and
+            'throughput_rps' (runs per second of measured time)
+    """
+    for index in range(warmup):
+        prepare(index)()
+
+    samples = []
+    query_counts = []
+    for index in range(warmup, warmup + repeat):
+        func = prepare(index)
+        queries = []
+        with connection.execute_wrapper(
+            lambda execute, sql, params, many, context: queries.append(sql) or execute(sql, params, many, context)
+        ):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        query_counts.append(len(queries))
+
+    result = summarize(samples)
+    result['queries_mean'] = round(sum(query_counts) / len(query_counts), 1) if query_counts else 0.0
+    result['queries_max'] = max(query_counts, default=0)
+    total_seconds = sum(samples) / 1000
+    result['throughput_rps'] = round(repeat / total_seconds, 1) if total_seconds else 0.0
+    return result
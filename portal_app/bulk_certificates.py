@@ -0,0 +1,218 @@
+"""
+Bulk Certificate Printing for Digital Gram Panchayat Portal
+
+Renders many approved certificates at once for month-end printing:
+- Filter by approval date range, certificate type and village
+- Chunks of applications are rendered in parallel on a ProcessPoolExecutor
+  (same layout and render cache as download_certificate)
+- Results are streamed, in order, into a ZIP of PDFs or one merged PDF
+
+Merging parallel renders into one PDF uses `pypdf` (in requirements.txt).
+Without it the merged document is laid out in a single process, with a
+warning; asking for several workers explicitly is then an error.
+"""
+
+import logging
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import PageBreak, SimpleDocTemplate
+
+from . import certificates
+from .models import Application
+
+
+CERTIFICATE_TYPES = ['birth_certificate', 'death_certificate', 'income_certificate']
+DEFAULT_CHUNK_SIZE = 25
+FORMATS = ['zip', 'pdf']
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# SELECTION
+# ============================================
+
+def select_certificates(date_from=None, date_to=None, application_types=None, village=None):
+    """
+    Approved certificate applications matching a print filter
+
+    Args:
+        date_from (date): Approved on or after this date (optional)
+        date_to (date): Approved on or before this date (optional)
+        application_types (list): Certificate types (default: all certificate types)
+        village (str): Applicant's village, case-insensitive (optional)
+
+    Returns:
+        QuerySet: Applications ordered by approval date
+    """
+    applications = Application.objects.filter(
+        status='approved',
+        application_type__in=application_types or CERTIFICATE_TYPES,
+    )
+    if date_from:
+        applications = applications.filter(reviewed_date__date__gte=date_from)
+    if date_to:
+        applications = applications.filter(reviewed_date__date__lte=date_to)
+    if village:
+        applications = applications.filter(applicant__village__iexact=village)
+    return applications.order_by('reviewed_date', 'id')
+
+
+def _load(application_ids):
+    """Applications with their detail rows, in the given id order"""
+    applications = Application.objects.with_details().in_bulk(application_ids)
+    return [applications[pk] for pk in application_ids if pk in applications]
+
+
+# ============================================
+# RENDERING
+# ============================================
+
+def _render_chunk(application_ids):
+    """
+    Render one chunk of certificates (runs in a worker process)
+
+    Returns:
+        list: [(file name, PDF bytes), ...] in input order
+    """
+    rendered = []
+    for application in _load(application_ids):
+        handle, _fingerprint, _modified = certificates.open_cached_certificate(application)
+        with handle:
+            rendered.append((f"certificate_{application.application_number}.pdf", handle.read()))
+    return rendered
+
+
+def _init_worker():
+    # Spawned and forkserver workers start without the app registry
+    import django
+    django.setup()
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def iter_rendered(application_ids, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Render certificates, in parallel when more than one worker is used
+
+    Args:
+        application_ids (list): Applications to render
+        workers (int): Worker processes (default: CPU count; 1 renders in-process)
+        chunk_size (int): Applications per task
+
+    Yields:
+        tuple: (file name, PDF bytes) in input order
+    """
+    application_ids = list(application_ids)
+    chunks = list(_chunks(application_ids, chunk_size))
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    # Workers cannot see uncommitted rows, and closing the connection
+    # would break the open transaction; render in-process instead
+    if workers <= 1 or connection.in_atomic_block:
+        for chunk in chunks:
+            yield from _render_chunk(chunk)
+        return
+
+    # Forked workers must open their own database connections; pooled
+    # ones go back to their pool, which forking then closes
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for rendered in executor.map(_render_chunk, chunks):
+            yield from rendered
+
+
+# ============================================
+# OUTPUT
+# ============================================
+
+def write_zip(application_ids, output, **options):
+    """
+    Stream certificates into a ZIP archive, one PDF per application
+
+    Args:
+        application_ids (list): Applications to render
+        output: Writable binary file object
+        **options: Passed to iter_rendered()
+
+    Returns:
+        int: Number of certificates written
+    """
+    count = 0
+    # PDFs are already compressed
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, pdf in iter_rendered(application_ids, **options):
+            archive.writestr(name, pdf)
+            count += 1
+    return count
+
+
+def write_merged_pdf(application_ids, output, **options):
+    """
+    Write all certificates into one PDF, one page per certificate
+
+    Args:
+        application_ids (list): Applications to render
+        output: Writable binary file object
+        **options: Passed to iter_rendered()
+
+    Returns:
+        int: Number of certificates written
+    """
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        workers = options.get('workers')
+        if workers and workers > 1:
+            raise ImproperlyConfigured(
+                f'Merging a PDF rendered by {workers} workers requires pypdf: pip install pypdf'
+            )
+        logger.warning('pypdf is not installed; laying out the merged PDF in a single process')
+        return _write_merged_single_process(application_ids, output)
+
+    writer = PdfWriter()
+    count = 0
+    for _name, pdf in iter_rendered(application_ids, **options):
+        writer.append(BytesIO(pdf))
+        count += 1
+    writer.write(output)
+    return count
+
+
+def _write_merged_single_process(application_ids, output):
+    """Lay out every certificate in one ReportLab document"""
+    elements = []
+    applications = _load(list(application_ids))
+    for application in applications:
+        if elements:
+            elements.append(PageBreak())
+        elements.extend(certificates.certificate_flowables(application))
+    SimpleDocTemplate(output, pagesize=A4).build(elements)
+    return len(applications)
+
+
+def write_certificates(application_ids, output, fmt='zip', **options):
+    """
+    Write certificates in the requested format
+
+    Args:
+        application_ids (list): Applications to render
+        output: Writable binary file object
+        fmt (str): 'zip' or 'pdf'
+        **options: Passed to iter_rendered()
+
+    Returns:
+        int: Number of certificates written
+    """
+    if fmt == 'pdf':
+        return write_merged_pdf(application_ids, output, **options)
+    return write_zip(application_ids, output, **options)
@@ -0,0 +1,307 @@
+"""
+Certificate PDF Rendering for Digital Gram Panchayat Portal
+
+- Certificate layout (ReportLab) shared by downloads and bulk printing
+- Content-addressed render cache: PDFs are stored on disk under
+  <application id>/<data hash>.pdf, so an unchanged certificate is
+  rendered once and any change to its data produces a new file
+  (stale files are removed by the signals in portal_app.signals).
+  Renders are written to a temporary file and renamed into place, so
+  readers never see a partial PDF and concurrent renders of the same
+  data leave one file
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.functional import LazyObject
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+
+# ============================================
+# CERTIFICATE CONTENT
+# ============================================
+
+def certificate_content(application):
+    """
+    Title and table rows printed on an application's certificate
+
+    Args:
+        application: Approved Application (detail rows ideally select_related)
+
+    Returns:
+        tuple: (title: str, rows: list of [label, value])
+    """
+    if application.application_type == 'birth_certificate':
+        cert = application.birth_certificate
+        return "BIRTH CERTIFICATE", [
+            ['Certificate Number:', cert.certificate_number or 'N/A'],
+            ['Issued Date:', str(cert.issued_date) if cert.issued_date else 'N/A'],
+            ['', ''],
+            ['Child Name:', cert.child_name],
+            ['Date of Birth:', str(cert.date_of_birth)],
+            ['Gender:', cert.get_child_gender_display()],
+            ['Place of Birth:', cert.place_of_birth],
+            ['Father Name:', cert.father_name],
+            ['Mother Name:', cert.mother_name],
+            ['Permanent Address:', cert.permanent_address],
+        ]
+
+    if application.application_type == 'death_certificate':
+        cert = application.death_certificate
+        return "DEATH CERTIFICATE", [
+            ['Certificate Number:', cert.certificate_number or 'N/A'],
+            ['Issued Date:', str(cert.issued_date) if cert.issued_date else 'N/A'],
+            ['', ''],
+            ['Deceased Name:', cert.deceased_name],
+            ['Date of Death:', str(cert.date_of_death)],
+            ['Age:', str(cert.deceased_age)],
+            ['Gender:', cert.get_deceased_gender_display()],
+            ['Place of Death:', cert.place_of_death],
+            ['Cause of Death:', cert.cause_of_death],
+            ['Permanent Address:', cert.permanent_address],
+        ]
+
+    if application.application_type == 'income_certificate':
+        cert = application.income_certificate
+        return "INCOME CERTIFICATE", [
+            ['Certificate Number:', cert.certificate_number or 'N/A'],
+            ['Issued Date:', str(cert.issued_date) if cert.issued_date else 'N/A'],
+            ['Valid Until:', str(cert.valid_until) if cert.valid_until else 'N/A'],
+            ['', ''],
+            ['Applicant Name:', cert.applicant_name],
+            ['Father/Husband Name:', cert.father_husband_name],
+            ['Occupation:', cert.occupation],
+            ['Annual Income:', f'₹{cert.annual_income}'],
+            ['Income Source:', cert.get_income_source_display()],
+            ['Purpose:', cert.purpose_of_certificate],
+            ['Residential Address:', cert.residential_address],
+        ]
+
+    # Tax payment or other
+    return "CERTIFICATE", [
+        ['Application Number:', application.application_number],
+        ['Type:', application.get_application_type_display()],
+        ['Status:', application.get_status_display()],
+    ]
+
+
+def certificate_fingerprint(application):
+    """
+    Hash of everything printed on the certificate
+
+    Returns:
+        str: Hex SHA-256 digest, used as cache key and ETag
+    """
+    title, rows = certificate_content(application)
+    payload = json.dumps(
+        [application.pk, application.application_number, application.status, title, rows],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# ============================================
+# PDF LAYOUT
+# ============================================
+
+_styles = None
+
+
+def _get_styles():
+    """Paragraph styles, built once per process"""
+    global _styles
+    if _styles is None:
+        styles = getSampleStyleSheet()
+        _styles = {
+            'title': ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=24,
+                textColor=colors.HexColor('#1a237e'),
+                spaceAfter=30,
+                alignment=1  # Center
+            ),
+            'heading2': styles['Heading2'],
+            'normal': styles['Normal'],
+        }
+    return _styles
+
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+
+def certificate_flowables(application):
+    """
+    ReportLab flowables for one certificate page
+
+    Returns:
+        list: Flowables ready for SimpleDocTemplate.build()
+    """
+    styles = _get_styles()
+    title, rows = certificate_content(application)
+
+    # Header
+    elements = [
+        Paragraph("Government of India", styles['title']),
+        Paragraph("Digital Gram Panchayat Portal", styles['heading2']),
+        Spacer(1, 0.5*inch),
+        Paragraph(title, styles['title']),
+    ]
+    if title != "CERTIFICATE":
+        elements.append(Spacer(1, 0.3*inch))
+
+    # Create table
+    table = Table(rows, colWidths=[2.5*inch, 4*inch])
+    table.setStyle(TABLE_STYLE)
+    elements.append(table)
+    elements.append(Spacer(1, 0.5*inch))
+
+    # Footer
+    elements.append(Paragraph("This is a computer-generated certificate.", styles['normal']))
+    elements.append(Spacer(1, 0.2*inch))
+    elements.append(Paragraph(f"Generated on: {timezone.now().strftime('%B %d, %Y')}", styles['normal']))
+    return elements
+
+
+def render_certificate_pdf(application):
+    """
+    Render a certificate PDF
+
+    Returns:
+        bytes: PDF document
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    doc.build(certificate_flowables(application))
+    return buffer.getvalue()
+
+
+# ============================================
+# RENDER CACHE
+# ============================================
+
+class _CacheStorage(LazyObject):
+    def _setup(self):
+        self._wrapped = FileSystemStorage(
+            location=getattr(settings, 'CERTIFICATE_CACHE_DIR', settings.BASE_DIR / 'certificate_cache')
+        )
+
+
+cache_storage = _CacheStorage()
+
+
+def reset_cache_storage():
+    """Re-read CERTIFICATE_CACHE_DIR on next use"""
+    global cache_storage
+    cache_storage = _CacheStorage()
+
+
+def _cache_dir(application_id):
+    return f"{application_id}"
+
+
+def get_cached_certificate(application):
+    """
+    Cached PDF for the application's current data, rendering on a miss
+
+    Args:
+        application: Approved Application
+
+    Returns:
+        tuple: (path in cache_storage, fingerprint, last modified datetime)
+    """
+    fingerprint = certificate_fingerprint(application)
+    path = f"{_cache_dir(application.pk)}/{fingerprint}.pdf"
+
+    if not cache_storage.exists(path):
+        _write_atomically(cache_storage.path(path), render_certificate_pdf(application))
+
+    return path, fingerprint, cache_storage.get_modified_time(path)
+
+
+def open_cached_certificate(application):
+    """
+    Open the cached PDF for the application's current data, rendering
+    on a miss
+
+    The file is opened once and served from that handle, so a concurrent
+    invalidate() removing it cannot fail the read.
+
+    Args:
+        application: Approved Application
+
+    Returns:
+        tuple: (binary file object, fingerprint, last modified datetime)
+    """
+    fingerprint = certificate_fingerprint(application)
+    path = f"{_cache_dir(application.pk)}/{fingerprint}.pdf"
+
+    try:
+        handle = cache_storage.open(path, 'rb')
+    except FileNotFoundError:
+        # Serve this render directly; invalidate() may remove the file again
+        content = render_certificate_pdf(application)
+        _write_atomically(cache_storage.path(path), content)
+        return BytesIO(content), fingerprint, timezone.now()
+
+    modified = datetime.fromtimestamp(os.fstat(handle.fileno()).st_mtime, tz=dt_timezone.utc)
+    return handle, fingerprint, modified
+
+
+def _write_atomically(target, content):
+    """Write `content` to a temporary file beside `target`, then rename it over `target`"""
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            output.write(content)
+        if cache_storage.file_permissions_mode is not None:
+            os.chmod(temp_path, cache_storage.file_permissions_mode)
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def invalidate(application_id):
+    """
+    Remove every cached render for an application
+
+    Args:
+        application_id (int): Application primary key
+    """
+    directory = _cache_dir(application_id)
+    try:
+        _dirs, files = cache_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in files:
+        cache_storage.delete(f"{directory}/{name}")
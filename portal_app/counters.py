@@ -0,0 +1,471 @@
+"""
+Incrementally Maintained Statistic Counters
+
+Keeps denormalized totals in StatisticCounter so dashboards read a
+handful of rows instead of scanning Application and Complaint:
+- Per status, per application type and per day
+- Per applicant/complainant status totals
+- Full rebuild/reconcile from the source tables
+
+The event hooks also update the per-day rollups behind the dashboard
+trend charts (portal_app.rollups).
+
+Update helpers must be called inside the same transaction as the
+write they describe (see the apply_* and admin views, and the Django
+admin's ApplicationAdmin and ComplaintAdmin).
+"""
+
+from collections import Counter
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.fields.json import KT
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import rollups
+from .models import Application, ArchivedApplication, ArchivedComplaint, Complaint, StatisticCounter
+
+
+# ============================================
+# COUNTER NAMES
+# ============================================
+
+def _day(value):
+    """Local calendar date of a datetime (or today) as ISO string"""
+    return timezone.localdate(value).isoformat() if value else timezone.localdate().isoformat()
+
+
+def application_counter_names(application, status=None):
+    """
+    Counter names touched by one application in the given status
+
+    Args:
+        application: Application instance
+        status (str): Status to count under (default: application.status)
+
+    Returns:
+        list: Counter names
+    """
+    status = status or application.status
+    return [
+        f'application:status:{status}',
+        f'application:applicant:{application.applicant_id}:status:{status}',
+    ]
+
+
+def complaint_counter_names(complaint, status=None):
+    """
+    Counter names touched by one complaint in the given status
+
+    Args:
+        complaint: Complaint instance
+        status (str): Status to count under (default: complaint.status)
+
+    Returns:
+        list: Counter names
+    """
+    status = status or complaint.status
+    return [
+        f'complaint:status:{status}',
+        f'complaint:complainant:{complaint.complainant_id}:status:{status}',
+    ]
+
+
+# ============================================
+# LOW-LEVEL UPDATES
+# ============================================
+
+def increment(name, delta=1):
+    """
+    Atomically add delta to a counter, creating it if missing
+
+    Args:
+        name (str): Counter name
+        delta (int): Amount to add (may be negative)
+    """
+    if StatisticCounter.objects.filter(name=name).update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            StatisticCounter.objects.create(name=name, value=delta)
+    except IntegrityError:
+        # Created concurrently by another request
+        StatisticCounter.objects.filter(name=name).update(value=F('value') + delta)
+
+
+def increment_many(deltas):
+    """
+    Apply several counter deltas, one update per distinct counter
+
+    Args:
+        deltas (dict): {name: delta}; zero deltas are skipped
+    """
+    for name, delta in sorted(deltas.items()):
+        if delta:
+            increment(name, delta)
+
+
+def read(names):
+    """
+    Read several counters in one query
+
+    Args:
+        names (list): Counter names
+
+    Returns:
+        dict: {name: value}, missing counters read as 0
+    """
+    values = dict(
+        StatisticCounter.objects.filter(name__in=names).values_list('name', 'value')
+    )
+    return {name: values.get(name, 0) for name in names}
+
+
+# ============================================
+# EVENT HOOKS
+# ============================================
+
+def record_application_created(application):
+    """Count a newly submitted application"""
+    increment('application:total')
+    increment(f'application:type:{application.application_type}')
+    increment(f'application:day:{_day(application.applied_date)}')
+    increment(f'application:applicant:{application.applicant_id}:total')
+    for name in application_counter_names(application):
+        increment(name)
+    if application.status == 'approved' and application.reviewed_date:
+        increment(f'application:approved_day:{_day(application.reviewed_date)}')
+    rollups.record_application_created(application)
+
+
+def record_application_deleted(application):
+    """
+    Uncount a deleted application
+
+    Not for archiving: archived applications keep counting.
+
+    Args:
+        application: Application (applicant loaded) as it was stored
+    """
+    increment('application:total', -1)
+    increment(f'application:type:{application.application_type}', -1)
+    increment(f'application:day:{_day(application.applied_date)}', -1)
+    increment(f'application:applicant:{application.applicant_id}:total', -1)
+    for name in application_counter_names(application):
+        increment(name, -1)
+    if application.status == 'approved' and application.reviewed_date:
+        increment(f'application:approved_day:{_day(application.reviewed_date)}', -1)
+    rollups.record_application_deleted(application)
+
+
+def record_application_status_change(application, old_status, old_reviewed_date=None):
+    """
+    Move an application between status counters
+
+    Args:
+        application: Application instance already holding the new status
+        old_status (str): Status before the change
+        old_reviewed_date (datetime): reviewed_date before the change
+    """
+    if old_status == application.status:
+        return
+    for name in application_counter_names(application, old_status):
+        increment(name, -1)
+    for name in application_counter_names(application):
+        increment(name)
+
+    if old_status == 'approved' and old_reviewed_date:
+        increment(f'application:approved_day:{_day(old_reviewed_date)}', -1)
+    if application.status == 'approved' and application.reviewed_date:
+        increment(f'application:approved_day:{_day(application.reviewed_date)}')
+    rollups.record_application_status_changes([(application, old_status, old_reviewed_date)])
+
+
+def record_application_status_changes(changes):
+    """
+    Batch form of record_application_status_change()
+
+    Nets out the deltas of all changes first, so a batch of N reviews
+    costs one update per distinct counter instead of ~4N.
+
+    Args:
+        changes (list): (application holding the new status, old_status,
+            old_reviewed_date) tuples
+    """
+    deltas = Counter()
+    for application, old_status, old_reviewed_date in changes:
+        if old_status == application.status:
+            continue
+        for name in application_counter_names(application, old_status):
+            deltas[name] -= 1
+        for name in application_counter_names(application):
+            deltas[name] += 1
+        if old_status == 'approved' and old_reviewed_date:
+            deltas[f'application:approved_day:{_day(old_reviewed_date)}'] -= 1
+        if application.status == 'approved' and application.reviewed_date:
+            deltas[f'application:approved_day:{_day(application.reviewed_date)}'] += 1
+    increment_many(deltas)
+    rollups.record_application_status_changes(changes)
+
+
+def record_complaint_created(complaint):
+    """Count a newly filed complaint"""
+    increment('complaint:total')
+    increment(f'complaint:day:{_day(complaint.filed_date)}')
+    increment(f'complaint:complainant:{complaint.complainant_id}:total')
+    for name in complaint_counter_names(complaint):
+        increment(name)
+    rollups.record_complaint_created(complaint)
+
+
+def record_complaint_deleted(complaint):
+    """Uncount a deleted complaint (not one moved to the archive)"""
+    increment('complaint:total', -1)
+    increment(f'complaint:day:{_day(complaint.filed_date)}', -1)
+    increment(f'complaint:complainant:{complaint.complainant_id}:total', -1)
+    for name in complaint_counter_names(complaint):
+        increment(name, -1)
+    rollups.record_complaint_deleted(complaint)
+
+
+def record_complaint_status_change(complaint, old_status):
+    """Move a complaint between status counters"""
+    if old_status == complaint.status:
+        return
+    for name in complaint_counter_names(complaint, old_status):
+        increment(name, -1)
+    for name in complaint_counter_names(complaint):
+        increment(name)
+
+
+# ============================================
+# READ API
+# ============================================
+
+def get_application_counts(user=None, include_activity=False):
+    """
+    Application totals by status from counters
+
+    Args:
+        user: Restrict to this applicant (optional)
+        include_activity (bool): Also return today/approved_today/this_week
+
+    Returns:
+        dict: Same keys as statistics.get_application_statistics()
+    """
+    statuses = [value for value, _label in Application.STATUS_CHOICES]
+    if user:
+        prefix = f'application:applicant:{user.pk}'
+        keys = {'total': f'{prefix}:total'}
+        keys.update({status: f'{prefix}:status:{status}' for status in statuses})
+    else:
+        keys = {'total': 'application:total'}
+        keys.update({status: f'application:status:{status}' for status in statuses})
+
+    week_keys = []
+    if include_activity:
+        today = timezone.localdate()
+        keys['today'] = f'application:day:{today.isoformat()}'
+        keys['approved_today'] = f'application:approved_day:{today.isoformat()}'
+        week_keys = [
+            f'application:day:{(today - timedelta(days=offset)).isoformat()}'
+            for offset in range(7)
+        ]
+
+    values = read(list(keys.values()) + week_keys)
+    counts = {label: values[name] for label, name in keys.items()}
+    if include_activity:
+        counts['this_week'] = sum(values[name] for name in week_keys)
+    return counts
+
+
+def get_application_type_counts():
+    """
+    Application totals per type, most common first
+
+    Returns:
+        list: [{'application_type': ..., 'count': ...}, ...]
+    """
+    names = {
+        f'application:type:{value}': value
+        for value, _label in Application.APPLICATION_TYPES
+    }
+    values = read(list(names))
+    rows = [
+        {'application_type': app_type, 'count': values[name]}
+        for name, app_type in names.items()
+        if values[name]
+    ]
+    return sorted(rows, key=lambda row: -row['count'])
+
+
+def get_complaint_counts(user=None, include_activity=False):
+    """
+    Complaint totals by status from counters
+
+    Args:
+        user: Restrict to this complainant (optional)
+        include_activity (bool): Also return today's count
+
+    Returns:
+        dict: {'total', 'open', 'in_progress', 'resolved', 'closed'} (+ 'today')
+    """
+    statuses = [value for value, _label in Complaint.STATUS_CHOICES]
+    if user:
+        prefix = f'complaint:complainant:{user.pk}'
+        keys = {'total': f'{prefix}:total'}
+        keys.update({status: f'{prefix}:status:{status}' for status in statuses})
+    else:
+        keys = {'total': 'complaint:total'}
+        keys.update({status: f'complaint:status:{status}' for status in statuses})
+    if include_activity:
+        keys['today'] = f'complaint:day:{timezone.localdate().isoformat()}'
+
+    values = read(list(keys.values()))
+    return {label: values[name] for label, name in keys.items()}
+
+
+# ============================================
+# REBUILD / RECONCILE
+# ============================================
+
+def source_models(apps=None):
+    """
+    Models the counters are computed from
+
+    Args:
+        apps: App registry (a migration's historical models; default:
+            the current models). Archive tables it lacks are left out.
+
+    Returns:
+        SimpleNamespace: applications and complaints (lists of live and
+            archive models), archived_applications (or None), counter
+    """
+    if apps is None:
+        return SimpleNamespace(
+            applications=[Application, ArchivedApplication],
+            complaints=[Complaint, ArchivedComplaint],
+            archived_applications=ArchivedApplication,
+            counter=StatisticCounter,
+        )
+
+    def get(name):
+        try:
+            return apps.get_model('portal_app', name)
+        except LookupError:
+            return None
+
+    archived_applications = get('ArchivedApplication')
+    return SimpleNamespace(
+        applications=[model for model in (get('Application'), archived_applications) if model],
+        complaints=[model for model in (get('Complaint'), get('ArchivedComplaint')) if model],
+        archived_applications=archived_applications,
+        counter=get('StatisticCounter'),
+    )
+
+
+def compute_expected_counters(apps=None):
+    """
+    Recompute every counter from the source tables with GROUP BY queries
+
+    Args:
+        apps: App registry to read the tables through (see source_models)
+
+    Returns:
+        dict: {counter name: value}
+    """
+    models = source_models(apps)
+    expected = {}
+
+    def add(name, value):
+        if value:
+            expected[name] = expected.get(name, 0) + value
+
+    # Archived records still count; only the tables they live in differ
+    for applications in (model.objects.all() for model in models.applications):
+        add('application:total', applications.count())
+        for row in applications.values('status').annotate(n=Count('id')):
+            add(f"application:status:{row['status']}", row['n'])
+        for row in applications.values('application_type').annotate(n=Count('id')):
+            add(f"application:type:{row['application_type']}", row['n'])
+        for row in applications.annotate(
+            day=TruncDate('applied_date')
+        ).values('day').annotate(n=Count('id')):
+            add(f"application:day:{row['day'].isoformat()}", row['n'])
+        for row in applications.filter(
+            status='approved', reviewed_date__isnull=False
+        ).annotate(day=TruncDate('reviewed_date')).values('day').annotate(n=Count('id')):
+            add(f"application:approved_day:{row['day'].isoformat()}", row['n'])
+        for row in applications.values('applicant_id', 'status').annotate(n=Count('id')):
+            prefix = f"application:applicant:{row['applicant_id']}"
+            add(f'{prefix}:total', row['n'])
+            add(f"{prefix}:status:{row['status']}", row['n'])
+
+    for complaints in (model.objects.all() for model in models.complaints):
+        add('complaint:total', complaints.count())
+        for row in complaints.values('status').annotate(n=Count('id')):
+            add(f"complaint:status:{row['status']}", row['n'])
+        for row in complaints.annotate(
+            day=TruncDate('filed_date')
+        ).values('day').annotate(n=Count('id')):
+            add(f"complaint:day:{row['day'].isoformat()}", row['n'])
+        for row in complaints.values('complainant_id', 'status').annotate(n=Count('id')):
+            prefix = f"complaint:complainant:{row['complainant_id']}"
+            add(f'{prefix}:total', row['n'])
+            add(f"{prefix}:status:{row['status']}", row['n'])
+
+    # Tax payments and issued certificates moved to the archive
+    archived = models.archived_applications
+    if archived is not None:
+        for row in archived.objects.filter(
+            detail__tax_type__isnull=False
+        ).values(tax_type=KT('detail__tax_type')).annotate(n=Count('id')):
+            add(f"archived:tax:{row['tax_type']}", row['n'])
+        for row in archived.objects.filter(
+            detail__tax_type__isnull=True, certificate_number__isnull=False
+        ).values('application_type').annotate(n=Count('id')):
+            add(f"archived:certificate:{row['application_type']}", row['n'])
+
+    return expected
+
+
+def find_drift():
+    """
+    Compare stored counters with freshly computed values
+
+    Returns:
+        dict: {counter name: (stored, expected)} for every mismatch
+    """
+    expected = compute_expected_counters()
+    stored = dict(StatisticCounter.objects.values_list('name', 'value'))
+    drift = {}
+    for name in set(expected) | set(stored):
+        if stored.get(name, 0) != expected.get(name, 0):
+            drift[name] = (stored.get(name, 0), expected.get(name, 0))
+    return drift
+
+
+@transaction.atomic
+def rebuild_counters(batch_size=1000, apps=None):
+    """
+    Replace all counters with values recomputed from the source tables
+
+    Args:
+        batch_size (int): Rows per INSERT
+        apps: App registry to read and write through (see source_models);
+            migrations pass theirs to seed the counters
+
+    Returns:
+        int: Number of counter rows written
+    """
+    counter = source_models(apps).counter
+    expected = compute_expected_counters(apps)
+    counter.objects.all().delete()
+    counter.objects.bulk_create(
+        [counter(name=name, value=value) for name, value in expected.items()],
+        batch_size=batch_size,
+    )
+    return len(expected)
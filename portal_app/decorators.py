@@ -14,6 +14,27 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 
 
+def deny_access(request, allowed_roles):
+    """
+    Response for an authenticated user whose role may not open a page
+
+    Shared by role_required and RoleBasedAccessMiddleware so both checks
+    answer the same way.
+
+    Args:
+        request: Current request
+        allowed_roles: Roles the page accepts
+
+    Returns:
+        HttpResponseRedirect: Redirect to the home page with an error message
+    """
+    messages.error(
+        request,
+        f"Access denied. This page requires {', '.join(allowed_roles)} role."
+    )
+    return redirect('home')
+
+
 def role_required(allowed_roles):
     """
     Decorator to restrict view access based on user role
@@ -27,6 +48,9 @@ def role_required(allowed_roles):
         def staff_and_admin_view(request):
             pass
     
+    The roles are also recorded on the view as `allowed_roles`, which
+    RoleBasedAccessMiddleware compiles into its routing table.
+
     Args:
         allowed_roles: String or list of allowed role(s)
     """
@@ -44,12 +68,9 @@ def role_required(allowed_roles):
             if user_role in allowed_roles:
                 return view_func(request, *args, **kwargs)
             else:
-                messages.error(
-                    request,
-                    f"Access denied. This page requires {', '.join(allowed_roles)} role."
-                )
-                return redirect('home')
+                return deny_access(request, allowed_roles)
         
+        wrapper.allowed_roles = tuple(allowed_roles)
         return wrapper
     return decorator
 
@@ -0,0 +1,190 @@
+"""
+Asynchronous Outbound Email Queue
+
+Keeps SMTP off the request path:
+- enqueue_email() stores the message in OutboundEmail and returns
+- send_queued_emails (management command) drains the outbox in batches
+  over one reused SMTP connection
+- Failed sends are retried with exponential backoff, then marked failed
+
+Claimed rows are leased by pushing next_attempt_at forward, so several
+workers can run side by side and a crashed worker's batch is picked up
+again once the lease expires.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 5
+LEASE_SECONDS = 300
+BACKOFF_BASE_SECONDS = 30
+
+
+# ============================================
+# ENQUEUE
+# ============================================
+
+def enqueue_email(subject, body, recipient_list, html_body='', from_email=None):
+    """
+    Queue an email for background delivery
+
+    Args:
+        subject (str): Subject line
+        body (str): Plain text body
+        recipient_list (list): Recipient addresses
+        html_body (str): Optional HTML alternative
+        from_email (str): Sender (default: DEFAULT_FROM_EMAIL)
+
+    Returns:
+        OutboundEmail: The queued row
+    """
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=', '.join(recipient_list),
+    )
+
+
+# ============================================
+# DELIVERY
+# ============================================
+
+def backoff_delay(attempts):
+    """
+    Delay before the next retry
+
+    Args:
+        attempts (int): Attempts made so far
+
+    Returns:
+        timedelta: 30s, 60s, 120s, ... capped at one hour
+    """
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), 3600))
+
+
+def claim_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Lease up to batch_size due emails to this worker
+
+    Returns:
+        list: OutboundEmail instances
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if batch:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                next_attempt_at=now + timedelta(seconds=LEASE_SECONDS)
+            )
+    return batch
+
+
+def _build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.recipient_list(),
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def send_batch(batch, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Deliver claimed emails over a single backend connection
+
+    Args:
+        batch (list): OutboundEmail instances from claim_batch()
+        max_attempts (int): Attempts before an email is marked failed
+
+    Returns:
+        tuple: (sent: int, failed: int)
+    """
+    if not batch:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        # Could not reach the mail server: retry the whole batch later
+        for email in batch:
+            _record_failure(email, exc, max_attempts)
+        return 0, len(batch)
+
+    sent = failed = 0
+    try:
+        for email in batch:
+            try:
+                _build_message(email, connection).send()
+            except Exception as exc:
+                failed += 1
+                _record_failure(email, exc, max_attempts)
+            else:
+                sent += 1
+                email.status = 'sent'
+                email.attempts += 1
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error'])
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+    return sent, failed
+
+
+def _record_failure(email, exc, max_attempts):
+    email.attempts += 1
+    email.last_error = str(exc)[:2000]
+    if email.attempts >= max_attempts:
+        email.status = 'failed'
+        logger.error("Giving up on email %s to %s: %s", email.pk, email.recipients, exc)
+    else:
+        email.next_attempt_at = timezone.now() + backoff_delay(email.attempts)
+        logger.warning("Email %s to %s failed (attempt %s): %s",
+                       email.pk, email.recipients, email.attempts, exc)
+    email.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
+
+
+def process_queue(batch_size=DEFAULT_BATCH_SIZE, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Claim and send one batch
+
+    Returns:
+        tuple: (sent: int, failed: int)
+    """
+    return send_batch(claim_batch(batch_size), max_attempts)
+
+
+def purge_sent(older_than_days):
+    """
+    Delete delivered emails older than the given age
+
+    Returns:
+        int: Number of rows deleted
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    deleted, _ = OutboundEmail.objects.filter(status='sent', sent_at__lt=cutoff).delete()
+    return deleted
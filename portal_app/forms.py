@@ -10,12 +10,14 @@ Contains all forms for:
 
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
+from django.urls import reverse
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Row, Column, Div
 from .models import (
     CustomUser, BirthCertificate, DeathCertificate, 
     IncomeCertificate, TaxPayment, Complaint, Application
 )
+from .assignment import assignable_staff, staff_label
 
 
 # ============================================
@@ -162,7 +164,9 @@ class CitizenRegistrationForm(UserCreationForm):
                 raise forms.ValidationError("Aadhar number must be exactly 12 digits.")
             if CustomUser.objects.filter(aadhar_number=aadhar).exists():
                 raise forms.ValidationError("This Aadhar number is already registered.")
-        return aadhar
+        # Stored as NULL when left blank: the column is unique, and NULLs
+        # do not collide the way empty strings do
+        return aadhar or None
     
     def clean_pincode(self):
         """Validate pincode format"""
@@ -549,9 +553,45 @@ class ApplicationReviewForm(forms.ModelForm):
         }
 
 
+class StaffAutocompleteSelect(forms.Select):
+    """
+    Staff picker that renders only the empty choice and the current one
+    
+    Other staff are searched on demand through the staff_autocomplete
+    JSON endpoint by the script on the complaint update page, so the page
+    never lists every user as an <option>.
+    """
+    template_name = 'portal_app/widgets/staff_autocomplete.html'
+    
+    def __init__(self, attrs=None):
+        super().__init__(attrs)
+        self.selected_label = None  # (pk, label) of the current choice, if already loaded
+    
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['autocomplete_url'] = reverse('staff_autocomplete')
+        return context
+    
+    def optgroups(self, name, value, attrs=None):
+        selected = next((str(v) for v in value if v not in (None, '')), None)
+        choices = [('', 'Unassigned')]
+        if selected:
+            if self.selected_label and str(self.selected_label[0]) == selected:
+                choices.append(self.selected_label)
+            elif selected.isdigit():
+                user = CustomUser.objects.filter(pk=selected).first()
+                if user:
+                    choices.append((user.pk, staff_label(user)))
+        self.choices = choices
+        return super().optgroups(name, value, attrs)
+
+
 class ComplaintUpdateForm(forms.ModelForm):
     """
     Form for admins to update complaint status
+    
+    assigned_to accepts active staff and admins (plus the current
+    assignee); the submitted id is validated with a single lookup.
     """
     
     class Meta:
@@ -560,13 +600,22 @@ class ComplaintUpdateForm(forms.ModelForm):
         widgets = {
             'status': forms.Select(attrs={'class': 'form-select'}),
             'priority': forms.Select(attrs={'class': 'form-select'}),
-            'assigned_to': forms.Select(attrs={'class': 'form-select'}),
+            'assigned_to': StaffAutocompleteSelect(attrs={'class': 'form-select'}),
             'resolution_remarks': forms.Textarea(attrs={
                 'class': 'form-control',
                 'rows': 3,
                 'placeholder': 'Resolution details'
             }),
         }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        field = self.fields['assigned_to']
+        field.queryset = assignable_staff(include=self.instance.assigned_to_id)
+        if self.instance.assigned_to_id and Complaint.assigned_to.is_cached(self.instance):
+            field.widget.selected_label = (
+                self.instance.assigned_to_id, staff_label(self.instance.assigned_to)
+            )
 
 
 # ============================================
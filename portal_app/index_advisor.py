@@ -0,0 +1,459 @@
+"""
+Index Advisor for the Portal's Query Shapes
+
+Checks that the queries the portal runs most are backed by an index:
+- query_shapes() builds each hot query the way the portal does, through
+  the same helpers where the views have them (admin listing filters,
+  staff assignment), so the catalog follows their filters and ordering
+- analyze() reads the ORM query rather than the SQL: the columns compared
+  with =, IN or IS NULL, range comparisons and ORDER BY columns. These
+  give the composite index that serves the query: equality columns first
+  (in any order), then the ordering (or the first range column)
+- The suggestion is matched against the table's actual indexes, and the
+  database's own EXPLAIN plan is summarized next to it (index used, full
+  scans, sorts). Partial indexes declared in Meta.indexes count when the
+  query's = / IN filters imply their condition. Plans depend on table statistics: on small tables the
+  planner may scan anyway, so the index check is what decides "missing"
+
+Filters under OR or NOT, on joined tables, or on JSON keys do not bound
+an index scan and are left out.
+
+Usage: python manage.py index_advisor
+"""
+
+import json
+import re
+from collections import namedtuple
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.db.models.expressions import Col, OrderBy
+from django.db.models.lookups import Lookup
+from django.db.models.sql.where import AND, WhereNode
+from django.http import QueryDict
+from django.utils import timezone
+
+
+EQUALITY_LOOKUPS = {'exact', 'in', 'isnull'}
+RANGE_LOOKUPS = {'gt', 'gte', 'lt', 'lte', 'range'}
+
+# Statuses, best first
+COVERED = 'covered'   # An index serves the filter and the ordering
+SORT = 'sort'         # An index serves the filter; rows are sorted afterwards
+PARTIAL = 'partial'   # An index covers some of the equality columns
+MISSING = 'missing'   # No index starts with any filtered column
+UNBOUNDED = 'n/a'     # No usable filter or ordering (full-table aggregate)
+
+QueryShape = namedtuple('QueryShape', 'name source queryset')
+
+
+# ============================================
+# QUERY CATALOG
+# ============================================
+
+def _request(user, **params):
+    """Stand-in request for the views' filter helpers"""
+    query = QueryDict(mutable=True)
+    query.update(params)
+    return SimpleNamespace(GET=query, user=user)
+
+
+def query_shapes():
+    """
+    The portal's hot queries, with sample parameters
+
+    Returns:
+        list: QueryShape(name, source, queryset) entries
+    """
+    from .assignment import OPEN_STATUSES, assignable_staff
+    from .models import (
+        Application, BirthCertificate, Complaint, CustomUser, DailyRollup, EmailOTP, OutboundEmail,
+    )
+    from .views import _filtered_applications, _filtered_complaints
+
+    # Parameter values only matter to EXPLAIN; any existing row will do
+    user = CustomUser.objects.only('id').order_by('pk').first() or CustomUser(pk=0)
+    now = timezone.now()
+
+    return [
+        QueryShape(
+            'admin_applications.status', 'views.admin_applications',
+            _filtered_applications(_request(user, status='pending')).order_by('-applied_date', '-id')[:21],
+        ),
+        QueryShape(
+            'admin_applications.type_status', 'views.admin_applications',
+            _filtered_applications(_request(user, status='pending', type='birth_certificate'))
+            .order_by('-applied_date', '-id')[:21],
+        ),
+        QueryShape(
+            'admin_complaints.status', 'views.admin_complaints',
+            _filtered_complaints(_request(user, status='open')).order_by('-filed_date', '-id')[:21],
+        ),
+        QueryShape(
+            'admin_complaints.priority_status', 'views.admin_complaints',
+            _filtered_complaints(_request(user, status='open', priority='urgent'))
+            .order_by('-filed_date', '-id')[:21],
+        ),
+        QueryShape(
+            'admin_complaints.assigned_me', 'views.admin_complaints',
+            _filtered_complaints(_request(user, status='open', assigned='me'))
+            .order_by('-filed_date', '-id')[:21],
+        ),
+        QueryShape(
+            'my_applications', 'views.my_applications',
+            Application.objects.filter(applicant=user).order_by('-applied_date', '-id')[:11],
+        ),
+        QueryShape(
+            'my_complaints', 'views.my_complaints',
+            Complaint.objects.filter(complainant=user).order_by('-filed_date', '-id')[:11],
+        ),
+        QueryShape(
+            'admin_dashboard.pending_staff', 'views.admin_dashboard',
+            CustomUser.objects.filter(role__in=['staff', 'admin'], is_active=False).order_by('-date_joined')[:5],
+        ),
+        QueryShape(
+            'admin_dashboard.recent_citizens', 'views.admin_dashboard',
+            CustomUser.objects.filter(role='citizen', is_active=True).order_by('-date_joined')[:10],
+        ),
+        QueryShape(
+            'otp.latest_unused', 'security_utils.verify_otp',
+            EmailOTP.objects.filter(user=user, is_used=False).order_by('-created_at')[:1],
+        ),
+        QueryShape(
+            'otp.recent', 'security_utils.resend_otp',
+            EmailOTP.objects.filter(user=user, created_at__gte=now - timedelta(minutes=1))[:1],
+        ),
+        QueryShape(
+            'staff_autocomplete', 'assignment.search_staff',
+            assignable_staff().order_by('first_name', 'last_name', 'username', 'id')[:21],
+        ),
+        QueryShape(
+            'assignment.open_loads', 'assignment.open_complaint_loads',
+            Complaint.objects.filter(assigned_to__in=[user.pk], status__in=OPEN_STATUSES)
+            .values('assigned_to').annotate(n=Count('id')),
+        ),
+        QueryShape(
+            'track.lookup', 'tracking.lookup',
+            Application.objects.filter(application_number='GP-0000000000'),
+        ),
+        QueryShape(
+            'email_queue.due', 'email_queue.claim_batch',
+            OutboundEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:50],
+        ),
+        QueryShape(
+            'statistics.certificates_issued', 'statistics.get_certificate_statistics',
+            BirthCertificate.objects.filter(Q(certificate_number__isnull=False)).order_by(),
+        ),
+        QueryShape(
+            'dashboard_timeseries', 'rollups.time_series',
+            DailyRollup.objects.filter(metric='submitted', day__gte=now.date() - timedelta(days=29))
+            .values('day').annotate(n=Sum('count')).order_by(),
+        ),
+    ]
+
+
+# ============================================
+# QUERY ANALYSIS
+# ============================================
+
+def _field_lookups(node, alias):
+    """
+    (lookup name, field, value) triples ANDed at the top of a WHERE tree
+
+    Only lookups on plain columns of the queried table are returned.
+    """
+    if node.negated or (node.connector != AND and len(node.children) > 1):
+        return
+    for child in node.children:
+        if isinstance(child, WhereNode):
+            yield from _field_lookups(child, alias)
+        elif isinstance(child, Lookup) and isinstance(child.lhs, Col) and child.lhs.alias == alias:
+            yield child.lookup_name, child.lhs.target, child.rhs
+
+
+def _ordering_fields(query):
+    """Fields of the ORDER BY clause, up to the first one an index cannot serve"""
+    opts = query.get_meta()
+    if query.group_by is not None:
+        # Grouped queries drop Meta.ordering
+        ordering = query.order_by
+    else:
+        ordering = query.order_by or (opts.ordering if query.default_ordering else ())
+    fields = []
+    for item in ordering:
+        if isinstance(item, OrderBy) and hasattr(item.expression, 'name'):
+            item = item.expression.name
+        if not isinstance(item, str) or item == '?' or '__' in item:
+            break
+        name = item.lstrip('-')
+        fields.append(opts.pk if name == 'pk' else opts.get_field(name))
+    return fields
+
+
+def query_columns(queryset):
+    """
+    Columns of a query that an index could serve
+
+    Args:
+        queryset (QuerySet): Query to analyze
+
+    Returns:
+        dict: {'equality', 'range', 'order'}, each a list of model fields,
+            and 'multi', the equality fields matching several values (IN)
+    """
+    query = queryset.query
+    equality, ranges, multi = [], [], []
+    for lookup_name, field, value in _field_lookups(query.where, query.base_table):
+        if lookup_name == 'isnull' and not value:
+            # IS NOT NULL reads a range of the index, not one key
+            lookup_name = 'gt'
+        if lookup_name in EQUALITY_LOOKUPS and field not in equality:
+            equality.append(field)
+            if lookup_name == 'in' and len(value) > 1:
+                multi.append(field)
+        elif lookup_name in RANGE_LOOKUPS and field not in ranges:
+            ranges.append(field)
+    # A column both compared with = and ranged is only an equality
+    ranges = [field for field in ranges if field not in equality]
+    order = [field for field in _ordering_fields(query) if field not in equality]
+    return {'equality': equality, 'range': ranges, 'order': order, 'multi': multi}
+
+
+def suggested_fields(columns):
+    """
+    Composite index serving a query: equality columns, then the ordering
+    when no range breaks it, else the first range column
+
+    Returns:
+        list: Model fields, in index order
+    """
+    ranges, order = columns['range'], columns['order']
+    if ranges and not (order and order[0] == ranges[0]):
+        tail = ranges[:1]
+    else:
+        tail = order
+    return columns['equality'] + tail
+
+
+def table_indexes(model):
+    """
+    Indexes of a model's table as the database reports them
+
+    Returns:
+        dict: {index name: ([column, ...], unique)}
+    """
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    return {
+        name: (info['columns'], bool(info['unique'] or info['primary_key']))
+        for name, info in constraints.items()
+        if (info['index'] or info['unique'] or info['primary_key'])
+        and info['columns'] and None not in info['columns']
+    }
+
+
+def _equality_values(where, alias):
+    """
+    {column: set of values} for the = and IN comparisons ANDed at the
+    top of a WHERE tree
+    """
+    values = {}
+    for lookup_name, field, value in _field_lookups(where, alias):
+        try:
+            if lookup_name == 'exact':
+                values[field.column] = {value}
+            elif lookup_name == 'in' and isinstance(value, (list, tuple, set)):
+                values[field.column] = set(value)
+        except TypeError:
+            # Unhashable value (e.g. JSON); cannot imply a condition
+            pass
+    return values
+
+
+def _condition_values(model, condition):
+    """
+    {column: allowed values} of a partial index condition, or None
+    unless it is only = and IN comparisons of the model's columns
+    """
+    where = model._default_manager.filter(condition).query.where
+    values = _equality_values(where, model._meta.db_table)
+    return values if len(values) == len(where.children) else None
+
+
+def usable_indexes(queryset):
+    """
+    Indexes of the queried table that can serve the query
+
+    Partial indexes (Meta.indexes with a condition) count only when the
+    query's filter implies their condition; the columns the condition
+    fixes then lead their column list.
+
+    Returns:
+        dict: table_indexes() output
+    """
+    model = queryset.model
+    indexes = table_indexes(model)
+    filtered = _equality_values(queryset.query.where, queryset.query.base_table)
+    for index in model._meta.indexes:
+        if index.condition is None or index.name not in indexes:
+            # Not partial, or not built on this database (MySQL)
+            continue
+        allowed = _condition_values(model, index.condition)
+        if allowed is None or not all(
+            column in filtered and filtered[column] <= values for column, values in allowed.items()
+        ):
+            del indexes[index.name]
+            continue
+        columns, unique = indexes[index.name]
+        indexes[index.name] = ([column for column in allowed if column not in columns] + columns, unique)
+    return indexes
+
+
+def coverage(columns, indexes):
+    """
+    How well the best of `indexes` serves a query
+
+    Args:
+        columns (dict): query_columns() output
+        indexes (dict): table_indexes() output
+
+    Returns:
+        tuple: (status, index name or None)
+    """
+    equality = {field.column for field in columns['equality']}
+    single = equality - {field.column for field in columns['multi']}
+    tail = [field.column for field in suggested_fields(columns)[len(columns['equality']):]]
+    if not equality and not tail:
+        return UNBOUNDED, None
+
+    best = (MISSING, None)
+    rank = [COVERED, SORT, PARTIAL, MISSING]
+    # Unique indexes first, so ties name the index that also enforces a key
+    for name, (index_columns, unique) in sorted(indexes.items(), key=lambda item: (not item[1][1], item[0])):
+        head = index_columns[:len(equality)]
+        if unique and set(index_columns) <= single:
+            # At most one row: nothing left to sort
+            status = COVERED
+        elif equality and set(head) == equality:
+            rest = index_columns[len(equality):]
+            # Rows for several IN values come back ordered per value only
+            ordered = rest[:len(tail)] == tail and not (columns['multi'] and columns['order'])
+            status = COVERED if ordered else SORT
+        elif not equality and tail and index_columns[:len(tail)] == tail:
+            status = COVERED
+        elif equality and index_columns[0] in equality:
+            status = PARTIAL
+        else:
+            continue
+        if rank.index(status) < rank.index(best[0]):
+            best = (status, name)
+    return best
+
+
+# ============================================
+# EXPLAIN PLANS
+# ============================================
+
+def _walk(node):
+    """Every dict nested in a JSON plan"""
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value)
+
+
+_SQLITE_STEP = re.compile(r'\b(SCAN|SEARCH) (\w+)(?: USING (?:COVERING )?INDEX (\w+))?')
+
+
+def explain_summary(queryset):
+    """
+    The database's plan for a query, reduced to what matters for indexing
+
+    Returns:
+        dict: {'indexes': names used, 'full_scans': tables read in full,
+               'sort': whether rows are sorted after reading, 'plan': raw text}
+    """
+    vendor = connection.vendor
+    summary = {'indexes': [], 'full_scans': [], 'sort': False}
+    if vendor == 'postgresql':
+        plan = queryset.explain(format='json')
+        for node in _walk(json.loads(plan)):
+            node_type = node.get('Node Type', '')
+            if node_type == 'Seq Scan':
+                summary['full_scans'].append(node['Relation Name'])
+            elif 'Index Name' in node:
+                summary['indexes'].append(node['Index Name'])
+            elif node_type.endswith('Sort'):
+                summary['sort'] = True
+    elif vendor == 'mysql':
+        plan = queryset.explain(format='json')
+        for node in _walk(json.loads(plan)):
+            if 'table_name' in node:
+                if node.get('access_type') == 'ALL':
+                    summary['full_scans'].append(node['table_name'])
+                elif node.get('key'):
+                    summary['indexes'].append(node['key'])
+            if node.get('using_filesort'):
+                summary['sort'] = True
+    else:
+        plan = queryset.explain()
+        for step, table, index in _SQLITE_STEP.findall(plan):
+            if index:
+                summary['indexes'].append(index)
+            elif step == 'SCAN':
+                summary['full_scans'].append(table)
+        summary['sort'] = 'TEMP B-TREE' in plan
+    summary['plan'] = plan
+    return summary
+
+
+def analyze(shape, explain=True):
+    """
+    Index report for one query shape
+
+    Args:
+        shape (QueryShape): Query to check
+        explain (bool): Also run EXPLAIN
+
+    Returns:
+        dict: {'name', 'source', 'table', 'status', 'index', 'equality',
+               'range', 'order', 'suggested', 'explain'}
+    """
+    model = shape.queryset.model
+    columns = query_columns(shape.queryset)
+    status, index = coverage(columns, usable_indexes(shape.queryset))
+    return {
+        'name': shape.name,
+        'source': shape.source,
+        'table': model._meta.db_table,
+        'status': status,
+        'index': index,
+        'equality': [field.name for field in columns['equality']],
+        'range': [field.name for field in columns['range']],
+        'order': [field.name for field in columns['order']],
+        'suggested': [field.name for field in suggested_fields(columns)],
+        'explain': explain_summary(shape.queryset) if explain else None,
+    }
+
+
+def audit(explain=True, names=None):
+    """
+    Index reports for the query catalog
+
+    Args:
+        explain (bool): Also run EXPLAIN for each query
+        names (list): Only shapes whose name contains one of these
+
+    Returns:
+        list: analyze() output per shape
+    """
+    shapes = query_shapes()
+    if names:
+        shapes = [shape for shape in shapes if any(name in shape.name for name in names)]
+    return [analyze(shape, explain) for shape in shapes]
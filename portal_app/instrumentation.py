@@ -0,0 +1,272 @@
+"""
+Per-Request Performance Instrumentation for Gram Panchayat Portal
+
+Opt-in (PERFORMANCE_INSTRUMENTATION = True) breakdown of where each
+request spends its time:
+- View name, total time and response size
+- Database query count and cumulative SQL time, on every connection,
+  via connection.execute_wrapper()
+- Template render time, via the InstrumentedTemplates backend
+  configured in TEMPLATES
+
+Each request's numbers are sent back in a Server-Timing header (shown
+in the browser's network panel), logged as one JSON line on the
+'portal_app.instrumentation' logger, and aggregated in-process per view.
+The staff-only /metrics/ page serves the aggregates as Prometheus text,
+with percentiles over the last PERFORMANCE_SAMPLE_SIZE requests per
+view. Each worker process keeps its own aggregates.
+
+Streaming responses (exports) are measured up to the point the response
+starts; queries made while streaming the body are not counted.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from .benchmarking import percentile
+
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# (metric name, help text, RequestMetrics attribute)
+SUMMARIES = [
+    ('portal_request_duration_seconds', 'Time spent handling the request', 'duration'),
+    ('portal_request_db_queries', 'Database queries per request', 'db_queries'),
+    ('portal_request_db_seconds', 'Cumulative SQL time per request', 'db_time'),
+    ('portal_request_template_seconds', 'Template render time per request', 'template_time'),
+    ('portal_response_size_bytes', 'Response body size', 'response_bytes'),
+]
+
+_current = ContextVar('portal_request_metrics', default=None)
+
+
+# ============================================
+# PER-REQUEST MEASUREMENT
+# ============================================
+
+class RequestMetrics:
+    """Numbers collected while one request is handled (times in seconds)"""
+
+    def __init__(self):
+        self.view = 'unresolved'
+        self.status = 0
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.response_bytes = 0
+        self.rendering = False
+
+    def record_query(self, execute, sql, params, many, context):
+        """connection.execute_wrapper() hook timing every SQL statement"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += time.perf_counter() - start
+
+    def server_timing(self):
+        """
+        Server-Timing header value
+
+        Returns:
+            str: e.g. 'total;dur=41.2, db;dur=6.3;desc="7 queries", tpl;dur=12.0'
+        """
+        return (
+            f'total;dur={self.duration * 1000:.1f}, '
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries", '
+            f'tpl;dur={self.template_time * 1000:.1f}'
+        )
+
+    def as_dict(self):
+        return {
+            'view': self.view,
+            'status': self.status,
+            'duration_ms': round(self.duration * 1000, 2),
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'template_ms': round(self.template_time * 1000, 2),
+            'response_bytes': self.response_bytes,
+        }
+
+
+class TimedTemplate(Template):
+    """Django template that adds its render time to the current request"""
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        # Only the outermost render is timed, so nested renders
+        # (render_to_string inside a tag) are not counted twice
+        if metrics is None or metrics.rendering:
+            return super().render(context, request)
+        metrics.rendering = True
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+            metrics.rendering = False
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    """
+    DjangoTemplates backend returning TimedTemplate
+
+    Costs one context variable lookup per render when instrumentation
+    is off.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# ============================================
+# IN-PROCESS AGGREGATION
+# ============================================
+
+class _Series:
+    """Count, sum and a window of recent samples for one metric"""
+
+    def __init__(self, sample_size):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=sample_size)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+
+class MetricsRegistry:
+    """Per-view request metrics, thread-safe, for the /metrics/ page"""
+
+    def __init__(self, sample_size=None):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+            self._statuses = {}
+
+    def record(self, metrics):
+        """Add one request's RequestMetrics to the aggregates"""
+        sample_size = self.sample_size or getattr(settings, 'PERFORMANCE_SAMPLE_SIZE', 1000)
+        with self._lock:
+            for name, _help, attribute in SUMMARIES:
+                key = (name, metrics.view)
+                if key not in self._series:
+                    self._series[key] = _Series(sample_size)
+                self._series[key].add(getattr(metrics, attribute))
+            status_key = (metrics.view, metrics.status)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def render_prometheus(self):
+        """
+        Aggregates in the Prometheus text exposition format
+
+        Returns:
+            str: One summary per metric (quantiles over the recent
+                samples, all-time _sum and _count) and a request counter
+                by view and status
+        """
+        with self._lock:
+            series = {key: (s.count, s.total, list(s.samples)) for key, s in self._series.items()}
+            statuses = dict(self._statuses)
+
+        lines = []
+        for name, help_text, _attribute in SUMMARIES:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} summary')
+            for (metric, view), (count, total, samples) in sorted(series.items()):
+                if metric != name:
+                    continue
+                label = f'view="{_escape(view)}"'
+                for quantile in QUANTILES:
+                    value = percentile(samples, quantile * 100)
+                    lines.append(f'{name}{{{label},quantile="{quantile}"}} {value:g}')
+                lines.append(f'{name}_sum{{{label}}} {total:g}')
+                lines.append(f'{name}_count{{{label}}} {count}')
+
+        lines.append('# HELP portal_requests_total Requests handled')
+        lines.append('# TYPE portal_requests_total counter')
+        for (view, status), count in sorted(statuses.items()):
+            lines.append(f'portal_requests_total{{view="{_escape(view)}",status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+class InstrumentationMiddleware:
+    """
+    Measure each request and publish the numbers
+
+    Listed first in MIDDLEWARE so the totals include the other
+    middleware. Removes itself unless PERFORMANCE_INSTRUMENTATION is on.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERFORMANCE_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.record_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            metrics.view = match.view_name
+        metrics.status = response.status_code
+        if not response.streaming:
+            metrics.response_bytes = len(response.content)
+
+        existing = response.get('Server-Timing')
+        timing = metrics.server_timing()
+        response['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+
+        record = metrics.as_dict()
+        record['method'] = request.method
+        logger.info(json.dumps(record, sort_keys=True), extra={'performance': record})
+        registry.record(metrics)
+        return response
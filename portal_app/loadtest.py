@@ -0,0 +1,441 @@
+"""
+HTTP Load Testing for Gram Panchayat Portal
+
+Locust-style virtual users driving a running portal over HTTP with
+realistic citizen and staff journeys:
+
+    register   Register a new citizen and verify the emailed OTP
+    apply      Citizen login -> birth certificate application -> track it
+    review     Staff login -> pending review queue -> approve one
+
+Journeys are drawn at random from a weighted mix. A load stage runs
+either closed-loop (N virtual users, each starting a new journey as soon
+as the last one ends) or open-loop (journeys arrive as a Poisson process
+at a fixed rate, with at most N in flight), and reports throughput,
+error rate and latency. Running stages at increasing concurrency shows
+where the portal saturates.
+
+Requires the httpx package (pip install httpx); the portal itself does
+not. The register journey reads OTP codes from the portal's database, so
+run the load test with the same settings as the server. Citizen and
+staff logins use the accounts created by generate_load_data. Per-IP
+rate limits only tell virtual users apart when the server trusts their
+X-Forwarded-For header (see VirtualUser).
+"""
+
+import asyncio
+import random
+import re
+import time
+import uuid
+from datetime import date
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+
+from .benchmarking import percentile
+
+
+JOURNEYS = ('register', 'apply', 'review')
+DEFAULT_MIX = {'register': 1, 'apply': 6, 'review': 3}
+
+APPLICATION_NUMBER_RE = re.compile(r'GP[A-Z]{4}\d{11}')
+REVIEW_LINK_RE = re.compile(r'/admin/application/(\d+)/review/')
+PDF_BYTES = b'%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\ntrailer << /Root 1 0 R >>\n%%EOF\n'
+
+
+def import_httpx():
+    try:
+        import httpx
+    except ImportError:
+        raise ImproperlyConfigured('The load test requires the httpx package: pip install httpx')
+    return httpx
+
+
+def parse_mix(value):
+    """
+    Parse a journey mix such as 'register=1,apply=6,review=3'
+
+    Journeys left out get weight 0.
+
+    Returns:
+        dict: {journey: weight}
+
+    Raises:
+        ValueError: Unknown journey, bad weight, or all weights zero
+    """
+    mix = dict.fromkeys(JOURNEYS, 0)
+    for part in filter(None, (item.strip() for item in value.split(','))):
+        name, sep, weight = part.partition('=')
+        name = name.strip()
+        if not sep or name not in mix:
+            raise ValueError(f"Expected journey=weight with journey one of {', '.join(JOURNEYS)}, got {part!r}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"Weight for {name} must be a number, got {weight!r}")
+        if mix[name] < 0:
+            raise ValueError(f"Weight for {name} must not be negative")
+    if not any(mix.values()):
+        raise ValueError('At least one journey needs a positive weight')
+    return mix
+
+
+def parse_application_number(html):
+    """First application number (e.g. GPBIRT25260000001) in a page, or None"""
+    match = APPLICATION_NUMBER_RE.search(html)
+    return match.group(0) if match else None
+
+
+def parse_review_ids(html):
+    """Application ids linked from a review queue page, in page order"""
+    return list(dict.fromkeys(int(pk) for pk in REVIEW_LINK_RE.findall(html)))
+
+
+# ============================================
+# RESULTS
+# ============================================
+
+class JourneyFailed(Exception):
+    """A step got an unexpected response; the journey is abandoned"""
+
+
+class StageStats:
+    """Requests and journey outcomes collected during one load stage"""
+
+    def __init__(self):
+        self.requests = []  # (journey, step, ok, latency seconds)
+        self.outcomes = {}  # (journey, outcome) -> count
+        self.errors = {}    # message -> count
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def add_request(self, journey, step, ok, latency):
+        self.requests.append((journey, step, ok, latency))
+
+    def add_outcome(self, journey, outcome, error=None):
+        self.outcomes[(journey, outcome)] = self.outcomes.get((journey, outcome), 0) + 1
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self, elapsed):
+        """
+        Throughput, error rate and latency for the stage
+
+        Args:
+            elapsed (float): Wall-clock seconds the stage ran
+
+        Returns:
+            dict: Totals, per-journey outcomes and per-step latency
+        """
+        latencies = [latency * 1000 for _j, _s, _ok, latency in self.requests]
+        failed = sum(1 for _j, _s, ok, _l in self.requests if not ok)
+        journeys = {}
+        for (journey, outcome), count in sorted(self.outcomes.items()):
+            journeys.setdefault(journey, {})[outcome] = count
+        steps = {}
+        for journey, step, ok, latency in self.requests:
+            entry = steps.setdefault(f'{journey}.{step}', {'samples': [], 'errors': 0})
+            entry['samples'].append(latency * 1000)
+            entry['errors'] += not ok
+        completed = sum(count for (_j, outcome), count in self.outcomes.items() if outcome != 'failed')
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'requests': len(self.requests),
+            'failed_requests': failed,
+            'error_rate': round(failed / len(self.requests), 4) if self.requests else 0.0,
+            'throughput_rps': round(len(self.requests) / elapsed, 2) if elapsed else 0.0,
+            'journeys_completed': completed,
+            'journeys_per_s': round(completed / elapsed, 2) if elapsed else 0.0,
+            'peak_in_flight': self.peak_in_flight,
+            'p50_ms': round(percentile(latencies, 50), 1),
+            'p95_ms': round(percentile(latencies, 95), 1),
+            'p99_ms': round(percentile(latencies, 99), 1),
+            'journeys': journeys,
+            'steps': {
+                name: {
+                    'requests': len(entry['samples']),
+                    'errors': entry['errors'],
+                    'p50_ms': round(percentile(entry['samples'], 50), 1),
+                    'p95_ms': round(percentile(entry['samples'], 95), 1),
+                }
+                for name, entry in sorted(steps.items())
+            },
+            'top_errors': dict(sorted(self.errors.items(), key=lambda item: -item[1])[:5]),
+        }
+
+
+# ============================================
+# VIRTUAL USERS
+# ============================================
+
+class VirtualUser:
+    """
+    One simulated visitor: its own cookies, client address and journey
+
+    Each virtual user sends a distinct X-Forwarded-For address. Run the
+    target server with TRUSTED_PROXY_COUNT=1 (and nothing else between
+    it and the load generator) so the per-IP login, OTP and tracking
+    rate limits count each virtual user separately, as with real
+    visitors; otherwise they all share the generator's address.
+    """
+
+    def __init__(self, client, stats, journey, config):
+        self.client = client
+        self.stats = stats
+        self.journey = journey
+        self.config = config
+
+    async def request(self, step, method, url, expect=200, **kwargs):
+        """Send one request, record it, and fail the journey on a bad status"""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception as exc:  # httpx.HTTPError and timeouts
+            self.stats.add_request(self.journey, step, False, time.perf_counter() - start)
+            raise JourneyFailed(f'{step}: {type(exc).__name__}')
+        ok = response.status_code == expect
+        self.stats.add_request(self.journey, step, ok, time.perf_counter() - start)
+        if not ok:
+            raise JourneyFailed(f'{step}: HTTP {response.status_code}')
+        return response
+
+    async def get(self, step, url, **kwargs):
+        return await self.request(step, 'GET', url, **kwargs)
+
+    async def post(self, step, url, data, files=None, expect=302):
+        """POST a form with the CSRF token from the cookie set by an earlier GET"""
+        data = {**data, 'csrfmiddlewaretoken': self.client.cookies.get(settings.CSRF_COOKIE_NAME, '')}
+        headers = {'Referer': str(self.client.base_url.join(url))}
+        return await self.request(step, 'POST', url, expect=expect, data=data, files=files, headers=headers)
+
+    async def login(self, username):
+        url = reverse('login')
+        await self.get('login_page', url)
+        # A rejected login re-renders the form with 200, failing the step
+        await self.post('login', url, {'username': username, 'password': self.config.password})
+
+    # ============================================
+    # JOURNEYS
+    # ============================================
+
+    async def run_register(self):
+        from asgiref.sync import sync_to_async
+
+        url = reverse('register')
+        token = uuid.uuid4().hex[:10]
+        password = f'Lt#{uuid.uuid4().hex[:12]}'
+        await self.get('register_page', url)
+        await self.post('register', url, {
+            'username': f'{self.config.prefix}_lt_{token}',
+            'first_name': 'Load',
+            'last_name': 'Test',
+            'email': f'{self.config.prefix}_lt_{token}@example.com',
+            'phone_number': f'7{uuid.uuid4().int % 10**9:09d}',
+            'date_of_birth': '1990-01-01',
+            'address': 'Ward 1',
+            'village': 'Loadtest',
+            'pincode': '411001',
+            'role': 'citizen',
+            'password1': password,
+            'password2': password,
+        })
+        otp_url = reverse('verify_otp')
+        await self.get('otp_page', otp_url)
+        code = await sync_to_async(latest_otp_code)(f'{self.config.prefix}_lt_{token}')
+        if code is None:
+            raise JourneyFailed('register: no OTP issued')
+        response = await self.post('verify_otp', otp_url, {'otp_code': code})
+        if not response.headers.get('location', '').endswith(reverse('login')):
+            raise JourneyFailed('verify_otp: rejected')
+        return 'completed'
+
+    async def run_apply(self):
+        await self.login(self.config.citizen_username())
+        url = reverse('apply_birth_certificate')
+        await self.get('apply_page', url)
+        response = await self.post('apply', url, {
+            'child_name': 'Load Child',
+            'child_gender': 'female',
+            'date_of_birth': date(2025, 1, 15).isoformat(),
+            'place_of_birth': 'PHC',
+            'father_name': 'Load Father',
+            'mother_name': 'Load Mother',
+            'permanent_address': 'Ward 1',
+        }, files={
+            'hospital_certificate': ('hospital.pdf', PDF_BYTES, 'application/pdf'),
+            'parents_id_proof': ('parents.pdf', PDF_BYTES, 'application/pdf'),
+        })
+        detail = await self.get('application_detail', response.headers['location'])
+        number = parse_application_number(detail.text)
+        if number is None:
+            raise JourneyFailed('application_detail: no application number')
+        await self.get('track', reverse('track_application'), params={'app_number': number})
+        return 'completed'
+
+    async def run_review(self):
+        await self.login(self.config.staff_username())
+        queue = await self.get('review_queue', reverse('admin_applications'), params={'status': 'pending'})
+        ids = parse_review_ids(queue.text)
+        if not ids:
+            return 'empty_queue'
+        # Spread concurrent reviewers over the first page of the queue
+        url = reverse('admin_review_application', args=[self.config.rng.choice(ids)])
+        await self.get('review_page', url)
+        await self.post('approve', url, {'status': 'approved', 'admin_remarks': 'Approved during load test'})
+        return 'completed'
+
+
+def latest_otp_code(username):
+    from django.db import connection
+    from .models import EmailOTP
+
+    try:
+        return (
+            EmailOTP.objects.filter(user__username=username, is_used=False)
+            .order_by('-created_at').values_list('otp_code', flat=True).first()
+        )
+    finally:
+        # Called via sync_to_async, on a worker thread that outlives the
+        # load test; do not leave a connection (or pool slot) open there
+        connection.close()
+
+
+# ============================================
+# LOAD STAGES
+# ============================================
+
+class LoadTestConfig:
+    """
+    Settings shared by every stage of a load test
+
+    Args:
+        base_url (str): Portal address, e.g. 'http://127.0.0.1:8000'
+        mix (dict): {journey: weight}, see parse_mix()
+        citizens (list): Citizen usernames for the apply journey
+        staff (list): Staff/admin usernames for the review journey
+        password (str): Password shared by those accounts
+        prefix (str): Prefix for usernames created by the register journey
+        timeout (float): Per-request timeout in seconds
+        seed (int): Random seed for journey choice and arrivals
+    """
+
+    def __init__(self, base_url, mix=None, citizens=(), staff=(), password='Load@12345',
+                 prefix='load', timeout=30.0, seed=None):
+        self.base_url = base_url.rstrip('/')
+        self.mix = dict(mix or DEFAULT_MIX)
+        self.citizens = list(citizens)
+        self.staff = list(staff)
+        self.password = password
+        self.prefix = prefix
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        if self.mix.get('apply') and not self.citizens:
+            raise ImproperlyConfigured('The apply journey needs citizen accounts')
+        if self.mix.get('review') and not self.staff:
+            raise ImproperlyConfigured('The review journey needs staff accounts')
+
+    def choose_journey(self):
+        names = [name for name in JOURNEYS if self.mix.get(name)]
+        return self.rng.choices(names, weights=[self.mix[name] for name in names])[0]
+
+    def citizen_username(self):
+        return self.rng.choice(self.citizens)
+
+    def staff_username(self):
+        return self.rng.choice(self.staff)
+
+    def client_ip(self):
+        return f'10.{self.rng.randrange(256)}.{self.rng.randrange(256)}.{self.rng.randrange(1, 255)}'
+
+
+async def run_journey(config, stats, httpx):
+    journey = config.choose_journey()
+    stats.in_flight += 1
+    stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+    try:
+        async with httpx.AsyncClient(
+            base_url=config.base_url,
+            headers={'X-Forwarded-For': config.client_ip()},
+            timeout=config.timeout,
+        ) as client:
+            user = VirtualUser(client, stats, journey, config)
+            outcome = await getattr(user, f'run_{journey}')()
+        stats.add_outcome(journey, outcome)
+    except JourneyFailed as exc:
+        stats.add_outcome(journey, 'failed', str(exc))
+    finally:
+        stats.in_flight -= 1
+
+
+async def run_stage(config, concurrency, duration, arrival_rate=0):
+    """
+    Run one load stage
+
+    Args:
+        config (LoadTestConfig): Shared settings
+        concurrency (int): Virtual users (closed loop) or the cap on
+            journeys in flight (open loop)
+        duration (float): Seconds during which new journeys start;
+            journeys still running at the end are allowed to finish
+        arrival_rate (float): Journeys started per second (Poisson
+            arrivals); 0 for a closed loop
+
+    Returns:
+        dict: StageStats.summary() plus the stage parameters
+    """
+    httpx = import_httpx()
+    stats = StageStats()
+    start = time.perf_counter()
+    deadline = start + duration
+
+    if arrival_rate > 0:
+        slots = asyncio.Semaphore(concurrency)
+        tasks = []
+
+        async def arrival():
+            async with slots:
+                await run_journey(config, stats, httpx)
+
+        next_start = start
+        while True:
+            next_start += config.rng.expovariate(arrival_rate)
+            if next_start >= deadline:
+                break
+            await asyncio.sleep(max(0.0, next_start - time.perf_counter()))
+            tasks.append(asyncio.create_task(arrival()))
+        await asyncio.gather(*tasks)
+    else:
+        async def virtual_user():
+            while time.perf_counter() < deadline:
+                await run_journey(config, stats, httpx)
+
+        await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+
+    result = stats.summary(time.perf_counter() - start)
+    result.update({'concurrency': concurrency, 'duration_s': duration, 'arrival_rate': arrival_rate})
+    return result
+
+
+def run_load_test(config, stages, duration, arrival_rate=0, on_stage=None):
+    """
+    Run stages at each concurrency level in turn
+
+    Args:
+        config (LoadTestConfig): Shared settings
+        stages (list): Concurrency per stage, e.g. [5, 10, 20]
+        duration (float): Seconds per stage
+        arrival_rate (float): Journeys per second, 0 for closed loop
+        on_stage (callable): Called with each stage's result as it ends
+
+    Returns:
+        list: run_stage() results in stage order
+    """
+    results = []
+    for concurrency in stages:
+        result = asyncio.run(run_stage(config, concurrency, duration, arrival_rate))
+        results.append(result)
+        if on_stage:
+            on_stage(result)
+    return results
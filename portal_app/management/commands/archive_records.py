@@ -0,0 +1,55 @@
+"""
+Move old closed applications and complaints to the archive tables
+
+Approved/rejected applications and closed complaints reviewed/resolved
+more than --days ago (default ARCHIVE_AFTER_DAYS) are copied to
+ArchivedApplication / ArchivedComplaint and deleted from the live
+tables, --batch-size records per transaction. Schedule it off-peak
+(e.g. nightly via cron); --limit bounds the work done per run.
+
+Usage:
+    python manage.py archive_records --dry-run
+    python manage.py archive_records
+    python manage.py archive_records --days 365 --batch-size 1000 --limit 50000
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from portal_app import archive
+
+
+class Command(BaseCommand):
+    help = 'Archive old closed applications and complaints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                            help='Archive records closed more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE,
+                            help='Records moved per transaction')
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Stop after this many applications (and as many complaints)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the records due')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        before = archive.cutoff(options['days'])
+
+        if options['dry_run']:
+            applications = archive.archivable_applications(before).count()
+            complaints = archive.archivable_complaints(before).count()
+            self.stdout.write(
+                f'{applications} application(s) and {complaints} complaint(s) '
+                f'closed before {before:%Y-%m-%d} would be archived.'
+            )
+            return
+
+        applications = archive.archive_applications(before, options['batch_size'], options['limit'])
+        complaints = archive.archive_complaints(before, options['batch_size'], options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {applications} application(s) and {complaints} complaint(s) '
+            f'closed before {before:%Y-%m-%d}.'
+        ))
@@ -0,0 +1,138 @@
+"""
+Benchmark approving a batch of applications: one at a time vs bulk_review
+
+Seeds a batch of pending applications inside a transaction, approves
+them the way the review page does (one review_application() per item)
+and then with reviews.bulk_review(), and rolls everything back, so the
+database is left unchanged.
+
+Usage:
+    python manage.py benchmark_bulk_review --size 1000
+    python manage.py benchmark_bulk_review --size 1000 --type income_certificate
+"""
+
+import time
+from datetime import date
+
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from portal_app import numbering, reviews
+from portal_app.models import (
+    Application, BirthCertificate, CustomUser, IncomeCertificate, TaxPayment
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare per-item and bulk approval of a batch of applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000, help='Applications per batch')
+        parser.add_argument(
+            '--type',
+            default='birth_certificate',
+            choices=['birth_certificate', 'income_certificate', 'water_tax'],
+            help='Application type to seed',
+        )
+        parser.add_argument('--skip-single', action='store_true',
+                            help='Only measure bulk_review')
+
+    def handle(self, *args, **options):
+        reviewer = CustomUser.objects.filter(role__in=['admin', 'staff']).first()
+        if reviewer is None:
+            raise CommandError('Create a staff or admin user first')
+
+        size = options['size']
+        self.stdout.write(f"Batch: {size} pending {options['type']} applications\n")
+
+        if not options['skip_single']:
+            self._run('single', options['type'], size, lambda ids: self._approve_one_by_one(ids, reviewer))
+        self._run('bulk', options['type'], size,
+                  lambda ids: reviews.bulk_review(ids, 'approved', reviewer))
+
+    def _run(self, label, application_type, size, approve):
+        try:
+            with transaction.atomic():
+                ids = self._seed(application_type, size)
+                # Counted with a wrapper: the debug query log keeps only 9000 entries
+                queries = []
+                with connection.execute_wrapper(
+                    lambda execute, sql, params, many, context: queries.append(sql) or execute(sql, params, many, context)
+                ):
+                    start = time.perf_counter()
+                    approve(ids)
+                    elapsed = time.perf_counter() - start
+                approved = Application.objects.filter(pk__in=ids, status='approved').count()
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(
+            f"{label:<7} approved={approved:<6} queries={len(queries):<7} "
+            f"total={elapsed * 1000:.1f}ms per_item={elapsed * 1000 / size:.3f}ms"
+        )
+
+    def _approve_one_by_one(self, ids, reviewer):
+        for application_id in ids:
+            application = Application.objects.with_details().get(pk=application_id)
+            old_status, old_reviewed_date = application.status, application.reviewed_date
+            application.status = 'approved'
+            application.reviewed_by = reviewer
+            application.reviewed_date = timezone.now()
+            reviews.review_application(application, old_status, old_reviewed_date, reviewer)
+
+    def _seed(self, application_type, size):
+        """Create `size` pending applications with detail rows; returns their ids"""
+        applicant = CustomUser.objects.filter(role='citizen').first()
+        if applicant is None:
+            raise CommandError('Create a citizen user first')
+
+        prefix = f"GP{application_type[:4].upper()}"
+        numbers = numbering.next_numbers(prefix, size)
+        Application.objects.bulk_create([
+            Application(applicant=applicant, application_type=application_type,
+                        status='pending', application_number=number)
+            for number in numbers
+        ], batch_size=500)
+        applications = list(Application.objects.filter(application_number__in=numbers).order_by('pk'))
+
+        if application_type == 'birth_certificate':
+            details = [
+                BirthCertificate(
+                    application=application, child_name=f'Bench Child {i}', child_gender='female',
+                    date_of_birth=date(2025, 1, 1), place_of_birth='PHC', father_name='Bench Father',
+                    mother_name='Bench Mother', permanent_address='Ward 1',
+                    hospital_certificate='birth_certificates/bench.pdf',
+                    parents_id_proof='birth_certificates/bench.pdf',
+                )
+                for i, application in enumerate(applications)
+            ]
+        elif application_type == 'income_certificate':
+            details = [
+                IncomeCertificate(
+                    application=application, applicant_name=f'Bench Applicant {i}',
+                    father_husband_name='Bench Father', occupation='Farmer', annual_income=90000,
+                    income_source='agriculture', income_details='Farm income',
+                    purpose_of_certificate='Scholarship',
+                    residential_address='Ward 1', income_proof='income_certificates/bench.pdf',
+                    id_proof='income_certificates/bench.pdf',
+                )
+                for i, application in enumerate(applications)
+            ]
+        else:
+            receipts = numbering.next_numbers('RCP', size)
+            details = [
+                TaxPayment(
+                    application=application, tax_type=application_type,
+                    property_number=f'BENCH{application.pk}', property_address='Ward 1',
+                    property_area_sqft=500, financial_year='2025-26', tax_amount=1200, total_amount=1200,
+                    receipt_number=receipt,
+                )
+                for application, receipt in zip(applications, receipts)
+            ]
+        type(details[0]).objects.bulk_create(details, batch_size=500)
+        return [application.pk for application in applications]
@@ -0,0 +1,45 @@
+"""
+Benchmark certificate downloads: fresh render vs cached PDF
+
+Runs against the configured database, so seed it first
+(e.g. with create_test_data) and approve at least one application.
+
+Usage:
+    python manage.py benchmark_certificates --repeat 50
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portal_app import certificates
+from portal_app.benchmarking import measure
+from portal_app.models import Application
+
+
+class Command(BaseCommand):
+    help = 'Compare wall time of rendering a certificate PDF with serving the cached copy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Measured runs per variant')
+
+    def handle(self, *args, **options):
+        application = Application.objects.with_details().filter(status='approved').first()
+        if application is None:
+            raise CommandError('No approved application to render')
+
+        def cached():
+            handle, _fingerprint, _modified = certificates.open_cached_certificate(application)
+            with handle:
+                return handle.read()
+
+        self.stdout.write(f"Application: {application.application_number}\n")
+        variants = [
+            ('before (render)', lambda: certificates.render_certificate_pdf(application)),
+            ('after (cached)', cached),
+        ]
+        for label, func in variants:
+            result = measure(func, repeat=options['repeat'])
+            self.stdout.write(
+                f"{label:<18} queries={result['queries']:<3} "
+                f"mean={result['mean_ms']:.2f}ms p50={result['p50_ms']:.2f}ms "
+                f"p95={result['p95_ms']:.2f}ms"
+            )
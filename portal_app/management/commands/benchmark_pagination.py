@@ -0,0 +1,67 @@
+"""
+Benchmark deep-page latency: offset (Paginator) vs keyset (cursor) paging
+
+Runs against the configured database, so seed it first with a large
+dataset. Both variants page through all applications newest first,
+the way admin_applications does.
+
+Usage:
+    python manage.py benchmark_pagination --pages 1 10 100 1000
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.test import RequestFactory
+
+from portal_app import pagination
+from portal_app.benchmarking import measure
+from portal_app.models import Application
+
+
+class Command(BaseCommand):
+    help = 'Compare offset and keyset pagination latency at increasing page depth'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 100, 1000],
+                            help='Page numbers to measure')
+        parser.add_argument('--per-page', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=10, help='Measured runs per variant')
+
+    def handle(self, *args, **options):
+        per_page = options['per_page']
+        applications = Application.objects.all()
+        total = applications.count()
+        if not total:
+            raise CommandError('No applications to paginate')
+        self.stdout.write(f"Dataset: {total} applications, {per_page} per page\n")
+
+        factory = RequestFactory()
+        ordered = applications.order_by('-applied_date', '-id')
+
+        for page in options['pages']:
+            offset = (page - 1) * per_page
+            if offset >= total:
+                self.stdout.write(f"page {page:<6} skipped (only {total} rows)")
+                continue
+
+            def offset_page():
+                page_obj = Paginator(ordered, per_page).get_page(page)
+                return list(page_obj.object_list), page_obj.paginator.num_pages
+
+            # The cursor a user would hold after paging down to this depth
+            params = {}
+            if offset:
+                last = ordered.values('applied_date', 'id')[offset - 1]
+                params['cursor'] = pagination.encode_cursor('next', last['applied_date'], last['id'])
+            request = factory.get('/', params)
+
+            def cursor_page():
+                return pagination.cursor_paginate(request, applications, per_page, 'applied_date')
+
+            for label, func in [('offset', offset_page), ('cursor', cursor_page)]:
+                result = measure(func, repeat=options['repeat'])
+                self.stdout.write(
+                    f"page {page:<6} {label:<7} queries={result['queries']:<2} "
+                    f"mean={result['mean_ms']:.2f}ms p50={result['p50_ms']:.2f}ms "
+                    f"p95={result['p95_ms']:.2f}ms"
+                )
@@ -0,0 +1,161 @@
+"""
+Request throughput with and without database connection pooling
+
+Replays the database side of a request from several threads against the
+configured MySQL or PostgreSQL database: the connection handling Django
+does on request_started, a few queries, and the cleanup on
+request_finished. Each strategy runs on its own temporary alias:
+- connect:    a new connection per request (CONN_MAX_AGE = 0, the old
+              MySQL settings)
+- persistent: one connection per thread, kept for DB_CONN_MAX_AGE
+- pooled:     portal_app.pooling with DB_POOL_OPTIONS
+
+Usage:
+    python manage.py benchmark_pooling --threads 1,8,32 --requests 500
+    python manage.py benchmark_pooling --mode connect --mode pooled --pool-size 4 --output pool.json
+"""
+
+import copy
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from portal_app import pooling
+from portal_app.benchmarking import summarize
+
+
+MODES = ('connect', 'persistent', 'pooled')
+
+
+def mode_settings(database, mode, pool_size):
+    """
+    Copy of a DATABASES entry using one connection strategy
+
+    Args:
+        database (dict): Settings of the database under test
+        mode (str): One of MODES
+        pool_size (int): max_size for the pooled mode
+
+    Returns:
+        dict: Settings for a temporary alias
+    """
+    database = copy.deepcopy(database)
+    database['OPTIONS'].pop('pool', None)
+    plain_engines = {pooled: plain for plain, pooled in settings.POOLED_ENGINES.items()}
+    engine = plain_engines.get(database['ENGINE'], database['ENGINE'])
+    database['ENGINE'] = engine
+    database['CONN_HEALTH_CHECKS'] = True
+    if mode == 'pooled':
+        database['ENGINE'] = settings.POOLED_ENGINES[engine]
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {**settings.DB_POOL_OPTIONS, 'max_size': pool_size}
+    elif mode == 'persistent':
+        database['CONN_MAX_AGE'] = settings.DB_CONN_MAX_AGE
+    else:
+        database['CONN_MAX_AGE'] = 0
+    return database
+
+
+def run_requests(alias, threads, requests, queries):
+    """
+    Simulated requests from `threads` threads, `requests` each
+
+    Returns:
+        tuple: (latency samples in ms, wall-clock seconds)
+    """
+    start_line = threading.Barrier(threads)
+
+    def worker():
+        connection = connections[alias]
+        samples = []
+        start_line.wait()
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                connection.close_if_unusable_or_obsolete()  # request_started
+                with connection.cursor() as cursor:
+                    for _ in range(queries):
+                        cursor.execute('SELECT 1')
+                        cursor.fetchone()
+                connection.close_if_unusable_or_obsolete()  # request_finished
+                samples.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(worker) for _ in range(threads)]
+        samples = [sample for future in futures for sample in future.result()]
+    return samples, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = 'Compare request throughput with per-request, persistent and pooled connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to benchmark')
+        parser.add_argument('--threads', default='1,8,32', help='Comma-separated thread counts')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per thread')
+        parser.add_argument('--queries', type=int, default=3, help='Queries per request')
+        parser.add_argument('--pool-size', type=int, help='Pool max_size (default DB_POOL_MAX_SIZE)')
+        parser.add_argument('--mode', action='append', choices=MODES, help='Strategies to run (default: all)')
+        parser.add_argument('--output', help='Write results to this JSON file')
+
+    def handle(self, *args, **options):
+        database = connections[options['database']]
+        if database.vendor not in ('mysql', 'postgresql'):
+            raise CommandError(f'Pooling applies to MySQL and PostgreSQL, not {database.vendor}')
+        try:
+            thread_counts = [int(value) for value in options['threads'].split(',') if value.strip()]
+        except ValueError:
+            raise CommandError('--threads needs comma-separated integers')
+        if not thread_counts or min(thread_counts) < 1 or options['requests'] < 1:
+            raise CommandError('--threads and --requests must be positive')
+        pool_size = options['pool_size'] or settings.DB_POOL_OPTIONS['max_size']
+
+        self.stdout.write(
+            f"{database.vendor} '{database.settings_dict['NAME']}': {options['requests']} requests per "
+            f"thread, {options['queries']} queries each, pool size {pool_size}"
+        )
+        self.stdout.write(
+            f"{'mode':<11} {'threads':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  pool"
+        )
+        results = []
+        for threads in thread_counts:
+            for mode in options['mode'] or MODES:
+                alias = f'benchmark_{mode}'
+                connections.settings[alias] = mode_settings(database.settings_dict, mode, pool_size)
+                try:
+                    samples, elapsed = run_requests(alias, threads, options['requests'], options['queries'])
+                    pool = pooling.pool_stats().get(alias)
+                finally:
+                    pooling.close_pool(alias)
+                    del connections.settings[alias]
+
+                result = {
+                    'mode': mode,
+                    'threads': threads,
+                    'throughput_rps': round(len(samples) / elapsed, 1),
+                    'pool': pool,
+                    **summarize(samples),
+                }
+                results.append(result)
+                pool_note = (
+                    f"{pool['opened']} opened, {pool['waits']} waits, {pool['wait_ms']:.0f} ms waiting"
+                    if pool else '-'
+                )
+                self.stdout.write(
+                    f"{mode:<11} {threads:>7} {result['throughput_rps']:>9.1f} {result['p50_ms']:>8.2f} "
+                    f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f}  {pool_note}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'vendor': database.vendor, 'results': results}, fh, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,55 @@
+"""
+Microbenchmark of the rate-limit backends
+
+Measures the cost of one RateLimiter.hit() per backend.
+
+Usage:
+    python manage.py benchmark_rate_limit --hits 2000
+    python manage.py benchmark_rate_limit --backend file --backend database
+"""
+
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from portal_app import rate_limit
+from portal_app.benchmarking import summarize
+
+
+BACKENDS = {
+    'locmem': lambda: rate_limit.CacheBackend(),
+    'file': lambda: rate_limit.FileBackend(tempfile.mkdtemp(prefix='ratelimit-bench-')),
+    'database': lambda: rate_limit.DatabaseBackend(),
+    'redis': lambda: rate_limit.RedisBackend(),
+}
+
+
+class Command(BaseCommand):
+    help = 'Time RateLimiter.hit() for each rate-limit backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hits', type=int, default=1000, help='Hits per backend')
+        parser.add_argument(
+            '--backend',
+            action='append',
+            choices=sorted(BACKENDS),
+            help='Backend(s) to measure (default: locmem, file, database)',
+        )
+
+    def handle(self, *args, **options):
+        hits = options['hits']
+        for name in options['backend'] or ['locmem', 'file', 'database']:
+            limiter = rate_limit.RateLimiter(backend=BACKENDS[name](), prefix='bench')
+            samples = []
+            for i in range(hits):
+                start = time.perf_counter()
+                limiter.hit(f'client{i % 50}', limit=1000000, period=60)
+                samples.append((time.perf_counter() - start) * 1000)
+
+            result = summarize(samples)
+            throughput = hits / (sum(samples) / 1000)
+            self.stdout.write(
+                f"{name:<9} {throughput:>10.0f} hits/s  "
+                f"p50={result['p50_ms']:.3f}ms p99={result['p99_ms']:.3f}ms"
+            )
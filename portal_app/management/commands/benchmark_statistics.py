@@ -0,0 +1,83 @@
+"""
+Benchmark dashboard statistics: per-COUNT queries vs conditional aggregates
+
+Runs against the configured database, so seed it first
+(e.g. with create_test_data).
+
+Usage:
+    python manage.py benchmark_statistics --repeat 20
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from portal_app import statistics
+from portal_app.benchmarking import measure
+from portal_app.models import (
+    CustomUser, Application, BirthCertificate, DeathCertificate,
+    IncomeCertificate, TaxPayment, Complaint
+)
+
+
+def legacy_dashboard_statistics():
+    """Per-COUNT statistics as admin_dashboard computed them originally"""
+    today = timezone.now().date()
+    week_ago = timezone.now() - timedelta(days=7)
+    return {
+        'total_citizens': CustomUser.objects.filter(role='citizen').count(),
+        'total_staff': CustomUser.objects.filter(role='staff').count(),
+        'total_admins': CustomUser.objects.filter(role='admin').count(),
+        'inactive_users': CustomUser.objects.filter(is_active=False).count(),
+        'new_users_today': CustomUser.objects.filter(date_joined__date=today).count(),
+        'total_applications': Application.objects.count(),
+        'pending_applications': Application.objects.filter(status='pending').count(),
+        'under_review_applications': Application.objects.filter(status='under_review').count(),
+        'approved_applications': Application.objects.filter(status='approved').count(),
+        'rejected_applications': Application.objects.filter(status='rejected').count(),
+        'applications_today': Application.objects.filter(applied_date__date=today).count(),
+        'approved_today': Application.objects.filter(
+            status='approved', reviewed_date__date=today
+        ).count(),
+        'applications_this_week': Application.objects.filter(applied_date__gte=week_ago).count(),
+        'total_complaints': Complaint.objects.count(),
+        'open_complaints': Complaint.objects.filter(status='open').count(),
+        'in_progress_complaints': Complaint.objects.filter(status='in_progress').count(),
+        'resolved_complaints': Complaint.objects.filter(status='resolved').count(),
+        'complaints_today': Complaint.objects.filter(filed_date__date=today).count(),
+        'total_tax_payments': TaxPayment.objects.count(),
+        'water_tax_count': TaxPayment.objects.filter(tax_type='water_tax').count(),
+        'house_tax_count': TaxPayment.objects.filter(tax_type='house_tax').count(),
+        'birth_certs': BirthCertificate.objects.filter(certificate_number__isnull=False).count(),
+        'death_certs': DeathCertificate.objects.filter(certificate_number__isnull=False).count(),
+        'income_certs': IncomeCertificate.objects.filter(certificate_number__isnull=False).count(),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare query count and wall time of dashboard statistics before/after aggregation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10, help='Measured runs per variant')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+
+        self.stdout.write(
+            f"Dataset: {CustomUser.objects.count()} users, "
+            f"{Application.objects.count()} applications, "
+            f"{Complaint.objects.count()} complaints\n"
+        )
+
+        variants = [
+            ('before (per-COUNT)', legacy_dashboard_statistics),
+            ('after (aggregated)', statistics.get_dashboard_statistics),
+        ]
+        for label, func in variants:
+            result = measure(func, repeat=repeat)
+            self.stdout.write(
+                f"{label:<22} queries={result['queries']:<3} "
+                f"mean={result['mean_ms']:.2f}ms p50={result['p50_ms']:.2f}ms "
+                f"p95={result['p95_ms']:.2f}ms"
+            )
@@ -0,0 +1,335 @@
+"""
+Benchmark suite for the portal's hot paths
+
+Drives the real views through the Django test client against the
+configured database (seed it first with generate_load_data) and reports
+latency percentiles, queries per request and throughput per scenario:
+
+    login                 POST /login/ (includes password hashing)
+    citizen_dashboard     GET /dashboard/
+    admin_dashboard       GET /admin-dashboard/
+    admin_applications    GET /admin/applications/ with status/type filters
+    submit_application    POST a birth certificate application with uploads
+    download_certificate  GET a certificate PDF (first render of each)
+    track_application     GET /track/ for recent application numbers
+    otp_verification      POST /verify-otp/ with a valid code
+
+Each scenario runs inside a transaction that is rolled back, and uploads
+and rendered certificates go to temporary directories, so the database
+and media are unchanged afterwards. Results can be saved as JSON and
+compared with an earlier run (e.g. from another commit).
+
+Usage:
+    python manage.py generate_load_data --citizens 20000 --applications 100000
+    python manage.py benchmark_suite --iterations 50 --output bench-new.json
+    python manage.py benchmark_suite --scenario login --scenario track_application
+    python manage.py benchmark_suite --output bench-new.json --compare bench-old.json
+"""
+
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+from datetime import date
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from portal_app.benchmarking import measure_prepared
+from portal_app.models import Application, Complaint, CustomUser
+
+
+SCENARIOS = [
+    'login',
+    'citizen_dashboard',
+    'admin_dashboard',
+    'admin_applications',
+    'submit_application',
+    'download_certificate',
+    'track_application',
+    'otp_verification',
+]
+APPLICATION_FILTERS = [
+    '?status=pending',
+    '?status=approved',
+    '?type=birth_certificate',
+    '?status=under_review&type=income_certificate',
+    '',
+]
+PDF_BYTES = b'%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\ntrailer << /Root 1 0 R >>\n%%EOF\n'
+
+
+class _Rollback(Exception):
+    pass
+
+
+def client_ip(index):
+    """A distinct client address per run, so per-IP rate limits never trip"""
+    return f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the hot request paths against the configured database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per scenario')
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                            help='Scenario(s) to run (default: all)')
+        parser.add_argument('--citizen', help='Citizen username (default: one with approved applications)')
+        parser.add_argument('--staff', help='Staff/admin username (default: first active staff)')
+        parser.add_argument('--password', default='Load@12345',
+                            help="Citizen's password, for the login scenario")
+        parser.add_argument('--output', help='Write results to this JSON file')
+        parser.add_argument('--compare', help='Earlier JSON results to compare against')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+        self.iterations = options['iterations']
+        self.warmup = options['warmup']
+        self.password = options['password']
+        self.citizen = self._pick_citizen(options['citizen'])
+        self.staff = self._pick_staff(options['staff'])
+        baseline = self._load(options['compare']) if options['compare'] else None
+
+        media_dir = tempfile.mkdtemp(prefix='bench-media-')
+        certificate_dir = tempfile.mkdtemp(prefix='bench-certificates-')
+        overrides = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            SECURE_SSL_REDIRECT=False,
+            MEDIA_ROOT=media_dir,
+            CERTIFICATE_CACHE_DIR=certificate_dir,
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        )
+        results = {}
+        try:
+            with overrides:
+                for name in options['scenario'] or SCENARIOS:
+                    results[name] = self._run(name)
+                    self._report(name, results[name], baseline)
+        finally:
+            shutil.rmtree(media_dir, ignore_errors=True)
+            shutil.rmtree(certificate_dir, ignore_errors=True)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(self._document(results), fh, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    # ============================================
+    # RUNNING AND REPORTING
+    # ============================================
+
+    def _run(self, name):
+        prepare = getattr(self, f'_prepare_{name}')()
+        try:
+            with transaction.atomic():
+                result = measure_prepared(prepare, repeat=self.iterations, warmup=self.warmup)
+                raise _Rollback
+        except _Rollback:
+            pass
+        return result
+
+    def _report(self, name, result, baseline):
+        line = (
+            f"{name:<21} p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms "
+            f"p99={result['p99_ms']:>8.2f}ms queries={result['queries_mean']:>5.1f} "
+            f"{result['throughput_rps']:>7.1f} req/s"
+        )
+        old = (baseline or {}).get('scenarios', {}).get(name)
+        if old:
+            line += (
+                f"  | p50 {_change(old['p50_ms'], result['p50_ms'])}, "
+                f"p95 {_change(old['p95_ms'], result['p95_ms'])}, "
+                f"queries {old['queries_mean']:g} -> {result['queries_mean']:g}"
+            )
+        self.stdout.write(line)
+
+    def _document(self, results):
+        return {
+            'created': timezone.now().isoformat(),
+            'git_commit': _git_commit(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'dataset': {
+                'users': CustomUser.objects.count(),
+                'applications': Application.objects.count(),
+                'complaints': Complaint.objects.count(),
+            },
+            'iterations': self.iterations,
+            'warmup': self.warmup,
+            'scenarios': results,
+        }
+
+    def _load(self, path):
+        try:
+            with open(path) as fh:
+                return json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+
+    # ============================================
+    # FIXTURES
+    # ============================================
+
+    def _pick_citizen(self, username):
+        citizens = CustomUser.objects.filter(role='citizen', is_active=True)
+        if username:
+            citizen = citizens.filter(username=username).first()
+        else:
+            citizen = citizens.filter(applications__status='approved').order_by('pk').first() or citizens.first()
+        if citizen is None:
+            raise CommandError('No active citizen found; run generate_load_data first')
+        return citizen
+
+    def _pick_staff(self, username):
+        staff = CustomUser.objects.filter(role__in=['staff', 'admin'], is_active=True)
+        staff = staff.filter(username=username) if username else staff.order_by('pk')
+        if not staff.exists():
+            raise CommandError('No active staff or admin user found; run generate_load_data first')
+        return staff.first()
+
+    def _client(self, user=None, index=0):
+        client = Client(REMOTE_ADDR=client_ip(index))
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def _expect(self, response, status, name):
+        if response.status_code != status:
+            raise CommandError(f"{name}: expected HTTP {status}, got {response.status_code}")
+        if response.streaming:
+            # The test client closes the response once it is consumed
+            b''.join(response.streaming_content)
+        return response
+
+    # ============================================
+    # SCENARIOS
+    # ============================================
+    # Each _prepare_<name>() returns prepare(index), which sets up one run
+    # and returns the request to time.
+
+    def _prepare_login(self):
+        url = reverse('login')
+        data = {'username': self.citizen.username, 'password': self.password}
+        if not self.citizen.check_password(self.password):
+            raise CommandError(f"login: wrong --password for {self.citizen.username}")
+
+        def prepare(index):
+            client = self._client(index=index)
+            return lambda: self._expect(client.post(url, data), 302, 'login')
+        return prepare
+
+    def _prepare_citizen_dashboard(self):
+        client = self._client(self.citizen)
+        url = reverse('dashboard')
+        return lambda index: lambda: self._expect(client.get(url), 200, 'citizen_dashboard')
+
+    def _prepare_admin_dashboard(self):
+        client = self._client(self.staff)
+        url = reverse('admin_dashboard')
+        return lambda index: lambda: self._expect(client.get(url), 200, 'admin_dashboard')
+
+    def _prepare_admin_applications(self):
+        client = self._client(self.staff)
+        url = reverse('admin_applications')
+
+        def prepare(index):
+            query = APPLICATION_FILTERS[index % len(APPLICATION_FILTERS)]
+            return lambda: self._expect(client.get(url + query), 200, 'admin_applications')
+        return prepare
+
+    def _prepare_submit_application(self):
+        client = self._client(self.citizen)
+        url = reverse('apply_birth_certificate')
+
+        def prepare(index):
+            data = {
+                'child_name': f'Bench Child {index}',
+                'child_gender': 'female',
+                'date_of_birth': date(2025, 1, 15).isoformat(),
+                'place_of_birth': 'PHC',
+                'father_name': 'Bench Father',
+                'mother_name': 'Bench Mother',
+                'permanent_address': 'Ward 1',
+                'hospital_certificate': SimpleUploadedFile('hospital.pdf', PDF_BYTES, 'application/pdf'),
+                'parents_id_proof': SimpleUploadedFile('parents.pdf', PDF_BYTES, 'application/pdf'),
+            }
+            return lambda: self._expect(client.post(url, data), 302, 'submit_application')
+        return prepare
+
+    def _prepare_download_certificate(self):
+        client = self._client(self.staff)
+        ids = list(
+            Application.objects.filter(
+                status='approved',
+                application_type__in=['birth_certificate', 'death_certificate', 'income_certificate'],
+            ).order_by('-pk').values_list('pk', flat=True)[:self.iterations + self.warmup]
+        )
+        if not ids:
+            raise CommandError('download_certificate: no approved certificate applications')
+
+        def prepare(index):
+            url = reverse('download_certificate', args=[ids[index % len(ids)]])
+            return lambda: self._expect(client.get(url), 200, 'download_certificate')
+        return prepare
+
+    def _prepare_track_application(self):
+        url = reverse('track_application')
+        numbers = list(Application.objects.values_list('application_number', flat=True)[:200])
+        if not numbers:
+            raise CommandError('track_application: no applications')
+
+        def prepare(index):
+            client = self._client(index=index)
+            query = f"?app_number={numbers[index % len(numbers)]}"
+            return lambda: self._expect(client.get(url + query), 200, 'track_application')
+        return prepare
+
+    def _prepare_otp_verification(self):
+        from portal_app.security_utils import create_otp_for_user
+
+        url = reverse('verify_otp')
+        password = make_password(None)
+
+        def prepare(index):
+            user = CustomUser.objects.create(
+                username=f'bench_otp_{index}', password=password, email=f'bench_otp_{index}@example.com',
+                phone_number=f'5{index:09d}', address='Ward 1', pincode='411001',
+                role='citizen', is_active=False, email_verified=False,
+            )
+            otp = create_otp_for_user(user)
+            client = self._client(index=index)
+            session = client.session
+            session['pending_verification_user_id'] = user.pk
+            session.save()
+            return lambda: self._expect(client.post(url, {'otp_code': otp.otp_code}), 302, 'otp_verification')
+        return prepare
+
+
+def _change(old, new):
+    """'12.00 -> 9.00ms (-25%)'"""
+    if not old:
+        return f"{old:.2f} -> {new:.2f}ms"
+    return f"{old:.2f} -> {new:.2f}ms ({(new - old) / old * 100:+.0f}%)"
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
@@ -0,0 +1,480 @@
+"""
+Generate a large, reproducible synthetic dataset for load testing
+
+Non-interactive and scaled by options. Rows are written with bulk_create
+in batches, with realistic distributions:
+- Activity grows towards the present (more recent rows than old ones)
+- Old applications and complaints are mostly decided/resolved, recent
+  ones mostly pending/open
+- Every application has its detail row and a status history (submitted,
+  under review, decision); complaints have created/assigned/resolved
+  history
+- Approved certificates carry certificate numbers, approved tax
+  payments are paid with receipt numbers
+
+The same --seed and --until on the same starting database produce the
+same data.
+Every generated user shares one password whose hash is computed once,
+so user creation does not spend minutes in PBKDF2.
+
+Usage:
+    python manage.py generate_load_data --citizens 200000 --applications 1000000 --complaints 500000
+    python manage.py generate_load_data --citizens 2000 --applications 10000 --seed 7 --index
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as datetime_time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from portal_app import counters, numbering, rollups, search
+from portal_app.models import (
+    Application, ApplicationStatusHistory, BirthCertificate, Complaint, ComplaintHistory,
+    CustomUser, DeathCertificate, IncomeCertificate, TaxPayment,
+)
+
+
+APPLICATION_TYPE_WEIGHTS = {
+    'birth_certificate': 25,
+    'death_certificate': 8,
+    'income_certificate': 22,
+    'water_tax': 25,
+    'house_tax': 20,
+}
+# Status weights for rows older / newer than RECENT_DAYS
+APPLICATION_STATUS_WEIGHTS = {
+    'old': {'approved': 75, 'rejected': 15, 'under_review': 5, 'pending': 5},
+    'recent': {'pending': 40, 'under_review': 25, 'approved': 28, 'rejected': 7},
+}
+COMPLAINT_STATUS_WEIGHTS = {
+    'old': {'closed': 55, 'resolved': 30, 'in_progress': 10, 'open': 5},
+    'recent': {'open': 45, 'in_progress': 30, 'resolved': 20, 'closed': 5},
+}
+COMPLAINT_CATEGORY_WEIGHTS = {
+    'water_supply': 22, 'electricity': 14, 'road': 16, 'sanitation': 12,
+    'street_light': 14, 'drainage': 10, 'waste_management': 8, 'other': 4,
+}
+PRIORITY_WEIGHTS = {'low': 25, 'medium': 45, 'high': 22, 'urgent': 8}
+RECENT_DAYS = 30
+
+VILLAGES = ['Shivapur', 'Rampur', 'Devgaon', 'Sonegaon', 'Khandala', 'Wadgaon', 'Pimpri', 'Nandgaon']
+FIRST_NAMES = ['Asha', 'Ravi', 'Meera', 'Suresh', 'Kavita', 'Anil', 'Sunita', 'Vijay', 'Pooja', 'Rahul',
+               'Lata', 'Sanjay', 'Rekha', 'Ganesh', 'Nisha', 'Prakash']
+LAST_NAMES = ['Patil', 'Jadhav', 'Pawar', 'Shinde', 'Kale', 'More', 'Deshmukh', 'Gaikwad', 'Kulkarni', 'Joshi']
+COMPLAINT_SUBJECTS = {
+    'water_supply': 'No water supply in ward {ward}',
+    'electricity': 'Frequent power cuts near ward {ward}',
+    'road': 'Potholes on main road in ward {ward}',
+    'sanitation': 'Public toilet not cleaned in ward {ward}',
+    'street_light': 'Street light not working in ward {ward}',
+    'drainage': 'Blocked drain in ward {ward}',
+    'waste_management': 'Garbage not collected in ward {ward}',
+    'other': 'Stray cattle on road in ward {ward}',
+}
+PLACEHOLDER_DOCUMENT = 'load_test/document.pdf'
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """
+    Let bulk_create keep the given auto_now_add values
+
+    Args:
+        fields: (model, field name) pairs whose auto_now_add is suspended
+    """
+    suspended = [model._meta.get_field(name) for model, name in fields]
+    for field in suspended:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in suspended:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Generate a large reproducible synthetic dataset for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--citizens', type=int, default=1000, help='Citizen accounts')
+        parser.add_argument('--staff', type=int, default=20, help='Panchayat staff accounts')
+        parser.add_argument('--applications', type=int, default=5000, help='Applications')
+        parser.add_argument('--complaints', type=int, default=2000, help='Complaints')
+        parser.add_argument('--days', type=int, default=730, help='Spread activity over this many past days')
+        parser.add_argument('--until', help='Latest activity date, YYYY-MM-DD (default: now); '
+                                            'fix it to reproduce identical timestamps')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create')
+        parser.add_argument('--prefix', default='load', help='Username prefix of generated users')
+        parser.add_argument('--password', default='Load@12345', help='Password of every generated user')
+        parser.add_argument('--index', action='store_true',
+                            help='Rebuild the search index afterwards (slow for large datasets)')
+
+    def handle(self, *args, **options):
+        if options['citizens'] < 1 and (options['applications'] or options['complaints']):
+            raise CommandError('Applications and complaints need at least one citizen')
+        if CustomUser.objects.filter(username__startswith=f"{options['prefix']}_").exists():
+            raise CommandError(f"Users prefixed '{options['prefix']}_' already exist; pass another --prefix")
+
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        if options['until']:
+            until = parse_date(options['until'])
+            if until is None:
+                raise CommandError('--until must be a date (YYYY-MM-DD)')
+            self.now = timezone.make_aware(datetime.combine(until, datetime_time(12)))
+        self.days = options['days']
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        self.password_hash = make_password(options['password'])
+        # Generated phones are 6000000000 upwards, after any taken ones
+        taken = (
+            CustomUser.objects.filter(phone_number__startswith='6')
+            .order_by('-phone_number').values_list('phone_number', flat=True).first()
+        )
+        phone_start = int(taken) - 6000000000 + 1 if taken else 0
+        staff_ids = self._create_users('staff', options['staff'], options['prefix'], phone_start)
+        citizen_ids = self._create_users('citizen', options['citizens'], options['prefix'],
+                                         phone_start + options['staff'])
+        self.staff_ids = staff_ids or list(
+            CustomUser.objects.filter(role__in=['staff', 'admin']).values_list('pk', flat=True)[:50]
+        ) or citizen_ids[:1]
+
+        self._create_applications(options['applications'], citizen_ids)
+        self._create_complaints(options['complaints'], citizen_ids)
+
+        self.stdout.write('Rebuilding statistic counters...')
+        counters.rebuild_counters()
+        self.stdout.write('Rebuilding daily rollups...')
+        rollups.rebuild_rollups()
+        if options['index']:
+            self.stdout.write('Rebuilding search index...')
+            search.rebuild()
+        else:
+            self.stdout.write('Search index not rebuilt; run rebuild_search_index when needed.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(citizen_ids)} citizens, {len(staff_ids)} staff, "
+            f"{options['applications']} applications and {options['complaints']} complaints "
+            f"in {time.perf_counter() - started:.1f}s (password: {options['password']})"
+        ))
+
+    # ============================================
+    # RANDOM HELPERS
+    # ============================================
+
+    def _weighted(self, weights):
+        return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _past_moment(self):
+        """A time in the last --days, skewed towards the present"""
+        age = self.days * 86400 * self.rng.random() ** 1.5
+        return self.now - timedelta(seconds=age)
+
+    def _era(self, moment):
+        return 'recent' if self.now - moment < timedelta(days=RECENT_DAYS) else 'old'
+
+    def _review_moment(self, submitted):
+        """A review time 1 hour to 20 days after submission, never in the future"""
+        return min(self.now, submitted + timedelta(hours=self.rng.uniform(1, 480)))
+
+    def _applicant(self, citizen_ids):
+        # Squaring skews towards the first citizens: a few apply often
+        return citizen_ids[int(len(citizen_ids) * self.rng.random() ** 2)]
+
+    def _name(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield min(self.batch_size, total - start)
+
+    # ============================================
+    # USERS
+    # ============================================
+
+    def _create_users(self, role, count, prefix, phone_start):
+        """Create `count` users of a role; returns their ids"""
+        if count <= 0:
+            return []
+        if phone_start + count > 10 ** 9:
+            raise CommandError('Not enough free 6xxxxxxxxx phone numbers')
+
+        self.stdout.write(f"Creating {count} {role} users...")
+        ids = []
+        created = 0
+        for size in self._batches(count):
+            users = []
+            for i in range(created, created + size):
+                first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                joined = self._past_moment()
+                users.append(CustomUser(
+                    username=f"{prefix}_{role}{i}",
+                    password=self.password_hash,
+                    first_name=first,
+                    last_name=last,
+                    email=f"{prefix}_{role}{i}@example.com",
+                    role=role,
+                    phone_number=f"6{phone_start + i:09d}",
+                    address=f"House {self.rng.randint(1, 400)}, Ward {self.rng.randint(1, 12)}",
+                    village=self.rng.choice(VILLAGES),
+                    pincode=f"41{self.rng.randint(1000, 9999)}",
+                    is_active=True,
+                    is_verified=True,
+                    email_verified=True,
+                    email_verified_at=joined,
+                    date_joined=joined,
+                    created_at=joined,
+                ))
+            with transaction.atomic(), explicit_timestamps((CustomUser, 'created_at')):
+                CustomUser.objects.bulk_create(users)
+            ids.extend(self._ids(CustomUser, users, 'username'))
+            created += size
+        return ids
+
+    def _ids(self, model, objects, unique_field):
+        """Primary keys of just-created rows (re-read where bulk_create cannot return them)"""
+        if all(obj.pk for obj in objects):
+            return [obj.pk for obj in objects]
+        values = [getattr(obj, unique_field) for obj in objects]
+        pks = dict(model.objects.filter(**{f'{unique_field}__in': values}).values_list(unique_field, 'pk'))
+        for obj in objects:
+            obj.pk = pks[getattr(obj, unique_field)]
+        return [obj.pk for obj in objects]
+
+    # ============================================
+    # APPLICATIONS
+    # ============================================
+
+    def _create_applications(self, count, citizen_ids):
+        if count <= 0:
+            return
+        self.stdout.write(f"Creating {count} applications...")
+        done = 0
+        for size in self._batches(count):
+            with transaction.atomic(), explicit_timestamps(
+                (Application, 'applied_date'), (ApplicationStatusHistory, 'changed_at')
+            ):
+                self._application_batch(size, citizen_ids)
+            done += size
+            self.stdout.write(f"  {done}/{count}")
+
+    def _application_batch(self, size, citizen_ids):
+        applications = []
+        for _ in range(size):
+            applied = self._past_moment()
+            status = self._weighted(APPLICATION_STATUS_WEIGHTS[self._era(applied)])
+            reviewed = status != 'pending'
+            applications.append(Application(
+                applicant_id=self._applicant(citizen_ids),
+                application_type=self._weighted(APPLICATION_TYPE_WEIGHTS),
+                status=status,
+                applied_date=applied,
+                reviewed_date=self._review_moment(applied) if reviewed else None,
+                reviewed_by_id=self.rng.choice(self.staff_ids) if reviewed else None,
+                admin_remarks='Documents verified' if status == 'approved' else (
+                    'Documents incomplete' if status == 'rejected' else None
+                ),
+            ))
+
+        by_type = {}
+        for application in applications:
+            by_type.setdefault(application.application_type, []).append(application)
+        for application_type, group in by_type.items():
+            numbers = numbering.next_numbers(f"GP{application_type[:4].upper()}", len(group))
+            for application, number in zip(group, numbers):
+                application.application_number = number
+
+        Application.objects.bulk_create(applications)
+        self._ids(Application, applications, 'application_number')
+
+        for application_type, group in by_type.items():
+            details = [self._detail(application) for application in group]
+            self._number_certificates(application_type, details)
+            type(details[0]).objects.bulk_create(details)
+
+        ApplicationStatusHistory.objects.bulk_create(self._application_history(applications))
+
+    def _detail(self, application):
+        """Unsaved detail row for an application"""
+        approved = application.status == 'approved'
+        issued = application.reviewed_date.date() if approved else None
+        kind = application.application_type
+        if kind == 'birth_certificate':
+            return BirthCertificate(
+                application=application,
+                child_name=self._name(),
+                child_gender=self.rng.choice(['male', 'female']),
+                date_of_birth=(application.applied_date - timedelta(days=self.rng.randint(1, 365))).date(),
+                place_of_birth=self.rng.choice(['PHC', 'District Hospital', 'Home']),
+                father_name=self._name(),
+                mother_name=self._name(),
+                permanent_address=f"Ward {self.rng.randint(1, 12)}, {self.rng.choice(VILLAGES)}",
+                hospital_certificate=PLACEHOLDER_DOCUMENT,
+                parents_id_proof=PLACEHOLDER_DOCUMENT,
+                issued_date=issued,
+            )
+        if kind == 'death_certificate':
+            return DeathCertificate(
+                application=application,
+                deceased_name=self._name(),
+                deceased_gender=self.rng.choice(['male', 'female']),
+                deceased_age=self.rng.randint(1, 99),
+                date_of_death=(application.applied_date - timedelta(days=self.rng.randint(1, 60))).date(),
+                place_of_death=self.rng.choice(['Home', 'District Hospital']),
+                cause_of_death=self.rng.choice(['Natural causes', 'Illness', 'Accident']),
+                informant_name=self._name(),
+                informant_relation=self.rng.choice(['Son', 'Daughter', 'Spouse']),
+                informant_phone=f"9{self.rng.randint(0, 999999999):09d}",
+                permanent_address=f"Ward {self.rng.randint(1, 12)}, {self.rng.choice(VILLAGES)}",
+                hospital_certificate=PLACEHOLDER_DOCUMENT,
+                deceased_id_proof=PLACEHOLDER_DOCUMENT,
+                issued_date=issued,
+            )
+        if kind == 'income_certificate':
+            return IncomeCertificate(
+                application=application,
+                applicant_name=self._name(),
+                father_husband_name=self._name(),
+                occupation=self.rng.choice(['Farmer', 'Labourer', 'Shopkeeper', 'Teacher']),
+                annual_income=Decimal(self.rng.randrange(30000, 600000, 1000)),
+                income_source=self.rng.choice(['agriculture', 'business', 'salary', 'other']),
+                income_details='Income from primary occupation',
+                purpose_of_certificate=self.rng.choice(['Scholarship', 'Loan', 'Government scheme']),
+                residential_address=f"Ward {self.rng.randint(1, 12)}, {self.rng.choice(VILLAGES)}",
+                income_proof=PLACEHOLDER_DOCUMENT,
+                id_proof=PLACEHOLDER_DOCUMENT,
+                issued_date=issued,
+                valid_until=issued + timedelta(days=365) if issued else None,
+            )
+        tax = Decimal(self.rng.randrange(300, 5000, 50))
+        late_fee = Decimal(self.rng.choice([0, 0, 0, 50, 100]))
+        return TaxPayment(
+            application=application,
+            tax_type=kind,
+            property_number=f"PROP{application.pk}",
+            property_address=f"Ward {self.rng.randint(1, 12)}, {self.rng.choice(VILLAGES)}",
+            property_area_sqft=Decimal(self.rng.randrange(200, 3000)),
+            financial_year=numbering.financial_year(application.applied_date.date()),
+            tax_amount=tax,
+            late_fee=late_fee,
+            total_amount=tax + late_fee,
+            payment_status='paid' if approved else 'pending',
+            payment_method=self.rng.choice(['online', 'cash']) if approved else '',
+            payment_date=application.reviewed_date if approved else None,
+            transaction_id=f"TXN{application.pk}" if approved else '',
+        )
+
+    def _number_certificates(self, application_type, details):
+        """Give approved certificates / paid taxes their numbers in one block"""
+        issued = [detail for detail in details if detail.application.status == 'approved']
+        if not issued:
+            return
+        if isinstance(issued[0], TaxPayment):
+            for detail, number in zip(issued, numbering.next_numbers('RCP', len(issued))):
+                detail.receipt_number = number
+        else:
+            for detail, number in zip(issued, numbering.certificate_numbers(application_type, len(issued))):
+                detail.certificate_number = number
+
+    def _application_history(self, applications):
+        rows = []
+        for application in applications:
+            rows.append(ApplicationStatusHistory(
+                application=application, old_status='', new_status='pending',
+                changed_by_id=application.applicant_id, changed_at=application.applied_date,
+                remarks='Application submitted',
+            ))
+            if application.status == 'pending':
+                continue
+            reviewed = application.reviewed_date
+            if application.status != 'under_review':
+                picked_up = application.applied_date + (reviewed - application.applied_date) / 2
+                rows.append(ApplicationStatusHistory(
+                    application=application, old_status='pending', new_status='under_review',
+                    changed_by_id=application.reviewed_by_id, changed_at=picked_up,
+                ))
+            rows.append(ApplicationStatusHistory(
+                application=application,
+                old_status='pending' if application.status == 'under_review' else 'under_review',
+                new_status=application.status,
+                changed_by_id=application.reviewed_by_id,
+                changed_at=reviewed,
+                remarks=application.admin_remarks,
+            ))
+        return rows
+
+    # ============================================
+    # COMPLAINTS
+    # ============================================
+
+    def _create_complaints(self, count, citizen_ids):
+        if count <= 0:
+            return
+        self.stdout.write(f"Creating {count} complaints...")
+        done = 0
+        for size in self._batches(count):
+            with transaction.atomic(), explicit_timestamps(
+                (Complaint, 'filed_date'), (ComplaintHistory, 'performed_at')
+            ):
+                self._complaint_batch(size, citizen_ids)
+            done += size
+            self.stdout.write(f"  {done}/{count}")
+
+    def _complaint_batch(self, size, citizen_ids):
+        numbers = numbering.next_numbers('CMP', size)
+        complaints = []
+        for number in numbers:
+            filed = self._past_moment()
+            status = self._weighted(COMPLAINT_STATUS_WEIGHTS[self._era(filed)])
+            category = self._weighted(COMPLAINT_CATEGORY_WEIGHTS)
+            ward = self.rng.randint(1, 12)
+            done = status in ('resolved', 'closed')
+            complaints.append(Complaint(
+                complaint_number=number,
+                complainant_id=self._applicant(citizen_ids),
+                category=category,
+                subject=COMPLAINT_SUBJECTS[category].format(ward=ward),
+                description=f"Reported by residents of ward {ward}. Please take action at the earliest.",
+                location=f"Ward {ward}, {self.rng.choice(VILLAGES)}",
+                priority=self._weighted(PRIORITY_WEIGHTS),
+                status=status,
+                filed_date=filed,
+                assigned_to_id=self.rng.choice(self.staff_ids) if status != 'open' else None,
+                resolved_date=self._review_moment(filed) if done else None,
+                resolution_remarks='Issue fixed by maintenance team' if done else None,
+            ))
+
+        Complaint.objects.bulk_create(complaints)
+        self._ids(Complaint, complaints, 'complaint_number')
+
+        history = []
+        for complaint in complaints:
+            history.append(ComplaintHistory(
+                complaint=complaint, action='created', new_value='open',
+                performed_by_id=complaint.complainant_id, performed_at=complaint.filed_date,
+            ))
+            if complaint.assigned_to_id:
+                history.append(ComplaintHistory(
+                    complaint=complaint, action='assigned', new_value=str(complaint.assigned_to_id),
+                    performed_by_id=complaint.assigned_to_id,
+                    performed_at=min(
+                        complaint.resolved_date or self.now,
+                        complaint.filed_date + timedelta(hours=self.rng.uniform(0.5, 48)),
+                    ),
+                ))
+            if complaint.resolved_date:
+                history.append(ComplaintHistory(
+                    complaint=complaint, action=complaint.status, old_value='in_progress',
+                    new_value=complaint.status, performed_by_id=complaint.assigned_to_id,
+                    performed_at=complaint.resolved_date, notes=complaint.resolution_remarks,
+                ))
+        ComplaintHistory.objects.bulk_create(history)
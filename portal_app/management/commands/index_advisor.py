@@ -0,0 +1,86 @@
+"""
+Report which of the portal's hot queries lack a supporting index
+
+Runs every query shape in portal_app.index_advisor against the configured
+database: checks the columns it filters and orders by against the table's
+indexes and summarizes the database's EXPLAIN plan. Seed realistic data
+first (generate_load_data) so the planner's choices are meaningful.
+
+Statuses:
+    covered   an index serves the filter and the ordering
+    sort      an index serves the filter; rows are sorted afterwards
+    partial   an index covers only some of the equality columns
+    missing   no index starts with any filtered column
+
+Usage:
+    python manage.py index_advisor
+    python manage.py index_advisor --shape admin_complaints --plan
+    python manage.py index_advisor --no-explain --fail-on-missing   # CI check
+    python manage.py index_advisor --output indexes.json
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from portal_app import index_advisor
+
+
+class Command(BaseCommand):
+    help = "Check the portal's hot queries against the database's indexes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shape', action='append', help='Only shapes whose name contains this')
+        parser.add_argument('--no-explain', action='store_true', help='Skip EXPLAIN; only check indexes')
+        parser.add_argument('--plan', action='store_true', help='Print the full EXPLAIN output')
+        parser.add_argument('--output', help='Write the report to this JSON file')
+        parser.add_argument(
+            '--fail-on-missing',
+            action='store_true',
+            help='Exit with an error when a shape is partial or missing',
+        )
+
+    def handle(self, *args, **options):
+        explain = not options['no_explain']
+        reports = index_advisor.audit(explain=explain, names=options['shape'])
+        if not reports:
+            raise CommandError('No query shape matches --shape')
+
+        self.stdout.write(f"{connection.vendor} '{connection.settings_dict['NAME']}': {len(reports)} query shapes")
+        self.stdout.write(f"{'shape':<34} {'status':<8} {'index':<50} plan")
+        for report in reports:
+            plan = '-'
+            if report['explain']:
+                summary = report['explain']
+                plan = ', '.join(
+                    [f'index {name}' for name in summary['indexes']]
+                    + [f'full scan {table}' for table in summary['full_scans']]
+                    + (['sort'] if summary['sort'] else [])
+                ) or '-'
+            line = f"{report['name']:<34} {report['status']:<8} {report['index'] or '-':<50} {plan}"
+            if report['status'] in (index_advisor.PARTIAL, index_advisor.MISSING):
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
+            if options['plan'] and report['explain']:
+                self.stdout.write(report['explain']['plan'])
+
+        lacking = [
+            report for report in reports
+            if report['status'] in (index_advisor.PARTIAL, index_advisor.MISSING)
+        ]
+        for report in lacking:
+            self.stdout.write(
+                f"{report['name']} ({report['source']}): add to {report['table']} "
+                f"models.Index(fields={report['suggested']!r})"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'vendor': connection.vendor, 'shapes': reports}, fh, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+        if lacking and options['fail_on_missing']:
+            raise CommandError(f'{len(lacking)} query shape(s) without a supporting index')
+        if not lacking:
+            self.stdout.write(self.style.SUCCESS('Every query shape has a supporting index.'))
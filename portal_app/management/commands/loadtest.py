@@ -0,0 +1,100 @@
+"""
+HTTP load test against a running portal
+
+Drives a mix of citizen and staff journeys (see portal_app.loadtest)
+over HTTP in stages of increasing concurrency, and reports throughput,
+error rate and latency per stage. Seed the database first with
+generate_load_data; its accounts are used for logins. Requires httpx.
+
+Journeys change data: the register journey creates accounts, apply
+submits applications and review approves pending ones. Run it against
+a load-test database, never production.
+
+Usage:
+    python manage.py generate_load_data --citizens 2000 --staff 50
+    python manage.py runserver --noreload   (or gunicorn, in another shell)
+    python manage.py loadtest --url http://127.0.0.1:8000 --concurrency 5,10,20 --duration 30
+    python manage.py loadtest --mix apply=1 --arrival-rate 4 --concurrency 50 --output load.json
+"""
+
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from portal_app.loadtest import LoadTestConfig, import_httpx, parse_mix, run_load_test
+from portal_app.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Run HTTP load-test journeys against a running portal'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the running portal')
+        parser.add_argument('--mix', default='register=1,apply=6,review=3',
+                            help='Journey weights, e.g. register=1,apply=6,review=3')
+        parser.add_argument('--concurrency', default='5,10,20',
+                            help='Comma-separated concurrency per stage')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds per stage')
+        parser.add_argument('--arrival-rate', type=float, default=0,
+                            help='Journeys started per second (Poisson); 0 runs a closed loop')
+        parser.add_argument('--prefix', default='load', help='Username prefix used by generate_load_data')
+        parser.add_argument('--password', default='Load@12345', help='Password of the generated accounts')
+        parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+        parser.add_argument('--seed', type=int, help='Random seed')
+        parser.add_argument('--output', help='Write results to this JSON file')
+
+    def handle(self, *args, **options):
+        try:
+            import_httpx()
+            mix = parse_mix(options['mix'])
+            stages = [int(value) for value in options['concurrency'].split(',') if value.strip()]
+        except (ImproperlyConfigured, ValueError) as exc:
+            raise CommandError(str(exc))
+        if not stages or min(stages) < 1:
+            raise CommandError('--concurrency needs one or more positive integers')
+        if options['duration'] <= 0:
+            raise CommandError('--duration must be positive')
+
+        prefix = options['prefix']
+        accounts = CustomUser.objects.filter(is_active=True, email_verified=True)
+        citizens = accounts.filter(role='citizen', username__startswith=f'{prefix}_citizen')
+        staff = accounts.filter(role__in=['staff', 'admin'], username__startswith=f'{prefix}_staff')
+        try:
+            config = LoadTestConfig(
+                options['url'],
+                mix=mix,
+                citizens=citizens.values_list('username', flat=True),
+                staff=staff.values_list('username', flat=True),
+                password=options['password'],
+                prefix=prefix,
+                timeout=options['timeout'],
+                seed=options['seed'],
+            )
+        except ImproperlyConfigured as exc:
+            raise CommandError(f"{exc}; run generate_load_data --prefix {prefix} first")
+
+        mode = f"{options['arrival_rate']:g} journeys/s" if options['arrival_rate'] else 'closed loop'
+        self.stdout.write(
+            f"{options['url']}: {len(config.citizens)} citizens, {len(config.staff)} staff, "
+            f"mix {options['mix']}, {mode}, {options['duration']:g}s per stage"
+        )
+        self.stdout.write(
+            f"{'users':>5} {'journeys':>8} {'requests':>8} {'req/s':>7} {'errors':>7} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        results = run_load_test(config, stages, options['duration'], options['arrival_rate'], on_stage=self._report)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'url': options['url'], 'mix': mix, 'stages': results}, fh, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def _report(self, result):
+        self.stdout.write(
+            f"{result['concurrency']:>5} {result['journeys_completed']:>8} {result['requests']:>8} "
+            f"{result['throughput_rps']:>7.1f} {result['error_rate']:>7.1%} "
+            f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+        )
+        for message, count in result['top_errors'].items():
+            self.stdout.write(self.style.WARNING(f"      {count} x {message}"))
@@ -0,0 +1,44 @@
+"""
+Delete expired sessions from the database in batches
+
+Unlike clearsessions, which removes every expired row in one DELETE,
+this deletes --batch-size rows per statement so the session table is
+never locked for long. Schedule it (e.g. hourly via cron).
+
+Usage:
+    python manage.py purge_sessions
+    python manage.py purge_sessions --batch-size 5000
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portal_app import session_store
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=session_store.PURGE_BATCH_SIZE,
+            help='Sessions deleted per statement',
+        )
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=None,
+            help='Keep sessions expired less than this many seconds ago '
+                 '(default: the session refresh threshold)',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        grace = None if options['grace'] is None else timedelta(seconds=options['grace'])
+
+        deleted = session_store.purge_expired(batch_size=options['batch_size'], grace=grace)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired session(s).'))
@@ -0,0 +1,45 @@
+"""
+Rebuild or reconcile the denormalized statistic counters
+
+Recomputes every counter from Application and Complaint with GROUP BY
+queries. Migration 0006 seeds the counters from existing rows; after
+that run this by hand or from a scheduled job (not on every web start:
+it scans both tables) after bulk imports, raw SQL writes, or whenever
+`--check` reports drift.
+
+Usage:
+    python manage.py rebuild_counters           # rewrite all counters
+    python manage.py rebuild_counters --check   # only report drift
+"""
+
+from django.core.management.base import BaseCommand
+
+from portal_app import counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild statistic counters from Application and Complaint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Report counters that differ from the source tables without writing',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = counters.find_drift()
+            if not drift:
+                self.stdout.write(self.style.SUCCESS('All counters are in sync.'))
+                return
+            for name in sorted(drift):
+                stored, expected = drift[name]
+                self.stdout.write(f'{name}: stored={stored} expected={expected}')
+            self.stdout.write(self.style.WARNING(
+                f'{len(drift)} counter(s) out of sync. Run without --check to rebuild.'
+            ))
+            return
+
+        written = counters.rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} counter(s).'))
@@ -0,0 +1,99 @@
+"""
+Rebuild or reconcile the daily rollups behind the dashboard trend charts
+
+Recomputes DailyRollup rows from Application, Complaint, TaxPayment and
+the archive tables with GROUP BY queries. By default it rebuilds the
+last ROLLUP_RECONCILE_DAYS days, which repairs any write that bypassed
+the incremental updates; the Procfile's `rollups` process does that
+once a day with --loop. Migration 0016 seeds all history when the
+rollups are first deployed; use --all after bulk imports.
+
+Usage:
+    python manage.py rebuild_rollups                          # last ROLLUP_RECONCILE_DAYS days
+    python manage.py rebuild_rollups --all                    # all history
+    python manage.py rebuild_rollups --start 2025-04-01 --end 2025-06-30
+    python manage.py rebuild_rollups --check                  # only report drift
+    python manage.py rebuild_rollups --loop                   # recent days, once a day
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from portal_app import rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily rollups from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild all history')
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD, default today)')
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Report rollups that differ from the source tables without writing',
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep rebuilding the recent days')
+        parser.add_argument('--interval', type=float, default=24 * 3600,
+                            help='Seconds between rebuilds with --loop')
+
+    def _date(self, value, option):
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise CommandError(f'{option} must be a date (YYYY-MM-DD)')
+        return day
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            if options['all'] or options['start'] or options['end'] or options['check']:
+                raise CommandError('--loop rebuilds the recent days; it takes no range or --check')
+            while True:
+                self.rebuild(options)
+                time.sleep(options['interval'])
+
+        self.rebuild(options)
+
+    def rebuild(self, options):
+        if options['all']:
+            if options['start'] or options['end']:
+                raise CommandError('--all cannot be combined with --start/--end')
+            start = end = None
+            period = 'all history'
+        else:
+            end = self._date(options['end'], '--end') if options['end'] else timezone.localdate()
+            start = (
+                self._date(options['start'], '--start') if options['start']
+                else end - timedelta(days=settings.ROLLUP_RECONCILE_DAYS - 1)
+            )
+            if start > end:
+                raise CommandError('--start must not be after --end')
+            period = f'{start} to {end}'
+
+        if options['check']:
+            drift = rollups.find_drift(start, end)
+            if not drift:
+                self.stdout.write(self.style.SUCCESS(f'All rollups for {period} are in sync.'))
+                return
+            for key in sorted(drift):
+                (stored_count, stored_amount), (count, amount) = drift[key]
+                metric, day, kind, village = key
+                self.stdout.write(
+                    f'{metric} {day} {kind}/{village}: stored={stored_count} ({stored_amount}) '
+                    f'expected={count} ({amount})'
+                )
+            self.stdout.write(self.style.WARNING(
+                f'{len(drift)} rollup(s) out of sync. Run without --check to rebuild.'
+            ))
+            return
+
+        written = rollups.rebuild_rollups(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} rollup(s) for {period}.'))
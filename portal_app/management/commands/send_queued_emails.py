@@ -0,0 +1,45 @@
+"""
+Background worker that delivers the outbound email queue
+
+Usage:
+    python manage.py send_queued_emails              # one pass, then exit
+    python manage.py send_queued_emails --loop       # keep polling
+    python manage.py send_queued_emails --purge-days 30
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from portal_app import email_queue
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbound emails in batches over one SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=email_queue.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-attempts', type=int, default=email_queue.DEFAULT_MAX_ATTEMPTS)
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new emails')
+        parser.add_argument('--interval', type=float, default=2.0, help='Idle poll interval in seconds')
+        parser.add_argument('--purge-days', type=int, help='Delete sent emails older than N days and exit')
+
+    def handle(self, *args, **options):
+        if options['purge_days'] is not None:
+            deleted = email_queue.purge_sent(options['purge_days'])
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} sent email(s).'))
+            return
+
+        while True:
+            sent, failed = email_queue.process_queue(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+            )
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}')
+
+            if not options['loop']:
+                break
+            # A full batch means more may be waiting; otherwise back off
+            if sent + failed < options['batch_size']:
+                time.sleep(options['interval'])
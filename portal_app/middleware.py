@@ -1,72 +1,69 @@
 """
 Role-Based Access Control Middleware
 
-This middleware enforces role-based access control rules:
-- Admin: Full access to /admin/ routes
-- Panchayat Staff: Access to /staff/ routes
-- Citizen: Access to /citizen/ routes
+Access rules are declared once, on the views, with the decorators in
+portal_app.decorators (@role_required, @staff_or_admin_required, ...).
+At startup the middleware walks the URLconf and compiles those
+declarations into a table of route name -> allowed roles; each request
+is then checked with one dict lookup on request.resolver_match.
+
+Typical rules:
+- Admin pages (/admin-dashboard/, /admin/applications/, ...): Staff and Admin
+- Certificate applications and tax payment: Citizens
+- Everything else: left to the view (login_required, public pages)
 """
 
-from django.shortcuts import redirect
-from django.urls import reverse
-from django.contrib import messages
+from django.urls import URLPattern, URLResolver, get_resolver
 from django.utils.deprecation import MiddlewareMixin
 
+from .decorators import deny_access
+
+
+def compile_route_roles(urlconf=None):
+    """
+    Map every role-restricted route to the roles its view accepts
+
+    Args:
+        urlconf: URLconf module or dotted path (default ROOT_URLCONF)
+
+    Returns:
+        dict: {view_name: frozenset of roles}, where view_name is the
+            namespaced URL name as in request.resolver_match.view_name
+    """
+    routes = {}
+
+    def walk(patterns, namespaces):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns, namespaces + [pattern.namespace] if pattern.namespace else namespaces)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                roles = getattr(pattern.callback, 'allowed_roles', None)
+                if roles:
+                    routes[':'.join(namespaces + [pattern.name])] = frozenset(roles)
+
+    walk(get_resolver(urlconf).url_patterns, [])
+    return routes
+
 
 class RoleBasedAccessMiddleware(MiddlewareMixin):
     """
     Middleware to enforce role-based URL access control
-    
-    Access Rules:
-    - /admin/ routes: Admin only
-    - /staff/ routes: Panchayat Staff and Admin
-    - /citizen/ routes: Citizens and all authenticated users
+
+    Rejects a logged-in user before the view runs when their role is not
+    among the roles declared on the view. Anonymous users pass through
+    so login_required can redirect them to the login page.
     """
-    
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.route_roles = compile_route_roles()
+
     def process_view(self, request, view_func, view_args, view_kwargs):
         # Skip middleware for unauthenticated users (let login_required handle it)
         if not request.user.is_authenticated:
             return None
-        
-        # Get the current path
-        path = request.path
-        user_role = request.user.role
-        
-        # Define role-based access rules
-        admin_paths = [
-            '/admin-dashboard/',
-            '/admin/applications/',
-            '/admin/application/',
-            '/admin/complaints/',
-            '/admin/complaint/',
-        ]
-        staff_paths = ['/staff-dashboard/', '/staff/applications/', '/staff/review/']
-        citizen_paths = [
-            '/dashboard/',
-            '/apply/',
-            '/my-applications/',
-            '/application/',
-            '/pay-tax/',
-            '/file-complaint/',
-            '/my-complaints/',
-            '/complaint/',
-        ]
-        
-        # Check admin routes
-        if any(path.startswith(admin_path) for admin_path in admin_paths):
-            if user_role != 'admin':
-                messages.error(request, "Access denied. Admin privileges required.")
-                return redirect('home')
-        
-        # Check staff routes
-        elif any(path.startswith(staff_path) for staff_path in staff_paths):
-            if user_role not in ['staff', 'admin']:
-                messages.error(request, "Access denied. Panchayat Staff privileges required.")
-                return redirect('home')
-        
-        # Check citizen routes
-        elif any(path.startswith(citizen_path) for citizen_path in citizen_paths):
-            # All authenticated users can access citizen routes
-            pass
-        
+
+        allowed_roles = self.route_roles.get(request.resolver_match.view_name)
+        if allowed_roles is not None and request.user.role not in allowed_roles:
+            return deny_access(request, getattr(view_func, 'allowed_roles', sorted(allowed_roles)))
         return None
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.9 on 2026-10-16 23:39
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    # Dashboards read the counters only; count existing rows once here
+    from portal_app.counters import rebuild_counters
+    rebuild_counters(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal_app', '0005_alter_customuser_username'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Statistic Counter',
+                'verbose_name_plural': 'Statistic Counters',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.9 on 2026-10-16 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal_app', '0009_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['applied_date', 'id'], name='portal_app__applied_5088f1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['applicant', 'applied_date', 'id'], name='portal_app__applica_2539ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['status', 'applied_date', 'id'], name='portal_app__status_1678bd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['filed_date', 'id'], name='portal_app__filed_d_a926f0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['complainant', 'filed_date', 'id'], name='portal_app__complai_eb9e1c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['status', 'filed_date', 'id'], name='portal_app__status_6aa5b5_idx'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.9 on 2026-10-17 00:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Native full-text indexes over search documents. SQLite (and any other
+# backend) relies on the SearchTerm inverted index instead.
+POSTGRES_INDEX = (
+    "CREATE INDEX portal_app_searchdoc_fts ON portal_app_searchdocument USING GIN (("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(body, '')), 'B')))"
+)
+MYSQL_INDEX = (
+    "ALTER TABLE portal_app_searchdocument "
+    "ADD FULLTEXT INDEX portal_app_searchdoc_fts (title, body)"
+)
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_INDEX)
+    elif vendor == 'mysql':
+        schema_editor.execute(MYSQL_INDEX)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS portal_app_searchdoc_fts")
+    elif vendor == 'mysql':
+        schema_editor.execute("ALTER TABLE portal_app_searchdocument DROP INDEX portal_app_searchdoc_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal_app', '0010_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('complaint', 'Complaint'), ('application', 'Application'), ('user', 'Citizen')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('complaint', 'Complaint'), ('application', 'Application'), ('user', 'Citizen')], max_length=20)),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='portal_app.searchdocument')),
+            ],
+            options={
+                'verbose_name': 'Search Term',
+                'verbose_name_plural': 'Search Terms',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document'),
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['kind', 'term', 'document'], name='portal_app__kind_e82eb9_idx'),
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
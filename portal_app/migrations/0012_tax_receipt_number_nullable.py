@@ -0,0 +1,24 @@
+# Generated by Django 4.2.9 on 2026-10-17 00:19
+
+from django.db import migrations, models
+
+
+def blank_receipts_to_null(apps, schema_editor):
+    TaxPayment = apps.get_model('portal_app', 'TaxPayment')
+    TaxPayment.objects.filter(receipt_number='').update(receipt_number=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal_app', '0011_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taxpayment',
+            name='receipt_number',
+            field=models.CharField(blank=True, max_length=50, null=True, unique=True),
+        ),
+        migrations.RunPython(blank_receipts_to_null, migrations.RunPython.noop),
+    ]
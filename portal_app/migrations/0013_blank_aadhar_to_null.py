@@ -0,0 +1,19 @@
+# Generated by Django 4.2.9 on 2026-10-17 06:05
+
+from django.db import migrations
+
+
+def blank_aadhar_to_null(apps, schema_editor):
+    CustomUser = apps.get_model('portal_app', 'CustomUser')
+    CustomUser.objects.filter(aadhar_number='').update(aadhar_number=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal_app', '0012_tax_receipt_number_nullable'),
+    ]
+
+    operations = [
+        migrations.RunPython(blank_aadhar_to_null, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.9 on 2026-10-17 00:37
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal_app', '0013_blank_aadhar_to_null'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedComplaint',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('complaint_number', models.CharField(max_length=20, unique=True)),
+                ('category', models.CharField(choices=[('water_supply', 'Water Supply'), ('electricity', 'Electricity'), ('road', 'Road & Infrastructure'), ('sanitation', 'Sanitation'), ('street_light', 'Street Light'), ('drainage', 'Drainage'), ('waste_management', 'Waste Management'), ('other', 'Other')], max_length=20)),
+                ('subject', models.CharField(max_length=300)),
+                ('description', models.TextField()),
+                ('location', models.TextField()),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], max_length=10)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved'), ('closed', 'Closed')], max_length=15)),
+                ('complaint_photo', models.CharField(blank=True, max_length=100)),
+                ('filed_date', models.DateTimeField()),
+                ('resolved_date', models.DateTimeField(blank=True, null=True)),
+                ('resolution_remarks', models.TextField(blank=True, null=True)),
+                ('history', models.JSONField(blank=True, default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('complainant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_complaints', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Complaint',
+                'verbose_name_plural': 'Archived Complaints',
+                'ordering': ['-filed_date'],
+                'indexes': [models.Index(fields=['complainant', 'filed_date'], name='portal_app__complai_c9c455_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedApplication',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('application_number', models.CharField(max_length=20, unique=True)),
+                ('application_type', models.CharField(choices=[('birth_certificate', 'Birth Certificate'), ('death_certificate', 'Death Certificate'), ('income_certificate', 'Income Certificate'), ('water_tax', 'Water Tax'), ('house_tax', 'House Tax')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('under_review', 'Under Review'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=15)),
+                ('applied_date', models.DateTimeField()),
+                ('reviewed_date', models.DateTimeField(blank=True, null=True)),
+                ('admin_remarks', models.TextField(blank=True, null=True)),
+                ('certificate_number', models.CharField(blank=True, max_length=50, null=True)),
+                ('detail', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status_history', models.JSONField(blank=True, default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_applications', to=settings.AUTH_USER_MODEL)),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Application',
+                'verbose_name_plural': 'Archived Applications',
+                'ordering': ['-applied_date'],
+                'indexes': [models.Index(fields=['applicant', 'applied_date'], name='portal_app__applica_be8747_idx')],
+            },
+        ),
+    ]
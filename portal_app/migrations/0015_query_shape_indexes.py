@@ -0,0 +1,41 @@
+# Generated by Django 4.2.9 on 2026-10-17 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal_app', '0014_archive_tables'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['application_type', 'status', 'applied_date', 'id'], name='portal_app__applica_bb7d4f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['assigned_to', 'status', 'filed_date', 'id'], name='portal_app__assigne_5eba60_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['priority', 'status', 'filed_date', 'id'], name='portal_app__priorit_caba48_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['role', 'is_active', 'date_joined'], name='portal_app__role_8580c4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailotp',
+            index=models.Index(fields=['user', 'is_used', 'created_at'], name='portal_app__user_id_1a2ba0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['applied_date', 'id'], name='application_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(condition=models.Q(('status__in', ['open', 'in_progress'])), fields=['assigned_to', 'status'], name='complaint_open_assignee_idx'),
+        ),
+    ]
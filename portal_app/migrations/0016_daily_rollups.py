@@ -0,0 +1,41 @@
+# Generated by Django 4.2.9 on 2026-10-17 01:17
+
+from django.db import migrations, models
+
+
+def seed_rollups(apps, schema_editor):
+    # Trend charts read the rollups only; aggregate existing rows once here
+    from portal_app.rollups import rebuild_rollups
+    rebuild_rollups(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal_app', '0015_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('submitted', 'Applications Submitted'), ('approved', 'Applications Approved'), ('complaints', 'Complaints Filed'), ('collections', 'Tax Collections')], max_length=20)),
+                ('day', models.DateField()),
+                ('kind', models.CharField(max_length=20)),
+                ('village', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Daily Rollup',
+                'verbose_name_plural': 'Daily Rollups',
+                'ordering': ['metric', 'day', 'kind', 'village'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(fields=('metric', 'day', 'kind', 'village'), name='unique_daily_rollup'),
+        ),
+        migrations.RunPython(seed_rollups, migrations.RunPython.noop),
+    ]
@@ -7,10 +7,13 @@ This file contains all database models representing:
 - Tax Payments (Water & House Tax)
 - Complaints
 - Application Status History
+- Archive of closed applications and complaints
 """
 
 from django.db import models
+from django.db.models.fields.files import FieldFile
 from django.contrib.auth.models import AbstractUser
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import RegexValidator, MinValueValidator
 from django.utils import timezone
 
@@ -123,6 +126,10 @@ class CustomUser(AbstractUser):
         verbose_name = "User"
         verbose_name_plural = "Users"
         ordering = ['-created_at']
+        indexes = [
+            # Admin dashboard: recent citizens, staff awaiting approval
+            models.Index(fields=['role', 'is_active', 'date_joined']),
+        ]
     
     def __str__(self):
         return f"{self.get_full_name()} ({self.username})"
@@ -135,6 +142,16 @@ class CustomUser(AbstractUser):
 # BASE APPLICATION MODEL
 # ============================================
 
+class ApplicationQuerySet(models.QuerySet):
+    
+    def with_details(self):
+        """Join applicant, reviewer and every one-to-one detail row"""
+        return self.select_related(
+            'applicant', 'reviewed_by', 'birth_certificate', 'death_certificate',
+            'income_certificate', 'tax_payment',
+        )
+
+
 class Application(models.Model):
     """
     Base model to track all types of applications
@@ -156,6 +173,15 @@ class Application(models.Model):
         ('rejected', 'Rejected'),
     )
     
+    # One-to-one detail row holding the form data of each application type
+    DETAIL_RELATIONS = {
+        'birth_certificate': 'birth_certificate',
+        'death_certificate': 'death_certificate',
+        'income_certificate': 'income_certificate',
+        'water_tax': 'tax_payment',
+        'house_tax': 'tax_payment',
+    }
+    
     application_number = models.CharField(
         max_length=20,
         unique=True,
@@ -187,6 +213,11 @@ class Application(models.Model):
     # Admin remarks
     admin_remarks = models.TextField(blank=True, null=True)
     
+    objects = ApplicationQuerySet.as_manager()
+    
+    # True on instances rebuilt from ArchivedApplication.as_application()
+    is_archived = False
+    
     class Meta:
         verbose_name = "Application"
         verbose_name_plural = "Applications"
@@ -195,17 +226,32 @@ class Application(models.Model):
             models.Index(fields=['application_number']),
             models.Index(fields=['status']),
             models.Index(fields=['applicant', 'status']),
+            # Keyset pagination: (applied_date, id), optionally per applicant/status
+            models.Index(fields=['applied_date', 'id']),
+            models.Index(fields=['applicant', 'applied_date', 'id']),
+            models.Index(fields=['status', 'applied_date', 'id']),
+            # admin_applications filtered by type and status
+            models.Index(fields=['application_type', 'status', 'applied_date', 'id']),
+            # Pending review queue; partial, so not created on MySQL
+            models.Index(
+                fields=['applied_date', 'id'], condition=models.Q(status='pending'),
+                name='application_pending_idx',
+            ),
         ]
     
     def __str__(self):
         return f"{self.application_number} - {self.get_application_type_display()}"
     
+    def get_detail(self):
+        """Certificate or tax payment row for this application (None if missing)"""
+        relation = self.DETAIL_RELATIONS.get(self.application_type)
+        return getattr(self, relation, None) if relation else None
+    
     def save(self, *args, **kwargs):
         if not self.application_number:
             # Generate unique application number
-            prefix = self.application_type[:4].upper()
-            timestamp = timezone.now().strftime('%Y%m%d%H%M%S')
-            self.application_number = f"GP{prefix}{timestamp}"
+            from .numbering import application_number
+            self.application_number = application_number(self.application_type)
         super().save(*args, **kwargs)
 
 
@@ -504,9 +550,11 @@ class TaxPayment(models.Model):
     )
     payment_date = models.DateTimeField(null=True, blank=True)
     transaction_id = models.CharField(max_length=100, blank=True)
+    # NULL until paid: many unpaid rows must not collide on ''
     receipt_number = models.CharField(
         max_length=50,
         blank=True,
+        null=True,
         unique=True
     )
     
@@ -536,8 +584,10 @@ class TaxPayment(models.Model):
         
         # Generate receipt number if paid
         if self.payment_status == 'paid' and not self.receipt_number:
-            timestamp = timezone.now().strftime('%Y%m%d%H%M%S')
-            self.receipt_number = f"RCP{timestamp}"
+            from .numbering import receipt_number
+            self.receipt_number = receipt_number()
+        elif not self.receipt_number:
+            self.receipt_number = None
         
         super().save(*args, **kwargs)
 
@@ -635,6 +685,19 @@ class Complaint(models.Model):
             models.Index(fields=['complaint_number']),
             models.Index(fields=['status']),
             models.Index(fields=['complainant', 'status']),
+            # Keyset pagination: (filed_date, id), optionally per complainant/status
+            models.Index(fields=['filed_date', 'id']),
+            models.Index(fields=['complainant', 'filed_date', 'id']),
+            models.Index(fields=['status', 'filed_date', 'id']),
+            # admin_complaints filtered by assignee or priority with status,
+            # and open-complaint loads per assignee (portal_app.assignment)
+            models.Index(fields=['assigned_to', 'status', 'filed_date', 'id']),
+            models.Index(fields=['priority', 'status', 'filed_date', 'id']),
+            # Open complaints per assignee; partial, so not created on MySQL
+            models.Index(
+                fields=['assigned_to', 'status'], condition=models.Q(status__in=['open', 'in_progress']),
+                name='complaint_open_assignee_idx',
+            ),
         ]
     
     def __str__(self):
@@ -643,8 +706,8 @@ class Complaint(models.Model):
     def save(self, *args, **kwargs):
         if not self.complaint_number:
             # Generate unique complaint number
-            timestamp = timezone.now().strftime('%Y%m%d%H%M%S')
-            self.complaint_number = f"CMP{timestamp}"
+            from .numbering import complaint_number
+            self.complaint_number = complaint_number()
         super().save(*args, **kwargs)
 
 
@@ -796,6 +859,9 @@ class EmailOTP(models.Model):
         indexes = [
             models.Index(fields=['user', 'is_verified']),
             models.Index(fields=['email', 'otp_code']),
+            # Latest unused OTP (verify_otp); its user prefix also serves
+            # the recent-OTP check (resend_otp) over a user's few rows
+            models.Index(fields=['user', 'is_used', 'created_at']),
         ]
     
     def __str__(self):
@@ -858,3 +924,403 @@ class EmailOTP(models.Model):
             self.expires_at = timezone.now() + timedelta(minutes=10)
         
         super().save(*args, **kwargs)
+
+
+# ============================================
+# DENORMALIZED STATISTIC COUNTERS
+# ============================================
+
+class StatisticCounter(models.Model):
+    """
+    Denormalized running total for dashboard statistics
+    
+    Each row holds one named counter, e.g.:
+    - application:status:pending
+    - application:type:birth_certificate
+    - application:day:2025-06-01
+    - application:applicant:42:status:approved
+    - complaint:status:open
+    
+    Maintained by portal_app.counters and rebuilt with
+    `python manage.py rebuild_counters`.
+    """
+    
+    name = models.CharField(max_length=120, unique=True)
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Statistic Counter"
+        verbose_name_plural = "Statistic Counters"
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+# ============================================
+# DAILY ROLLUPS
+# ============================================
+
+class DailyRollup(models.Model):
+    """
+    Events of one kind per day, type and village, for trend charts
+
+    Metrics:
+    - submitted:   applications submitted (kind = application type)
+    - approved:    applications approved (kind = application type)
+    - complaints:  complaints filed (kind = complaint category)
+    - collections: tax payments received (kind = tax type), with amount
+
+    The village is the applicant's or complainant's village when the
+    event happened. Maintained by portal_app.rollups and reconciled
+    nightly with `python manage.py rebuild_rollups`.
+    """
+
+    METRIC_CHOICES = (
+        ('submitted', 'Applications Submitted'),
+        ('approved', 'Applications Approved'),
+        ('complaints', 'Complaints Filed'),
+        ('collections', 'Tax Collections'),
+    )
+
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    day = models.DateField()
+    kind = models.CharField(max_length=20)
+    village = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Daily Rollup"
+        verbose_name_plural = "Daily Rollups"
+        ordering = ['metric', 'day', 'kind', 'village']
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'day', 'kind', 'village'], name='unique_daily_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.day} {self.kind}/{self.village}: {self.count}"
+
+
+# ============================================
+# NUMBER SEQUENCES
+# ============================================
+
+class NumberSequence(models.Model):
+    """
+    Next unreserved value of an identifier sequence
+    
+    One row per (prefix, financial year), e.g. ('GPBIRT', '2025-26').
+    Worker processes reserve blocks of values from here through
+    portal_app.numbering, so this row is touched once per block
+    rather than once per application.
+    """
+    
+    prefix = models.CharField(max_length=20)
+    period = models.CharField(max_length=10, help_text="Financial year, e.g. 2025-26")
+    next_value = models.BigIntegerField(default=1)
+    
+    class Meta:
+        verbose_name = "Number Sequence"
+        verbose_name_plural = "Number Sequences"
+        ordering = ['prefix', 'period']
+        constraints = [
+            models.UniqueConstraint(fields=['prefix', 'period'], name='unique_number_sequence'),
+        ]
+    
+    def __str__(self):
+        return f"{self.prefix} {self.period}: next {self.next_value}"
+
+
+# ============================================
+# RATE LIMIT COUNTERS
+# ============================================
+
+class RateLimitCounter(models.Model):
+    """
+    Shared request counter for the database rate-limit backend
+    
+    One row per identifier and time window; incremented atomically
+    so every gunicorn worker sees the same count.
+    """
+    
+    key = models.CharField(max_length=255, unique=True)
+    count = models.IntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        verbose_name = "Rate Limit Counter"
+        verbose_name_plural = "Rate Limit Counters"
+    
+    def __str__(self):
+        return f"{self.key}: {self.count}"
+
+
+# ============================================
+# OUTBOUND EMAIL QUEUE
+# ============================================
+
+class OutboundEmail(models.Model):
+    """
+    Durable outbox for emails sent by the background worker
+    
+    Request handlers enqueue rows here (portal_app.email_queue) and
+    `python manage.py send_queued_emails` delivers them in batches.
+    """
+    
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    recipients = models.TextField(help_text="Comma-separated recipient addresses")
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time the worker may (re)try this email"
+    )
+    last_error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Outbound Emails"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} → {self.recipients} ({self.get_status_display()})"
+    
+    def recipient_list(self):
+        return [address.strip() for address in self.recipients.split(',') if address.strip()]
+
+
+# ============================================
+# SEARCH INDEX
+# ============================================
+
+class SearchDocument(models.Model):
+    """
+    Denormalized searchable text of one complaint, application or citizen
+    
+    Maintained by portal_app.search on save. PostgreSQL (GIN tsvector)
+    and MySQL (FULLTEXT) index title/body directly; other databases use
+    the SearchTerm inverted index.
+    """
+    
+    KIND_CHOICES = (
+        ('complaint', 'Complaint'),
+        ('application', 'Application'),
+        ('user', 'Citizen'),
+    )
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Search Document"
+        verbose_name_plural = "Search Documents"
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
+
+
+class SearchTerm(models.Model):
+    """
+    Inverted index posting: one term of one SearchDocument
+    
+    weight is the term's frequency, counting title occurrences more.
+    kind is copied from the document so lookups never join to it.
+    """
+    
+    document = models.ForeignKey(
+        SearchDocument,
+        on_delete=models.CASCADE,
+        related_name='terms'
+    )
+    kind = models.CharField(max_length=20, choices=SearchDocument.KIND_CHOICES)
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField(default=1)
+    
+    class Meta:
+        verbose_name = "Search Term"
+        verbose_name_plural = "Search Terms"
+        indexes = [
+            models.Index(fields=['kind', 'term', 'document']),
+        ]
+    
+    def __str__(self):
+        return f"{self.term} → {self.document_id} ({self.weight})"
+
+
+# ============================================
+# ARCHIVE OF CLOSED RECORDS
+# ============================================
+
+def archive_fields(instance, exclude=()):
+    """
+    Column values of a model instance for an archive JSON field
+
+    Args:
+        instance: Model instance
+        exclude (tuple): Field names to leave out
+
+    Returns:
+        dict: {attname: value}, files as their storage name
+    """
+    values = {}
+    for field in instance._meta.concrete_fields:
+        if field.name in exclude:
+            continue
+        value = field.value_from_object(instance)
+        values[field.attname] = (value.name or '') if isinstance(value, FieldFile) else value
+    return values
+
+
+def restore_fields(model, values):
+    """Unsaved model instance from archive_fields() output (as read back from JSON)"""
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    return model(**{
+        name: fields[name].to_python(value)
+        for name, value in values.items()
+        if name in fields
+    })
+
+
+class ArchivedApplication(models.Model):
+    """
+    Approved or rejected application moved out of the live tables
+    
+    Written by portal_app.archive. Keeps the original primary key and
+    application number, so tracking and certificate download links keep
+    working; the certificate/tax detail row and the status history are
+    stored as JSON.
+    """
+    
+    id = models.BigIntegerField(primary_key=True)
+    application_number = models.CharField(max_length=20, unique=True)
+    applicant = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='archived_applications'
+    )
+    application_type = models.CharField(max_length=20, choices=Application.APPLICATION_TYPES)
+    status = models.CharField(max_length=15, choices=Application.STATUS_CHOICES)
+    applied_date = models.DateTimeField()
+    reviewed_date = models.DateTimeField(null=True, blank=True)
+    reviewed_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    admin_remarks = models.TextField(blank=True, null=True)
+    certificate_number = models.CharField(max_length=50, blank=True, null=True)
+    
+    detail = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status_history = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = "Archived Application"
+        verbose_name_plural = "Archived Applications"
+        ordering = ['-applied_date']
+        indexes = [
+            models.Index(fields=['applicant', 'applied_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.application_number} - {self.get_application_type_display()} (archived)"
+    
+    def as_application(self):
+        """
+        Unsaved Application rebuilt from the archive, detail row attached
+
+        Good for reading (tracking snapshot, certificate rendering), never
+        for saving.
+        """
+        application = Application(
+            id=self.id,
+            application_number=self.application_number,
+            applicant_id=self.applicant_id,
+            application_type=self.application_type,
+            status=self.status,
+            applied_date=self.applied_date,
+            reviewed_date=self.reviewed_date,
+            reviewed_by_id=self.reviewed_by_id,
+            admin_remarks=self.admin_remarks,
+        )
+        application.is_archived = True
+        if ArchivedApplication.applicant.is_cached(self):
+            application.applicant = self.applicant
+        relation = Application.DETAIL_RELATIONS.get(self.application_type)
+        if relation and self.detail:
+            model = Application._meta.get_field(relation).related_model
+            setattr(application, relation, restore_fields(model, self.detail))
+        return application
+
+
+class ArchivedComplaint(models.Model):
+    """
+    Closed complaint moved out of the live tables
+    
+    Written by portal_app.archive, with the original primary key and
+    complaint number; the complaint history is stored as JSON.
+    """
+    
+    id = models.BigIntegerField(primary_key=True)
+    complaint_number = models.CharField(max_length=20, unique=True)
+    complainant = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='archived_complaints'
+    )
+    category = models.CharField(max_length=20, choices=Complaint.CATEGORY_CHOICES)
+    subject = models.CharField(max_length=300)
+    description = models.TextField()
+    location = models.TextField()
+    priority = models.CharField(max_length=10, choices=Complaint.PRIORITY_CHOICES)
+    status = models.CharField(max_length=15, choices=Complaint.STATUS_CHOICES)
+    complaint_photo = models.CharField(max_length=100, blank=True)
+    filed_date = models.DateTimeField()
+    assigned_to = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    resolved_date = models.DateTimeField(null=True, blank=True)
+    resolution_remarks = models.TextField(blank=True, null=True)
+    
+    history = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = "Archived Complaint"
+        verbose_name_plural = "Archived Complaints"
+        ordering = ['-filed_date']
+        indexes = [
+            models.Index(fields=['complainant', 'filed_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.complaint_number} - {self.subject} (archived)"
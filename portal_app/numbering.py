@@ -0,0 +1,259 @@
+"""
+Identifier Allocation for Digital Gram Panchayat Portal
+
+Hands out unique application, complaint, receipt and certificate numbers:
+- One sequence per prefix per financial year (NumberSequence)
+- Each worker process reserves a block of values at a time, so the
+  sequence row is locked once per block instead of once per submission
+- Numbers may skip values (unused blocks of a restarted worker) but
+  never repeat
+
+Format examples:
+    GPBIRT25260000001   application (GP + type + FY + sequence)
+    CMP25260000001      complaint
+    RCP25260000001      tax receipt
+    CERTBIRT25260000001 certificate
+"""
+
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS, IntegrityError, OperationalError, connection, connections,
+    transaction,
+)
+from django.utils import timezone
+
+from .models import NumberSequence
+
+
+DEFAULT_BLOCK_SIZE = 20
+SEQUENCE_DIGITS = 7
+RESERVE_ATTEMPTS = 8
+
+
+# ============================================
+# FINANCIAL YEAR
+# ============================================
+
+def financial_year(date=None):
+    """
+    Indian financial year (April-March) containing a date
+
+    Args:
+        date: Date to classify (default: today)
+
+    Returns:
+        str: e.g. '2025-26'
+    """
+    date = date or timezone.localdate()
+    start = date.year if date.month >= 4 else date.year - 1
+    return f"{start}-{str(start + 1)[-2:]}"
+
+
+def _compact_year(period):
+    """'2025-26' -> '2526'"""
+    return period[2:4] + period[-2:]
+
+
+# ============================================
+# BLOCK RESERVATION
+# ============================================
+
+def _reserve_sql(conn, prefix, period, size):
+    """
+    Advance a sequence by `size` and return the first reserved value
+
+    Must run inside a transaction on `conn`. Raises IntegrityError if
+    another worker created the sequence row concurrently.
+    """
+    table = conn.ops.quote_name(NumberSequence._meta.db_table)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET next_value = next_value + %s "
+            f"WHERE prefix = %s AND period = %s",
+            [size, prefix, period],
+        )
+        if cursor.rowcount:
+            cursor.execute(
+                f"SELECT next_value FROM {table} WHERE prefix = %s AND period = %s",
+                [prefix, period],
+            )
+            return cursor.fetchone()[0] - size
+
+        cursor.execute(
+            f"INSERT INTO {table} (prefix, period, next_value) VALUES (%s, %s, %s)",
+            [prefix, period, 1 + size],
+        )
+        return 1
+
+
+def _reserve_independent(prefix, period, size):
+    """
+    Reserve a block on a fresh connection that commits on its own
+
+    Used while the request is inside a transaction: the reservation
+    must survive a rollback of that transaction (otherwise another
+    worker could be handed the same block) and must not keep the
+    sequence row locked until the request commits.
+    """
+    conn = connections.create_connection(DEFAULT_DB_ALIAS)
+    try:
+        conn.set_autocommit(False)
+        try:
+            start = _reserve_sql(conn, prefix, period, size)
+            conn.commit()
+            return start
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.close()
+
+
+def reserve_block(prefix, period, size):
+    """
+    Reserve `size` consecutive values of a sequence
+
+    Args:
+        prefix (str): Sequence prefix, e.g. 'GPBIRT'
+        period (str): Financial year, e.g. '2025-26'
+        size (int): Number of values to reserve
+
+    Returns:
+        int: First value of the reserved range [start, start + size)
+    """
+    for attempt in range(RESERVE_ATTEMPTS):
+        try:
+            # SQLite allows a single writer, so a second connection would
+            # deadlock against the open transaction; reserve in-line there.
+            if connection.in_atomic_block and connection.vendor != 'sqlite':
+                return _reserve_independent(prefix, period, size)
+            with transaction.atomic():
+                return _reserve_sql(connection, prefix, period, size)
+        except (IntegrityError, OperationalError):
+            # Lost the race creating the row, or lock contention
+            if attempt == RESERVE_ATTEMPTS - 1:
+                raise
+            time.sleep(0.005 * (2 ** attempt))
+
+
+class BlockAllocator:
+    """
+    Per-process cache of reserved sequence blocks
+
+    Thread-safe; the cache is dropped after fork so pre-forked workers
+    never share a block inherited from the master process.
+    """
+
+    def __init__(self, block_size=None):
+        self.block_size = block_size or getattr(
+            settings, 'NUMBER_BLOCK_SIZE', DEFAULT_BLOCK_SIZE
+        )
+        self._blocks = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def allocate(self, prefix, period):
+        """
+        Next unique value of a sequence
+
+        Args:
+            prefix (str): Sequence prefix
+            period (str): Financial year
+
+        Returns:
+            int: Sequence value
+        """
+        key = (prefix, period)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._blocks.clear()
+                self._pid = os.getpid()
+
+            block = self._blocks.get(key)
+            if block is None or block[0] >= block[1]:
+                if connection.in_atomic_block and connection.vendor == 'sqlite':
+                    # Reserved in the caller's transaction: a rollback would
+                    # hand the rest of the block out again, so take one value
+                    return reserve_block(prefix, period, 1)
+                start = reserve_block(prefix, period, self.block_size)
+                block = [start, start + self.block_size]
+                self._blocks[key] = block
+
+            value = block[0]
+            block[0] += 1
+            return value
+
+
+_allocator = BlockAllocator()
+
+
+# ============================================
+# PUBLIC API
+# ============================================
+
+def next_number(prefix, date=None):
+    """
+    Allocate a formatted identifier
+
+    Args:
+        prefix (str): Identifier prefix, e.g. 'CMP'
+        date: Date deciding the financial year (default: today)
+
+    Returns:
+        str: e.g. 'CMP25260000042'
+    """
+    period = financial_year(date)
+    value = _allocator.allocate(prefix, period)
+    return f"{prefix}{_compact_year(period)}{value:0{SEQUENCE_DIGITS}d}"
+
+
+def next_numbers(prefix, count, date=None):
+    """
+    Allocate `count` consecutive identifiers at once
+
+    Reserves one block of exactly `count` values directly (bypassing the
+    per-process block cache), so a batch costs one sequence update.
+
+    Args:
+        prefix (str): Identifier prefix
+        count (int): Number of identifiers
+        date: Date deciding the financial year (default: today)
+
+    Returns:
+        list: Formatted identifiers in increasing order
+    """
+    if count <= 0:
+        return []
+    period = financial_year(date)
+    start = reserve_block(prefix, period, count)
+    year = _compact_year(period)
+    return [f"{prefix}{year}{value:0{SEQUENCE_DIGITS}d}" for value in range(start, start + count)]
+
+
+def application_number(application_type):
+    """Application number, e.g. GPBIRT25260000001"""
+    return next_number(f"GP{application_type[:4].upper()}")
+
+
+def complaint_number():
+    """Complaint number, e.g. CMP25260000001"""
+    return next_number('CMP')
+
+
+def receipt_number():
+    """Tax receipt number, e.g. RCP25260000001"""
+    return next_number('RCP')
+
+
+def certificate_number(application_type):
+    """Certificate number, e.g. CERTBIRT25260000001"""
+    return next_number(f"CERT{application_type[:4].upper()}")
+
+
+def certificate_numbers(application_type, count):
+    """`count` certificate numbers reserved in one block"""
+    return next_numbers(f"CERT{application_type[:4].upper()}", count)
@@ -0,0 +1,222 @@
+"""
+Keyset (Cursor) Pagination for Large Listings
+
+Offset paging (Paginator) runs a COUNT(*) plus LIMIT/OFFSET, so deep
+pages get slower as the database skips more rows. Keyset paging instead
+remembers the sort key of the last row shown and asks for rows after it:
+
+    WHERE applied_date <= :last_date
+      AND NOT (applied_date = :last_date AND id >= :last_id)
+    ORDER BY applied_date DESC, id DESC
+    LIMIT :per_page + 1
+
+which is an index range scan on (applied_date, id) at any depth. (The
+equivalent "date < x OR (date = x AND id < y)" form defeats the range
+scan on some backends.)
+
+- Cursors are opaque URL-safe tokens: base64 of "direction|timestamp|id"
+- Totals are optional and capped (COUNT over a LIMITed subquery)
+- ?page=N requests (old links) and PAGINATION_MODE = 'offset' keep the
+  classic Paginator
+"""
+
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+DEFAULT_COUNT_LIMIT = 1000
+
+
+class InvalidCursor(ValueError):
+    """Cursor token could not be decoded"""
+
+
+# ============================================
+# CURSOR TOKENS
+# ============================================
+
+def encode_cursor(direction, value, pk):
+    """
+    Opaque cursor for a position in a listing
+
+    Args:
+        direction (str): 'next' (rows after) or 'prev' (rows before)
+        value (datetime): Sort key of the boundary row
+        pk (int): Primary key of the boundary row
+
+    Returns:
+        str: URL-safe token
+    """
+    raw = f"{direction}|{value.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Inverse of encode_cursor()
+
+    Returns:
+        tuple: (direction, value, pk)
+
+    Raises:
+        InvalidCursor: Token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, value, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return direction, datetime.fromisoformat(value), int(pk)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(str(exc))
+
+
+# ============================================
+# CURSOR PAGE
+# ============================================
+
+class CursorPage:
+    """
+    One page of a keyset-paginated listing
+
+    Iterates like a Paginator Page; templates tell the two apart with
+    page_obj.is_cursor and link with next_query / previous_query.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_query=None, previous_query=None,
+                 count=None, count_is_capped=False):
+        self.object_list = object_list
+        self.next_query = next_query
+        self.previous_query = previous_query
+        self.count = count
+        self.count_is_capped = count_is_capped
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_query is not None
+
+    def has_previous(self):
+        return self.previous_query is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def total_display(self):
+        """Total for display, e.g. '250' or '1000+' (empty if not counted)"""
+        if self.count is None:
+            return ''
+        return f"{self.count}+" if self.count_is_capped else str(self.count)
+
+
+def capped_count(queryset, limit):
+    """
+    Row count that stops counting at `limit`
+
+    Returns:
+        tuple: (count: int, capped: bool)
+    """
+    count = queryset.order_by()[:limit + 1].count()
+    return min(count, limit), count > limit
+
+
+def cursor_paginate(request, queryset, per_page, field, count_limit=None):
+    """
+    Keyset-paginate a queryset ordered by (field DESC, id DESC)
+
+    Args:
+        request: Current request (reads ?cursor=, builds links from GET)
+        queryset (QuerySet): Filtered rows
+        per_page (int): Rows per page
+        field (str): Datetime sort field, e.g. 'applied_date'
+        count_limit (int): Cap for the approximate total
+            (default: PAGINATION_COUNT_LIMIT; 0 disables counting)
+
+    Returns:
+        CursorPage: Current page
+    """
+    if count_limit is None:
+        count_limit = getattr(settings, 'PAGINATION_COUNT_LIMIT', DEFAULT_COUNT_LIMIT)
+
+    direction, boundary = 'next', None
+    token = request.GET.get('cursor')
+    if token:
+        try:
+            direction, value, pk = decode_cursor(token)
+            boundary = (value, pk)
+        except InvalidCursor:
+            pass  # Start from the first page
+
+    rows = queryset
+    if boundary and direction == 'next':
+        value, pk = boundary
+        rows = rows.filter(Q(**{f'{field}__lte': value}) & ~Q(**{field: value, 'id__gte': pk}))
+        rows = rows.order_by(f'-{field}', '-id')
+    elif boundary:
+        value, pk = boundary
+        rows = rows.filter(Q(**{f'{field}__gte': value}) & ~Q(**{field: value, 'id__lte': pk}))
+        rows = rows.order_by(field, 'id')
+    else:
+        rows = rows.order_by(f'-{field}', '-id')
+
+    # One extra row tells whether there is another page in this direction
+    object_list = list(rows[:per_page + 1])
+    has_more = len(object_list) > per_page
+    object_list = object_list[:per_page]
+    if direction == 'prev':
+        object_list.reverse()
+
+    has_next = has_more if direction == 'next' else boundary is not None
+    has_previous = boundary is not None if direction == 'next' else has_more
+
+    def link(link_direction, row):
+        query = request.GET.copy()
+        query.pop('page', None)
+        query['cursor'] = encode_cursor(link_direction, getattr(row, field), row.pk)
+        return query.urlencode()
+
+    count, capped = (None, False)
+    if count_limit:
+        count, capped = capped_count(queryset, count_limit)
+
+    return CursorPage(
+        object_list,
+        next_query=link('next', object_list[-1]) if has_next and object_list else None,
+        previous_query=link('prev', object_list[0]) if has_previous and object_list else None,
+        count=count,
+        count_is_capped=capped,
+    )
+
+
+def paginate_listing(request, queryset, per_page, field):
+    """
+    Paginate a listing in the configured mode
+
+    Keyset pagination by default; the classic Paginator when
+    PAGINATION_MODE = 'offset' or the request carries ?page=.
+
+    Args:
+        request: Current request
+        queryset (QuerySet): Filtered rows
+        per_page (int): Rows per page
+        field (str): Datetime sort field (newest first)
+
+    Returns:
+        CursorPage or Page: Current page
+    """
+    mode = getattr(settings, 'PAGINATION_MODE', 'cursor')
+    if mode == 'offset' or 'page' in request.GET:
+        paginator = Paginator(queryset.order_by(f'-{field}', '-id'), per_page)
+        return paginator.get_page(request.GET.get('page'))
+    return cursor_paginate(request, queryset, per_page, field)
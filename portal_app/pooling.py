@@ -0,0 +1,503 @@
+"""
+Database Connection Pooling for Gram Panchayat Portal
+
+Per-process pools of open database connections: a request checks a
+connection out when it first touches the database and hands it back
+when it finishes, instead of opening and closing its own.
+- PostgreSQL uses psycopg_pool (pip install "psycopg[pool]")
+- MySQL uses ConnectionPool below; PyMySQL has no pool of its own
+- One pool per database alias and worker process, shared by its
+  threads; a checkout waits up to `timeout` seconds for a free slot
+- Connections are health-checked on checkout (CONN_HEALTH_CHECKS) and
+  replaced once older than `max_lifetime` or unused for `max_idle`
+  seconds
+- Checkouts, wait time, recycles and lost connections are counted per
+  pool and served with the request metrics at /metrics/
+
+Enabled per database with OPTIONS['pool'] (True or a dict overriding
+DEFAULTS) on the backends in portal_app.backends; settings.DB_POOL
+turns it on (by default for PostgreSQL only; MySQL opts in with
+DB_POOL=True). This is the option Django 5.1's
+own PostgreSQL pooling reads. Pools open lazily, so each worker process
+builds its own after gunicorn forks: forking closes the parent's pools,
+and the child forgets any it inherited without touching their sockets.
+"""
+
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.utils import DEFAULT_DB_ALIAS
+
+
+DEFAULTS = {
+    'min_size': 0,          # Connections kept open however long they idle
+    'max_size': 10,         # Open connections per process, idle or in use
+    'timeout': 30.0,        # Seconds a checkout waits for a free connection
+    'max_lifetime': 3600.0,  # Seconds before a connection is replaced
+    'max_idle': 600.0,      # Seconds unused before a connection is closed
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# Pools and connections a forked child inherited. They stay referenced
+# so their finalizers never run in the child: libpq says goodbye to the
+# server on cleanup, which would end the parent's session on that socket
+_inherited = []
+
+
+class PoolTimeout(OperationalError):
+    """No connection became free within the pool's timeout"""
+
+
+def pool_options(options):
+    """
+    Pool settings from OPTIONS['pool']
+
+    Args:
+        options: True for DEFAULTS, or a dict overriding some of them
+
+    Returns:
+        dict: Complete pool settings
+    """
+    if options is True:
+        return dict(DEFAULTS)
+    unknown = set(options) - set(DEFAULTS)
+    if unknown:
+        raise ImproperlyConfigured(f"Unknown pool options: {', '.join(sorted(unknown))}")
+    return {**DEFAULTS, **options}
+
+
+# ============================================
+# CONNECTION POOL
+# ============================================
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections
+
+    Connections are handed out most-recently-returned first, so a quiet
+    process lets its extra connections go idle and close.
+
+    Args:
+        connect (callable): Opens a new connection
+        check (callable): Raises if a connection is no longer usable;
+            run on every checkout of an idle connection
+        reset (callable): Returns a connection to a clean state; run on
+            every checkin, and the connection is dropped if it raises
+        name (str): Label used in errors and metrics
+        min_size, max_size, timeout, max_lifetime, max_idle: see DEFAULTS
+    """
+
+    def __init__(self, connect, check=None, reset=None, name='', **options):
+        options = pool_options(options)
+        if options['max_size'] < 1 or not 0 <= options['min_size'] <= options['max_size']:
+            raise ImproperlyConfigured('Pool sizes need 0 <= min_size <= max_size and max_size >= 1')
+        self.name = name
+        self.min_size = options['min_size']
+        self.max_size = options['max_size']
+        self.timeout = options['timeout']
+        self.max_lifetime = options['max_lifetime']
+        self.max_idle = options['max_idle']
+        self._connect = connect
+        self._check = check
+        self._reset = reset
+        self._condition = threading.Condition()
+        self._idle = deque()        # (connection, opened at, returned at), newest last
+        self._in_use = {}           # id(connection) -> opened at
+        self._size = 0              # Open connections plus slots being opened
+        self._waiting = 0
+        self._wait_time = 0.0
+        self._stats = Counter()
+        self.closed = False
+
+    def getconn(self):
+        """
+        Check a connection out, opening one if the pool has room
+
+        Returns:
+            A DB-API connection; hand it back with putconn()
+
+        Raises:
+            PoolTimeout: No connection became free within `timeout`
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection, opened, retired = self._take(deadline)
+            for old in retired:
+                _close_quietly(old)
+            if connection is None:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+                opened = time.monotonic()
+                with self._condition:
+                    self._stats['opened'] += 1
+            elif self._check is not None:
+                try:
+                    self._check(connection)
+                except Exception:
+                    _close_quietly(connection)
+                    self._release_slot(lost=True)
+                    continue
+            with self._condition:
+                self._in_use[id(connection)] = opened
+                self._stats['checkouts'] += 1
+            return connection
+
+    def _take(self, deadline):
+        """An idle connection, or (None, None, ...) with a reserved slot"""
+        retired = []
+        waited = False
+        with self._condition:
+            while True:
+                if self.closed:
+                    raise OperationalError(f'Connection pool {self.name!r} is closed')
+                now = time.monotonic()
+                # Least recently returned first: close what idled too long
+                while self._idle and self._size > self.min_size and now - self._idle[0][2] >= self.max_idle:
+                    retired.append(self._retire(self._idle.popleft()[0]))
+                while self._idle:
+                    connection, opened, returned = self._idle.pop()
+                    if now - opened < self.max_lifetime:
+                        return connection, opened, retired
+                    retired.append(self._retire(connection))
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None, retired
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'No connection free in pool {self.name!r} after {self.timeout:g}s '
+                        f'({self.max_size} in use)'
+                    )
+                if not waited:
+                    waited = True
+                    self._stats['waits'] += 1
+                self._waiting += 1
+                started = time.monotonic()
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+                    self._wait_time += time.monotonic() - started
+
+    def _retire(self, connection):
+        self._size -= 1
+        self._stats['recycled'] += 1
+        return connection
+
+    def _release_slot(self, lost=False):
+        with self._condition:
+            self._size -= 1
+            if lost:
+                self._stats['lost'] += 1
+            self._condition.notify()
+
+    def putconn(self, connection):
+        """
+        Hand a checked-out connection back
+
+        It is reset and kept for reuse, or closed if the reset fails,
+        it has outlived max_lifetime or the pool is closed.
+        """
+        with self._condition:
+            opened = self._in_use.pop(id(connection), None)
+        if opened is None:
+            raise ValueError(f'Connection does not belong to pool {self.name!r}')
+
+        healthy = True
+        if self._reset is not None:
+            try:
+                self._reset(connection)
+            except Exception:
+                healthy = False
+
+        now = time.monotonic()
+        with self._condition:
+            if healthy and not self.closed and now - opened < self.max_lifetime:
+                self._idle.append((connection, opened, now))
+                self._condition.notify()
+                return
+            self._size -= 1
+            if not healthy:
+                self._stats['lost'] += 1
+            elif not self.closed:
+                self._stats['recycled'] += 1
+            self._condition.notify()
+        _close_quietly(connection)
+
+    def close(self):
+        """Close idle connections; ones in use close when handed back"""
+        with self._condition:
+            self.closed = True
+            idle = [connection for connection, _opened, _returned in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for connection in idle:
+            _close_quietly(connection)
+
+    def stats(self):
+        """
+        Current gauges and cumulative counters
+
+        Returns:
+            dict: max_size, size, idle, in_use, waiting (gauges) and
+                checkouts, waits, wait_ms, timeouts, opened, recycled,
+                lost (totals since the pool was created)
+        """
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'waiting': self._waiting,
+                'checkouts': self._stats['checkouts'],
+                'waits': self._stats['waits'],
+                'wait_ms': round(self._wait_time * 1000, 3),
+                'timeouts': self._stats['timeouts'],
+                'opened': self._stats['opened'],
+                'recycled': self._stats['recycled'],
+                'lost': self._stats['lost'],
+            }
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def psycopg_pool_stats(pool):
+    """
+    psycopg_pool.ConnectionPool.get_stats() in ConnectionPool.stats() terms
+
+    psycopg_pool does not count recycles; they are derived as connections
+    opened and since closed, less those lost.
+    """
+    raw = pool.get_stats()
+    size = raw.get('pool_size', 0)
+    idle = raw.get('pool_available', 0)
+    opened = raw.get('connections_num', 0) - raw.get('connections_errors', 0)
+    lost = raw.get('connections_lost', 0) + raw.get('returns_bad', 0)
+    return {
+        'max_size': raw.get('pool_max', pool.max_size),
+        'size': size,
+        'idle': idle,
+        'in_use': size - idle,
+        'waiting': raw.get('requests_waiting', 0),
+        'checkouts': raw.get('requests_num', 0),
+        'waits': raw.get('requests_queued', 0),
+        'wait_ms': raw.get('requests_wait_ms', 0),
+        'timeouts': raw.get('requests_errors', 0),
+        'opened': opened,
+        'recycled': max(opened - size - lost, 0),
+        'lost': lost,
+    }
+
+
+# ============================================
+# PER-PROCESS REGISTRY
+# ============================================
+
+def get_pool(key, create):
+    """
+    The pool registered under `key`, created on first use
+
+    Args:
+        key (tuple): (alias, database identity); a new identity (e.g. the
+            test database replacing the real one) closes the old pool
+        create (callable): Builds the pool
+
+    Returns:
+        The pool object
+    """
+    alias = key[0]
+    with _pools_lock:
+        current = _pools.get(alias)
+        if current is not None and current[0] == key:
+            return current[1]
+        pool = create()
+        _pools[alias] = (key, pool)
+    if current is not None:
+        current[1].close()
+    return pool
+
+
+def close_pool(alias=DEFAULT_DB_ALIAS):
+    """Close and forget the pool of one database alias"""
+    with _pools_lock:
+        entry = _pools.pop(alias, None)
+    if entry is not None:
+        entry[1].close()
+
+
+def close_pools():
+    """
+    Close and forget every pool of this process
+
+    Idle connections close now, ones in use when handed back; the next
+    checkout builds a new pool. Runs before os.fork() so children do not
+    inherit the parent's open sockets.
+    """
+    global _pools
+    with _pools_lock:
+        entries, _pools = list(_pools.values()), {}
+    for _key, pool in entries:
+        pool.close()
+
+
+def _forget_pools():
+    """After os.fork(), in the child: drop inherited pools without closing them"""
+    global _pools, _pools_lock
+    # Another thread of the parent may have held the lock while forking
+    _pools_lock = threading.Lock()
+    _inherited.extend(pool for _key, pool in _pools.values())
+    _pools = {}
+
+
+os.register_at_fork(before=close_pools, after_in_child=_forget_pools)
+
+
+def pool_stats():
+    """
+    Statistics of every pool in this process
+
+    Returns:
+        dict: {alias: ConnectionPool.stats()-style dict}
+    """
+    with _pools_lock:
+        pools = {alias: pool for alias, (_key, pool) in _pools.items()}
+    return {
+        alias: pool.stats() if isinstance(pool, ConnectionPool) else psycopg_pool_stats(pool)
+        for alias, pool in sorted(pools.items())
+    }
+
+
+# (metric name, type, help text, stats key, scale)
+METRICS = [
+    ('portal_db_pool_max_connections', 'gauge', 'Pool size limit', 'max_size', 1),
+    ('portal_db_pool_idle_connections', 'gauge', 'Open connections waiting for a checkout', 'idle', 1),
+    ('portal_db_pool_in_use_connections', 'gauge', 'Connections checked out', 'in_use', 1),
+    ('portal_db_pool_waiting_requests', 'gauge', 'Checkouts waiting for a free connection', 'waiting', 1),
+    ('portal_db_pool_checkouts_total', 'counter', 'Connections handed out', 'checkouts', 1),
+    ('portal_db_pool_waits_total', 'counter', 'Checkouts that had to wait', 'waits', 1),
+    ('portal_db_pool_wait_seconds_total', 'counter', 'Time checkouts spent waiting', 'wait_ms', 0.001),
+    ('portal_db_pool_timeouts_total', 'counter', 'Checkouts that gave up waiting', 'timeouts', 1),
+    ('portal_db_pool_opened_total', 'counter', 'Connections opened', 'opened', 1),
+    ('portal_db_pool_recycled_total', 'counter', 'Connections closed for age or idleness', 'recycled', 1),
+    ('portal_db_pool_lost_total', 'counter', 'Connections dropped as broken', 'lost', 1),
+]
+
+
+def render_prometheus():
+    """
+    Pool statistics of this process in the Prometheus text format
+
+    Returns:
+        str: One series per pool for each of METRICS ('' without pools)
+    """
+    stats = pool_stats()
+    if not stats:
+        return ''
+    lines = []
+    for name, kind, help_text, key, scale in METRICS:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for alias, values in stats.items():
+            lines.append(f'{name}{{alias="{alias}"}} {values[key] * scale:g}')
+    return '\n'.join(lines) + '\n'
+
+
+# ============================================
+# DATABASE BACKEND SUPPORT
+# ============================================
+
+class PooledDatabaseWrapperMixin:
+    """
+    DatabaseWrapper mixin taking connections from the alias's pool
+
+    Without OPTIONS['pool'] the backend behaves exactly like Django's.
+    Backends implement create_pool(conn_params, options); the pool
+    needs getconn(), putconn() and close().
+    """
+
+    def pool_settings(self):
+        """Pool settings for this database, or None when not pooled"""
+        options = self.settings_dict['OPTIONS'].get('pool')
+        # Django's short-lived connection to the server's default database
+        if not options or self.alias == NO_DB_ALIAS:
+            return None
+        if self.settings_dict['CONN_MAX_AGE']:
+            raise ImproperlyConfigured(
+                f"Database '{self.alias}' is pooled; set CONN_MAX_AGE to 0, the pool "
+                f"decides how long connections live"
+            )
+        return pool_options(options)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Django passes unknown OPTIONS on to the driver
+        params.pop('pool', None)
+        return params
+
+    def get_pool(self, conn_params):
+        """This alias's pool, or None when not pooled"""
+        options = self.pool_settings()
+        if options is None:
+            return None
+        settings_dict = self.settings_dict
+        key = (
+            self.alias,
+            settings_dict['NAME'], settings_dict['USER'], settings_dict['HOST'], settings_dict['PORT'],
+        )
+        return get_pool(key, lambda: self.create_pool(conn_params, options))
+
+    def create_pool(self, conn_params, options):
+        raise NotImplementedError('Pooled backends must implement create_pool()')
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        if pool is None:
+            self._pool = None
+            return super().get_new_connection(conn_params)
+        return self.checkout(pool)
+
+    def checkout(self, pool):
+        """A connection from `pool`, remembered for _close()"""
+        connection = pool.getconn()
+        self._pool, self._pool_pid = pool, os.getpid()
+        return connection
+
+    def _close(self):
+        pool = getattr(self, '_pool', None)
+        if self.connection is None or pool is None:
+            return super()._close()
+        connection, self.connection, self._pool = self.connection, None, None
+        if self._pool_pid != os.getpid():
+            # Checked out by the parent before forking; its socket is not ours
+            _inherited.append(connection)
+            return
+        with self.wrap_database_errors:
+            pool.putconn(connection)
+
+
+class PooledDatabaseCreationMixin:
+    """DatabaseCreation mixin closing the pool before a test database is dropped"""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the database in use
+        close_pool(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
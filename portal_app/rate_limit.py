@@ -0,0 +1,296 @@
+"""
+Sliding-Window Rate Limiter for Gram Panchayat Portal
+
+Shared, atomic request limiting for login and OTP endpoints:
+- Sliding-window counter (current + weighted previous window)
+- Atomic increments only, no read-modify-write races
+- Pluggable backends: Django cache, file, database table, Redis
+
+Configure in settings.py:
+    RATE_LIMIT_BACKEND = 'portal_app.rate_limit.DatabaseBackend'
+    RATE_LIMIT_OPTIONS = {}
+"""
+
+import hashlib
+import os
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# ============================================
+# BACKENDS
+# ============================================
+
+class BaseBackend:
+    """
+    Storage for windowed counters
+
+    Subclasses implement an atomic incr() and a get().
+    """
+
+    def incr(self, key, ttl):
+        """
+        Atomically add one to a counter
+
+        Args:
+            key (str): Counter key
+            ttl (int): Seconds until the counter may be discarded
+
+        Returns:
+            int: Counter value after the increment
+        """
+        raise NotImplementedError
+
+    def get(self, key):
+        """Current value of a counter (0 if missing or expired)"""
+        raise NotImplementedError
+
+
+class CacheBackend(BaseBackend):
+    """
+    Counters in a Django cache using add() + incr()
+
+    Atomic on LocMemCache (per process), Memcached, Redis and the
+    database cache. Use a shared cache in production, otherwise each
+    gunicorn worker enforces its own limit.
+    """
+
+    def __init__(self, cache_alias='default'):
+        from django.core.cache import caches
+        self.cache = caches[cache_alias]
+
+    def incr(self, key, ttl):
+        if self.cache.add(key, 1, ttl):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.add(key, 1, ttl)
+            return 1
+
+    def get(self, key):
+        return self.cache.get(key, 0)
+
+
+class DatabaseBackend(BaseBackend):
+    """
+    Counters in the RateLimitCounter table using UPDATE ... SET count = count + 1
+
+    Shared by all workers without extra infrastructure. Expired rows
+    are purged opportunistically when new windows start.
+    """
+
+    def __init__(self, purge_probability=0.01):
+        self.purge_probability = purge_probability
+
+    def _live(self, key):
+        from .models import RateLimitCounter
+        return RateLimitCounter.objects.filter(key=key, expires_at__gt=timezone.now())
+
+    def incr(self, key, ttl):
+        from .models import RateLimitCounter
+
+        for _ in range(3):
+            with transaction.atomic():
+                if self._live(key).update(count=F('count') + 1):
+                    return self._live(key).values_list('count', flat=True).first() or 1
+                if random.random() < self.purge_probability:
+                    self.purge_expired()
+                try:
+                    with transaction.atomic():
+                        # Only an expired row may be replaced: a live one was
+                        # committed by another worker since the update above
+                        RateLimitCounter.objects.filter(key=key, expires_at__lte=timezone.now()).delete()
+                        RateLimitCounter.objects.create(
+                            key=key,
+                            count=1,
+                            expires_at=timezone.now() + timedelta(seconds=ttl),
+                        )
+                    return 1
+                except IntegrityError:
+                    # Another worker created the row first; increment it
+                    continue
+        return self.get(key)
+
+    def get(self, key):
+        return self._live(key).values_list('count', flat=True).first() or 0
+
+    @staticmethod
+    def purge_expired():
+        """Delete expired counter rows; returns number deleted"""
+        from .models import RateLimitCounter
+        deleted, _ = RateLimitCounter.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+
+class FileBackend(BaseBackend):
+    """
+    Counters in small files guarded by OS file locks
+
+    Shared by all worker processes on one machine. Each file holds
+    "<count> <expiry timestamp>".
+    """
+
+    def __init__(self, directory=None):
+        self.directory = str(directory or os.path.join(settings.BASE_DIR, '.ratelimit'))
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    @staticmethod
+    def _lock(handle):
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+
+    @staticmethod
+    def _unlock(handle):
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def _parse(content, now):
+        """(count, expiry) from file content; (0, None) if missing or expired"""
+        try:
+            count, expires = content.split()
+            if float(expires) > now:
+                return int(count), float(expires)
+        except ValueError:
+            pass
+        return 0, None
+
+    def incr(self, key, ttl):
+        now = time.time()
+        with open(self._path(key), 'a+') as handle:
+            self._lock(handle)
+            try:
+                handle.seek(0)
+                count, expires = self._parse(handle.read(), now)
+                count += 1
+                handle.seek(0)
+                handle.truncate()
+                handle.write(f"{count} {expires or now + ttl}")
+                handle.flush()
+                return count
+            finally:
+                self._unlock(handle)
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as handle:
+                return self._parse(handle.read(), time.time())[0]
+        except FileNotFoundError:
+            return 0
+
+
+class RedisBackend(BaseBackend):
+    """
+    Counters in Redis (or any Redis-protocol server) via SET NX + INCR
+
+    Requires the optional `redis` package.
+    """
+
+    def __init__(self, url=None):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured(
+                'RedisBackend requires the redis package: pip install redis'
+            )
+        url = url or getattr(settings, 'REDIS_URL', '') or 'redis://localhost:6379/0'
+        self.client = redis.Redis.from_url(url)
+
+    def incr(self, key, ttl):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(key, 0, ex=ttl, nx=True)
+        pipe.incr(key)
+        return int(pipe.execute()[1])
+
+    def get(self, key):
+        return int(self.client.get(key) or 0)
+
+
+# ============================================
+# SLIDING WINDOW LIMITER
+# ============================================
+
+class RateLimiter:
+    """
+    Sliding-window counter limiter
+
+    Counts hits in fixed windows of `period` seconds and estimates the
+    rolling count as current + previous * (unelapsed fraction of the
+    current window). Every hit is counted, including rejected ones.
+    """
+
+    def __init__(self, backend=None, prefix='rl', clock=time.time):
+        self.backend = backend or get_backend()
+        self.prefix = prefix
+        self.clock = clock
+
+    def hit(self, identifier, limit, period):
+        """
+        Record one request and decide whether it is allowed
+
+        Args:
+            identifier (str): Who is being limited (e.g. 'login:user:ip')
+            limit (int): Maximum requests per rolling period
+            period (int): Window length in seconds
+
+        Returns:
+            bool: True if under the limit
+        """
+        now = self.clock()
+        window = int(now // period)
+        # Identifiers carry user input (login names); hashing keeps keys
+        # short and safe for RateLimitCounter.key and cache key rules
+        digest = hashlib.sha1(identifier.encode()).hexdigest()
+        current_key = f"{self.prefix}:{digest}:{period}:{window}"
+        previous_key = f"{self.prefix}:{digest}:{period}:{window - 1}"
+
+        current = self.backend.incr(current_key, ttl=period * 2)
+        if current > limit:
+            return False
+
+        elapsed = (now % period) / period
+        previous = self.backend.get(previous_key)
+        return previous * (1 - elapsed) + current <= limit
+
+
+_backend = None
+
+
+def get_backend():
+    """
+    Backend configured by RATE_LIMIT_BACKEND / RATE_LIMIT_OPTIONS
+
+    Returns:
+        BaseBackend: Shared backend instance
+    """
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'RATE_LIMIT_BACKEND', 'portal_app.rate_limit.DatabaseBackend')
+        options = getattr(settings, 'RATE_LIMIT_OPTIONS', {})
+        _backend = import_string(path)(**options)
+    return _backend
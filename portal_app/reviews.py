@@ -0,0 +1,182 @@
+"""
+Application Review for Digital Gram Panchayat Portal
+
+review_application() records a single review from the review page;
+bulk_review() approves or rejects many applications in one transaction,
+for staff clearing a backlog:
+- Status, reviewer and review date saved with one UPDATE per batch
+- Status history rows written with one bulk_create
+- Certificate numbers reserved as one block per certificate type
+- Statistic counters adjusted once per distinct counter
+
+bulk_update() bypasses model signals, so the side effects of a save
+(tracking cache, search index, certificate render cache) are applied
+here explicitly.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import certificates, counters, numbering, search, tracking
+from .models import Application, ApplicationStatusHistory
+
+
+BULK_STATUSES = ['approved', 'rejected', 'under_review']
+BATCH_SIZE = 500
+
+
+def review_application(application, old_status, old_reviewed_date, reviewer):
+    """
+    Save one reviewed application whose status changed
+
+    Saves the application, moves its counters, records the status
+    history and issues the certificate number on approval, in one
+    transaction.
+
+    Args:
+        application: Application (details loaded) holding the new status,
+            reviewer, review date and remarks
+        old_status (str): Status before the review
+        old_reviewed_date (datetime): reviewed_date before the review
+        reviewer: Staff user performing the review
+    """
+    with transaction.atomic():
+        application.save()
+        counters.record_application_status_change(application, old_status, old_reviewed_date)
+        ApplicationStatusHistory.objects.create(
+            application=application,
+            old_status=old_status,
+            new_status=application.status,
+            changed_by=reviewer,
+            remarks=application.admin_remarks,
+        )
+
+        detail = application.get_detail()
+        if application.status == 'approved' and detail is not None:
+            if hasattr(detail, 'certificate_number') and not detail.certificate_number:
+                detail.certificate_number = numbering.certificate_number(application.application_type)
+                detail.issued_date = timezone.now().date()
+                # Set validity for income certificate (1 year)
+                if hasattr(detail, 'valid_until'):
+                    detail.valid_until = timezone.now().date() + timedelta(days=365)
+                detail.save()
+
+
+def _issue_certificates(applications, issued_date):
+    """
+    Give approved applications' certificate rows a number and issue date
+
+    Args:
+        applications (list): Approved applications with details loaded
+        issued_date (date): Issue date to record
+
+    Returns:
+        int: Number of certificates issued
+    """
+    pending = defaultdict(list)
+    for application in applications:
+        detail = application.get_detail()
+        if detail is not None and hasattr(detail, 'certificate_number') and not detail.certificate_number:
+            pending[application.application_type].append(detail)
+
+    issued = 0
+    for application_type, details in pending.items():
+        model = type(details[0])
+        fields = ['certificate_number', 'issued_date']
+        if hasattr(details[0], 'valid_until'):
+            fields.append('valid_until')
+        numbers = numbering.certificate_numbers(application_type, len(details))
+        for detail, number in zip(details, numbers):
+            detail.certificate_number = number
+            detail.issued_date = issued_date
+            if 'valid_until' in fields:
+                # Income certificates are valid for one year
+                detail.valid_until = issued_date + timedelta(days=365)
+        model.objects.bulk_update(details, fields, batch_size=BATCH_SIZE)
+        issued += len(details)
+    return issued
+
+
+def bulk_review(application_ids, status, reviewer, remarks=''):
+    """
+    Move several applications to a new review status at once
+
+    Applications already in the target status are left untouched.
+
+    Args:
+        application_ids (list): Applications to review
+        status (str): 'approved', 'rejected' or 'under_review'
+        reviewer: Staff user performing the review
+        remarks (str): Admin remarks saved on every application (optional;
+            existing remarks are kept when empty)
+
+    Returns:
+        dict: {'updated': int, 'unchanged': int, 'certificates': int}
+
+    Raises:
+        ValueError: Unsupported status
+    """
+    if status not in BULK_STATUSES:
+        raise ValueError(f"Unsupported bulk review status: {status}")
+
+    now = timezone.now()
+    with transaction.atomic():
+        applications = list(
+            Application.objects.with_details()
+            .select_for_update(of=('self',))
+            .filter(pk__in=list(application_ids))
+            .order_by('pk')
+        )
+        changes = []
+        for application in applications:
+            if application.status == status:
+                continue
+            changes.append((application, application.status, application.reviewed_date))
+            application.status = status
+            application.reviewed_by = reviewer
+            application.reviewed_date = now
+            if remarks:
+                application.admin_remarks = remarks
+
+        changed = [application for application, _old, _date in changes]
+        if changed:
+            # Every row gets the same values, so one UPDATE ... WHERE id IN
+            # does what bulk_update() would, without its per-row CASE
+            values = {'status': status, 'reviewed_by': reviewer, 'reviewed_date': now}
+            if remarks:
+                values['admin_remarks'] = remarks
+            changed_ids = [application.pk for application in changed]
+            for start in range(0, len(changed_ids), BATCH_SIZE):
+                Application.objects.filter(pk__in=changed_ids[start:start + BATCH_SIZE]).update(**values)
+            ApplicationStatusHistory.objects.bulk_create([
+                ApplicationStatusHistory(
+                    application=application,
+                    old_status=old_status,
+                    new_status=status,
+                    changed_by=reviewer,
+                    remarks=application.admin_remarks,
+                )
+                for application, old_status, _old_date in changes
+            ], batch_size=BATCH_SIZE)
+            counters.record_application_status_changes(changes)
+
+        issued = 0
+        if status == 'approved' and changed:
+            issued = _issue_certificates(changed, timezone.localdate(now))
+            # Certificate numbers are part of the indexed text
+            search.index_objects(changed)
+
+        # What the skipped post_save signals would have done
+        tracking.invalidate_many([application.application_number for application in changed])
+        for application, old_status, _old_date in changes:
+            if old_status == 'approved':
+                certificates.invalidate(application.pk)
+
+    return {
+        'updated': len(changed),
+        'unchanged': len(applications) - len(changed),
+        'certificates': issued,
+    }
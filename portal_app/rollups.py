@@ -0,0 +1,486 @@
+"""
+Daily Rollups for Dashboard Trend Charts
+
+Keeps per-day aggregates in DailyRollup so trend charts read a few
+hundred small rows instead of scanning Application, Complaint and
+TaxPayment:
+- One row per metric, day, type and village (see DailyRollup)
+- Updated incrementally in the transaction of the write they describe,
+  from the portal_app.counters event hooks and, for tax payments, a
+  save signal (payments change in the Django admin)
+- Recomputed for recent days every night by
+  `python manage.py rebuild_rollups`, which also repairs writes that
+  bypass the hooks (bulk loads, raw SQL)
+- time_series() buckets the rows per day, week or month for a date
+  range, optionally split per type or village, cached for
+  ROLLUP_CACHE_TIMEOUT seconds
+
+Days are local calendar days (TIME_ZONE), like the statistic counters.
+Archiving deletes the live rows without uncounting them; archived
+records keep counting. Deletes in the Django admin are uncounted.
+"""
+
+import hashlib
+from collections import Counter
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import (
+    Application, ArchivedApplication, ArchivedComplaint, Complaint, DailyRollup, TaxPayment
+)
+
+
+METRICS = [value for value, _label in DailyRollup.METRIC_CHOICES]
+BUCKETS = ('day', 'week', 'month')
+SPLITS = {'type': 'kind', 'village': 'village'}
+MAX_BUCKETS = 400
+CACHE_PREFIX = 'rollups'
+
+# Default range per bucket when no start date is given
+DEFAULT_SPAN = {'day': 30, 'week': 12, 'month': 12}
+
+KIND_CHOICES = {
+    'submitted': Application.APPLICATION_TYPES,
+    'approved': Application.APPLICATION_TYPES,
+    'complaints': Complaint.CATEGORY_CHOICES,
+    'collections': TaxPayment.TAX_TYPE_CHOICES,
+}
+
+
+def _day(value):
+    """Local calendar date of a datetime"""
+    return timezone.localdate(value)
+
+
+# ============================================
+# LOW-LEVEL UPDATES
+# ============================================
+
+def add(metric, day, kind, village, count=1, amount=0):
+    """
+    Atomically add to a rollup row, creating it if missing
+
+    Args:
+        metric (str): One of METRICS
+        day (date): Local day of the event
+        kind (str): Application type, complaint category or tax type
+        village (str): Village of the citizen concerned
+        count (int): Events to add (may be negative)
+        amount: Amount to add (collections)
+    """
+    rows = DailyRollup.objects.filter(metric=metric, day=day, kind=kind, village=village)
+    if rows.update(count=F('count') + count, amount=F('amount') + amount):
+        return
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(
+                metric=metric, day=day, kind=kind, village=village, count=count, amount=amount
+            )
+    except IntegrityError:
+        # Created concurrently by another request
+        rows.update(count=F('count') + count, amount=F('amount') + amount)
+
+
+def add_many(deltas):
+    """
+    Apply several rollup deltas, one update per distinct row
+
+    Args:
+        deltas (dict): {(metric, day, kind, village): count}; zero
+            deltas are skipped
+    """
+    for (metric, day, kind, village), count in sorted(deltas.items()):
+        if count:
+            add(metric, day, kind, village, count)
+
+
+# ============================================
+# EVENT HOOKS
+# ============================================
+
+def record_application_created(application):
+    """Count a newly submitted application"""
+    add('submitted', _day(application.applied_date), application.application_type, application.applicant.village)
+    add_many(approval_deltas(application, 'pending', None))
+
+
+def record_application_deleted(application):
+    """Uncount a deleted application, its approval and its tax payment"""
+    kind, village = application.application_type, application.applicant.village
+    deltas = Counter({('submitted', _day(application.applied_date), kind, village): -1})
+    deltas.subtract(approval_deltas(application, 'pending', None))
+    add_many(deltas)
+    payment = TaxPayment.objects.filter(
+        application_id=application.pk, payment_status='paid', payment_date__isnull=False
+    ).values_list('payment_date', 'tax_type', 'total_amount').first()
+    if payment:
+        paid_on, tax_type, amount = payment
+        add('collections', _day(paid_on), tax_type, village, -1, -amount)
+
+
+def approval_deltas(application, old_status, old_reviewed_date):
+    """
+    Rollup changes of one application status change
+
+    Args:
+        application: Application (applicant loaded) holding the new
+            status and review date
+        old_status (str): Status before the change
+        old_reviewed_date (datetime): reviewed_date before the change
+
+    Returns:
+        Counter: {(metric, day, kind, village): count}
+    """
+    deltas = Counter()
+    if old_status == application.status:
+        return deltas
+    kind, village = application.application_type, application.applicant.village
+    if old_status == 'approved' and old_reviewed_date:
+        deltas['approved', _day(old_reviewed_date), kind, village] -= 1
+    if application.status == 'approved' and application.reviewed_date:
+        deltas['approved', _day(application.reviewed_date), kind, village] += 1
+    return deltas
+
+
+def record_application_status_changes(changes):
+    """
+    Count approvals (and approvals withdrawn) of reviewed applications
+
+    Args:
+        changes (list): (application holding the new status, old_status,
+            old_reviewed_date) tuples
+    """
+    deltas = Counter()
+    for change in changes:
+        deltas.update(approval_deltas(*change))
+    add_many(deltas)
+
+
+def record_complaint_created(complaint):
+    """Count a newly filed complaint"""
+    add('complaints', _day(complaint.filed_date), complaint.category, complaint.complainant.village)
+
+
+def record_complaint_deleted(complaint):
+    """Uncount a deleted complaint"""
+    add('complaints', _day(complaint.filed_date), complaint.category, complaint.complainant.village, -1)
+
+
+def record_tax_payment_change(payment, old):
+    """
+    Move a tax payment's amount between collection days
+
+    Args:
+        payment: TaxPayment as saved
+        old (tuple): (payment_status, payment_date, total_amount) before
+            the save, or None for a new payment
+    """
+    def collected(status, paid_on, amount):
+        return (_day(paid_on), amount) if status == 'paid' and paid_on else None
+
+    before = collected(*old) if old else None
+    after = collected(payment.payment_status, payment.payment_date, payment.total_amount)
+    if before == after:
+        return
+    village = Application.objects.filter(pk=payment.application_id).values_list(
+        'applicant__village', flat=True
+    ).first() or ''
+    if before:
+        add('collections', before[0], payment.tax_type, village, -1, -before[1])
+    if after:
+        add('collections', after[0], payment.tax_type, village, 1, after[1])
+
+
+# ============================================
+# REBUILD / RECONCILE
+# ============================================
+
+def _midnight(day):
+    """Start of a local day as an aware datetime"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _in_range(queryset, field, start, end):
+    # Compare the raw column (not its __date) so indexes can be used
+    if start:
+        queryset = queryset.filter(**{f'{field}__gte': _midnight(start)})
+    if end:
+        queryset = queryset.filter(**{f'{field}__lt': _midnight(end + timedelta(days=1))})
+    return queryset
+
+
+def _models(apps=None):
+    """Source and rollup models, from a migration's registry when given"""
+    names = ['Application', 'ArchivedApplication', 'Complaint', 'ArchivedComplaint', 'TaxPayment', 'DailyRollup']
+    if apps is None:
+        return SimpleNamespace(
+            Application=Application, ArchivedApplication=ArchivedApplication, Complaint=Complaint,
+            ArchivedComplaint=ArchivedComplaint, TaxPayment=TaxPayment, DailyRollup=DailyRollup,
+        )
+    return SimpleNamespace(**{name: apps.get_model('portal_app', name) for name in names})
+
+
+def compute_rollups(start=None, end=None, apps=None):
+    """
+    Recompute rollups from the live and archive tables with GROUP BY
+    queries
+
+    Args:
+        start (date): First day to compute (default: all history)
+        end (date): Last day to compute (default: all future)
+        apps: App registry to read the tables through (a migration's
+            historical models; default: the current models)
+
+    Returns:
+        dict: {(metric, day, kind, village): (count, amount)}
+    """
+    models = _models(apps)
+    expected = {}
+
+    def add_row(key, count, amount=0):
+        if count:
+            old_count, old_amount = expected.get(key, (0, 0))
+            expected[key] = (old_count + count, old_amount + amount)
+
+    def grouped(metric, queryset, field, kind, village):
+        rows = _in_range(queryset, field, start, end).annotate(day=TruncDate(field)).values(
+            'day', kind, village
+        ).annotate(n=Count('id')).order_by()
+        for row in rows:
+            add_row((metric, row['day'], row[kind], row[village]), row['n'])
+
+    for applications in (models.Application.objects.all(), models.ArchivedApplication.objects.all()):
+        grouped('submitted', applications, 'applied_date', 'application_type', 'applicant__village')
+        grouped(
+            'approved', applications.filter(status='approved', reviewed_date__isnull=False),
+            'reviewed_date', 'application_type', 'applicant__village',
+        )
+    for complaints in (models.Complaint.objects.all(), models.ArchivedComplaint.objects.all()):
+        grouped('complaints', complaints, 'filed_date', 'category', 'complainant__village')
+
+    payments = _in_range(
+        models.TaxPayment.objects.filter(payment_status='paid', payment_date__isnull=False),
+        'payment_date', start, end,
+    )
+    for row in payments.annotate(day=TruncDate('payment_date')).values(
+        'day', 'tax_type', 'application__applicant__village'
+    ).annotate(n=Count('id'), total=Sum('total_amount')).order_by():
+        add_row(
+            ('collections', row['day'], row['tax_type'], row['application__applicant__village']),
+            row['n'], row['total'],
+        )
+
+    # Archived tax payments keep their fields in the detail JSON
+    archived = models.ArchivedApplication.objects.filter(detail__payment_status='paid')
+    if end:
+        # Nothing is paid before it is applied for
+        archived = _in_range(archived, 'applied_date', None, end)
+    for detail, village in archived.values_list('detail', 'applicant__village').iterator():
+        paid_on = parse_datetime(detail.get('payment_date') or '')
+        if paid_on is None:
+            continue
+        day = _day(paid_on)
+        if (start and day < start) or (end and day > end):
+            continue
+        add_row(('collections', day, detail['tax_type'], village), 1, Decimal(str(detail['total_amount'])))
+
+    return expected
+
+
+def _stored(start=None, end=None, apps=None):
+    rows = _models(apps).DailyRollup.objects.all()
+    if start:
+        rows = rows.filter(day__gte=start)
+    if end:
+        rows = rows.filter(day__lte=end)
+    return rows
+
+
+def find_drift(start=None, end=None):
+    """
+    Compare stored rollups with freshly computed values
+
+    Returns:
+        dict: {(metric, day, kind, village): (stored, expected)} for
+            every mismatch, each a (count, amount) tuple
+    """
+    expected = compute_rollups(start, end)
+    stored = {
+        (row.metric, row.day, row.kind, row.village): (row.count, row.amount)
+        for row in _stored(start, end)
+        if row.count or row.amount
+    }
+    return {
+        key: (stored.get(key, (0, 0)), expected.get(key, (0, 0)))
+        for key in set(stored) | set(expected)
+        if stored.get(key, (0, 0)) != expected.get(key, (0, 0))
+    }
+
+
+def rebuild_rollups(start=None, end=None, apps=None):
+    """
+    Replace stored rollups for a day range with recomputed values
+
+    Args:
+        start (date): First day to rebuild (default: all history)
+        end (date): Last day to rebuild (default: all future)
+        apps: App registry to read and write through (see
+            compute_rollups); migrations pass theirs to seed the rollups
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    rollup = _models(apps).DailyRollup
+    with transaction.atomic():
+        expected = compute_rollups(start, end, apps)
+        _stored(start, end, apps).delete()
+        rollup.objects.bulk_create(
+            [
+                rollup(metric=metric, day=day, kind=kind, village=village, count=count, amount=amount)
+                for (metric, day, kind, village), (count, amount) in expected.items()
+            ],
+            batch_size=1000,
+        )
+    return len(expected)
+
+
+# ============================================
+# TIME SERIES
+# ============================================
+
+def bucket_start(day, bucket):
+    """First day of the bucket holding `day` (weeks start on Monday)"""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, bucket):
+    """First day of the bucket after the one starting on `day`"""
+    if bucket == 'week':
+        return day + timedelta(days=7)
+    if bucket == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def _date(value, name):
+    if not value:
+        return None
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD)')
+    return day
+
+
+def time_series(metric, bucket='day', start=None, end=None, kind=None, village=None, split=None):
+    """
+    Rollup totals per bucket, for trend charts
+
+    Args:
+        metric (str): One of METRICS
+        bucket (str): 'day', 'week' or 'month'
+        start (str): First day, YYYY-MM-DD (default: DEFAULT_SPAN
+            buckets before `end`)
+        end (str): Last day, YYYY-MM-DD (default: today)
+        kind (str): Only this application type, category or tax type
+        village (str): Only this village
+        split (str): One series per 'type' or per 'village' instead of
+            a single total
+
+    Returns:
+        dict: {'metric', 'bucket', 'start', 'end', 'labels' (bucket start
+               dates), 'series': [{'key', 'label', 'counts', 'amounts'}]}
+
+    Raises:
+        ValueError: Unknown metric, bucket or split, bad dates, or more
+            than MAX_BUCKETS buckets
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+    if split and split not in SPLITS:
+        raise ValueError(f"split must be one of {', '.join(SPLITS)}")
+    end = _date(end, 'end') or timezone.localdate()
+    start = _date(start, 'start')
+    if start is None:
+        start = bucket_start(end, bucket)
+        for _ in range(DEFAULT_SPAN[bucket] - 1):
+            start = bucket_start(start - timedelta(days=1), bucket)
+    start = bucket_start(start, bucket)
+    if start > end:
+        raise ValueError('start must not be after end')
+
+    labels = []
+    day = start
+    while day <= end:
+        labels.append(day)
+        if len(labels) > MAX_BUCKETS:
+            raise ValueError(f'At most {MAX_BUCKETS} buckets per request; use a wider bucket or a shorter range')
+        day = next_bucket(day, bucket)
+
+    params = f'{metric}|{bucket}|{start}|{end}|{kind or ""}|{village or ""}|{split or ""}'
+    key = f"{CACHE_PREFIX}:{hashlib.md5(params.encode('utf-8')).hexdigest()}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    rows = DailyRollup.objects.filter(metric=metric, day__gte=start, day__lte=end)
+    if kind:
+        rows = rows.filter(kind=kind)
+    if village:
+        rows = rows.filter(village=village)
+    truncate = {'day': F('day'), 'week': TruncWeek('day'), 'month': TruncMonth('day')}[bucket]
+    group = [SPLITS[split]] if split else []
+    rows = rows.annotate(bucket=truncate).values('bucket', *group).annotate(
+        n=Sum('count'), total=Sum('amount')
+    ).order_by()
+
+    position = {label: index for index, label in enumerate(labels)}
+    series = {}
+    for row in rows:
+        name = row[group[0]] if group else 'total'
+        counts, amounts = series.setdefault(name, ([0] * len(labels), [0.0] * len(labels)))
+        index = position[row['bucket']]
+        counts[index] += row['n']
+        amounts[index] += float(row['total'] or 0)
+
+    kind_labels = dict(KIND_CHOICES[metric])
+    data = {
+        'metric': metric,
+        'bucket': bucket,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'labels': [label.isoformat() for label in labels],
+        'series': [
+            {
+                'key': name,
+                'label': kind_labels.get(name, name) if split == 'type' else ('Total' if name == 'total' else name),
+                'counts': counts,
+                'amounts': [round(amount, 2) for amount in amounts] if metric == 'collections' else None,
+            }
+            for name, (counts, amounts) in sorted(series.items())
+        ],
+    }
+    if not data['series']:
+        data['series'] = [{
+            'key': 'total', 'label': 'Total', 'counts': [0] * len(labels),
+            'amounts': [0.0] * len(labels) if metric == 'collections' else None,
+        }]
+    cache.set(key, data, settings.ROLLUP_CACHE_TIMEOUT)
+    return data
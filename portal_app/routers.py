@@ -0,0 +1,128 @@
+"""
+Read-Replica Routing for Gram Panchayat Portal
+
+Reporting reads go to read-only replicas (REPLICA_DATABASES, configured
+with DATABASE_URL_REPLICA_1, _2, ...); everything else, and every
+write, stays on the primary:
+- use_replica() marks reporting code (dashboards, statistics) as a
+  context manager or view decorator; ReplicaRouter sends its reads to
+  a replica
+- read_database() names the database for code that picks one itself
+  (exports streamed after the view returns, public tracking)
+- A client whose request wrote anything is pinned to the primary for
+  REPLICA_PIN_SECONDS by a cookie (ReplicaPinMiddleware), so they read
+  their own writes while the replicas catch up
+- Reads inside a transaction on the primary stay on the primary
+
+Without replicas configured all of this is a no-op.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+PIN_COOKIE = 'gram_panchayat_primary'
+
+# Writes that do not change what the client reads back
+UNPINNED_MODELS = {'sessions.session', 'portal_app.ratelimitcounter'}
+
+_reporting = ContextVar('portal_replica_reporting', default=False)
+_request = ContextVar('portal_replica_request', default=None)
+
+
+class RequestState:
+    """Replica routing state of the request being handled"""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned   # Client wrote within the pin window
+        self.wrote = False     # This request has written
+
+
+def read_database():
+    """
+    Database for a reporting read made now
+
+    Returns:
+        str: A replica alias, or the primary when no replica is
+            configured, the client is pinned, this request wrote, or a
+            transaction is open on the primary
+    """
+    replicas = settings.REPLICA_DATABASES
+    if not replicas:
+        return DEFAULT_DB_ALIAS
+    state = _request.get()
+    if state is not None and (state.pinned or state.wrote):
+        return DEFAULT_DB_ALIAS
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+@contextmanager
+def use_replica():
+    """Send ORM reads in this block (or decorated view) to read_database()"""
+    token = _reporting.set(True)
+    try:
+        yield
+    finally:
+        _reporting.reset(token)
+
+
+class ReplicaRouter:
+    """
+    DATABASE_ROUTERS entry: replica reads inside use_replica(), all
+    writes on the primary
+    """
+
+    def db_for_read(self, model, **hints):
+        if _reporting.get():
+            return read_database()
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _request.get()
+        if state is not None and model._meta.label_lower not in UNPINNED_MODELS:
+            state.wrote = True
+        # Explicit, or Django would write objects read from a replica back to it
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaPinMiddleware:
+    """
+    Pin clients to the primary for REPLICA_PIN_SECONDS after they write
+
+    Removes itself when no replicas are configured.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _request.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,470 @@
+"""
+Full-Text Search for Digital Gram Panchayat Portal
+
+One search API over complaints, applications and citizens, backed by
+the SearchDocument table (one row of title/body text per object):
+- PostgreSQL: tsvector expression with a GIN index, ranked by ts_rank
+- MySQL: FULLTEXT index, MATCH ... AGAINST in boolean mode
+- Anything else (SQLite): the SearchTerm inverted index, ranked by
+  summed term weight with title terms counting more
+
+Every query term must match; the last term also matches as a prefix so
+results appear while the user is still typing. Documents are kept up to
+date by the signals in portal_app.signals and can be rebuilt with
+`python manage.py rebuild_search_index`.
+
+The backend follows the database vendor unless SEARCH_BACKEND is set to
+'postgres', 'mysql' or 'inverted'.
+"""
+
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Max, Q, Sum, Value, When
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Application, Complaint, CustomUser, SearchDocument, SearchTerm
+
+
+KINDS = ['complaint', 'application', 'user']
+DEFAULT_LIMIT = 20
+TITLE_WEIGHT = 3
+MAX_TERM_LENGTH = 64
+SNIPPET_LENGTH = 160
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Fields whose change requires a document to be rebuilt; saves limited
+# to other fields (e.g. update_fields=['last_login']) are skipped
+INDEXED_FIELDS = {
+    'complaint': {'complaint_number', 'subject', 'description', 'location', 'category'},
+    'application': {'application_number', 'application_type'},
+    'user': {'username', 'first_name', 'last_name', 'phone_number', 'email', 'village'},
+}
+
+
+# ============================================
+# DOCUMENTS
+# ============================================
+
+def tokenize(text):
+    """
+    Lower-cased word tokens of a text
+
+    Args:
+        text (str): Any text
+
+    Returns:
+        list: Tokens, truncated to MAX_TERM_LENGTH
+    """
+    return [token[:MAX_TERM_LENGTH] for token in _TOKEN_RE.findall((text or '').lower())]
+
+
+def kind_of(instance):
+    """Search kind of a model instance (None if it is not indexed)"""
+    if isinstance(instance, Complaint):
+        return 'complaint'
+    if isinstance(instance, Application):
+        return 'application'
+    if isinstance(instance, CustomUser):
+        return 'user'
+    return None
+
+
+def _join(*parts):
+    return ' '.join(str(part) for part in parts if part)
+
+
+def build_document(instance):
+    """
+    Title and body text indexed for an object
+
+    Args:
+        instance: Complaint, Application or CustomUser
+
+    Returns:
+        tuple: (title: str, body: str)
+    """
+    kind = kind_of(instance)
+
+    if kind == 'complaint':
+        return (
+            _join(instance.complaint_number, instance.subject),
+            _join(instance.description, instance.location, instance.get_category_display()),
+        )
+
+    if kind == 'application':
+        detail = instance.get_detail()
+        if instance.application_type == 'birth_certificate' and detail:
+            names = (detail.child_name, detail.father_name, detail.mother_name,
+                     detail.certificate_number)
+        elif instance.application_type == 'death_certificate' and detail:
+            names = (detail.deceased_name, detail.informant_name, detail.certificate_number)
+        elif instance.application_type == 'income_certificate' and detail:
+            names = (detail.applicant_name, detail.father_husband_name, detail.certificate_number)
+        elif instance.application_type in ('water_tax', 'house_tax') and detail:
+            names = (detail.property_number, detail.property_address)
+        else:
+            names = ()
+        return (
+            _join(instance.application_number, instance.get_application_type_display()),
+            _join(*names),
+        )
+
+    if kind == 'user':
+        return (
+            instance.get_full_name() or instance.username,
+            _join(instance.username, instance.phone_number, instance.email, instance.village),
+        )
+
+    raise ValueError(f"{type(instance).__name__} is not searchable")
+
+
+def _term_weights(title, body):
+    weights = Counter()
+    for token in tokenize(title):
+        weights[token] += TITLE_WEIGHT
+    for token in tokenize(body):
+        weights[token] += 1
+    return weights
+
+
+# ============================================
+# BACKENDS
+# ============================================
+
+def get_backend():
+    """
+    Active search backend
+
+    Returns:
+        str: 'postgres', 'mysql' or 'inverted'
+    """
+    backend = getattr(settings, 'SEARCH_BACKEND', 'auto')
+    if backend != 'auto':
+        return backend
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    if connection.vendor == 'mysql':
+        return 'mysql'
+    return 'inverted'
+
+
+# Must match the indexed expression in migration 0011 for the GIN index to be used
+_PG_VECTOR = (
+    "(setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(body, '')), 'B'))"
+)
+
+
+def _search_postgres(terms, kinds, limit):
+    query = ' & '.join(terms[:-1] + [terms[-1] + ':*'])
+    placeholders = ', '.join(['%s'] * len(kinds))
+    sql = (
+        f"SELECT id, ts_rank({_PG_VECTOR}, q) AS score "
+        f"FROM portal_app_searchdocument, to_tsquery('simple', %s) q "
+        f"WHERE {_PG_VECTOR} @@ q AND kind IN ({placeholders}) "
+        f"ORDER BY score DESC, id DESC LIMIT %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [query, *kinds, limit])
+        return cursor.fetchall()
+
+
+def _search_mysql(terms, kinds, limit):
+    query = ' '.join(f'+{term}' for term in terms[:-1]) + f' +{terms[-1]}*'
+    placeholders = ', '.join(['%s'] * len(kinds))
+    sql = (
+        f"SELECT id, MATCH(title, body) AGAINST (%s IN BOOLEAN MODE) AS score "
+        f"FROM portal_app_searchdocument "
+        f"WHERE MATCH(title, body) AGAINST (%s IN BOOLEAN MODE) AND kind IN ({placeholders}) "
+        f"ORDER BY score DESC, id DESC LIMIT %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [query, query, *kinds, limit])
+        return cursor.fetchall()
+
+
+def _prefix_q(prefix):
+    # A range instead of startswith: LIKE ... ESCAPE cannot use the index on SQLite
+    return Q(term__gte=prefix, term__lt=prefix + '\U0010ffff')
+
+
+def _search_inverted(terms, kinds, limit):
+    conditions = [Q(term=term) for term in terms[:-1]] + [_prefix_q(terms[-1])]
+
+    matched = Q()
+    for condition in conditions:
+        matched |= condition
+
+    # One flag per query term; a document qualifies when every flag is set
+    flags = {
+        f'has_{index}': Max(Case(When(condition, then=Value(1)), default=Value(0),
+                                 output_field=IntegerField()))
+        for index, condition in enumerate(conditions)
+    }
+    rows = (
+        SearchTerm.objects.filter(matched, kind__in=kinds)
+        .values('document_id')
+        .annotate(score=Sum('weight'), **flags)
+        .filter(**{name: 1 for name in flags})
+        .order_by('-score', '-document_id')
+        .values_list('document_id', 'score')[:limit]
+    )
+    return list(rows)
+
+
+_BACKENDS = {
+    'postgres': _search_postgres,
+    'mysql': _search_mysql,
+    'inverted': _search_inverted,
+}
+
+
+# ============================================
+# INDEXING
+# ============================================
+
+def index_object(instance):
+    """
+    Create or refresh the search document of an object
+
+    Args:
+        instance: Complaint, Application or CustomUser
+    """
+    index_objects([instance])
+
+
+def index_objects(instances):
+    """
+    Create or refresh the search documents of several objects of one kind
+
+    Unchanged documents are left alone; the rest are written with one
+    bulk update/insert (used by bulk operations that bypass signals).
+
+    Args:
+        instances (list): Complaints, Applications or CustomUsers
+
+    Returns:
+        int: Number of documents written
+    """
+    if not instances:
+        return 0
+    kind = kind_of(instances[0])
+    built = {}
+    for instance in instances:
+        title, body = build_document(instance)
+        built[instance.pk] = (title[:255], body)
+
+    existing = {
+        document.object_id: document
+        for document in SearchDocument.objects.filter(kind=kind, object_id__in=list(built))
+    }
+    changed, created = [], []
+    now = timezone.now()
+    for object_id, (title, body) in built.items():
+        document = existing.get(object_id)
+        if document is None:
+            created.append(SearchDocument(kind=kind, object_id=object_id, title=title, body=body))
+        elif (document.title, document.body) != (title, body):
+            document.title, document.body, document.updated_at = title, body, now
+            changed.append(document)
+    if not changed and not created:
+        return 0
+
+    inverted = get_backend() == 'inverted'
+    with transaction.atomic():
+        if changed:
+            SearchDocument.objects.bulk_update(changed, ['title', 'body', 'updated_at'], batch_size=500)
+            if inverted:
+                SearchTerm.objects.filter(document__in=changed).delete()
+                _write_terms(changed)
+        _write_batch(created, inverted)
+    return len(changed) + len(created)
+
+
+def remove_object(kind, object_id):
+    """
+    Drop an object's search document
+
+    Args:
+        kind (str): 'complaint', 'application' or 'user'
+        object_id (int): Primary key of the object
+    """
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def _querysets():
+    return {
+        'complaint': Complaint.objects.order_by('id'),
+        'application': Application.objects.with_details().order_by('id'),
+        'user': CustomUser.objects.order_by('id'),
+    }
+
+
+def rebuild(kinds=None, batch_size=500):
+    """
+    Rebuild the index from scratch
+
+    Args:
+        kinds (list): Kinds to rebuild (default: all)
+        batch_size (int): Rows read and documents written per batch
+
+    Returns:
+        dict: Number of documents per kind
+    """
+    kinds = kinds or KINDS
+    inverted = get_backend() == 'inverted'
+    querysets = _querysets()
+    totals = {}
+
+    for kind in kinds:
+        with transaction.atomic():
+            SearchDocument.objects.filter(kind=kind).delete()
+            totals[kind] = 0
+            batch = []
+            for instance in querysets[kind].iterator(chunk_size=batch_size):
+                title, body = build_document(instance)
+                batch.append(SearchDocument(kind=kind, object_id=instance.pk, title=title[:255], body=body))
+                if len(batch) >= batch_size:
+                    totals[kind] += _write_batch(batch, inverted)
+                    batch = []
+            totals[kind] += _write_batch(batch, inverted)
+    return totals
+
+
+def _write_batch(documents, inverted):
+    """Insert new documents (and their terms); returns the number written"""
+    if not documents:
+        return 0
+    SearchDocument.objects.bulk_create(documents)
+    if inverted:
+        if any(document.pk is None for document in documents):
+            # bulk_create does not return ids on every backend; read them back
+            ids = dict(
+                SearchDocument.objects
+                .filter(kind=documents[0].kind, object_id__in=[d.object_id for d in documents])
+                .values_list('object_id', 'id')
+            )
+            for document in documents:
+                document.pk = ids[document.object_id]
+        _write_terms(documents)
+    return len(documents)
+
+
+def _write_terms(documents):
+    SearchTerm.objects.bulk_create([
+        SearchTerm(document_id=document.pk, kind=document.kind, term=term, weight=weight)
+        for document in documents
+        for term, weight in _term_weights(document.title, document.body).items()
+    ], batch_size=1000)
+
+
+# ============================================
+# QUERYING
+# ============================================
+
+class SearchResult:
+    """One ranked hit"""
+
+    def __init__(self, document, score, terms):
+        self.kind = document.kind
+        self.object_id = document.object_id
+        self.title = document.title
+        self.score = float(score or 0)
+        self.snippet = make_snippet(document.body, terms)
+
+    @property
+    def kind_display(self):
+        return dict(SearchDocument.KIND_CHOICES)[self.kind]
+
+    @property
+    def url(self):
+        if self.kind == 'complaint':
+            return reverse('admin_update_complaint', args=[self.object_id])
+        if self.kind == 'application':
+            return reverse('admin_review_application', args=[self.object_id])
+        return reverse('admin:portal_app_customuser_change', args=[self.object_id])
+
+
+def make_snippet(body, terms, length=SNIPPET_LENGTH):
+    """
+    Excerpt of the body around the first matching term
+
+    Returns:
+        str: At most `length` characters, with ellipses where cut
+    """
+    if len(body) <= length:
+        return body
+    lowered = body.lower()
+    positions = [lowered.find(term) for term in terms if term in lowered]
+    start = max(min(positions) - length // 4, 0) if positions else 0
+    snippet = body[start:start + length]
+    if start > 0:
+        snippet = '…' + snippet
+    if start + length < len(body):
+        snippet += '…'
+    return snippet
+
+
+def search_ids(query, kinds=None, limit=DEFAULT_LIMIT):
+    """
+    Ranked (document id, score) pairs for a query
+
+    Args:
+        query (str): User-entered search text
+        kinds (list): Restrict to these kinds (default: all)
+        limit (int): Maximum number of hits
+
+    Returns:
+        list: [(SearchDocument id, score), ...] best first
+    """
+    terms = tokenize(query)
+    if not terms:
+        return []
+    return _BACKENDS[get_backend()](terms, list(kinds or KINDS), limit)
+
+
+def search(query, kinds=None, limit=DEFAULT_LIMIT):
+    """
+    Search complaints, applications and citizens
+
+    Args:
+        query (str): User-entered search text
+        kinds (list): Restrict to these kinds (default: all)
+        limit (int): Maximum number of results
+
+    Returns:
+        list: SearchResult objects, best first
+    """
+    hits = search_ids(query, kinds, limit)
+    documents = SearchDocument.objects.in_bulk([document_id for document_id, _score in hits])
+    terms = tokenize(query)
+    return [
+        SearchResult(documents[document_id], score, terms)
+        for document_id, score in hits
+        if document_id in documents
+    ]
+
+
+def matching_object_ids(query, kind, limit=1000):
+    """
+    Primary keys of objects of one kind matching a query
+
+    Args:
+        query (str): Search text
+        kind (str): 'complaint', 'application' or 'user'
+        limit (int): Maximum number of ids
+
+    Returns:
+        list: Object primary keys, best first
+    """
+    hits = search_ids(query, [kind], limit)
+    object_ids = dict(
+        SearchDocument.objects.filter(pk__in=[document_id for document_id, _score in hits])
+        .values_list('id', 'object_id')
+    )
+    return [object_ids[document_id] for document_id, _score in hits if document_id in object_ids]
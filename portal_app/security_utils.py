@@ -303,13 +303,15 @@ def get_security_headers():
 # RATE LIMITING HELPERS
 # ============================================
 
-from django.core.cache import cache
 from django.http import HttpResponse
 
 
 def check_rate_limit(identifier, limit=5, period=60):
     """
-    Simple rate limiting check using Django cache
+    Sliding-window rate limiting check
+    
+    Uses the shared backend configured by RATE_LIMIT_BACKEND
+    (see portal_app.rate_limit), so limits hold across all workers.
     
     Args:
         identifier (str): Unique identifier (e.g., IP address, user ID)
@@ -319,15 +321,8 @@ def check_rate_limit(identifier, limit=5, period=60):
     Returns:
         bool: True if under limit, False if exceeded
     """
-    cache_key = f'rate_limit_{identifier}'
-    requests = cache.get(cache_key, 0)
-    
-    if requests >= limit:
-        return False
-    
-    # Increment counter
-    cache.set(cache_key, requests + 1, period)
-    return True
+    from .rate_limit import RateLimiter
+    return RateLimiter().hit(identifier, limit, period)
 
 
 def rate_limit_exceeded_response():
@@ -652,12 +647,16 @@ def send_otp_email(user, otp_code):
         otp_code: 6-digit OTP code
     
     Returns:
-        bool: True if email sent successfully, False otherwise
+        bool: True if email queued/sent successfully, False otherwise
     
     Security:
         - Uses Django's email backend
         - Does not expose OTP in logs
         - Includes expiration time in email
+    
+    With EMAIL_QUEUE_ENABLED the email is stored in the outbox and
+    delivered by `manage.py send_queued_emails`, so the request does
+    not wait on SMTP.
     """
     from django.core.mail import send_mail
     from django.conf import settings
@@ -678,20 +677,31 @@ def send_otp_email(user, otp_code):
         # Plain text version
         plain_message = strip_tags(html_message)
         
-        # Send email
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        if getattr(settings, 'EMAIL_QUEUE_ENABLED', False):
+            from .email_queue import enqueue_email
+            enqueue_email(
+                subject=subject,
+                body=plain_message,
+                recipient_list=[user.email],
+                html_body=html_message,
+            )
+            event = 'OTP_EMAIL_QUEUED'
+        else:
+            # Send email
+            send_mail(
+                subject=subject,
+                message=plain_message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+                html_message=html_message,
+                fail_silently=False,
+            )
+            event = 'OTP_EMAIL_SENT'
         
         log_security_event(
-            'OTP_EMAIL_SENT',
+            event,
             user.username,
-            f"OTP email sent to: {user.email}",
+            f"OTP email for: {user.email}",
             'INFO'
         )
         
@@ -0,0 +1,178 @@
+"""
+Low-Write Session Engine for Gram Panchayat Portal
+
+SESSION_SAVE_EVERY_REQUEST slides the session expiry on every page
+view, which with Django's database engine means an UPDATE on
+django_session per request per logged-in user. This engine keeps the
+same behaviour while writing far less:
+- The session row is written only when the session data changes, or
+  when the new expiry has moved more than SESSION_REFRESH_THRESHOLD
+  (a fraction of SESSION_COOKIE_AGE) past the stored one
+- With SESSION_WRITE_BEHIND enabled, sessions are also kept in the
+  SESSION_CACHE_ALIAS cache: reads come from the cache and every request
+  refreshes the cached expiry, while the database row trails behind it
+  by at most the threshold
+
+Only enable SESSION_WRITE_BEHIND with a shared cache (Redis). With the
+per-process LocMemCache each worker would keep its own copy, and a
+logout handled by one worker would not reach the others.
+
+Configure in settings.py:
+    SESSION_ENGINE = 'portal_app.session_store'
+    SESSION_WRITE_BEHIND = True
+    SESSION_REFRESH_THRESHOLD = 0.1
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.utils import timezone
+
+
+KEY_PREFIX = 'portal_app.session'
+PURGE_BATCH_SIZE = 1000
+
+
+def refresh_threshold():
+    """
+    How far the expiry may slide before the session row is rewritten
+
+    Returns:
+        timedelta: SESSION_REFRESH_THRESHOLD x SESSION_COOKIE_AGE
+    """
+    fraction = getattr(settings, 'SESSION_REFRESH_THRESHOLD', 0.1)
+    return timedelta(seconds=settings.SESSION_COOKIE_AGE * fraction)
+
+
+class SessionStore(DBStore):
+    """
+    Database-backed sessions that skip writes which change nothing
+
+    Expiry-only saves are dropped until the expiry has moved past the
+    refresh threshold; with SESSION_WRITE_BEHIND the cache entry carries
+    the up-to-date expiry in the meantime.
+    """
+
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        self._write_behind = getattr(settings, 'SESSION_WRITE_BEHIND', False)
+        self._cache = caches[settings.SESSION_CACHE_ALIAS] if self._write_behind else None
+        # expire_date of the database row, once known
+        self._stored_expiry = None
+        super().__init__(session_key)
+
+    @property
+    def cache_key(self):
+        return self.cache_key_prefix + self._get_or_create_session_key()
+
+    def _get_session_from_db(self):
+        s = super()._get_session_from_db()
+        self._stored_expiry = s.expire_date if s else None
+        return s
+
+    def _cache_session(self):
+        self._cache.set(
+            self.cache_key,
+            {'data': self._session, 'stored_expiry': self._stored_expiry},
+            self.get_expiry_age(),
+        )
+
+    def load(self):
+        if self._write_behind:
+            try:
+                cached = self._cache.get(self.cache_key)
+            except Exception:
+                # Some backends raise on invalid keys; treat it as a miss
+                cached = None
+            if cached is not None:
+                self._stored_expiry = cached['stored_expiry']
+                return cached['data']
+
+        data = super().load()
+        if self._write_behind and self._stored_expiry is not None:
+            self._session_cache = data
+            self._cache_session()
+        return data
+
+    def refresh_due(self):
+        """
+        Whether the stored expiry is far enough behind to be rewritten
+
+        Returns:
+            bool: True if the row is missing, unknown or stale by at
+                least refresh_threshold()
+        """
+        if self._stored_expiry is None:
+            return True
+        return self.get_expiry_date() - self._stored_expiry >= refresh_threshold()
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+
+        if must_create or self.modified or self.refresh_due():
+            super().save(must_create=must_create)
+            self._stored_expiry = self.get_expiry_date()
+
+        if self._write_behind:
+            self._cache_session()
+
+    def exists(self, session_key):
+        if self._write_behind and session_key and (self.cache_key_prefix + session_key) in self._cache:
+            return True
+        return super().exists(session_key)
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        if self._write_behind:
+            self._cache.delete(self.cache_key_prefix + session_key)
+
+    def flush(self):
+        """Remove the current session and regenerate the key"""
+        self.clear()
+        self.delete(self.session_key)
+        self._session_key = None
+
+    @classmethod
+    def clear_expired(cls):
+        purge_expired()
+
+
+def purge_expired(batch_size=PURGE_BATCH_SIZE, grace=None):
+    """
+    Delete expired session rows a batch at a time
+
+    Short deletes keep lock times low on a busy django_session table,
+    unlike one DELETE over every expired row.
+
+    Args:
+        batch_size (int): Rows deleted per statement
+        grace (timedelta): Only delete rows expired for at least this
+            long (default refresh_threshold(), since a session refreshed
+            only in the cache can be that far ahead of its row)
+
+    Returns:
+        int: Number of sessions deleted
+    """
+    if grace is None:
+        grace = refresh_threshold()
+    cutoff = timezone.now() - grace
+
+    deleted = 0
+    while True:
+        keys = list(
+            Session.objects.filter(expire_date__lt=cutoff)
+            .values_list('session_key', flat=True)[:batch_size]
+        )
+        if not keys:
+            return deleted
+        Session.objects.filter(session_key__in=keys).delete()
+        deleted += len(keys)
@@ -0,0 +1,89 @@
+"""
+Signal Handlers for Portal App
+
+- Drop cached certificate PDFs whenever an application or its
+  certificate row changes
+- Keep the full-text search index in step with complaints,
+  applications (and their certificate rows) and users
+- Clear the cached public tracking status of changed applications
+- Keep the tax collection rollups in step with payments (edited in the
+  Django admin)
+"""
+
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import certificates, rollups, search, tracking
+from .models import (
+    Application, BirthCertificate, Complaint, CustomUser, DeathCertificate,
+    IncomeCertificate, TaxPayment
+)
+
+
+@receiver([post_save, post_delete], sender=Application)
+def invalidate_application_certificate(sender, instance, **kwargs):
+    certificates.invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Application)
+def invalidate_tracking_status(sender, instance, **kwargs):
+    tracking.invalidate(instance.application_number)
+
+
+@receiver([post_save, post_delete], sender=BirthCertificate)
+@receiver([post_save, post_delete], sender=DeathCertificate)
+@receiver([post_save, post_delete], sender=IncomeCertificate)
+def invalidate_certificate_row(sender, instance, **kwargs):
+    certificates.invalidate(instance.application_id)
+
+
+@receiver(setting_changed)
+def reset_certificate_storage(setting, **kwargs):
+    # Let override_settings(CERTIFICATE_CACHE_DIR=...) take effect
+    if setting == 'CERTIFICATE_CACHE_DIR':
+        certificates.reset_cache_storage()
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_save, sender=Complaint)
+@receiver(post_save, sender=CustomUser)
+def update_search_document(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return  # Fixture loading; rebuild the index afterwards
+    kind = search.kind_of(instance)
+    if update_fields is not None and not set(update_fields) & search.INDEXED_FIELDS[kind]:
+        return
+    search.index_object(instance)
+
+
+@receiver(post_delete, sender=Application)
+@receiver(post_delete, sender=Complaint)
+@receiver(post_delete, sender=CustomUser)
+def remove_search_document(sender, instance, **kwargs):
+    search.remove_object(search.kind_of(instance), instance.pk)
+
+
+@receiver(post_save, sender=BirthCertificate)
+@receiver(post_save, sender=DeathCertificate)
+@receiver(post_save, sender=IncomeCertificate)
+@receiver(post_save, sender=TaxPayment)
+def update_application_search_document(sender, instance, raw=False, **kwargs):
+    # Certificate names are indexed on the application's document
+    if not raw:
+        search.index_object(instance.application)
+
+
+@receiver(pre_save, sender=TaxPayment)
+def remember_tax_payment(sender, instance, raw=False, **kwargs):
+    # Collection state before the save, for record_tax_payment_change()
+    instance._rollup_old = None if raw or instance._state.adding else (
+        TaxPayment.objects.filter(pk=instance.pk)
+        .values_list('payment_status', 'payment_date', 'total_amount').first()
+    )
+
+
+@receiver(post_save, sender=TaxPayment)
+def update_collection_rollups(sender, instance, raw=False, **kwargs):
+    if not raw:
+        rollups.record_tax_payment_change(instance, getattr(instance, '_rollup_old', None))
@@ -0,0 +1,227 @@
+"""
+Statistics Engine for Digital Gram Panchayat Portal
+
+Computes dashboard statistics with conditional aggregates:
+- One query per table using Count(filter=Q(...))
+- Application/complaint totals read from maintained counters
+- Shared by admin_dashboard and get_application_statistics
+- Read from a replica when configured (portal_app.routers)
+"""
+
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import counters
+from .routers import use_replica
+from .models import (
+    CustomUser, Application, BirthCertificate, DeathCertificate,
+    IncomeCertificate, TaxPayment, Complaint
+)
+
+
+# ============================================
+# PER-TABLE AGGREGATES
+# ============================================
+
+def _status_counts(choices, field='status'):
+    """
+    Build one filtered Count per status choice
+
+    Args:
+        choices (tuple): Model STATUS_CHOICES
+        field (str): Name of the status field
+
+    Returns:
+        dict: {status: Count(...)} suitable for aggregate()
+    """
+    return {
+        value: Count('id', filter=Q(**{field: value}))
+        for value, _label in choices
+    }
+
+
+@use_replica()
+def get_user_statistics():
+    """
+    User counts by role, inactive users and users joined today
+
+    Returns:
+        dict: {'citizens', 'staff', 'admins', 'inactive', 'new_today'}
+    """
+    today = timezone.now().date()
+    return CustomUser.objects.aggregate(
+        citizens=Count('id', filter=Q(role='citizen')),
+        staff=Count('id', filter=Q(role='staff')),
+        admins=Count('id', filter=Q(role='admin')),
+        inactive=Count('id', filter=Q(is_active=False)),
+        new_today=Count('id', filter=Q(date_joined__date=today)),
+    )
+
+
+@use_replica()
+def get_application_statistics(user=None, include_activity=False):
+    """
+    Application counts by status in a single query
+
+    Args:
+        user: Restrict to applications of this applicant (optional)
+        include_activity (bool): Also count today's/this week's activity
+
+    Returns:
+        dict: {'total', 'pending', 'under_review', 'approved', 'rejected'}
+              plus 'today', 'approved_today', 'this_week' with include_activity
+    """
+    applications = Application.objects.all()
+    if user:
+        applications = applications.filter(applicant=user)
+
+    aggregates = {'total': Count('id')}
+    aggregates.update(_status_counts(Application.STATUS_CHOICES))
+
+    if include_activity:
+        now = timezone.now()
+        today = now.date()
+        aggregates.update(
+            today=Count('id', filter=Q(applied_date__date=today)),
+            approved_today=Count(
+                'id', filter=Q(status='approved', reviewed_date__date=today)
+            ),
+            this_week=Count('id', filter=Q(applied_date__gte=now - timedelta(days=7))),
+        )
+
+    return applications.aggregate(**aggregates)
+
+
+@use_replica()
+def get_application_type_statistics():
+    """
+    Application counts grouped by type, most common first
+
+    Returns:
+        QuerySet: [{'application_type': ..., 'count': ...}, ...]
+    """
+    return Application.objects.values('application_type').annotate(
+        count=Count('id')
+    ).order_by('-count')
+
+
+@use_replica()
+def get_complaint_statistics(user=None):
+    """
+    Complaint counts by status plus today's, unassigned and urgent complaints
+
+    Args:
+        user: Restrict to complaints filed by this user (optional)
+
+    Returns:
+        dict: {'total', 'open', 'in_progress', 'resolved', 'closed',
+               'today', 'unassigned', 'urgent'}
+    """
+    complaints = Complaint.objects.all()
+    if user:
+        complaints = complaints.filter(complainant=user)
+
+    aggregates = {'total': Count('id')}
+    aggregates.update(_status_counts(Complaint.STATUS_CHOICES))
+    aggregates.update(
+        today=Count('id', filter=Q(filed_date__date=timezone.now().date())),
+        unassigned=Count('id', filter=Q(assigned_to__isnull=True)),
+        urgent=Count(
+            'id', filter=Q(priority='urgent', status__in=['open', 'in_progress'])
+        ),
+    )
+    return complaints.aggregate(**aggregates)
+
+
+@use_replica()
+def get_archived_counts():
+    """
+    Tax payments and issued certificates moved to the archive tables
+    (portal_app.archive), from counters
+
+    Returns:
+        dict: {'tax': {tax_type: n}, 'certificates': {application_type: n}}
+    """
+    tax_types = [value for value, _label in TaxPayment.TAX_TYPE_CHOICES]
+    certificate_types = ['birth_certificate', 'death_certificate', 'income_certificate']
+    values = counters.read(
+        [f'archived:tax:{value}' for value in tax_types]
+        + [f'archived:certificate:{value}' for value in certificate_types]
+    )
+    return {
+        'tax': {value: values[f'archived:tax:{value}'] for value in tax_types},
+        'certificates': {value: values[f'archived:certificate:{value}'] for value in certificate_types},
+    }
+
+
+@use_replica()
+def get_tax_statistics(archived=None):
+    """
+    Tax payment counts by tax type, archived payments included
+
+    Args:
+        archived (dict): get_archived_counts() output, if already read
+
+    Returns:
+        dict: {'total', 'water_tax', 'house_tax'}
+    """
+    archived = (archived or get_archived_counts())['tax']
+    aggregates = {'total': Count('id')}
+    aggregates.update(_status_counts(TaxPayment.TAX_TYPE_CHOICES, field='tax_type'))
+    stats = TaxPayment.objects.aggregate(**aggregates)
+    for tax_type, count in archived.items():
+        stats[tax_type] += count
+        stats['total'] += count
+    return stats
+
+
+@use_replica()
+def get_certificate_statistics(archived=None):
+    """
+    Number of issued certificates per certificate table, archived
+    certificates included
+
+    Args:
+        archived (dict): get_archived_counts() output, if already read
+
+    Returns:
+        dict: {'birth', 'death', 'income'}
+    """
+    archived = (archived or get_archived_counts())['certificates']
+    # A WHERE clause (not an aggregate filter) lets the count use the
+    # unique index on certificate_number
+    issued = Q(certificate_number__isnull=False)
+    return {
+        'birth': BirthCertificate.objects.filter(issued).count() + archived['birth_certificate'],
+        'death': DeathCertificate.objects.filter(issued).count() + archived['death_certificate'],
+        'income': IncomeCertificate.objects.filter(issued).count() + archived['income_certificate'],
+    }
+
+
+# ============================================
+# DASHBOARD STATISTICS
+# ============================================
+
+@use_replica()
+def get_dashboard_statistics():
+    """
+    All admin dashboard statistics
+    
+    Application and complaint totals come from portal_app.counters;
+    the remaining tables are aggregated live.
+
+    Returns:
+        dict: {'users', 'applications', 'application_types',
+               'complaints', 'tax', 'certificates'}
+    """
+    archived = get_archived_counts()
+    return {
+        'users': get_user_statistics(),
+        'applications': counters.get_application_counts(include_activity=True),
+        'application_types': counters.get_application_type_counts(),
+        'complaints': counters.get_complaint_counts(include_activity=True),
+        'tax': get_tax_statistics(archived),
+        'certificates': get_certificate_statistics(archived),
+    }
@@ -1,2 +1,2331 @@
-# This file intentionally left blank
-# Django test framework will use this file
+"""
+Tests for Digital Gram Panchayat Portal
+
+Run with:
+    python manage.py test portal_app
+"""
+
+import asyncio
+import csv
+import importlib.util
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.http import HttpResponse
+from django.test import LiveServerTestCase, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from . import (
+    archive, assignment, bulk_certificates, certificates, counters, email_queue, exports, index_advisor,
+    instrumentation, loadtest, numbering, pagination, pooling, rate_limit, reviews, rollups, routers, search,
+    session_store, statistics, tracking, urls as portal_urls, views,
+)
+from .forms import ComplaintUpdateForm
+from .middleware import RoleBasedAccessMiddleware, compile_route_roles
+from .models import (
+    CustomUser, Application, BirthCertificate, Complaint, StatisticCounter, TaxPayment,
+    ApplicationStatusHistory, ComplaintHistory, OutboundEmail, SearchDocument, SearchTerm,
+    ArchivedApplication, ArchivedComplaint, DailyRollup, RateLimitCounter
+)
+
+
+# ============================================
+# TEST DATA HELPERS
+# ============================================
+
+def make_user(username, role='citizen', **extra):
+    """Create an active, email-verified user with valid required fields"""
+    phone_suffix = str(CustomUser.objects.count()).zfill(9)
+    fields = {
+        'email': f'{username}@example.com',
+        'phone_number': f'9{phone_suffix}',
+        'address': 'Test Address',
+        'pincode': '411001',
+        'role': role,
+        'is_active': True,
+        'email_verified': True,
+    }
+    fields.update(extra)
+    return CustomUser.objects.create_user(username=username, password='Test@12345', **fields)
+
+
+def make_application(applicant, application_type='water_tax', status='pending'):
+    """Create a bare application row"""
+    return Application.objects.create(
+        applicant=applicant,
+        application_type=application_type,
+        status=status,
+    )
+
+
+def make_tax_application(applicant, status='pending'):
+    """Create a water tax application with its TaxPayment detail row"""
+    application = make_application(applicant, 'water_tax', status)
+    TaxPayment.objects.create(
+        application=application,
+        tax_type='water_tax',
+        property_number=f'PROP{application.pk}',
+        property_address='Ward 1',
+        property_area_sqft=500,
+        financial_year='2025-26',
+        tax_amount=1200,
+    )
+    return application
+
+
+def make_birth_application(applicant, status='approved', child_name='Asha'):
+    """Create a birth certificate application with its detail row"""
+    application = make_application(applicant, 'birth_certificate', status)
+    BirthCertificate.objects.create(
+        application=application,
+        child_name=child_name,
+        child_gender='female',
+        date_of_birth=date(2025, 5, 1),
+        place_of_birth='PHC',
+        father_name='Ravi',
+        mother_name='Meera',
+        permanent_address='Ward 1',
+        hospital_certificate='birth_certificates/hospital.pdf',
+        parents_id_proof='birth_certificates/parents_id.pdf',
+        certificate_number=f'CERTBIRT2526{application.pk:07d}',
+    )
+    return application
+
+
+def make_complaint(complainant, status='open', priority='medium'):
+    """Create a bare complaint row"""
+    return Complaint.objects.create(
+        complainant=complainant,
+        category='water_supply',
+        subject='No water',
+        description='Tap dry',
+        location='Ward 1',
+        status=status,
+        priority=priority,
+    )
+
+
+# ============================================
+# STATISTICS ENGINE
+# ============================================
+
+class StatisticsEngineTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.citizen = make_user('citizen1')
+        cls.staff = make_user('staff1', role='staff')
+        cls.admin = make_user('admin1', role='admin')
+        make_user('pending_admin', role='admin', is_active=False)
+        for status in ['pending', 'pending', 'approved', 'rejected', 'under_review']:
+            make_application(cls.citizen, status=status)
+        make_complaint(cls.citizen, status='open', priority='urgent')
+        make_complaint(cls.citizen, status='resolved')
+        counters.rebuild_counters()
+
+    def test_application_statistics_match_counts(self):
+        stats = statistics.get_application_statistics()
+        self.assertEqual(stats['total'], 5)
+        self.assertEqual(stats['pending'], 2)
+        self.assertEqual(stats['approved'], 1)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['under_review'], 1)
+
+    def test_application_statistics_single_query(self):
+        with self.assertNumQueries(1):
+            statistics.get_application_statistics(self.citizen, include_activity=True)
+
+    def test_complaint_statistics(self):
+        stats = statistics.get_complaint_statistics(self.citizen)
+        self.assertEqual(stats['total'], 2)
+        self.assertEqual(stats['open'], 1)
+        self.assertEqual(stats['resolved'], 1)
+        self.assertEqual(stats['urgent'], 1)
+        self.assertEqual(stats['unassigned'], 2)
+
+    def test_user_statistics(self):
+        stats = statistics.get_user_statistics()
+        self.assertEqual(stats['citizens'], 1)
+        self.assertEqual(stats['staff'], 1)
+        self.assertEqual(stats['admins'], 2)
+        self.assertEqual(stats['inactive'], 1)
+
+    def test_dashboard_statistics_query_count(self):
+        # users, applications, types, complaints, archived counts, tax + three certificate tables
+        with self.assertNumQueries(9):
+            statistics.get_dashboard_statistics()
+
+    def test_admin_dashboard_renders(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['pending_applications'], 2)
+        self.assertEqual(response.context['open_complaints'], 1)
+
+
+# ============================================
+# STATISTIC COUNTERS
+# ============================================
+
+class StatisticCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.citizen = make_user('citizen1')
+        cls.admin = make_user('admin1', role='admin')
+
+    def test_increment_creates_and_updates(self):
+        counters.increment('test:counter')
+        counters.increment('test:counter', 4)
+        counters.increment('test:counter', -2)
+        self.assertEqual(StatisticCounter.objects.get(name='test:counter').value, 3)
+
+    def test_file_complaint_updates_counters(self):
+        self.client.force_login(self.citizen)
+        self.client.post(reverse('file_complaint'), {
+            'category': 'road',
+            'subject': 'Pothole near school',
+            'description': 'Large pothole on main road',
+            'location': 'Main road',
+            'priority': 'high',
+        })
+        counts = counters.get_complaint_counts(self.citizen)
+        self.assertEqual(counts['total'], 1)
+        self.assertEqual(counts['open'], 1)
+        self.assertEqual(counters.find_drift(), {})
+
+    def test_review_moves_status_counters(self):
+        application = make_tax_application(self.citizen)
+        counters.rebuild_counters()
+
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse('admin_review_application', args=[application.id]),
+            {'status': 'approved', 'admin_remarks': 'OK'},
+        )
+        self.assertRedirects(response, reverse('admin_applications'), fetch_redirect_response=False)
+
+        counts = counters.get_application_counts(include_activity=True)
+        self.assertEqual(counts['pending'], 0)
+        self.assertEqual(counts['approved'], 1)
+        self.assertEqual(counts['approved_today'], 1)
+        self.assertEqual(counters.find_drift(), {})
+        self.assertEqual(application.status_history.count(), 1)
+
+    def test_django_admin_edits_and_deletes_keep_counters(self):
+        from django.contrib.admin.sites import site
+
+        application = make_birth_application(self.citizen, status='pending')
+        tax = make_tax_application(self.citizen)
+        payment = tax.tax_payment
+        payment.payment_status, payment.payment_date = 'paid', timezone.now()
+        payment.save()
+        complaints = [make_complaint(self.citizen), make_complaint(self.citizen)]
+        counters.rebuild_counters()
+        rollups.rebuild_rollups()
+        application_admin, complaint_admin = site._registry[Application], site._registry[Complaint]
+
+        application.status, application.reviewed_date = 'approved', timezone.now()
+        application_admin.save_model(None, application, None, True)
+        complaints[0].status, complaints[0].category = 'resolved', 'road'
+        complaint_admin.save_model(None, complaints[0], None, True)
+        self.assertEqual(counters.get_application_counts()['approved'], 1)
+        self.assertEqual((counters.find_drift(), rollups.find_drift()), ({}, {}))
+
+        application_admin.delete_model(None, application)
+        application_admin.delete_queryset(None, Application.objects.filter(pk=tax.pk))
+        complaint_admin.delete_queryset(None, Complaint.objects.all())
+        self.assertEqual(counters.get_application_counts()['total'], 0)
+        self.assertEqual((counters.find_drift(), rollups.find_drift()), ({}, {}))
+
+        self.assertIn('applicant', application_admin.get_readonly_fields(None, tax))
+        self.assertNotIn('applicant', application_admin.get_readonly_fields(None))
+
+    def test_rebuild_repairs_drift(self):
+        make_application(self.citizen, status='approved')
+        self.assertIn('application:status:approved', counters.find_drift())
+        counters.rebuild_counters()
+        self.assertEqual(counters.find_drift(), {})
+        self.assertEqual(counters.get_application_counts(self.citizen)['approved'], 1)
+
+    def test_migration_seeds_counters(self):
+        from django.db.migrations.executor import MigrationExecutor
+
+        make_application(self.citizen, status='approved')
+        make_complaint(self.citizen)
+        state = MigrationExecutor(connection).loader.project_state(('portal_app', '0006_statisticcounter'))
+        counters.rebuild_counters(apps=state.apps)
+        self.assertEqual(counters.find_drift(), {})
+
+
+# ============================================
+# NUMBER ALLOCATION
+# ============================================
+
+class NumberAllocatorTests(TestCase):
+
+    def test_financial_year(self):
+        self.assertEqual(numbering.financial_year(date(2025, 3, 31)), '2024-25')
+        self.assertEqual(numbering.financial_year(date(2025, 4, 1)), '2025-26')
+
+    def test_same_second_submissions_are_unique(self):
+        citizen = make_user('citizen1')
+        numbers = {make_complaint(citizen).complaint_number for _ in range(300)}
+        self.assertEqual(len(numbers), 300)
+
+    def test_rolled_back_reservation_is_not_reused(self):
+        allocator = numbering.BlockAllocator(block_size=10)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                allocator.allocate('ROLLBK', '2025-26')
+                raise RuntimeError('request failed')
+        values = [allocator.allocate('ROLLBK', '2025-26') for _ in range(15)]
+        self.assertEqual(len(set(values)), 15)
+
+    def test_number_format(self):
+        number = numbering.application_number('birth_certificate')
+        year = numbering.financial_year().replace('-', '')[2:]
+        self.assertTrue(number.startswith(f'GPBIRT{year}'))
+        self.assertLessEqual(len(number), Application._meta.get_field('application_number').max_length)
+
+
+class NumberAllocatorConcurrencyTests(TransactionTestCase):
+
+    def test_parallel_allocations_never_collide(self):
+        # Several allocators stand in for separate worker processes,
+        # each hammered by its own pool of threads
+        allocators = [numbering.BlockAllocator(block_size=25) for _ in range(4)]
+
+        def submit(i):
+            try:
+                return allocators[i % len(allocators)].allocate('STRESS', '2025-26')
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            values = list(pool.map(submit, range(4000)))
+
+        self.assertEqual(len(set(values)), 4000)
+
+    def test_independent_reservation_commits_on_its_own(self):
+        first = numbering._reserve_independent('INDEP', '2025-26', 10)
+        second = numbering._reserve_independent('INDEP', '2025-26', 10)
+        self.assertEqual((first, second), (1, 11))
+
+
+# ============================================
+# RATE LIMITING
+# ============================================
+
+def _file_backend_worker(directory, attempts, results):
+    """Child process body for the multi-process rate limit test"""
+    limiter = rate_limit.RateLimiter(
+        backend=rate_limit.FileBackend(directory), clock=lambda: 1000.0
+    )
+    results.put(sum(limiter.hit('login:shared', limit=60, period=3600) for _ in range(attempts)))
+
+
+class RateLimiterTests(TestCase):
+
+    def make_limiter(self, backend, now=1000.0):
+        self.now = now
+        return rate_limit.RateLimiter(backend=backend, clock=lambda: self.now)
+
+    def assert_enforces_limit(self, backend):
+        limiter = self.make_limiter(backend)
+        results = [limiter.hit('login:alice', limit=3, period=60) for _ in range(5)]
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertTrue(limiter.hit('login:bob', limit=3, period=60))
+
+    def test_cache_backend(self):
+        self.assert_enforces_limit(rate_limit.CacheBackend())
+
+    def test_database_backend(self):
+        self.assert_enforces_limit(rate_limit.DatabaseBackend())
+
+    def test_database_backend_keeps_concurrent_row(self):
+        class RacingBackend(rate_limit.DatabaseBackend):
+            raced = False
+
+            def _live(self, key):
+                if not self.raced:
+                    # Another worker creates the row after this one's update
+                    self.raced = True
+                    rate_limit.DatabaseBackend(purge_probability=0).incr(key, ttl=60)
+                    return RateLimitCounter.objects.none()
+                return super()._live(key)
+
+        self.assertEqual(RacingBackend(purge_probability=0).incr('rl:race', ttl=60), 2)
+        self.assertEqual(RateLimitCounter.objects.get(key='rl:race').count, 2)
+
+    def test_file_backend(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.assert_enforces_limit(rate_limit.FileBackend(directory))
+
+    def test_window_slides(self):
+        limiter = self.make_limiter(rate_limit.CacheBackend(), now=1200.0)
+        for _ in range(4):
+            limiter.hit('otp:1', limit=4, period=60)
+        # Next window starts at 1260; the previous one still weighs 3/4 at 1275
+        self.now = 1275.0
+        self.assertTrue(limiter.hit('otp:1', limit=4, period=60))
+        self.assertFalse(limiter.hit('otp:1', limit=4, period=60))
+        # Once the old window has fully slid out the budget is back
+        self.now = 1380.0
+        self.assertTrue(limiter.hit('otp:1', limit=4, period=60))
+
+    def test_check_rate_limit_uses_shared_backend(self):
+        from .security_utils import check_rate_limit
+        with self.settings(RATE_LIMIT_BACKEND='portal_app.rate_limit.DatabaseBackend'):
+            rate_limit._backend = None
+            self.addCleanup(setattr, rate_limit, '_backend', None)
+            self.assertTrue(check_rate_limit('resend:7', limit=1, period=600))
+            self.assertFalse(check_rate_limit('resend:7', limit=1, period=600))
+            # Long user input still fits RateLimitCounter.key
+            identifier = f"login:{'x' * 400}:127.0.0.1"
+            self.assertTrue(check_rate_limit(identifier, limit=1, period=600))
+            self.assertFalse(check_rate_limit(identifier, limit=1, period=600))
+
+    @unittest.skipUnless(
+        'fork' in multiprocessing.get_all_start_methods(), 'requires fork start method'
+    )
+    def test_limit_holds_across_processes(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [
+            context.Process(target=_file_backend_worker, args=(directory, 40, results))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+        allowed = sum(results.get(timeout=5) for _ in workers)
+        self.assertEqual(allowed, 60)
+
+
+# ============================================
+# OUTBOUND EMAIL QUEUE
+# ============================================
+
+class FailingEmailBackend(BaseEmailBackend):
+    """Email backend whose every send fails"""
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP unavailable')
+
+
+class EmailQueueTests(TestCase):
+
+    def test_otp_email_is_queued_not_sent(self):
+        from .security_utils import send_otp_email
+        user = make_user('citizen1')
+        with self.settings(EMAIL_QUEUE_ENABLED=True):
+            self.assertTrue(send_otp_email(user, '123456'))
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.recipient_list(), [user.email])
+        self.assertIn('123456', queued.html_body)
+
+    def test_worker_delivers_batch(self):
+        for i in range(3):
+            email_queue.enqueue_email('Hello', 'Body', [f'user{i}@example.com'], html_body='<p>Body</p>')
+        self.assertEqual(email_queue.process_queue(batch_size=10), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(OutboundEmail.objects.filter(status='sent').count(), 3)
+        # Nothing left to claim
+        self.assertEqual(email_queue.process_queue(), (0, 0))
+
+    def test_failures_back_off_then_give_up(self):
+        queued = email_queue.enqueue_email('Hello', 'Body', ['user@example.com'])
+        with self.settings(EMAIL_BACKEND='portal_app.tests.FailingEmailBackend'):
+            self.assertEqual(email_queue.process_queue(), (0, 1))
+            queued.refresh_from_db()
+            self.assertEqual((queued.status, queued.attempts), ('pending', 1))
+            self.assertGreater(queued.next_attempt_at, queued.created_at)
+            # Not due yet
+            self.assertEqual(email_queue.process_queue(), (0, 0))
+
+            OutboundEmail.objects.update(next_attempt_at=queued.created_at)
+            email_queue.process_queue(max_attempts=2)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'failed')
+        self.assertIn('SMTP unavailable', queued.last_error)
+
+
+# ============================================
+# CERTIFICATE PDF CACHE
+# ============================================
+
+class CertificateCacheTests(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        overrider = override_settings(CERTIFICATE_CACHE_DIR=self.cache_dir)
+        overrider.enable()
+        self.addCleanup(overrider.disable)
+
+        self.citizen = make_user('citizen1')
+        self.application = make_birth_application(self.citizen)
+        self.cert = self.application.birth_certificate
+        self.client.force_login(self.citizen)
+        self.url = reverse('download_certificate', args=[self.application.pk])
+
+    def _cached_files(self):
+        return certificates.cache_storage.listdir(str(self.application.pk))[1]
+
+    def test_download_renders_once(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Content-Type'], 'application/pdf')
+        body = b''.join(first.streaming_content)
+        self.assertTrue(body.startswith(b'%PDF'))
+
+        with mock.patch.object(certificates, 'render_certificate_pdf') as render:
+            second = self.client.get(self.url)
+        render.assert_not_called()
+        self.assertEqual(b''.join(second.streaming_content), body)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_render_is_written_atomically(self):
+        with mock.patch('portal_app.certificates.os.replace', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                certificates.get_cached_certificate(self.application)
+        # Neither a partial PDF nor the temporary file is left behind
+        self.assertEqual(self._cached_files(), [])
+
+        path, fingerprint, _modified = certificates.get_cached_certificate(self.application)
+        self.assertEqual(path, f'{self.application.pk}/{fingerprint}.pdf')
+        self.assertEqual(self._cached_files(), [f'{fingerprint}.pdf'])
+
+    def test_download_survives_concurrent_invalidate(self):
+        self.client.get(self.url)
+        storage_open = certificates.cache_storage.open
+
+        def open_after_invalidate(path, mode='rb'):
+            certificates.invalidate(self.application.pk)
+            return storage_open(path, mode)
+
+        with mock.patch.object(certificates.cache_storage, 'open', side_effect=open_after_invalidate):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+        # An open handle keeps serving after the file is removed
+        pdf, _fingerprint, _modified = certificates.open_cached_certificate(self.application)
+        certificates.invalidate(self.application.pk)
+        with pdf:
+            self.assertTrue(pdf.read().startswith(b'%PDF'))
+
+    def test_conditional_request_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_certificate_change_invalidates_cache(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(len(self._cached_files()), 1)
+
+        self.cert.child_name = 'Asha Patil'
+        self.cert.save()
+        self.assertEqual(self._cached_files(), [])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+# ============================================
+# BULK CERTIFICATE PRINTING
+# ============================================
+
+class BulkCertificateTests(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        overrider = override_settings(CERTIFICATE_CACHE_DIR=self.cache_dir)
+        overrider.enable()
+        self.addCleanup(overrider.disable)
+
+        self.citizen = make_user('citizen1', village='Shivapur')
+        other = make_user('citizen2', village='Rampur')
+        self.approved = [make_birth_application(self.citizen, child_name=f'Child {i}') for i in range(3)]
+        make_birth_application(self.citizen, status='pending')
+        make_birth_application(other)
+        make_tax_application(self.citizen, status='approved')
+        Application.objects.update(reviewed_date=timezone.now())
+
+    def test_select_certificates_filters(self):
+        selected = bulk_certificates.select_certificates(village='shivapur')
+        self.assertEqual(list(selected), self.approved)
+        self.assertFalse(bulk_certificates.select_certificates(application_types=['income_certificate']))
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        self.assertFalse(bulk_certificates.select_certificates(date_from=tomorrow))
+
+    def test_zip_contains_one_pdf_per_certificate(self):
+        output = BytesIO()
+        ids = [application.pk for application in self.approved]
+        self.assertEqual(bulk_certificates.write_zip(ids, output, workers=1, chunk_size=2), 3)
+        with zipfile.ZipFile(output) as archive:
+            names = archive.namelist()
+            self.assertEqual(
+                names,
+                [f'certificate_{application.application_number}.pdf' for application in self.approved],
+            )
+            self.assertTrue(archive.read(names[0]).startswith(b'%PDF'))
+
+    def test_merged_pdf(self):
+        output = BytesIO()
+        ids = [application.pk for application in self.approved]
+        self.assertEqual(bulk_certificates.write_merged_pdf(ids, output, workers=1), 3)
+        self.assertTrue(output.getvalue().startswith(b'%PDF'))
+
+    def test_merged_pdf_without_pypdf(self):
+        ids = [application.pk for application in self.approved]
+        with mock.patch.dict(sys.modules, {'pypdf': None}):
+            with self.assertRaises(ImproperlyConfigured):
+                bulk_certificates.write_merged_pdf(ids, BytesIO(), workers=4)
+            output = BytesIO()
+            with self.assertLogs('portal_app.bulk_certificates', 'WARNING'):
+                self.assertEqual(bulk_certificates.write_merged_pdf(ids, output), 3)
+        self.assertTrue(output.getvalue().startswith(b'%PDF'))
+
+    def test_parallel_workers_set_up_django(self):
+        ids = [application.pk for application in self.approved]
+        with mock.patch.object(bulk_certificates, 'connection', in_atomic_block=False), \
+                mock.patch.object(bulk_certificates, 'connections'), \
+                mock.patch.object(bulk_certificates, 'ProcessPoolExecutor') as executor:
+            executor.return_value.__enter__.return_value.map.return_value = [[('a.pdf', b'%PDF')]]
+            self.assertEqual(list(bulk_certificates.iter_rendered(ids, workers=2, chunk_size=2)), [('a.pdf', b'%PDF')])
+        self.assertIs(executor.call_args.kwargs['initializer'], bulk_certificates._init_worker)
+
+    def test_admin_action_renders_in_process(self):
+        from django.contrib.admin.sites import site
+
+        request = RequestFactory().post('/')
+        queryset = Application.objects.filter(applicant=self.citizen)
+        with mock.patch.object(
+            bulk_certificates, 'write_certificates', wraps=bulk_certificates.write_certificates
+        ) as write:
+            response = site._registry[Application].print_certificates_zip(request, queryset)
+        self.assertEqual(write.call_args.kwargs['workers'], 1)
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(len(archive.namelist()), 3)
+
+    def test_command_writes_output(self):
+        path = f'{self.cache_dir}/out.zip'
+        call_command('print_certificates', '--village', 'Shivapur', '--output', path, stdout=StringIO())
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(len(archive.namelist()), 3)
+
+
+# ============================================
+# DATA EXPORTS
+# ============================================
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('admin1', role='admin')
+        self.citizen = make_user('citizen1', village='Shivapur')
+        self.birth = make_birth_application(self.citizen)
+        self.tax = make_tax_application(self.citizen, status='pending')
+        make_complaint(self.citizen)
+        assigned = make_complaint(self.citizen, priority='urgent')
+        assigned.assigned_to = self.admin
+        assigned.subject = '=HYPERLINK("http://example.com")'
+        assigned.save()
+        self.client.force_login(self.admin)
+
+    def _csv(self, response):
+        body = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(StringIO(body)))
+
+    def test_application_csv_respects_filters(self):
+        response = self.client.get(reverse('export_applications'), {'status': 'approved'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="applications_', response['Content-Disposition'])
+
+        header, *rows = self._csv(response)
+        self.assertEqual(len(rows), 1)
+        row = dict(zip(header, rows[0]))
+        self.assertEqual(row['Application Number'], self.birth.application_number)
+        self.assertEqual(row['Certificate Number'], self.birth.birth_certificate.certificate_number)
+        self.assertEqual(row['Village'], 'Shivapur')
+
+    def test_application_export_query_count_is_constant(self):
+        for i in range(5):
+            make_birth_application(self.citizen, child_name=f'Child {i}')
+        # One query for the rows; detail rows come from select_related
+        with self.assertNumQueries(1):
+            rows = list(exports.application_rows(Application.objects.all()))
+        self.assertEqual(len(rows), 1 + Application.objects.count())
+        tax_row = next(row for row in rows if row[0] == self.tax.application_number)
+        self.assertIn(f'PROP{self.tax.pk}', tax_row)
+
+    def test_complaint_csv_escapes_formulas(self):
+        response = self.client.get(reverse('export_complaints'), {'priority': 'urgent'})
+        header, *rows = self._csv(response)
+        self.assertEqual(len(rows), 1)
+        row = dict(zip(header, rows[0]))
+        self.assertTrue(row['Subject'].startswith("'="))
+
+    def test_complaint_xlsx(self):
+        response = self.client.get(reverse('export_complaints'), {'format': 'xlsx', 'assigned': 'unassigned'})
+        self.assertEqual(
+            response['Content-Type'],
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as workbook:
+            self.assertIn('xl/workbook.xml', workbook.namelist())
+            sheet = workbook.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertEqual(sheet.count('<row>'), 2)
+        self.assertIn('Complaint Number', sheet)
+
+
+# ============================================
+# QUERY BUDGETS
+# ============================================
+
+class QueryBudgetMixin:
+    """
+    Per-view query budgets checked against a growing dataset
+
+    Subclasses implement seed(), which adds one more batch of rows.
+    assertQueryBudget() requests the URL, seeds another batch, requests
+    it again and fails if the query count grew (an N+1) or exceeds the
+    budget. A warm-up request first fills caches so both measured
+    requests see the same cache state.
+    """
+
+    def seed(self):
+        raise NotImplementedError
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries), queries
+
+    def assertQueryBudget(self, url, budget):
+        self._count_queries(url)
+        before, _ = self._count_queries(url)
+        self.seed()
+        after, queries = self._count_queries(url)
+        details = '\n'.join(query['sql'] for query in queries.captured_queries)
+        self.assertEqual(before, after, f'{url} query count grows with data:\n{details}')
+        self.assertLessEqual(after, budget, f'{url} exceeds its query budget:\n{details}')
+
+
+class ViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.admin = make_user('admin1', role='admin', is_staff=True, is_superuser=True)
+        self.citizen = make_user('citizen1')
+        self.application = make_birth_application(self.citizen)
+        self.complaint = make_complaint(self.citizen)
+        self.batch = 0
+        self.seed()
+
+    def seed(self):
+        """Another applicant, reviewer and history row for every listing"""
+        self.batch += 1
+        staff = make_user(f'staff{self.batch}', role='staff')
+        other = make_user(f'other{self.batch}')
+        for applicant in (self.citizen, other):
+            application = make_birth_application(applicant, child_name=f'Child {self.batch}')
+            application.reviewed_by = staff
+            application.save()
+            complaint = make_complaint(applicant)
+            complaint.assigned_to = staff
+            complaint.save()
+        ApplicationStatusHistory.objects.create(
+            application=self.application, old_status='pending', new_status='approved', changed_by=staff,
+        )
+        ComplaintHistory.objects.create(
+            complaint=self.complaint, action='assigned', new_value=str(staff), performed_by=staff,
+        )
+
+    # Budgets include 2 queries to load the session and user; the session
+    # row is not rewritten on these requests (portal_app.session_store)
+
+    def test_citizen_views(self):
+        self.client.force_login(self.citizen)
+        budgets = [
+            (reverse('dashboard'), 5),
+            (reverse('my_applications'), 4),
+            (reverse('application_detail', args=[self.application.pk]), 3),
+            (reverse('my_complaints'), 5),
+            (reverse('complaint_detail', args=[self.complaint.pk]), 4),
+            # Status and the per-IP limit counter both live in the cache
+            (reverse('track_application') + f'?app_number={self.application.application_number}', 2),
+        ]
+        for url, budget in budgets:
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, budget)
+
+    def test_staff_views(self):
+        self.client.force_login(self.admin)
+        budgets = [
+            (reverse('admin_dashboard'), 16),
+            (reverse('admin_applications'), 4),
+            (reverse('admin_review_application', args=[self.application.pk]), 3),
+            (reverse('admin_complaints'), 5),
+            (reverse('admin_update_complaint', args=[self.complaint.pk]), 4),
+            (reverse('export_applications'), 3),
+            (reverse('export_complaints'), 3),
+        ]
+        for url, budget in budgets:
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, budget)
+
+    def test_django_admin_changelists(self):
+        self.client.force_login(self.admin)
+        for model in ('application', 'birthcertificate', 'complaint',
+                      'applicationstatushistory', 'complainthistory'):
+            with self.subTest(model=model):
+                self.assertQueryBudget(reverse(f'admin:portal_app_{model}_changelist'), 6)
+
+
+# ============================================
+# SESSIONS
+# ============================================
+
+class SessionStoreTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        store = session_store.SessionStore()
+        store['user'] = 'citizen1'
+        store.save(must_create=True)
+        self.key = store.session_key
+
+    def _count_queries(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        return len(queries)
+
+    def test_expiry_only_save_is_skipped(self):
+        store = session_store.SessionStore(self.key)
+        self.assertEqual(store['user'], 'citizen1')
+        self.assertEqual(self._count_queries(store.save), 0)
+
+    def test_data_change_is_written(self):
+        store = session_store.SessionStore(self.key)
+        store['theme'] = 'dark'
+        store.save()
+        self.assertEqual(session_store.SessionStore(self.key)['theme'], 'dark')
+
+    def test_expiry_refreshed_past_threshold(self):
+        stale = timezone.now() + timedelta(seconds=60)
+        Session.objects.filter(pk=self.key).update(expire_date=stale)
+        store = session_store.SessionStore(self.key)
+        store.load()
+        store.save()
+        self.assertGreater(Session.objects.get(pk=self.key).expire_date, stale + session_store.refresh_threshold())
+
+    @override_settings(SESSION_WRITE_BEHIND=True)
+    def test_write_behind_reads_from_cache(self):
+        session_store.SessionStore(self.key).load()  # fills the cache
+        store = session_store.SessionStore(self.key)
+        self.assertEqual(self._count_queries(store.load), 0)
+        self.assertEqual(self._count_queries(store.save), 0)
+
+        store.flush()
+        self.assertFalse(Session.objects.filter(pk=self.key).exists())
+        self.assertEqual(session_store.SessionStore(self.key).load(), {})
+
+    def test_logged_in_requests_do_not_rewrite_session(self):
+        citizen = make_user('citizen1')
+        self.client.force_login(citizen)
+        self.client.get(reverse('dashboard'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('dashboard'))
+        writes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "django_session"')]
+        self.assertEqual(writes, [])
+
+    def test_purge_sessions_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=1))
+        # Expired, but within the refresh threshold: kept by default
+        Session.objects.create(session_key='recent', session_data='', expire_date=now - timedelta(seconds=10))
+
+        out = StringIO()
+        call_command('purge_sessions', '--batch-size', '2', stdout=out)
+        self.assertIn('Deleted 5 expired session(s)', out.getvalue())
+        self.assertEqual(set(Session.objects.values_list('pk', flat=True)), {self.key, 'recent'})
+
+        call_command('purge_sessions', '--grace', '0', stdout=StringIO())
+        self.assertEqual(list(Session.objects.values_list('pk', flat=True)), [self.key])
+
+
+# ============================================
+# KEYSET PAGINATION
+# ============================================
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.citizen = make_user('citizen1')
+        self.applications = [make_application(self.citizen) for _ in range(25)]
+        # Identical timestamps for a run of rows: the id tiebreaker must hold
+        Application.objects.filter(pk__lte=self.applications[12].pk).update(
+            applied_date=self.applications[0].applied_date
+        )
+        self.expected = list(
+            Application.objects.order_by('-applied_date', '-id').values_list('id', flat=True)
+        )
+        self.factory = RequestFactory()
+
+    def _page(self, query='', **kwargs):
+        return pagination.cursor_paginate(
+            self.factory.get('/?' + query), Application.objects.all(), 10, 'applied_date', **kwargs
+        )
+
+    def test_walk_forward_and_back(self):
+        pages = [self._page()]
+        while pages[-1].has_next():
+            pages.append(self._page(pages[-1].next_query))
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([app.pk for page in pages for app in page], self.expected)
+        self.assertFalse(pages[0].has_previous())
+
+        back = self._page(pages[2].previous_query)
+        self.assertEqual([app.pk for app in back], [app.pk for app in pages[1]])
+        self.assertTrue(back.has_next())
+        first = self._page(back.previous_query)
+        self.assertEqual([app.pk for app in first], self.expected[:10])
+        self.assertFalse(first.has_previous())
+
+    def test_links_keep_filters_and_drop_page(self):
+        page = self._page('status=pending&page=3')
+        self.assertIn('status=pending', page.next_query)
+        self.assertNotIn('page=', page.next_query)
+
+    def test_capped_total(self):
+        self.assertEqual(self._page().total_display, '25')
+        self.assertEqual(self._page(count_limit=20).total_display, '20+')
+        self.assertEqual(self._page(count_limit=0).total_display, '')
+
+    def test_invalid_cursor_starts_over(self):
+        page = self._page('cursor=not-a-cursor')
+        self.assertEqual([app.pk for app in page], self.expected[:10])
+
+    def test_listing_views(self):
+        self.client.force_login(self.citizen)
+        response = self.client.get(reverse('my_applications'))
+        self.assertTrue(response.context['page_obj'].is_cursor)
+        self.assertContains(response, '?cursor=')
+        # Old ?page= links keep working
+        response = self.client.get(reverse('my_applications'), {'page': 2})
+        self.assertEqual(response.context['page_obj'].number, 2)
+
+
+# ============================================
+# FULL-TEXT SEARCH
+# ============================================
+
+@override_settings(SEARCH_BACKEND='inverted')
+class SearchIndexTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('admin1', role='admin', is_staff=True, is_superuser=True,
+                               first_name='Sunita', last_name='Patil')
+        self.citizen = make_user('ramesh', first_name='Ramesh', last_name='Kale', village='Shivapur')
+        self.complaint = make_complaint(self.citizen)
+        self.complaint.subject = 'Street light broken near temple'
+        self.complaint.description = 'The street light on the temple road has been dark for a week'
+        self.complaint.save()
+        self.birth = make_birth_application(self.citizen, child_name='Ananya')
+
+    def _titles(self, query, **kwargs):
+        return [result.title for result in search.search(query, **kwargs)]
+
+    def test_objects_are_indexed_on_save(self):
+        self.assertEqual(
+            set(SearchDocument.objects.values_list('kind', flat=True)),
+            {'complaint', 'application', 'user'},
+        )
+        results = search.search('ananya')
+        self.assertEqual([(r.kind, r.object_id) for r in results], [('application', self.birth.pk)])
+        self.assertEqual(search.search('shivapur')[0].object_id, self.citizen.pk)
+        self.assertEqual(search.search(self.citizen.phone_number)[0].kind, 'user')
+
+    def test_tax_applications_are_found_by_property(self):
+        tax = make_tax_application(self.citizen)
+        results = search.search(f'prop{tax.pk}')
+        self.assertEqual([(r.kind, r.object_id) for r in results], [('application', tax.pk)])
+
+    def test_all_terms_must_match_and_last_is_prefix(self):
+        self.assertEqual(len(search.search('street temple')), 1)
+        self.assertEqual(len(search.search('street tem')), 1)
+        self.assertEqual(search.search('street mosque'), [])
+        self.assertEqual(search.search('   '), [])
+
+    def test_title_matches_rank_higher(self):
+        other = make_complaint(self.citizen)
+        other.subject = 'Garbage pile'
+        other.description = 'Garbage lying next to the broken street light'
+        other.save()
+        results = search.search('street light', kinds=['complaint'])
+        self.assertEqual([r.object_id for r in results], [self.complaint.pk, other.pk])
+        self.assertGreater(results[0].score, results[1].score)
+
+    def test_updates_and_deletes_are_incremental(self):
+        self.complaint.subject = 'Handpump leaking'
+        self.complaint.save()
+        self.assertEqual(self._titles('handpump'), [f'{self.complaint.complaint_number} Handpump leaking'])
+        self.assertEqual(search.search('temple road', kinds=['complaint'])[0].title,
+                         self._titles('handpump')[0])
+
+        birth_cert = self.birth.birth_certificate
+        birth_cert.child_name = 'Kavya'
+        birth_cert.save()
+        self.assertEqual(search.search('ananya'), [])
+        self.assertEqual(search.search('kavya')[0].object_id, self.birth.pk)
+
+        self.complaint.delete()
+        self.assertEqual(search.search('handpump'), [])
+        self.assertFalse(SearchTerm.objects.filter(term='handpump').exists())
+
+    def test_unrelated_saves_skip_reindexing(self):
+        with self.assertNumQueries(1):
+            self.citizen.last_login = timezone.now()
+            self.citizen.save(update_fields=['last_login'])
+
+    def test_rebuild_command(self):
+        SearchDocument.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('complaint: 1 document(s)', out.getvalue())
+        self.assertEqual(search.search('kale')[0].object_id, self.citizen.pk)
+        self.assertEqual(len(search.search('street light')), 1)
+
+    def test_staff_search_page(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin_search'), {'q': 'street light'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.complaint.complaint_number)
+        self.assertContains(response, reverse('admin_update_complaint', args=[self.complaint.pk]))
+
+        response = self.client.get(reverse('admin_search'), {'q': 'ramesh', 'kind': 'application'})
+        self.assertEqual(response.context['results'], [])
+
+        self.client.force_login(self.citizen)
+        response = self.client.get(reverse('admin_search'), {'q': 'street'})
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_admin_changelist_uses_index(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:portal_app_birthcertificate_changelist'), {'q': 'anan'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+        # Terms outside the index fall back to search_fields
+        response = self.client.get(reverse('admin:portal_app_application_changelist'),
+                                   {'q': 'ramesh@example.com'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_admin_changelist_keeps_substring_matches(self):
+        from portal_app.admin import CustomUserAdmin
+
+        make_user('suramesh', first_name='Suresh')
+        make_user('rameshwar', first_name='Ramesh')
+        self.client.force_login(self.admin)
+        url = reverse('admin:portal_app_customuser_changelist')
+        # The index finds ramesh and rameshwar; only icontains finds suramesh
+        response = self.client.get(url, {'q': 'ramesh'})
+        self.assertEqual(response.context['cl'].result_count, 3)
+        # Index hits cut off at search_limit do not hide search_fields matches
+        with mock.patch.object(CustomUserAdmin, 'search_limit', 1):
+            response = self.client.get(url, {'q': 'ramesh'})
+        self.assertEqual(response.context['cl'].result_count, 3)
+
+
+class VendorSearchChecks:
+    """Search behaviour every database backend must share"""
+
+    def setUp(self):
+        self.admin = make_user('admin1', role='admin', is_staff=True, is_superuser=True)
+        self.citizen = make_user('ramesh', first_name='Ramesh', last_name='Kale', village='Shivapur')
+        self.complaint = make_complaint(self.citizen)
+        self.complaint.subject = 'Street light broken near temple'
+        self.complaint.description = 'The street light on the temple road has been dark for a week'
+        self.complaint.save()
+        self.other = make_complaint(self.citizen)
+        self.other.subject = 'Garbage pile'
+        self.other.description = 'Garbage lying next to the broken street light'
+        self.other.save()
+
+    def test_all_terms_must_match_and_last_is_prefix(self):
+        self.assertEqual(len(search.search('temple street')), 1)
+        self.assertEqual(len(search.search('street tem')), 1)
+        self.assertEqual(search.search('street mosque'), [])
+
+    def test_title_matches_rank_higher(self):
+        results = search.search('street light', kinds=['complaint'])
+        self.assertEqual([r.object_id for r in results], [self.complaint.pk, self.other.pk])
+
+    def test_admin_changelist_unions_index_hits(self):
+        make_user('suramesh')
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:portal_app_customuser_changelist'), {'q': 'ramesh'})
+        self.assertEqual(response.context['cl'].result_count, 2)
+        response = self.client.get(reverse('admin:portal_app_complaint_changelist'), {'q': 'temple road'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'requires PostgreSQL')
+class PostgresSearchTests(VendorSearchChecks, TestCase):
+    pass
+
+
+@unittest.skipUnless(connection.vendor == 'mysql', 'requires MySQL')
+class MySQLSearchTests(VendorSearchChecks, TransactionTestCase):
+    """InnoDB only updates FULLTEXT indexes on commit"""
+
+
+# ============================================
+# PUBLIC TRACKING
+# ============================================
+
+class TrackingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.citizen = make_user('citizen1', first_name='Asha', last_name='Pawar')
+        self.application = make_application(self.citizen)
+        self.number = self.application.application_number
+
+    def _application_queries(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+        return result, [q for q in queries if 'portal_app_application' in q['sql']]
+
+    def test_found_status_is_cached(self):
+        data, queries = self._application_queries(lambda: tracking.lookup(self.number))
+        self.assertEqual(data['status'], 'pending')
+        self.assertEqual(data['applicant_name'], 'Asha Pawar')
+        self.assertEqual(len(queries), 1)
+        data, queries = self._application_queries(lambda: tracking.lookup(self.number.lower()))
+        self.assertEqual(data['id'], self.application.pk)
+        self.assertEqual(queries, [])
+
+    def test_status_change_invalidates_cache(self):
+        tracking.lookup(self.number)
+        self.application.status = 'approved'
+        self.application.save()
+        self.assertEqual(tracking.lookup(self.number)['status'], 'approved')
+
+    def test_unknown_numbers_are_negatively_cached(self):
+        self.assertIsNone(tracking.lookup('GPBIRT25269999999'))
+        result, queries = self._application_queries(lambda: tracking.lookup('GPBIRT25269999999'))
+        self.assertIsNone(result)
+        self.assertEqual(queries, [])
+        # Malformed input never reaches the database or the cache
+        result, queries = self._application_queries(lambda: tracking.lookup("x' OR 1=1 --"))
+        self.assertIsNone(result)
+        self.assertEqual(queries, [])
+
+    def test_new_application_clears_not_found_entry(self):
+        other = make_user('citizen2')
+        with mock.patch('portal_app.numbering.application_number', return_value='GPWATE25269999999'):
+            self.assertIsNone(tracking.lookup('GPWATE25269999999'))
+            created = make_application(other)
+        self.assertEqual(tracking.lookup('GPWATE25269999999')['id'], created.pk)
+
+    def test_page_and_json_status(self):
+        response = self.client.get(reverse('track_application'), {'app_number': self.number})
+        self.assertContains(response, 'Asha Pawar')
+        self.assertContains(response, reverse('track_application_status'))
+
+        response = self.client.get(reverse('track_application_status'), {'app_number': self.number})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'pending')
+        self.assertNotIn('applicant_name', response.json())
+        self.assertIn('max-age', response['Cache-Control'])
+
+        response = self.client.get(reverse('track_application_status'), {'app_number': 'NOPE'})
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(TRACK_RATE_LIMIT=2, TRACK_RATE_PERIOD=60)
+    def test_lookups_are_throttled_per_ip(self):
+        url = reverse('track_application_status')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url, {'app_number': self.number}).status_code, 200)
+        response = self.client.get(url, {'app_number': self.number})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        response = self.client.get(reverse('track_application'), {'app_number': self.number})
+        self.assertEqual(response.status_code, 429)
+        # Another client is unaffected
+        response = self.client.get(url, {'app_number': self.number}, REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(response.status_code, 200)
+        # Counted in the cache, not the database
+        with self.assertNumQueries(0):
+            self.assertTrue(tracking.allow_lookup('10.0.0.10'))
+
+    @override_settings(TRACK_RATE_LIMIT=1, TRACK_RATE_PERIOD=60)
+    def test_throttle_ignores_spoofed_forwarded_for(self):
+        url = reverse('track_application_status')
+        self.assertEqual(self.client.get(url, {'app_number': self.number}).status_code, 200)
+        response = self.client.get(url, {'app_number': self.number}, HTTP_X_FORWARDED_FOR='10.1.1.1')
+        self.assertEqual(response.status_code, 429)
+
+        # Behind one proxy only the hop it appended counts
+        with self.settings(TRUSTED_PROXY_COUNT=1):
+            forwarded = {'REMOTE_ADDR': '10.0.0.2', 'HTTP_X_FORWARDED_FOR': '10.1.1.1, 10.0.0.3'}
+            self.assertEqual(self.client.get(url, {'app_number': self.number}, **forwarded).status_code, 200)
+            forwarded['HTTP_X_FORWARDED_FOR'] = '10.1.1.2, 10.0.0.3'
+            self.assertEqual(self.client.get(url, {'app_number': self.number}, **forwarded).status_code, 429)
+
+    def test_client_ip_uses_trusted_hops(self):
+        factory = RequestFactory()
+        request = factory.get('/', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.3, 10.0.0.4')
+        self.assertEqual(views.get_client_ip(request), '10.0.0.2')
+        with self.settings(TRUSTED_PROXY_COUNT=2):
+            self.assertEqual(views.get_client_ip(request), '10.0.0.3')
+        with self.settings(TRUSTED_PROXY_COUNT=5):
+            self.assertEqual(views.get_client_ip(request), '1.2.3.4')
+
+
+# ============================================
+# BULK REVIEW
+# ============================================
+
+class BulkReviewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.admin = make_user('admin1', role='admin', is_staff=True, is_superuser=True)
+        self.citizen = make_user('citizen1')
+        self.births = [
+            make_birth_application(self.citizen, status='pending', child_name=f'Child {i}')
+            for i in range(3)
+        ]
+        BirthCertificate.objects.filter(application__in=self.births).update(certificate_number=None)
+        self.tax = make_tax_application(self.citizen)
+        self.already = make_application(self.citizen, status='approved')
+        counters.rebuild_counters()
+
+    def _ids(self):
+        return [app.pk for app in self.births] + [self.tax.pk, self.already.pk]
+
+    def test_bulk_approve(self):
+        tracking.lookup(self.tax.application_number)
+        result = reviews.bulk_review(self._ids(), 'approved', self.admin, remarks='Verified')
+        self.assertEqual(result, {'updated': 4, 'unchanged': 1, 'certificates': 3})
+
+        approved = Application.objects.filter(pk__in=self._ids())
+        self.assertTrue(all(app.status == 'approved' for app in approved))
+        self.assertEqual(
+            set(approved.exclude(pk=self.already.pk).values_list('reviewed_by', 'admin_remarks')),
+            {(self.admin.pk, 'Verified')},
+        )
+        self.assertEqual(
+            ApplicationStatusHistory.objects.filter(new_status='approved', changed_by=self.admin).count(), 4
+        )
+        numbers = list(BirthCertificate.objects.filter(application__in=self.births)
+                       .values_list('certificate_number', flat=True))
+        self.assertEqual(len(set(numbers)), 3)
+        self.assertTrue(all(numbers))
+        self.assertEqual(counters.find_drift(), {})
+        # Side effects normally done by post_save
+        self.assertEqual(tracking.lookup(self.tax.application_number)['status'], 'approved')
+        self.assertEqual(search.search(numbers[0])[0].object_id,
+                         BirthCertificate.objects.get(certificate_number=numbers[0]).application_id)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        # First review creates the 'rejected' counter rows
+        reviews.bulk_review([self.births[0].pk], 'rejected', self.admin)
+        with CaptureQueriesContext(connection) as small:
+            reviews.bulk_review([self.births[1].pk], 'rejected', self.admin)
+        with CaptureQueriesContext(connection) as large:
+            reviews.bulk_review([self.births[2].pk, self.tax.pk], 'rejected', self.admin)
+        self.assertEqual(len(small), len(large))
+
+    def test_rejects_unknown_status(self):
+        with self.assertRaises(ValueError):
+            reviews.bulk_review(self._ids(), 'pending', self.admin)
+
+    def test_bulk_review_view(self):
+        self.client.force_login(self.admin)
+        listing = reverse('admin_applications') + '?status=pending'
+        response = self.client.post(reverse('admin_bulk_review'), {
+            'application_ids': [self.tax.pk, self.births[0].pk],
+            'status': 'rejected',
+            'next': listing,
+        })
+        self.assertRedirects(response, listing, fetch_redirect_response=False)
+        self.assertEqual(
+            Application.objects.filter(pk__in=[self.tax.pk, self.births[0].pk], status='rejected').count(), 2
+        )
+
+        response = self.client.post(reverse('admin_bulk_review'), {
+            'application_ids': [self.births[1].pk], 'status': 'bogus', 'next': 'https://evil.example/',
+        })
+        self.assertRedirects(response, reverse('admin_applications'), fetch_redirect_response=False)
+        self.assertEqual(Application.objects.get(pk=self.births[1].pk).status, 'pending')
+
+        self.client.force_login(self.citizen)
+        self.client.post(reverse('admin_bulk_review'), {'application_ids': [self.births[1].pk], 'status': 'approved'})
+        self.assertEqual(Application.objects.get(pk=self.births[1].pk).status, 'pending')
+
+    def test_admin_action(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('admin:portal_app_application_changelist'), {
+            'action': 'approve_selected',
+            '_selected_action': [app.pk for app in self.births],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Application.objects.filter(pk__in=[a.pk for a in self.births], status='approved').count(), 3)
+
+
+# ============================================
+# ROLE-BASED ACCESS
+# ============================================
+
+class RoleAccessTests(TestCase):
+
+    ROLES = ('citizen', 'staff', 'admin')
+
+    def setUp(self):
+        self.users = {role: make_user(f'{role}1', role=role) for role in self.ROLES}
+        self.middleware = RoleBasedAccessMiddleware(lambda request: None)
+
+    def test_table_matches_view_decorators(self):
+        declared = {
+            pattern.name: frozenset(pattern.callback.allowed_roles)
+            for pattern in portal_urls.urlpatterns
+            if hasattr(pattern.callback, 'allowed_roles')
+        }
+        compiled = {name: roles for name, roles in compile_route_roles().items() if ':' not in name}
+        self.assertEqual(compiled, declared)
+
+    def test_staff_pages_declare_roles(self):
+        # A staff page without a role decorator would be open to citizens
+        for pattern in portal_urls.urlpatterns:
+            if str(pattern.pattern).startswith('admin'):
+                with self.subTest(name=pattern.name):
+                    self.assertIn(pattern.name, self.middleware.route_roles)
+
+    def test_middleware_agrees_with_decorators(self):
+        factory = RequestFactory()
+        for pattern in portal_urls.urlpatterns:
+            allowed = getattr(pattern.callback, 'allowed_roles', None)
+            if allowed is None:
+                continue
+            path = reverse(pattern.name, args=[1] * len(pattern.pattern.converters))
+            for role, user in self.users.items():
+                with self.subTest(name=pattern.name, role=role):
+                    request = factory.get(path)
+                    request.user = user
+                    request.session = self.client.session
+                    request._messages = FallbackStorage(request)
+                    request.resolver_match = resolve(path)
+                    response = self.middleware.process_view(request, request.resolver_match.func, (), {})
+                    self.assertEqual(response is None, role in allowed)
+
+    def test_staff_reach_staff_pages(self):
+        self.client.force_login(self.users['staff'])
+        self.assertEqual(self.client.get(reverse('admin_applications')).status_code, 200)
+        response = self.client.get(reverse('apply_birth_certificate'))
+        self.assertRedirects(response, reverse('home'), fetch_redirect_response=False)
+
+    def test_citizens_kept_out_of_staff_pages(self):
+        self.client.force_login(self.users['citizen'])
+        response = self.client.get(reverse('admin_applications'), follow=True)
+        self.assertRedirects(response, reverse('home'))
+        self.assertContains(response, 'Access denied')
+
+
+# ============================================
+# PERFORMANCE INSTRUMENTATION
+# ============================================
+
+@override_settings(PERFORMANCE_INSTRUMENTATION=True)
+class InstrumentationTests(TestCase):
+
+    def setUp(self):
+        instrumentation.registry.reset()
+        self.citizen = make_user('citizen1')
+        self.admin = make_user('admin1', role='admin')
+        make_birth_application(self.citizen)
+
+    def test_server_timing_header(self):
+        self.client.force_login(self.citizen)
+        with self.assertLogs('portal_app.instrumentation', 'INFO') as logs:
+            response = self.client.get(reverse('my_applications'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+$')
+
+        record = logs.records[-1].performance
+        self.assertEqual(record['view'], 'my_applications')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['db_queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertEqual(record['response_bytes'], len(response.content))
+
+    def test_metrics_endpoint(self):
+        self.client.force_login(self.citizen)
+        for _ in range(3):
+            self.client.get(reverse('my_applications'))
+
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 302)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        body = response.content.decode()
+        self.assertIn('# TYPE portal_request_duration_seconds summary', body)
+        self.assertIn('portal_request_duration_seconds_count{view="my_applications"} 3', body)
+        self.assertIn('portal_request_db_queries{view="my_applications",quantile="0.99"}', body)
+        self.assertIn('portal_requests_total{view="my_applications",status="200"} 3', body)
+
+    @override_settings(PERFORMANCE_INSTRUMENTATION=False)
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse('home'))
+        self.assertNotIn('Server-Timing', response)
+
+
+# ============================================
+# LOAD-TEST DATA GENERATOR
+# ============================================
+
+class GenerateLoadDataTests(TestCase):
+
+    def _generate(self, prefix, seed=5):
+        call_command(
+            'generate_load_data', '--citizens', '30', '--staff', '3', '--applications', '200',
+            '--complaints', '80', '--batch-size', '64', '--seed', str(seed), '--prefix', prefix,
+            '--until', '2026-03-31', stdout=StringIO(),
+        )
+
+    def test_generates_consistent_data(self):
+        self._generate('gen')
+        self.assertEqual(CustomUser.objects.filter(username__startswith='gen_citizen').count(), 30)
+        self.assertEqual(Application.objects.count(), 200)
+        self.assertEqual(Complaint.objects.count(), 80)
+        self.assertEqual(Application.objects.filter(status_history__isnull=True).count(), 0)
+        self.assertEqual(Complaint.objects.filter(history__isnull=True).count(), 0)
+        for application in Application.objects.with_details():
+            self.assertIsNotNone(application.get_detail(), application.application_type)
+        self.assertFalse(
+            BirthCertificate.objects.filter(application__status='approved', certificate_number='').exists()
+        )
+        self.assertFalse(TaxPayment.objects.filter(payment_status='pending', receipt_number__isnull=False).exists())
+        self.assertGreater(Application.objects.values('status').distinct().count(), 2)
+        self.assertLessEqual(Application.objects.latest('applied_date').applied_date.date(), date(2026, 3, 31))
+        self.assertEqual(counters.find_drift(), {})
+        self.assertTrue(self.client.login(username='gen_citizen0', password='Load@12345'))
+
+    def test_seed_is_reproducible(self):
+        self._generate('one')
+        first = list(Application.objects.order_by('pk').values_list('application_type', 'status', 'applied_date'))
+        Application.objects.all().delete()
+        self._generate('two')
+        second = list(Application.objects.order_by('pk').values_list('application_type', 'status', 'applied_date'))
+        self.assertEqual(first, second)
+
+    def test_unpaid_tax_payments_have_no_receipt(self):
+        citizen = make_user('citizen1')
+        first, second = make_tax_application(citizen), make_tax_application(citizen)
+        self.assertIsNone(first.tax_payment.receipt_number)
+        self.assertIsNone(second.tax_payment.receipt_number)
+
+
+# ============================================
+# BENCHMARK SUITE
+# ============================================
+
+class BenchmarkSuiteTests(TestCase):
+
+    def test_suite_runs_and_writes_json(self):
+        citizen = make_user('citizen1')
+        make_user('staff1', role='staff')
+        application = make_birth_application(citizen)
+        output = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        output.close()
+        self.addCleanup(os.remove, output.name)
+
+        out = StringIO()
+        call_command('benchmark_suite', '--iterations', '2', '--warmup', '1', '--password', 'Test@12345',
+                     '--output', output.name, stdout=out)
+        with open(output.name) as fh:
+            results = json.load(fh)
+        self.assertEqual(sorted(results['scenarios']), sorted(
+            ['login', 'citizen_dashboard', 'admin_dashboard', 'admin_applications', 'submit_application',
+             'download_certificate', 'track_application', 'otp_verification']
+        ))
+        for name, result in results['scenarios'].items():
+            with self.subTest(scenario=name):
+                self.assertEqual(result['runs'], 2)
+                if name == 'track_application':
+                    # Status and rate limit counter both come from the cache
+                    self.assertEqual(result['queries_mean'], 0)
+                else:
+                    self.assertGreater(result['queries_mean'], 0)
+                self.assertGreater(result['throughput_rps'], 0)
+
+        # Every scenario was rolled back
+        self.assertEqual(list(Application.objects.values_list('pk', flat=True)), [application.pk])
+        self.assertEqual(CustomUser.objects.count(), 2)
+
+        call_command('benchmark_suite', '--iterations', '1', '--warmup', '0', '--scenario', 'track_application',
+                     '--compare', output.name, stdout=out)
+        self.assertIn('p50', out.getvalue().splitlines()[-1])
+
+
+# ============================================
+# HTTP LOAD TEST
+# ============================================
+
+class LoadTestTests(TestCase):
+
+    def test_parse_mix(self):
+        self.assertEqual(loadtest.parse_mix('apply=3, review=1'), {'register': 0, 'apply': 3.0, 'review': 1.0})
+        for value in ('apply', 'browse=1', 'apply=x', 'apply=-1', 'apply=0'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                loadtest.parse_mix(value)
+
+    def test_page_parsers(self):
+        html = (
+            '<p>GPBIRT26270000042</p>'
+            '<a href="/admin/application/7/review/">Review</a><a href="/admin/application/3/review/">Review</a>'
+            '<a href="/admin/application/7/review/">Review</a>'
+        )
+        self.assertEqual(loadtest.parse_application_number(html), 'GPBIRT26270000042')
+        self.assertIsNone(loadtest.parse_application_number('<p>none</p>'))
+        self.assertEqual(loadtest.parse_review_ids(html), [7, 3])
+
+    def test_stage_summary(self):
+        stats = loadtest.StageStats()
+        stats.add_request('apply', 'login', True, 0.010)
+        stats.add_request('apply', 'apply', False, 0.030)
+        stats.add_outcome('apply', 'failed', 'apply: HTTP 500')
+        stats.add_request('review', 'login', True, 0.020)
+        stats.add_outcome('review', 'empty_queue')
+        summary = stats.summary(2.0)
+        self.assertEqual(summary['requests'], 3)
+        self.assertEqual(summary['error_rate'], 0.3333)
+        self.assertEqual(summary['throughput_rps'], 1.5)
+        self.assertEqual(summary['journeys_completed'], 1)
+        self.assertEqual(summary['journeys'], {'apply': {'failed': 1}, 'review': {'empty_queue': 1}})
+        self.assertEqual(summary['top_errors'], {'apply: HTTP 500': 1})
+        self.assertEqual(summary['steps']['apply.login']['p50_ms'], 10.0)
+
+    def test_registrations_without_aadhar_do_not_collide(self):
+        for index in range(2):
+            response = self.client.post(reverse('register'), {
+                'username': f'newcitizen{index}',
+                'first_name': 'New',
+                'last_name': 'Citizen',
+                'email': f'newcitizen{index}@example.com',
+                'phone_number': f'700000000{index}',
+                'address': 'Ward 1',
+                'village': 'Rampur',
+                'pincode': '411001',
+                'role': 'citizen',
+                'password1': 'Sturdy#Pass91',
+                'password2': 'Sturdy#Pass91',
+            }, REMOTE_ADDR=f'10.0.0.{index + 1}')
+            self.assertRedirects(response, reverse('verify_otp'), fetch_redirect_response=False)
+        self.assertEqual(CustomUser.objects.filter(aadhar_number__isnull=True).count(), 2)
+
+
+@unittest.skipUnless(importlib.util.find_spec('httpx'), 'requires httpx')
+class LoadTestLiveServerTests(LiveServerTestCase):
+
+    def test_stage_runs_every_journey(self):
+        citizen = make_user('load_citizen1')
+        staff = make_user('load_staff1', role='staff')
+        make_birth_application(citizen, status='pending')
+        config = loadtest.LoadTestConfig(
+            self.live_server_url, citizens=[citizen.username], staff=[staff.username],
+            password='Test@12345', seed=3,
+        )
+        config.choose_journey = iter(['register', 'apply', 'review']).__next__
+        stats = loadtest.StageStats()
+        httpx = loadtest.import_httpx()
+
+        async def run():
+            for _ in range(3):
+                await loadtest.run_journey(config, stats, httpx)
+
+        media_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_dir)
+        with self.settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', MEDIA_ROOT=media_dir):
+            asyncio.run(run())
+        summary = stats.summary(1.0)
+        self.assertEqual(summary['top_errors'], {})
+        self.assertEqual(summary['journeys'], {
+            'register': {'completed': 1}, 'apply': {'completed': 1}, 'review': {'completed': 1},
+        })
+        self.assertTrue(CustomUser.objects.get(username__startswith='load_lt_').email_verified)
+        self.assertEqual(Application.objects.filter(status='approved').count(), 1)
+
+
+# ============================================
+# ARCHIVAL
+# ============================================
+
+class ArchiveTests(TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        overrider = override_settings(CERTIFICATE_CACHE_DIR=self.cache_dir)
+        overrider.enable()
+        self.addCleanup(overrider.disable)
+
+        self.citizen = make_user('citizen1')
+        self.staff = make_user('staff1', role='staff')
+        long_ago = timezone.now() - timedelta(days=1000)
+        self.old = make_birth_application(self.citizen)
+        self.old_tax = make_tax_application(self.citizen, status='rejected')
+        self.old_pending = make_application(self.citizen)
+        self.recent = make_birth_application(self.citizen, child_name='Kavya')
+        ApplicationStatusHistory.objects.create(
+            application=self.old, old_status='pending', new_status='approved', changed_by=self.staff,
+        )
+        Application.objects.filter(pk__in=[self.old.pk, self.old_tax.pk, self.old_pending.pk]).update(
+            applied_date=long_ago, reviewed_date=long_ago,
+        )
+        Application.objects.filter(pk=self.old_pending.pk).update(reviewed_date=None)
+
+        self.old_complaint = make_complaint(self.citizen, status='closed')
+        self.open_complaint = make_complaint(self.citizen, status='open')
+        ComplaintHistory.objects.create(complaint=self.old_complaint, action='closed', performed_by=self.staff)
+        Complaint.objects.filter(pk__in=[self.old_complaint.pk, self.open_complaint.pk]).update(
+            filed_date=long_ago, resolved_date=long_ago,
+        )
+        counters.rebuild_counters()
+
+    def test_moves_only_old_closed_records(self):
+        dashboard_before = statistics.get_dashboard_statistics()
+        self.assertEqual(archive.archive_applications(batch_size=1), 2)
+        self.assertEqual(archive.archive_complaints(), 1)
+
+        self.assertEqual(
+            sorted(Application.objects.values_list('pk', flat=True)), sorted([self.old_pending.pk, self.recent.pk])
+        )
+        self.assertEqual(list(Complaint.objects.values_list('pk', flat=True)), [self.open_complaint.pk])
+        self.assertFalse(BirthCertificate.objects.filter(application_id=self.old.pk).exists())
+        self.assertFalse(TaxPayment.objects.filter(application_id=self.old_tax.pk).exists())
+
+        archived = ArchivedApplication.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.application_number, self.old.application_number)
+        self.assertEqual(archived.certificate_number, self.old.birth_certificate.certificate_number)
+        self.assertEqual(archived.detail['child_name'], 'Asha')
+        self.assertEqual(archived.status_history[0]['new_status'], 'approved')
+        self.assertEqual(ArchivedComplaint.objects.get().history[0]['action'], 'closed')
+        self.assertFalse(SearchDocument.objects.filter(kind='application', object_id=self.old.pk).exists())
+
+        # Dashboards and a counter rebuild still count archived records
+        self.assertEqual(statistics.get_dashboard_statistics(), dashboard_before)
+        self.assertEqual(counters.find_drift(), {})
+
+    def test_limit_and_dry_run(self):
+        out = StringIO()
+        call_command('archive_records', '--dry-run', stdout=out)
+        self.assertIn('2 application(s) and 1 complaint(s)', out.getvalue())
+        self.assertFalse(ArchivedApplication.objects.exists())
+
+        call_command('archive_records', '--limit', '1', stdout=out)
+        self.assertEqual(ArchivedApplication.objects.count(), 1)
+        self.assertEqual(ArchivedComplaint.objects.count(), 1)
+        call_command('archive_records', '--days', '2000', stdout=out)
+        self.assertEqual(ArchivedApplication.objects.count(), 1)
+
+    def test_archived_application_is_tracked_and_downloadable(self):
+        url = reverse('download_certificate', args=[self.old.pk])
+        self.client.force_login(self.citizen)
+        live = self.client.get(url)
+        self.assertEqual(live.status_code, 200)
+        live_etag = live['ETag']
+        b''.join(live.streaming_content)
+        archive.archive_applications()
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], live_etag)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+        response = self.client.get(reverse('track_application'), {'app_number': self.old.application_number})
+        self.assertContains(response, self.old.application_number)
+        self.assertContains(response, url)
+        self.assertNotContains(response, reverse('application_detail', args=[self.old.pk]))
+        self.assertTrue(response.context['application']['archived'])
+
+        # Rejected archived applications have no certificate
+        response = self.client.get(reverse('download_certificate', args=[self.old_tax.pk]))
+        self.assertRedirects(
+            response, f"{reverse('track_application')}?app_number={self.old_tax.application_number}",
+            fetch_redirect_response=False,
+        )
+        self.client.force_login(make_user('citizen2'))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+# ============================================
+# STAFF ASSIGNMENT
+# ============================================
+
+class StaffAssignmentTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.citizen = make_user('citizen1', first_name='Sita')
+        self.admin = make_user('admin1', role='admin', first_name='Anil', last_name='Patil')
+        self.staff = make_user('staff1', role='staff', first_name='Sunita', last_name='Jadhav')
+        self.inactive = make_user('staff2', role='staff', first_name='Suresh', is_active=False)
+        self.complaint = make_complaint(self.citizen)
+        assigned = [make_complaint(self.citizen), make_complaint(self.citizen, status='closed')]
+        Complaint.objects.filter(pk__in=[c.pk for c in assigned]).update(assigned_to=self.staff)
+
+    def autocomplete(self, **params):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('staff_autocomplete'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_search_returns_active_staff_with_open_load(self):
+        data = self.autocomplete(q='su')
+        self.assertEqual([item['username'] for item in data['results']], ['staff1'])
+        self.assertEqual(data['results'][0]['open_complaints'], 1)
+        self.assertEqual(data['results'][0]['text'], 'Sunita Jadhav (staff1) · 1 open')
+        self.assertFalse(data['has_more'])
+
+        usernames = [item['username'] for item in self.autocomplete()['results']]
+        self.assertEqual(usernames, ['admin1', 'staff1'])
+
+    def test_search_pages(self):
+        for n in range(assignment.PAGE_SIZE):
+            make_user(f'extra{n:02d}', role='staff', first_name='Zed')
+        first = self.autocomplete(q='zed')
+        self.assertEqual(len(first['results']), assignment.PAGE_SIZE)
+        self.assertFalse(first['has_more'])
+        everyone = self.autocomplete(page='1')
+        self.assertTrue(everyone['has_more'])
+        rest = self.autocomplete(page='2')
+        self.assertEqual(len(rest['results']), 2)
+        # Out-of-range pages are clamped instead of overflowing the OFFSET
+        self.assertEqual(self.autocomplete(page='9' * 30)['page'], assignment.MAX_PAGE)
+        self.assertEqual(self.autocomplete(page='-5')['page'], 1)
+        self.assertEqual(self.autocomplete(page='x')['page'], 1)
+
+    def test_citizens_cannot_search(self):
+        self.client.force_login(self.citizen)
+        response = self.client.get(reverse('staff_autocomplete'))
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_update_page_lists_no_users(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin_update_complaint', args=[self.complaint.pk]))
+        self.assertContains(response, reverse('staff_autocomplete'))
+        self.assertNotContains(response, f'value="{self.citizen.pk}"')
+        self.assertNotContains(response, f'value="{self.staff.pk}"')
+
+    def test_form_accepts_staff_only(self):
+        data = {'status': 'in_progress', 'priority': 'high', 'resolution_remarks': ''}
+        form = ComplaintUpdateForm({**data, 'assigned_to': self.staff.pk}, instance=self.complaint)
+        self.assertTrue(form.is_valid(), form.errors)
+        for user in (self.citizen, self.inactive):
+            form = ComplaintUpdateForm({**data, 'assigned_to': user.pk}, instance=self.complaint)
+            self.assertIn('assigned_to', form.errors)
+
+    def test_deactivated_assignee_stays_selected(self):
+        Complaint.objects.filter(pk=self.complaint.pk).update(assigned_to=self.inactive)
+        complaint = Complaint.objects.select_related('assigned_to').get(pk=self.complaint.pk)
+        form = ComplaintUpdateForm(instance=complaint)
+        self.assertIn('Suresh (staff2)', str(form['assigned_to']))
+        form = ComplaintUpdateForm(
+            {'status': 'open', 'priority': 'medium', 'assigned_to': self.inactive.pk}, instance=complaint,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+
+
+# ============================================
+# CONNECTION POOLING
+# ============================================
+
+class ConnectionPoolTests(TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('portal_app.pooling.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.opened = []
+
+    def make_pool(self, **options):
+        import sqlite3
+
+        def connect():
+            connection = sqlite3.connect(':memory:', check_same_thread=False)
+            self.opened.append(connection)
+            return connection
+
+        pool = pooling.ConnectionPool(connect, name='test', **options)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_reuses_returned_connections(self):
+        pool = self.make_pool(max_size=2)
+        first = pool.getconn()
+        pool.putconn(first)
+        self.assertIs(pool.getconn(), first)
+        second = pool.getconn()
+        self.assertIsNot(second, first)
+        stats = pool.stats()
+        self.assertEqual((stats['opened'], stats['checkouts'], stats['in_use'], stats['idle']), (2, 3, 2, 0))
+        with self.assertRaises(ValueError):
+            pool.putconn(object())
+
+    def test_full_pool_times_out(self):
+        pool = self.make_pool(max_size=1, timeout=0)
+        pool.getconn()
+        with self.assertRaises(pooling.PoolTimeout):
+            pool.getconn()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiting_checkout_gets_returned_connection(self):
+        pool = self.make_pool(max_size=1, timeout=30)
+        held = pool.getconn()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            waiter = executor.submit(pool.getconn)
+            while not pool.stats()['waiting']:
+                pass
+            pool.putconn(held)
+            self.assertIs(waiter.result(timeout=5), held)
+        self.assertEqual(pool.stats()['waits'], 1)
+
+    def test_recycles_old_and_idle_connections(self):
+        pool = self.make_pool(max_size=2, max_lifetime=100, max_idle=10)
+        old = pool.getconn()
+        self.now += 100
+        pool.putconn(old)  # Past its lifetime: closed, not kept
+        self.assertEqual(pool.stats()['idle'], 0)
+
+        idle = pool.getconn()
+        pool.putconn(idle)
+        self.now += 10
+        self.assertIsNot(pool.getconn(), idle)
+        self.assertEqual(pool.stats()['recycled'], 2)
+
+    def test_min_size_connections_survive_idling(self):
+        pool = self.make_pool(min_size=1, max_idle=10)
+        kept = pool.getconn()
+        pool.putconn(kept)
+        self.now += 60
+        self.assertIs(pool.getconn(), kept)
+
+    def test_drops_connections_failing_check_or_reset(self):
+        import sqlite3
+
+        pool = self.make_pool(max_size=1)
+        pool._check = lambda connection: connection.execute('SELECT 1')
+        pool._reset = lambda connection: connection.rollback()
+        broken = pool.getconn()
+        pool.putconn(broken)
+        broken.close()
+        replacement = pool.getconn()
+        self.assertIsNot(replacement, broken)
+        replacement.close()
+        pool.putconn(replacement)  # Reset fails on the closed connection
+        self.assertEqual(pool.stats()['lost'], 2)
+        self.assertEqual(pool.stats()['size'], 0)
+        self.assertIsInstance(pool.getconn(), sqlite3.Connection)
+
+    def test_registry_metrics_and_close(self):
+        pool = self.make_pool()
+        pool.putconn(pool.getconn())
+        self.addCleanup(pooling.close_pool, 'pool-test')
+        self.assertIs(pooling.get_pool(('pool-test', 'db1'), lambda: pool), pool)
+        self.assertIs(pooling.get_pool(('pool-test', 'db1'), self.make_pool), pool)
+
+        self.assertEqual(pooling.pool_stats()['pool-test']['checkouts'], 1)
+        metrics = pooling.render_prometheus()
+        self.assertIn('portal_db_pool_checkouts_total{alias="pool-test"} 1', metrics)
+        self.assertIn('portal_db_pool_idle_connections{alias="pool-test"} 1', metrics)
+
+        # A different database under the same alias replaces the pool
+        replacement = pooling.get_pool(('pool-test', 'db2'), self.make_pool)
+        self.assertIsNot(replacement, pool)
+        self.assertTrue(pool.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_fork_gives_child_fresh_pool(self):
+        pool = self.make_pool()
+        inherited = pool.getconn()
+        pool.putconn(inherited)
+        self.addCleanup(pooling.close_pool, 'pool-test')
+        pooling.get_pool(('pool-test', 'db1'), lambda: pool)
+
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # Child: report whether it got a new pool and connection
+            try:
+                child_pool = pooling.get_pool(('pool-test', 'db1'), self.make_pool)
+                fresh = child_pool is not pool and child_pool.getconn() is not inherited
+                os.write(write_end, b'1' if fresh and not pooling._inherited else b'0')
+            finally:
+                os._exit(0)
+        os.close(write_end)
+        with os.fdopen(read_end, 'rb') as result:
+            self.assertEqual(result.read(), b'1')
+        os.waitpid(pid, 0)
+
+        # The parent closed its pool before forking; the child inherited no sockets
+        self.assertTrue(pool.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+        self.assertNotIn('pool-test', pooling.pool_stats())
+
+    def test_options(self):
+        self.assertEqual(pooling.pool_options(True), pooling.DEFAULTS)
+        self.assertEqual(pooling.pool_options({'max_size': 3})['max_size'], 3)
+        with self.assertRaises(ImproperlyConfigured):
+            pooling.pool_options({'size': 3})
+        with self.assertRaises(ImproperlyConfigured):
+            self.make_pool(min_size=5, max_size=2)
+
+    def test_pooled_settings_for_server_databases(self):
+        from django.conf import settings as django_settings
+        from portal_app.management.commands.benchmark_pooling import mode_settings
+
+        database = {'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': 0, 'OPTIONS': {}}
+        pooled = mode_settings(database, 'pooled', 4)
+        self.assertEqual(pooled['ENGINE'], 'portal_app.backends.postgresql')
+        self.assertEqual(pooled['OPTIONS']['pool']['max_size'], 4)
+        persistent = mode_settings(pooled, 'persistent', 4)
+        self.assertEqual(persistent['ENGINE'], 'django.db.backends.postgresql')
+        self.assertNotIn('pool', persistent['OPTIONS'])
+        self.assertEqual(persistent['CONN_MAX_AGE'], django_settings.DB_CONN_MAX_AGE)
+        self.assertEqual(mode_settings(database, 'connect', 4)['CONN_MAX_AGE'], 0)
+
+    def test_pool_defaults_to_postgresql_only(self):
+        import subprocess
+        from django.conf import settings as django_settings
+
+        script = "from gram_panchayat import settings; print(settings.DATABASES['default']['ENGINE'])"
+        env = {name: value for name, value in os.environ.items() if name not in ('DATABASE_URL', 'DB_POOL')}
+
+        def engine(**extra):
+            return subprocess.run(
+                [sys.executable, '-c', script], env={**env, **extra}, cwd=django_settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+
+        self.assertEqual(engine(), 'django.db.backends.mysql')
+        self.assertEqual(engine(DB_POOL='True'), 'portal_app.backends.mysql')
+        self.assertEqual(engine(DATABASE_URL='postgresql://portal@db/portal'), 'portal_app.backends.postgresql')
+
+
+# ============================================
+# READ REPLICAS
+# ============================================
+
+@override_settings(REPLICA_DATABASES=['replica_test'], REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingTests(TransactionTestCase):
+    """A second SQLite database stands in for the replica, unreplicated"""
+
+    # replica_test is added in setUpClass, before '__all__' is resolved
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.mkdtemp()
+        primary = connections['default'].settings_dict
+        connections.settings['replica_test'] = {
+            **primary,
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.replica_dir, 'replica.sqlite3'),
+            'OPTIONS': {},
+            'TEST': {**primary['TEST'], 'NAME': None, 'MIRROR': None},
+        }
+        call_command('migrate', database='replica_test', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica_test'].close()
+        del connections['replica_test']
+        del connections.settings['replica_test']
+        shutil.rmtree(cls.replica_dir, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.citizen = make_user('citizen1')
+
+    def test_reporting_reads_use_replica(self):
+        with routers.use_replica():
+            self.assertFalse(CustomUser.objects.filter(pk=self.citizen.pk).exists())
+        self.assertTrue(CustomUser.objects.filter(pk=self.citizen.pk).exists())
+        self.assertEqual(statistics.get_user_statistics()['citizens'], 0)
+        with transaction.atomic(), routers.use_replica():
+            self.assertTrue(CustomUser.objects.filter(pk=self.citizen.pk).exists())
+
+    def test_writes_go_to_primary(self):
+        # bulk_create: no signals, which would index the user on the primary
+        CustomUser.objects.using('replica_test').bulk_create([
+            CustomUser(username='mirrored', email='m@example.com', phone_number='9876500000'),
+        ])
+        with routers.use_replica():
+            user = CustomUser.objects.get(username='mirrored')
+            user.address = 'Ward 2'
+            user.save()
+        self.assertEqual(CustomUser.objects.using('default').get(username='mirrored').address, 'Ward 2')
+
+    def test_tracking_reads_replica_unless_pinned(self):
+        application = make_application(self.citizen)
+        url = reverse('track_application_status') + f'?app_number={application.application_number}'
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        cache.clear()
+        self.client.cookies[routers.PIN_COOKIE] = '1'
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_exports_read_replica(self):
+        make_application(self.citizen)
+        self.client.force_login(make_user('admin1', role='admin'))
+        response = self.client.get(reverse('export_applications'))
+        rows = list(csv.reader(b''.join(response.streaming_content).decode('utf-8-sig').splitlines()))
+        self.assertEqual(len(rows), 1)  # Header only
+
+    def test_writes_pin_client_to_primary(self):
+        def view(request):
+            reads = [routers.read_database()]
+            if request.method == 'POST':
+                make_complaint(self.citizen)
+                reads.append(routers.read_database())
+            return HttpResponse(','.join(reads))
+
+        middleware = routers.ReplicaPinMiddleware(view)
+        factory = RequestFactory()
+        response = middleware(factory.get('/'))
+        self.assertEqual(response.content, b'replica_test')
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+        response = middleware(factory.post('/'))
+        self.assertEqual(response.content, b'replica_test,default')
+        self.assertEqual(response.cookies[routers.PIN_COOKIE]['max-age'], 10)
+
+        pinned = factory.get('/')
+        pinned.COOKIES[routers.PIN_COOKIE] = '1'
+        self.assertEqual(middleware(pinned).content, b'default')
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_replicas(self):
+        with routers.use_replica():
+            self.assertTrue(CustomUser.objects.filter(pk=self.citizen.pk).exists())
+        with self.assertRaises(MiddlewareNotUsed):
+            routers.ReplicaPinMiddleware(lambda request: HttpResponse())
+
+
+# ============================================
+# INDEX ADVISOR
+# ============================================
+
+class IndexAdvisorTests(TestCase):
+
+    def columns(self, queryset):
+        columns = index_advisor.query_columns(queryset)
+        return {key: [field.name for field in fields] for key, fields in columns.items()}
+
+    def test_query_columns(self):
+        request = index_advisor._request(None, status='open', priority='urgent')
+        queryset = views._filtered_complaints(request).order_by('-filed_date', '-id')
+        columns = self.columns(queryset)
+        self.assertEqual(sorted(columns['equality']), ['priority', 'status'])
+        self.assertEqual(columns['order'], ['filed_date', 'id'])
+        self.assertEqual(columns['range'], [])
+
+        # Ranges, IN lists, IS NOT NULL; OR branches bound nothing
+        queryset = Complaint.objects.filter(
+            Q(category='road') | Q(category='water'),
+            status__in=['open', 'in_progress'],
+            filed_date__gte=timezone.now(),
+            resolved_date__isnull=False,
+        ).order_by('-id')
+        columns = self.columns(queryset)
+        self.assertEqual(columns['equality'], ['status'])
+        self.assertEqual(columns['multi'], ['status'])
+        self.assertEqual(sorted(columns['range']), ['filed_date', 'resolved_date'])
+        self.assertIn(
+            index_advisor.suggested_fields(index_advisor.query_columns(queryset))[1].name,
+            ['filed_date', 'resolved_date'],
+        )
+
+    def test_coverage(self):
+        columns = index_advisor.query_columns(
+            Complaint.objects.filter(status='open', priority='high').order_by('-filed_date', '-id')
+        )
+
+        def status(*indexes):
+            return index_advisor.coverage(columns, {
+                f'idx{n}': (list(index_columns), False) for n, index_columns in enumerate(indexes)
+            })[0]
+
+        self.assertEqual(status(['filed_date']), index_advisor.MISSING)
+        self.assertEqual(status(['status', 'filed_date']), index_advisor.PARTIAL)
+        self.assertEqual(status(['status', 'priority', 'category']), index_advisor.SORT)
+        self.assertEqual(status(['priority', 'status', 'filed_date', 'id']), index_advisor.COVERED)
+
+        lookup = index_advisor.query_columns(Application.objects.filter(application_number='GP-1'))
+        self.assertEqual(
+            index_advisor.coverage(lookup, {'key': (['application_number'], True)}),
+            (index_advisor.COVERED, 'key'),
+        )
+
+    def test_query_shapes_have_indexes(self):
+        reports = {report['name']: report for report in index_advisor.audit(explain=False)}
+        lacking = [
+            name for name, report in reports.items()
+            if report['status'] in (index_advisor.PARTIAL, index_advisor.MISSING)
+        ]
+        self.assertEqual(lacking, [])
+        for name in (
+            'admin_applications.type_status', 'admin_complaints.priority_status',
+            'admin_complaints.assigned_me', 'admin_dashboard.recent_citizens',
+            'otp.latest_unused', 'assignment.open_loads',
+        ):
+            self.assertEqual(reports[name]['status'], index_advisor.COVERED, name)
+        # One OTP index: the recent-OTP check uses its user prefix
+        self.assertEqual(reports['otp.recent']['index'], reports['otp.latest_unused']['index'])
+
+    def test_partial_indexes_count_when_the_filter_implies_them(self):
+        def usable(queryset):
+            return index_advisor.usable_indexes(queryset)
+
+        pending = usable(Application.objects.filter(status='pending'))
+        self.assertEqual(pending['application_pending_idx'][0], ['status', 'applied_date', 'id'])
+        self.assertNotIn('application_pending_idx', usable(Application.objects.filter(status='approved')))
+        self.assertNotIn('application_pending_idx', usable(Application.objects.all()))
+
+        self.assertIn('complaint_open_assignee_idx', usable(
+            Complaint.objects.filter(assigned_to=1, status__in=['open'])
+        ))
+        self.assertNotIn('complaint_open_assignee_idx', usable(
+            Complaint.objects.filter(assigned_to=1, status__in=['open', 'closed'])
+        ))
+
+    def test_explain_summary(self):
+        shape = next(shape for shape in index_advisor.query_shapes() if shape.name == 'my_complaints')
+        summary = index_advisor.explain_summary(shape.queryset)
+        self.assertTrue(summary['indexes'])
+        self.assertEqual(summary['full_scans'], [])
+
+    def test_command(self):
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'indexes.json')
+            call_command('index_advisor', '--fail-on-missing', '--output', path, stdout=out)
+            with open(path) as fh:
+                report = json.load(fh)
+        self.assertEqual(len(report['shapes']), len(index_advisor.query_shapes()))
+        self.assertIn('Every query shape has a supporting index.', out.getvalue())
+
+        with mock.patch.object(index_advisor, 'table_indexes', return_value={}):
+            out = StringIO()
+            with self.assertRaises(CommandError):
+                call_command('index_advisor', '--shape', 'otp.', '--no-explain', '--fail-on-missing', stdout=out)
+        self.assertIn("add to portal_app_emailotp models.Index(fields=['user', 'created_at'])", out.getvalue())
+
+
+# ============================================
+# DAILY ROLLUPS
+# ============================================
+
+class DailyRollupTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.citizen = make_user('citizen1', village='Rampur')
+        self.staff = make_user('staff1', role='staff')
+        self.today = timezone.localdate()
+
+    def rollups(self, metric):
+        return {
+            (row.day, row.kind, row.village): (row.count, row.amount)
+            for row in DailyRollup.objects.filter(metric=metric) if row.count
+        }
+
+    def test_event_hooks(self):
+        application = make_birth_application(self.citizen, status='pending')
+        counters.record_application_created(application)
+        complaint = make_complaint(self.citizen)
+        counters.record_complaint_created(complaint)
+        self.assertEqual(self.rollups('submitted'), {(self.today, 'birth_certificate', 'Rampur'): (1, 0)})
+        self.assertEqual(self.rollups('complaints'), {(self.today, 'water_supply', 'Rampur'): (1, 0)})
+
+        application = Application.objects.with_details().get(pk=application.pk)
+        application.status, application.reviewed_date = 'approved', timezone.now()
+        reviews.review_application(application, 'pending', None, self.staff)
+        self.assertEqual(self.rollups('approved'), {(self.today, 'birth_certificate', 'Rampur'): (1, 0)})
+        reviews.bulk_review([application.pk], 'rejected', self.staff)
+        self.assertEqual(self.rollups('approved'), {})
+
+        tax_application = make_tax_application(self.citizen)
+        counters.record_application_created(tax_application)
+        payment = tax_application.tax_payment
+        self.assertEqual(self.rollups('collections'), {})
+        payment.payment_status, payment.payment_date = 'paid', timezone.now()
+        payment.save()
+        self.assertEqual(self.rollups('collections'), {(self.today, 'water_tax', 'Rampur'): (1, Decimal('1200'))})
+        payment.payment_date -= timedelta(days=3)
+        payment.late_fee = 100
+        payment.save()
+        self.assertEqual(
+            self.rollups('collections'),
+            {(self.today - timedelta(days=3), 'water_tax', 'Rampur'): (1, Decimal('1300'))},
+        )
+        self.assertEqual(rollups.find_drift(), {})
+
+    def test_rebuild_counts_archived_records(self):
+        application = make_application(self.citizen, 'birth_certificate', 'approved')
+        Application.objects.filter(pk=application.pk).update(
+            reviewed_date=timezone.now() - timedelta(days=800)
+        )
+        make_complaint(self.citizen)
+        self.assertEqual(len(rollups.find_drift()), 3)  # Submitted, approved, complaint
+
+        self.assertEqual(rollups.rebuild_rollups(), 3)
+        self.assertEqual(rollups.find_drift(), {})
+        archive.archive_applications()
+        self.assertFalse(Application.objects.exists())
+        self.assertEqual(rollups.find_drift(), {})
+        self.assertEqual(rollups.rebuild_rollups(), 3)
+
+        # A day range leaves other days alone
+        DailyRollup.objects.create(metric='submitted', day=self.today - timedelta(days=30), kind='x', village='y')
+        rollups.rebuild_rollups(self.today - timedelta(days=2), self.today)
+        self.assertEqual(DailyRollup.objects.count(), 4)
+
+    def test_time_series(self):
+        monday = date(2026, 3, 2)
+        rollups.add('submitted', monday, 'birth_certificate', 'Rampur', 2)
+        rollups.add('submitted', monday + timedelta(days=6), 'water_tax', 'Rampur', 1)
+        rollups.add('submitted', monday + timedelta(days=7), 'birth_certificate', 'Sonpur', 4)
+        rollups.add('submitted', monday + timedelta(days=40), 'birth_certificate', 'Rampur', 8)
+
+        data = rollups.time_series('submitted', 'week', start='2026-03-04', end='2026-03-15')
+        self.assertEqual(data['labels'], ['2026-03-02', '2026-03-09'])
+        self.assertEqual(data['series'], [{'key': 'total', 'label': 'Total', 'counts': [3, 4], 'amounts': None}])
+
+        data = rollups.time_series('submitted', 'month', start='2026-03-01', end='2026-04-30', split='type')
+        self.assertEqual(data['labels'], ['2026-03-01', '2026-04-01'])
+        self.assertEqual(
+            [(series['label'], series['counts']) for series in data['series']],
+            [('Birth Certificate', [6, 8]), ('Water Tax', [1, 0])],
+        )
+
+        data = rollups.time_series(
+            'submitted', 'day', start='2026-03-01', end='2026-03-09', village='Sonpur', split='village'
+        )
+        self.assertEqual([series['counts'][-1] for series in data['series']], [4])
+        self.assertEqual(len(data['labels']), 9)
+
+        # Empty ranges still chart; default ranges end today
+        data = rollups.time_series('collections', 'month')
+        self.assertEqual(len(data['labels']), 12)
+        self.assertEqual(data['end'], self.today.isoformat())
+        self.assertEqual(data['series'][0]['amounts'], [0.0] * 12)
+
+        # Cached
+        with self.assertNumQueries(0):
+            rollups.time_series('submitted', 'week', start='2026-03-04', end='2026-03-15')
+
+        for kwargs in (
+            {'metric': 'visits'}, {'bucket': 'year'}, {'split': 'status'}, {'start': '2026-02-30'},
+            {'start': 'yesterday'}, {'start': '2026-03-10', 'end': '2026-03-01'}, {'start': '2020-01-01'},
+        ):
+            with self.assertRaises(ValueError):
+                rollups.time_series(**{'metric': 'submitted', **kwargs})
+
+    def test_timeseries_view(self):
+        rollups.add('complaints', self.today, 'water_supply', 'Rampur', 2)
+        url = reverse('dashboard_timeseries')
+        self.client.force_login(self.citizen)
+        self.assertNotEqual(self.client.get(url, {'metric': 'complaints'}).status_code, 200)
+
+        self.client.force_login(self.staff)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'metric': 'complaints', 'bucket': 'week'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sum(response.json()['series'][0]['counts']), 2)
+        self.assertIn('private', response['Cache-Control'])
+        for table in ('portal_app_application', 'portal_app_complaint"', 'portal_app_taxpayment'):
+            self.assertFalse(any(table in query['sql'] for query in queries.captured_queries), table)
+
+        response = self.client.get(url, {'metric': 'complaints', 'bucket': 'decade'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('bucket', response.json()['error'])
+
+    def test_rebuild_command(self):
+        make_complaint(self.citizen)
+        out = StringIO()
+        call_command('rebuild_rollups', '--check', stdout=out)
+        self.assertIn('1 rollup(s) out of sync', out.getvalue())
+        call_command('rebuild_rollups', stdout=StringIO())
+        out = StringIO()
+        call_command('rebuild_rollups', '--all', '--check', stdout=out)
+        self.assertIn('in sync', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('rebuild_rollups', '--start', '2026-03-10', '--end', '2026-03-01')
+        with self.assertRaises(CommandError):
+            call_command('rebuild_rollups', '--all', '--start', '2026-03-10')
+        with self.assertRaises(CommandError):
+            call_command('rebuild_rollups', '--loop', '--all')
+
+    def test_rebuild_command_loop(self):
+        make_complaint(self.citizen)
+        with mock.patch('time.sleep', side_effect=KeyboardInterrupt), self.assertRaises(KeyboardInterrupt):
+            call_command('rebuild_rollups', '--loop', stdout=StringIO())
+        self.assertEqual(rollups.find_drift(), {})
+
+    def test_migration_seeds_rollups(self):
+        from django.db.migrations.executor import MigrationExecutor
+
+        make_complaint(self.citizen)
+        make_application(self.citizen, status='approved')
+        DailyRollup.objects.all().delete()
+        state = MigrationExecutor(connection).loader.project_state(('portal_app', '0016_daily_rollups'))
+        rollups.rebuild_rollups(apps=state.apps)
+        self.assertEqual(rollups.find_drift(), {})
@@ -0,0 +1,190 @@
+"""
+Cached Public Application Tracking
+
+The /track/ page and its JSON variant look applications up by number
+without logging in, so they are cheap to hammer. Lookups go through
+the default cache instead of the database:
+- Found applications are cached as a small status snapshot until their
+  next save (signals in portal_app.signals clear the entry) or
+  TRACK_CACHE_TIMEOUT
+- Unknown numbers are cached as "not found" for TRACK_NOT_FOUND_TIMEOUT,
+  so bots probing random numbers do not reach the database either
+- Archived applications (portal_app.archive) are found in the archive
+  table when the live table has no match
+- Malformed numbers are rejected without any lookup
+- Lookups are limited per client IP (TRACK_RATE_LIMIT per
+  TRACK_RATE_PERIOD seconds) via portal_app.rate_limit, counted in
+  TRACK_RATE_LIMIT_BACKEND (the cache) so a hit costs no queries
+- Cache misses read from a replica when configured (portal_app.routers);
+  those entries are kept at most REPLICA_PIN_SECONDS
+"""
+
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.module_loading import import_string
+
+from . import routers
+from .models import Application, ArchivedApplication
+
+
+CACHE_PREFIX = 'track'
+NOT_FOUND = 'not-found'
+
+_limiter = None
+
+_NUMBER_RE = re.compile(r'^[A-Z0-9-]{1,20}$')
+
+
+def normalize_number(application_number):
+    """
+    Canonical form of a user-entered application number
+
+    Returns:
+        str: Upper-cased number, or '' if it cannot be a valid number
+    """
+    number = (application_number or '').strip().upper()
+    return number if _NUMBER_RE.match(number) else ''
+
+
+def _cache_key(number):
+    return f"{CACHE_PREFIX}:{number}"
+
+
+def snapshot(application):
+    """
+    Everything the tracking page shows about an application
+
+    Args:
+        application: Application with applicant loaded
+
+    Returns:
+        dict: Picklable status snapshot
+    """
+    return {
+        'id': application.pk,
+        'application_number': application.application_number,
+        'application_type': application.application_type,
+        'type_display': application.get_application_type_display(),
+        'status': application.status,
+        'status_display': application.get_status_display(),
+        'applied_date': application.applied_date,
+        'reviewed_date': application.reviewed_date,
+        'admin_remarks': application.admin_remarks or '',
+        'applicant_id': application.applicant_id,
+        'applicant_name': application.applicant.get_full_name(),
+        'archived': application.is_archived,
+    }
+
+
+def lookup(application_number):
+    """
+    Status snapshot for an application number, from cache when possible
+
+    Args:
+        application_number (str): Number as entered by the user
+
+    Returns:
+        dict: snapshot() of the application, or None if not found
+    """
+    number = normalize_number(application_number)
+    if not number:
+        return None
+
+    key = _cache_key(number)
+    cached = cache.get(key)
+    if cached == NOT_FOUND:
+        return None
+    if cached is not None:
+        return cached
+
+    database = routers.read_database()
+    application = (
+        Application.objects.using(database).select_related('applicant')
+        .filter(application_number=number)
+        .first()
+    )
+    if application is None:
+        archived = (
+            ArchivedApplication.objects.using(database).select_related('applicant')
+            .filter(application_number=number)
+            .first()
+        )
+        application = archived.as_application() if archived else None
+    found_timeout = settings.TRACK_CACHE_TIMEOUT
+    not_found_timeout = settings.TRACK_NOT_FOUND_TIMEOUT
+    if database != DEFAULT_DB_ALIAS:
+        # A lagging replica may not have the save that just cleared this
+        # entry; keep its answer no longer than replicas are allowed to lag
+        found_timeout = min(found_timeout, settings.REPLICA_PIN_SECONDS)
+        not_found_timeout = min(not_found_timeout, settings.REPLICA_PIN_SECONDS)
+    if application is None:
+        cache.set(key, NOT_FOUND, not_found_timeout)
+        return None
+
+    data = snapshot(application)
+    cache.set(key, data, found_timeout)
+    return data
+
+
+def invalidate(application_number):
+    """
+    Forget the cached status of an application number
+
+    Clears the entry now and again after the surrounding transaction
+    commits, so a lookup racing the save cannot re-cache the old status.
+    """
+    if not application_number:
+        return
+    key = _cache_key(application_number)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def invalidate_many(application_numbers):
+    """Batch form of invalidate() for bulk updates that bypass signals"""
+    keys = [_cache_key(number) for number in application_numbers if number]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def public_status(data):
+    """
+    JSON-safe subset of a snapshot for the polling endpoint
+
+    Returns:
+        dict: Status fields without applicant details
+    """
+    return {
+        'application_number': data['application_number'],
+        'application_type': data['application_type'],
+        'type_display': data['type_display'],
+        'status': data['status'],
+        'status_display': data['status_display'],
+        'applied_date': data['applied_date'].isoformat() if data['applied_date'] else None,
+        'reviewed_date': data['reviewed_date'].isoformat() if data['reviewed_date'] else None,
+        'admin_remarks': data['admin_remarks'],
+    }
+
+
+def allow_lookup(client_ip):
+    """
+    Count one lookup against the client's per-IP limit
+
+    Returns:
+        bool: True if the lookup may go ahead
+    """
+    from .rate_limit import RateLimiter
+
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(backend=import_string(settings.TRACK_RATE_LIMIT_BACKEND)())
+    return _limiter.hit(
+        f"track:{client_ip}",
+        limit=settings.TRACK_RATE_LIMIT,
+        period=settings.TRACK_RATE_PERIOD,
+    )
@@ -11,6 +11,7 @@ urlpatterns = [
     path('about/', views.about, name='about'),
     path('services/', views.services, name='services'),
     path('track/', views.track_application, name='track_application'),
+    path('track/status/', views.track_application_status, name='track_application_status'),
     
     # Authentication URLs
     path('register/', views.register_view, name='register'),
@@ -45,7 +46,16 @@ urlpatterns = [
     # Admin URLs
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('admin/applications/', views.admin_applications, name='admin_applications'),
+    path('admin/applications/export/', views.export_applications, name='export_applications'),
     path('admin/application/<int:application_id>/review/', views.admin_review_application, name='admin_review_application'),
+    path('admin/applications/bulk-review/', views.admin_bulk_review, name='admin_bulk_review'),
     path('admin/complaints/', views.admin_complaints, name='admin_complaints'),
+    path('admin/complaints/export/', views.export_complaints, name='export_complaints'),
     path('admin/complaint/<int:complaint_id>/update/', views.admin_update_complaint, name='admin_update_complaint'),
+    path('admin/search/', views.admin_search, name='admin_search'),
+    path('admin/staff/autocomplete/', views.staff_autocomplete, name='staff_autocomplete'),
+    path('admin/dashboard/timeseries/', views.dashboard_timeseries, name='dashboard_timeseries'),
+    
+    # Performance metrics (Prometheus text format)
+    path('metrics/', views.metrics, name='metrics'),
 ]
@@ -15,23 +15,19 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q, Count
 from django.utils import timezone
-from django.http import HttpResponse, Http404
-from django.core.paginator import Paginator
-from datetime import datetime, timedelta
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from io import BytesIO
+from django.urls import reverse
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag, url_has_allowed_host_and_scheme
+from datetime import datetime
 
 from .models import (
-    CustomUser, Application, BirthCertificate, DeathCertificate,
-    IncomeCertificate, TaxPayment, Complaint, ApplicationStatusHistory,
-    ComplaintHistory
+    CustomUser, Application, Complaint, ApplicationStatusHistory,
+    ComplaintHistory, SearchDocument, ArchivedApplication
 )
 from .forms import (
     CitizenRegistrationForm, UserLoginForm, BirthCertificateForm,
@@ -43,6 +39,9 @@ from .decorators import (
     role_required, admin_required, staff_required, 
     citizen_required, staff_or_admin_required
 )
+from . import (
+    certificates, counters, exports, pagination, reviews, routers, search, statistics, tracking,
+)
 
 
 # ============================================
@@ -50,10 +49,18 @@ from .decorators import (
 # ============================================
 
 def get_client_ip(request):
-    """Best-effort client IP extraction for rate limiting."""
+    """
+    Client IP for rate limiting
+
+    Only the X-Forwarded-For entries appended by the
+    settings.TRUSTED_PROXY_COUNT proxies are trusted: the rightmost hop
+    they recorded, never the spoofable leftmost one.
+    """
+    proxies = settings.TRUSTED_PROXY_COUNT
     forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if forwarded_for:
-        return forwarded_for.split(',')[0].strip()
+    if proxies and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(',')]
+        return hops[-min(proxies, len(hops))]
     return request.META.get('REMOTE_ADDR', '')
 
 def create_status_history(application, old_status, new_status, changed_by, remarks=None):
@@ -69,33 +76,12 @@ def create_status_history(application, old_status, new_status, changed_by, remar
     )
 
 
-def generate_certificate_number(application_type):
-    """
-    Generate unique certificate number
-    Format: CERT{TYPE}{TIMESTAMP}
-    """
-    type_prefix = application_type[:4].upper()
-    timestamp = timezone.now().strftime('%Y%m%d%H%M%S')
-    return f"CERT{type_prefix}{timestamp}"
-
-
 def get_application_statistics(user=None):
     """
     Get application statistics for dashboard
+    Reads the maintained counters instead of scanning Application
     """
-    if user:
-        applications = Application.objects.filter(applicant=user)
-    else:
-        applications = Application.objects.all()
-    
-    stats = {
-        'total': applications.count(),
-        'pending': applications.filter(status='pending').count(),
-        'under_review': applications.filter(status='under_review').count(),
-        'approved': applications.filter(status='approved').count(),
-        'rejected': applications.filter(status='rejected').count(),
-    }
-    return stats
+    return counters.get_application_counts(user)
 
 
 # ============================================
@@ -323,6 +309,7 @@ def logout_view(request):
 # ============================================
 
 @login_required
+@routers.use_replica()
 def dashboard(request):
     """
     Citizen Dashboard - Shows overview of applications and services
@@ -334,11 +321,12 @@ def dashboard(request):
     applications = Application.objects.filter(applicant=request.user)
     
     # Statistics
+    app_stats = get_application_statistics(request.user)
     stats = {
-        'total_applications': applications.count(),
-        'pending': applications.filter(status='pending').count(),
-        'approved': applications.filter(status='approved').count(),
-        'rejected': applications.filter(status='rejected').count(),
+        'total_applications': app_stats['total'],
+        'pending': app_stats['pending'],
+        'approved': app_stats['approved'],
+        'rejected': app_stats['rejected'],
     }
     
     # Recent applications
@@ -368,26 +356,28 @@ def apply_birth_certificate(request):
     if request.method == 'POST':
         form = BirthCertificateForm(request.POST, request.FILES)
         if form.is_valid():
-            # Create Application first
-            application = Application.objects.create(
-                applicant=request.user,
-                application_type='birth_certificate',
-                status='pending'
-            )
+            with transaction.atomic():
+                # Create Application first
+                application = Application.objects.create(
+                    applicant=request.user,
+                    application_type='birth_certificate',
+                    status='pending'
+                )
             
-            # Create Birth Certificate linked to Application
-            birth_cert = form.save(commit=False)
-            birth_cert.application = application
-            birth_cert.save()
+                # Create Birth Certificate linked to Application
+                birth_cert = form.save(commit=False)
+                birth_cert.application = application
+                birth_cert.save()
             
-            # Create initial status history
-            create_status_history(
-                application=application,
-                old_status='',
-                new_status='pending',
-                changed_by=request.user,
-                remarks='Application submitted'
-            )
+                # Create initial status history
+                create_status_history(
+                    application=application,
+                    old_status='',
+                    new_status='pending',
+                    changed_by=request.user,
+                    remarks='Application submitted'
+                )
+                counters.record_application_created(application)
             
             messages.success(
                 request,
@@ -421,26 +411,28 @@ def apply_death_certificate(request):
     if request.method == 'POST':
         form = DeathCertificateForm(request.POST, request.FILES)
         if form.is_valid():
-            # Create Application first
-            application = Application.objects.create(
-                applicant=request.user,
-                application_type='death_certificate',
-                status='pending'
-            )
+            with transaction.atomic():
+                # Create Application first
+                application = Application.objects.create(
+                    applicant=request.user,
+                    application_type='death_certificate',
+                    status='pending'
+                )
             
-            # Create Death Certificate linked to Application
-            death_cert = form.save(commit=False)
-            death_cert.application = application
-            death_cert.save()
+                # Create Death Certificate linked to Application
+                death_cert = form.save(commit=False)
+                death_cert.application = application
+                death_cert.save()
             
-            # Create initial status history
-            create_status_history(
-                application=application,
-                old_status='',
-                new_status='pending',
-                changed_by=request.user,
-                remarks='Application submitted'
-            )
+                # Create initial status history
+                create_status_history(
+                    application=application,
+                    old_status='',
+                    new_status='pending',
+                    changed_by=request.user,
+                    remarks='Application submitted'
+                )
+                counters.record_application_created(application)
             
             messages.success(
                 request,
@@ -474,26 +466,28 @@ def apply_income_certificate(request):
     if request.method == 'POST':
         form = IncomeCertificateForm(request.POST, request.FILES)
         if form.is_valid():
-            # Create Application first
-            application = Application.objects.create(
-                applicant=request.user,
-                application_type='income_certificate',
-                status='pending'
-            )
+            with transaction.atomic():
+                # Create Application first
+                application = Application.objects.create(
+                    applicant=request.user,
+                    application_type='income_certificate',
+                    status='pending'
+                )
             
-            # Create Income Certificate linked to Application
-            income_cert = form.save(commit=False)
-            income_cert.application = application
-            income_cert.save()
+                # Create Income Certificate linked to Application
+                income_cert = form.save(commit=False)
+                income_cert.application = application
+                income_cert.save()
             
-            # Create initial status history
-            create_status_history(
-                application=application,
-                old_status='',
-                new_status='pending',
-                changed_by=request.user,
-                remarks='Application submitted'
-            )
+                # Create initial status history
+                create_status_history(
+                    application=application,
+                    old_status='',
+                    new_status='pending',
+                    changed_by=request.user,
+                    remarks='Application submitted'
+                )
+                counters.record_application_created(application)
             
             messages.success(
                 request,
@@ -529,27 +523,29 @@ def pay_tax(request):
     if request.method == 'POST':
         form = TaxPaymentForm(request.POST, request.FILES)
         if form.is_valid():
-            # Create Application first
-            tax_type = form.cleaned_data['tax_type']
-            application = Application.objects.create(
-                applicant=request.user,
-                application_type=tax_type,
-                status='pending'
-            )
+            with transaction.atomic():
+                # Create Application first
+                tax_type = form.cleaned_data['tax_type']
+                application = Application.objects.create(
+                    applicant=request.user,
+                    application_type=tax_type,
+                    status='pending'
+                )
             
-            # Create Tax Payment linked to Application
-            tax_payment = form.save(commit=False)
-            tax_payment.application = application
-            tax_payment.save()
+                # Create Tax Payment linked to Application
+                tax_payment = form.save(commit=False)
+                tax_payment.application = application
+                tax_payment.save()
             
-            # Create initial status history
-            create_status_history(
-                application=application,
-                old_status='',
-                new_status='pending',
-                changed_by=request.user,
-                remarks=f'{tax_type.replace("_", " ").title()} payment application submitted'
-            )
+                # Create initial status history
+                create_status_history(
+                    application=application,
+                    old_status='',
+                    new_status='pending',
+                    changed_by=request.user,
+                    remarks=f'{tax_type.replace("_", " ").title()} payment application submitted'
+                )
+                counters.record_application_created(application)
             
             messages.success(
                 request,
@@ -583,18 +579,20 @@ def file_complaint(request):
     if request.method == 'POST':
         form = ComplaintForm(request.POST, request.FILES)
         if form.is_valid():
-            complaint = form.save(commit=False)
-            complaint.complainant = request.user
-            complaint.save()
-            
-            # Create complaint history
-            ComplaintHistory.objects.create(
-                complaint=complaint,
-                action='created',
-                new_value=complaint.get_status_display(),
-                performed_by=request.user,
-                notes=f'Complaint filed: {complaint.subject}'
-            )
+            with transaction.atomic():
+                complaint = form.save(commit=False)
+                complaint.complainant = request.user
+                complaint.save()
+                
+                # Create complaint history
+                ComplaintHistory.objects.create(
+                    complaint=complaint,
+                    action='created',
+                    new_value=complaint.get_status_display(),
+                    performed_by=request.user,
+                    notes=f'Complaint filed: {complaint.subject}'
+                )
+                counters.record_complaint_created(complaint)
             
             messages.success(
                 request,
@@ -621,7 +619,9 @@ def my_complaints(request):
     """
     View user's complaints with filtering
     """
-    complaints = Complaint.objects.filter(complainant=request.user).order_by('-filed_date')
+    complaints = Complaint.objects.filter(complainant=request.user).select_related(
+        'assigned_to'
+    ).order_by('-filed_date')
     
     # Status filter
     status_filter = request.GET.get('status')
@@ -629,21 +629,17 @@ def my_complaints(request):
         complaints = complaints.filter(status=status_filter)
     
     # Statistics
-    total_complaints = Complaint.objects.filter(complainant=request.user).count()
-    open_complaints = Complaint.objects.filter(complainant=request.user, status='open').count()
-    resolved_complaints = Complaint.objects.filter(complainant=request.user, status='resolved').count()
+    complaint_stats = counters.get_complaint_counts(request.user)
     
-    # Pagination
-    paginator = Paginator(complaints, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (keyset on (filed_date, id); ?page=N still uses offsets)
+    page_obj = pagination.paginate_listing(request, complaints, 10, 'filed_date')
     
     context = {
         'title': 'My Complaints',
         'page_obj': page_obj,
-        'total_complaints': total_complaints,
-        'open_complaints': open_complaints,
-        'resolved_complaints': resolved_complaints,
+        'total_complaints': complaint_stats['total'],
+        'open_complaints': complaint_stats['open'],
+        'resolved_complaints': complaint_stats['resolved'],
         'status_filter': status_filter,
     }
     return render(request, 'portal_app/citizen/my_complaints.html', context)
@@ -654,10 +650,12 @@ def complaint_detail(request, complaint_id):
     """
     View complaint details with complete history
     """
-    complaint = get_object_or_404(Complaint, pk=complaint_id, complainant=request.user)
+    complaint = get_object_or_404(
+        Complaint.objects.select_related('assigned_to'), pk=complaint_id, complainant=request.user
+    )
     
     # Get complaint history
-    history = complaint.history.all().order_by('-performed_at')
+    history = complaint.history.select_related('performed_by').order_by('-performed_at')
     
     context = {
         'title': 'Complaint Details',
@@ -683,10 +681,8 @@ def my_applications(request):
     if status_filter:
         applications = applications.filter(status=status_filter)
     
-    # Pagination
-    paginator = Paginator(applications, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (keyset on (applied_date, id); ?page=N still uses offsets)
+    page_obj = pagination.paginate_listing(request, applications, 10, 'applied_date')
     
     context = {
         'title': 'My Applications',
@@ -701,21 +697,15 @@ def application_detail(request, application_id):
     """
     View application details
     """
-    application = get_object_or_404(Application, pk=application_id, applicant=request.user)
+    application = get_object_or_404(
+        Application.objects.with_details(), pk=application_id, applicant=request.user
+    )
     
-    # Get specific certificate details
-    certificate_data = None
-    if application.application_type == 'birth_certificate':
-        certificate_data = application.birth_certificate
-    elif application.application_type == 'death_certificate':
-        certificate_data = application.death_certificate
-    elif application.application_type == 'income_certificate':
-        certificate_data = application.income_certificate
-    elif application.application_type in ['water_tax', 'house_tax']:
-        certificate_data = application.tax_payment
+    # Get specific certificate details (already joined)
+    certificate_data = application.get_detail()
     
     # Get status history
-    status_history = application.status_history.all()
+    status_history = application.status_history.select_related('changed_by')
     
     context = {
         'title': 'Application Details',
@@ -733,94 +723,65 @@ def application_detail(request, application_id):
 def track_application(request):
     """
     Public application tracking by application number
+    Lookups are cached and limited per IP (see portal_app.tracking)
     """
     application = None
     application_number = request.GET.get('app_number', '').strip()
     
     if application_number:
-        try:
-            application = Application.objects.get(application_number=application_number)
-        except Application.DoesNotExist:
+        from .security_utils import rate_limit_exceeded_response
+
+        if not tracking.allow_lookup(get_client_ip(request)):
+            return rate_limit_exceeded_response()
+        application = tracking.lookup(application_number)
+        if application is None:
             messages.error(request, 'Application not found. Please check the application number.')
     
     context = {
         'title': 'Track Application',
         'application': application,
         'application_number': application_number,
+        'poll_interval': settings.TRACK_POLL_INTERVAL,
     }
     return render(request, 'portal_app/track_application.html', context)
 
 
+def track_application_status(request):
+    """
+    JSON status of an application for polling from the tracking page
+    Query params: app_number
+    """
+    if not tracking.allow_lookup(get_client_ip(request)):
+        response = JsonResponse({'error': 'Too many requests. Please try again later.'}, status=429)
+        response['Retry-After'] = str(settings.TRACK_RATE_PERIOD)
+        return response
+    
+    application = tracking.lookup(request.GET.get('app_number', ''))
+    if application is None:
+        return JsonResponse({'error': 'Application not found.'}, status=404)
+    
+    response = JsonResponse(tracking.public_status(application))
+    patch_cache_control(response, public=True, max_age=settings.TRACK_POLL_INTERVAL // 2)
+    return response
+
+
 # ============================================
 # ADMIN DASHBOARD
 # ============================================
 
 @staff_or_admin_required
+@routers.use_replica()
 def admin_dashboard(request):
     """
     Government-Style Admin Dashboard with comprehensive statistics
     Staff and Admin only - access controlled by decorator
     """
-    from datetime import timedelta
-    from django.db.models import Count, Q
-    
-    # User Statistics
-    total_citizens = CustomUser.objects.filter(role='citizen').count()
-    total_staff = CustomUser.objects.filter(role='staff').count()
-    total_admins = CustomUser.objects.filter(role='admin').count()
-    inactive_users = CustomUser.objects.filter(is_active=False).count()
-    new_users_today = CustomUser.objects.filter(
-        date_joined__date=timezone.now().date()
-    ).count()
-    
-    # Application Statistics
-    total_applications = Application.objects.count()
-    pending_applications = Application.objects.filter(status='pending').count()
-    under_review_applications = Application.objects.filter(status='under_review').count()
-    approved_applications = Application.objects.filter(status='approved').count()
-    rejected_applications = Application.objects.filter(status='rejected').count()
-    
-    # Today's Statistics
-    today = timezone.now().date()
-    applications_today = Application.objects.filter(applied_date__date=today).count()
-    approved_today = Application.objects.filter(
-        status='approved',
-        reviewed_date__date=today
-    ).count()
-    
-    # This Week Statistics
-    week_ago = timezone.now() - timedelta(days=7)
-    applications_this_week = Application.objects.filter(
-        applied_date__gte=week_ago
-    ).count()
-    
-    # Application Type Breakdown
-    app_type_stats = Application.objects.values('application_type').annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Complaint Statistics
-    total_complaints = Complaint.objects.count()
-    open_complaints = Complaint.objects.filter(status='open').count()
-    in_progress_complaints = Complaint.objects.filter(status='in_progress').count()
-    resolved_complaints = Complaint.objects.filter(status='resolved').count()
-    complaints_today = Complaint.objects.filter(filed_date__date=today).count()
-    
-    # Tax Payment Statistics
-    total_tax_payments = TaxPayment.objects.count()
-    water_tax_count = TaxPayment.objects.filter(tax_type='water_tax').count()
-    house_tax_count = TaxPayment.objects.filter(tax_type='house_tax').count()
-    
-    # Certificate Statistics
-    birth_certs = BirthCertificate.objects.filter(
-        certificate_number__isnull=False
-    ).count()
-    death_certs = DeathCertificate.objects.filter(
-        certificate_number__isnull=False
-    ).count()
-    income_certs = IncomeCertificate.objects.filter(
-        certificate_number__isnull=False
-    ).count()
+    stats = statistics.get_dashboard_statistics()
+    user_stats = stats['users']
+    app_stats = stats['applications']
+    complaint_stats = stats['complaints']
+    tax_stats = stats['tax']
+    cert_stats = stats['certificates']
     
     # Recent Activity
     recent_applications = Application.objects.select_related(
@@ -849,50 +810,50 @@ def admin_dashboard(request):
     
     # Status Distribution for Chart
     status_distribution = {
-        'pending': pending_applications,
-        'under_review': under_review_applications,
-        'approved': approved_applications,
-        'rejected': rejected_applications
+        'pending': app_stats['pending'],
+        'under_review': app_stats['under_review'],
+        'approved': app_stats['approved'],
+        'rejected': app_stats['rejected']
     }
     
     context = {
         'title': 'Admin Dashboard',
         # User Stats
-        'total_citizens': total_citizens,
-        'total_staff': total_staff,
-        'total_admins': total_admins,
-        'inactive_users': inactive_users,
-        'new_users_today': new_users_today,
+        'total_citizens': user_stats['citizens'],
+        'total_staff': user_stats['staff'],
+        'total_admins': user_stats['admins'],
+        'inactive_users': user_stats['inactive'],
+        'new_users_today': user_stats['new_today'],
         # Application Stats
-        'total_applications': total_applications,
-        'pending_applications': pending_applications,
-        'under_review_applications': under_review_applications,
-        'approved_applications': approved_applications,
-        'rejected_applications': rejected_applications,
-        'applications_today': applications_today,
-        'approved_today': approved_today,
-        'applications_this_week': applications_this_week,
+        'total_applications': app_stats['total'],
+        'pending_applications': app_stats['pending'],
+        'under_review_applications': app_stats['under_review'],
+        'approved_applications': app_stats['approved'],
+        'rejected_applications': app_stats['rejected'],
+        'applications_today': app_stats['today'],
+        'approved_today': app_stats['approved_today'],
+        'applications_this_week': app_stats['this_week'],
         # Complaint Stats
-        'total_complaints': total_complaints,
-        'open_complaints': open_complaints,
-        'in_progress_complaints': in_progress_complaints,
-        'resolved_complaints': resolved_complaints,
-        'complaints_today': complaints_today,
+        'total_complaints': complaint_stats['total'],
+        'open_complaints': complaint_stats['open'],
+        'in_progress_complaints': complaint_stats['in_progress'],
+        'resolved_complaints': complaint_stats['resolved'],
+        'complaints_today': complaint_stats['today'],
         # Certificate Stats
-        'birth_certs': birth_certs,
-        'death_certs': death_certs,
-        'income_certs': income_certs,
+        'birth_certs': cert_stats['birth'],
+        'death_certs': cert_stats['death'],
+        'income_certs': cert_stats['income'],
         # Tax Stats
-        'total_tax_payments': total_tax_payments,
-        'water_tax_count': water_tax_count,
-        'house_tax_count': house_tax_count,
+        'total_tax_payments': tax_stats['total'],
+        'water_tax_count': tax_stats['water_tax'],
+        'house_tax_count': tax_stats['house_tax'],
         # Lists
         'recent_applications': recent_applications,
         'pending_applications_list': pending_applications_list,
         'recent_complaints': recent_complaints,
         'pending_staff': pending_staff,
         'recent_citizens': recent_citizens,
-        'app_type_stats': app_type_stats,
+        'app_type_stats': stats['application_types'],
         'status_distribution': status_distribution,
     }
     return render(request, 'portal_app/admin/dashboard.html', context)
@@ -902,15 +863,10 @@ def admin_dashboard(request):
 # ADMIN APPLICATION MANAGEMENT
 # ============================================
 
-@staff_or_admin_required
-def admin_applications(request):
-    """
-    View and manage all applications
-    Staff and Admin only - access controlled by decorator
-    """
+def _filtered_applications(request):
+    """Applications matching the admin_applications filters (status, type)"""
     applications = Application.objects.all().order_by('-applied_date')
     
-    # Filters
     status_filter = request.GET.get('status')
     type_filter = request.GET.get('type')
     
@@ -918,11 +874,21 @@ def admin_applications(request):
         applications = applications.filter(status=status_filter)
     if type_filter:
         applications = applications.filter(application_type=type_filter)
+    return applications
+
+
+@staff_or_admin_required
+def admin_applications(request):
+    """
+    View and manage all applications
+    Staff and Admin only - access controlled by decorator
+    """
+    applications = _filtered_applications(request).select_related('applicant')
+    status_filter = request.GET.get('status')
+    type_filter = request.GET.get('type')
     
-    # Pagination
-    paginator = Paginator(applications, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (keyset on (applied_date, id); ?page=N still uses offsets)
+    page_obj = pagination.paginate_listing(request, applications, 20, 'applied_date')
     
     context = {
         'title': 'Manage Applications',
@@ -939,56 +905,24 @@ def admin_review_application(request, application_id):
     Review and approve/reject application with status tracking
     Staff and Admin only - access controlled by decorator
     """
-    application = get_object_or_404(Application, pk=application_id)
+    application = get_object_or_404(Application.objects.with_details(), pk=application_id)
     
-    # Get specific certificate details
-    certificate_data = None
-    if application.application_type == 'birth_certificate':
-        certificate_data = application.birth_certificate
-    elif application.application_type == 'death_certificate':
-        certificate_data = application.death_certificate
-    elif application.application_type == 'income_certificate':
-        certificate_data = application.income_certificate
-    elif application.application_type in ['water_tax', 'house_tax']:
-        certificate_data = application.tax_payment
+    # Get specific certificate details (already joined)
+    certificate_data = application.get_detail()
     
     if request.method == 'POST':
+        # Capture the current values before the form mutates the instance
+        old_status = application.status
+        old_reviewed_date = application.reviewed_date
         form = ApplicationReviewForm(request.POST, instance=application)
         if form.is_valid():
-            old_status = application.status
             updated_app = form.save(commit=False)
             updated_app.reviewed_by = request.user
             updated_app.reviewed_date = timezone.now()
             
             # If status changed, create history
             if old_status != updated_app.status:
-                # Save application first
-                updated_app.save()
-                
-                # Create status history
-                create_status_history(
-                    application=updated_app,
-                    old_status=old_status,
-                    new_status=updated_app.status,
-                    changed_by=request.user,
-                    remarks=updated_app.admin_remarks
-                )
-                
-                # If approved, generate certificate number
-                if updated_app.status == 'approved' and certificate_data:
-                    if hasattr(certificate_data, 'certificate_number'):
-                        if not certificate_data.certificate_number:
-                            certificate_data.certificate_number = generate_certificate_number(
-                                application.application_type
-                            )
-                            certificate_data.issued_date = timezone.now().date()
-                            
-                            # Set validity for income certificate (1 year)
-                            if hasattr(certificate_data, 'valid_until'):
-                                from datetime import timedelta
-                                certificate_data.valid_until = timezone.now().date() + timedelta(days=365)
-                            
-                            certificate_data.save()
+                reviews.review_application(updated_app, old_status, old_reviewed_date, request.user)
                 
                 status_msg = 'approved' if updated_app.status == 'approved' else updated_app.status
                 messages.success(
@@ -1004,7 +938,7 @@ def admin_review_application(request, application_id):
         form = ApplicationReviewForm(instance=application)
     
     # Get status history
-    status_history = application.status_history.all().order_by('-changed_at')
+    status_history = application.status_history.select_related('changed_by').order_by('-changed_at')
     
     context = {
         'title': 'Review Application',
@@ -1016,19 +950,47 @@ def admin_review_application(request, application_id):
     return render(request, 'portal_app/admin/review_application.html', context)
 
 
+@staff_or_admin_required
+def admin_bulk_review(request):
+    """
+    Approve, reject or mark under review all selected applications at once
+    POST: application_ids (repeated), status, remarks, next (listing URL)
+    """
+    if request.method == 'POST':
+        application_ids = [pk for pk in request.POST.getlist('application_ids') if pk.isdigit()]
+        status = request.POST.get('status', '')
+        
+        if not application_ids:
+            messages.warning(request, 'Select at least one application.')
+        elif status not in reviews.BULK_STATUSES:
+            messages.error(request, 'Choose a valid review status.')
+        else:
+            result = reviews.bulk_review(
+                application_ids, status, request.user,
+                remarks=request.POST.get('remarks', '').strip(),
+            )
+            status_display = dict(Application.STATUS_CHOICES)[status]
+            message = f"{result['updated']} application(s) marked {status_display}."
+            if result['unchanged']:
+                message += f" {result['unchanged']} already had that status."
+            if result['certificates']:
+                message += f" {result['certificates']} certificate number(s) issued."
+            messages.success(request, message)
+        
+        next_url = request.POST.get('next', '')
+        if url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+            return redirect(next_url)
+    return redirect('admin_applications')
+
+
 # ============================================
 # ADMIN COMPLAINT MANAGEMENT
 # ============================================
 
-@staff_or_admin_required
-def admin_complaints(request):
-    """
-    View and manage all complaints with comprehensive filtering
-    Staff and Admin only - access controlled by decorator
-    """
-    complaints = Complaint.objects.select_related('complainant', 'assigned_to').all().order_by('-filed_date')
+def _filtered_complaints(request):
+    """Complaints matching the admin_complaints filters (status, category, priority, assignment)"""
+    complaints = Complaint.objects.all().order_by('-filed_date')
     
-    # Filters
     status_filter = request.GET.get('status')
     category_filter = request.GET.get('category')
     priority_filter = request.GET.get('priority')
@@ -1044,29 +1006,36 @@ def admin_complaints(request):
         complaints = complaints.filter(assigned_to=request.user)
     elif assigned_filter == 'unassigned':
         complaints = complaints.filter(assigned_to__isnull=True)
+    return complaints
+
+
+@staff_or_admin_required
+def admin_complaints(request):
+    """
+    View and manage all complaints with comprehensive filtering
+    Staff and Admin only - access controlled by decorator
+    """
+    complaints = _filtered_complaints(request).select_related('complainant', 'assigned_to')
+    status_filter = request.GET.get('status')
+    category_filter = request.GET.get('category')
+    priority_filter = request.GET.get('priority')
+    assigned_filter = request.GET.get('assigned')
     
     # Statistics
-    total_complaints = Complaint.objects.count()
-    open_complaints = Complaint.objects.filter(status='open').count()
-    in_progress_complaints = Complaint.objects.filter(status='in_progress').count()
-    resolved_complaints = Complaint.objects.filter(status='resolved').count()
-    unassigned_complaints = Complaint.objects.filter(assigned_to__isnull=True).count()
-    urgent_complaints = Complaint.objects.filter(priority='urgent', status__in=['open', 'in_progress']).count()
-    
-    # Pagination
-    paginator = Paginator(complaints, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    complaint_stats = statistics.get_complaint_statistics()
+    
+    # Pagination (keyset on (filed_date, id); ?page=N still uses offsets)
+    page_obj = pagination.paginate_listing(request, complaints, 20, 'filed_date')
     
     context = {
         'title': 'Manage Complaints',
         'page_obj': page_obj,
-        'total_complaints': total_complaints,
-        'open_complaints': open_complaints,
-        'in_progress_complaints': in_progress_complaints,
-        'resolved_complaints': resolved_complaints,
-        'unassigned_complaints': unassigned_complaints,
-        'urgent_complaints': urgent_complaints,
+        'total_complaints': complaint_stats['total'],
+        'open_complaints': complaint_stats['open'],
+        'in_progress_complaints': complaint_stats['in_progress'],
+        'resolved_complaints': complaint_stats['resolved'],
+        'unassigned_complaints': complaint_stats['unassigned'],
+        'urgent_complaints': complaint_stats['urgent'],
         'status_filter': status_filter,
         'category_filter': category_filter,
         'priority_filter': priority_filter,
@@ -1081,7 +1050,9 @@ def admin_update_complaint(request, complaint_id):
     Update complaint status, assignment, and resolution with history tracking
     Staff and Admin only - access controlled by decorator
     """
-    complaint = get_object_or_404(Complaint, pk=complaint_id)
+    complaint = get_object_or_404(
+        Complaint.objects.select_related('complainant', 'assigned_to'), pk=complaint_id
+    )
     old_status = complaint.status
     old_priority = complaint.priority
     old_assigned_to = complaint.assigned_to
@@ -1133,7 +1104,9 @@ def admin_update_complaint(request, complaint_id):
                     notes=f'Assigned to {updated_complaint.assigned_to.get_full_name()}' if updated_complaint.assigned_to else 'Assignment removed'
                 )
             
-            updated_complaint.save()
+            with transaction.atomic():
+                updated_complaint.save()
+                counters.record_complaint_status_change(updated_complaint, old_status)
             
             messages.success(
                 request,
@@ -1146,7 +1119,7 @@ def admin_update_complaint(request, complaint_id):
         form = ComplaintUpdateForm(instance=complaint)
     
     # Get complaint history
-    history = complaint.history.all().order_by('-performed_at')
+    history = complaint.history.select_related('performed_by').order_by('-performed_at')
     
     context = {
         'title': 'Update Complaint',
@@ -1157,6 +1130,125 @@ def admin_update_complaint(request, complaint_id):
     return render(request, 'portal_app/admin/update_complaint.html', context)
 
 
+# ============================================
+# DATA EXPORTS (CSV / XLSX)
+# ============================================
+
+def _export_format(request):
+    fmt = request.GET.get('format', 'csv')
+    return fmt if fmt in exports.FORMATS else 'csv'
+
+
+@staff_or_admin_required
+def export_applications(request):
+    """
+    Stream the filtered application list as CSV or XLSX
+    Accepts the same filters as admin_applications plus ?format=csv|xlsx
+    """
+    # Streamed after the view returns, so the database is picked here
+    rows = exports.application_rows(_filtered_applications(request).using(routers.read_database()))
+    return exports.streaming_export(rows, 'applications', _export_format(request))
+
+
+@staff_or_admin_required
+def export_complaints(request):
+    """
+    Stream the filtered complaint list as CSV or XLSX
+    Accepts the same filters as admin_complaints plus ?format=csv|xlsx
+    """
+    rows = exports.complaint_rows(_filtered_complaints(request).using(routers.read_database()))
+    return exports.streaming_export(rows, 'complaints', _export_format(request))
+
+
+# ============================================
+# STAFF SEARCH
+# ============================================
+
+@staff_or_admin_required
+def admin_search(request):
+    """
+    Search complaints, applications and citizens from one box
+    Query params: q (search text), kind (optional: complaint/application/user)
+    """
+    query = request.GET.get('q', '').strip()
+    kind = request.GET.get('kind', '')
+    kinds = [kind] if kind in search.KINDS else None
+    
+    results = search.search(query, kinds=kinds, limit=50) if query else []
+    
+    context = {
+        'title': 'Search',
+        'query': query,
+        'kind_filter': kind if kinds else '',
+        'kind_choices': SearchDocument.KIND_CHOICES,
+        'results': results,
+    }
+    return render(request, 'portal_app/admin/search.html', context)
+
+
+@staff_or_admin_required
+def staff_autocomplete(request):
+    """
+    JSON page of assignable staff for the complaint assignee picker
+    Query params: q (name or username), page (1-based)
+    """
+    from .assignment import MAX_PAGE, search_staff
+    try:
+        page = min(max(int(request.GET.get('page', 1)), 1), MAX_PAGE)
+    except ValueError:
+        page = 1
+    response = JsonResponse(search_staff(request.GET.get('q', ''), page))
+    patch_cache_control(response, private=True, max_age=settings.STAFF_AUTOCOMPLETE_CACHE_TIMEOUT)
+    return response
+
+
+@staff_or_admin_required
+@routers.use_replica()
+def dashboard_timeseries(request):
+    """
+    JSON time series for the admin dashboard trend charts, read from the
+    daily rollups (never the application/complaint tables)
+    Query params: metric (submitted, approved, complaints, collections),
+    bucket (day, week, month), start, end (YYYY-MM-DD), type, village,
+    split (type, village)
+    """
+    from .rollups import time_series
+    try:
+        data = time_series(
+            request.GET.get('metric', ''),
+            bucket=request.GET.get('bucket', 'day'),
+            start=request.GET.get('start'),
+            end=request.GET.get('end'),
+            kind=request.GET.get('type'),
+            village=request.GET.get('village'),
+            split=request.GET.get('split'),
+        )
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    response = JsonResponse(data)
+    patch_cache_control(response, private=True, max_age=settings.ROLLUP_CACHE_TIMEOUT)
+    return response
+
+
+# ============================================
+# PERFORMANCE METRICS
+# ============================================
+
+@staff_or_admin_required
+def metrics(request):
+    """
+    Per-view request timings and database pool statistics of this worker
+    in Prometheus text format
+    Timings are empty unless PERFORMANCE_INSTRUMENTATION is enabled
+    """
+    from .instrumentation import registry
+    from .pooling import render_prometheus as render_pool_metrics
+    return HttpResponse(
+        registry.render_prometheus() + render_pool_metrics(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
 # ============================================
 # PDF GENERATION (Download Certificate)
 # ============================================
@@ -1166,7 +1258,11 @@ def download_certificate(request, application_id):
     """
     Generate and download PDF certificate
     """
-    application = get_object_or_404(Application, pk=application_id)
+    application = Application.objects.with_details().filter(pk=application_id).first()
+    if application is None:
+        # Archived applications keep their id (see portal_app.archive)
+        archived = get_object_or_404(ArchivedApplication.objects.select_related('applicant'), pk=application_id)
+        application = archived.as_application()
     
     # Check if user has permission
     if not (
@@ -1179,134 +1275,28 @@ def download_certificate(request, application_id):
     # Only approved applications can be downloaded
     if application.status != 'approved':
         messages.error(request, 'Certificate not yet approved.')
+        if application.is_archived:
+            return redirect(f"{reverse('track_application')}?app_number={application.application_number}")
         return redirect('application_detail', application_id=application_id)
     
-    # Generate PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a237e'),
-        spaceAfter=30,
-        alignment=1  # Center
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#283593'),
-        spaceAfter=12,
-    )
-    
-    # Header
-    elements.append(Paragraph("Government of India", title_style))
-    elements.append(Paragraph("Digital Gram Panchayat Portal", styles['Heading2']))
-    elements.append(Spacer(1, 0.5*inch))
-    
-    # Get certificate specific data
-    if application.application_type == 'birth_certificate':
-        cert = application.birth_certificate
-        elements.append(Paragraph("BIRTH CERTIFICATE", title_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        data = [
-            ['Certificate Number:', cert.certificate_number or 'N/A'],
-            ['Issued Date:', str(cert.issued_date) if cert.issued_date else 'N/A'],
-            ['', ''],
-            ['Child Name:', cert.child_name],
-            ['Date of Birth:', str(cert.date_of_birth)],
-            ['Gender:', cert.get_child_gender_display()],
-            ['Place of Birth:', cert.place_of_birth],
-            ['Father Name:', cert.father_name],
-            ['Mother Name:', cert.mother_name],
-            ['Permanent Address:', cert.permanent_address],
-        ]
-    
-    elif application.application_type == 'death_certificate':
-        cert = application.death_certificate
-        elements.append(Paragraph("DEATH CERTIFICATE", title_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        data = [
-            ['Certificate Number:', cert.certificate_number or 'N/A'],
-            ['Issued Date:', str(cert.issued_date) if cert.issued_date else 'N/A'],
-            ['', ''],
-            ['Deceased Name:', cert.deceased_name],
-            ['Date of Death:', str(cert.date_of_death)],
-            ['Age:', str(cert.deceased_age)],
-            ['Gender:', cert.get_deceased_gender_display()],
-            ['Place of Death:', cert.place_of_death],
-            ['Cause of Death:', cert.cause_of_death],
-            ['Permanent Address:', cert.permanent_address],
-        ]
-    
-    elif application.application_type == 'income_certificate':
-        cert = application.income_certificate
-        elements.append(Paragraph("INCOME CERTIFICATE", title_style))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        data = [
-            ['Certificate Number:', cert.certificate_number or 'N/A'],
-            ['Issued Date:', str(cert.issued_date) if cert.issued_date else 'N/A'],
-            ['Valid Until:', str(cert.valid_until) if cert.valid_until else 'N/A'],
-            ['', ''],
-            ['Applicant Name:', cert.applicant_name],
-            ['Father/Husband Name:', cert.father_husband_name],
-            ['Occupation:', cert.occupation],
-            ['Annual Income:', f'₹{cert.annual_income}'],
-            ['Income Source:', cert.get_income_source_display()],
-            ['Purpose:', cert.purpose_of_certificate],
-            ['Residential Address:', cert.residential_address],
-        ]
-    
+    # Serve the cached render; unchanged certificates are never re-rendered
+    pdf, fingerprint, modified = certificates.open_cached_certificate(application)
+    etag = quote_etag(fingerprint)
+    last_modified = int(modified.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(
+            pdf,
+            content_type='application/pdf',
+            as_attachment=True,
+            filename=f"certificate_{application.application_number}.pdf",
+        )
     else:
-        # Tax payment or other
-        elements.append(Paragraph("CERTIFICATE", title_style))
-        data = [
-            ['Application Number:', application.application_number],
-            ['Type:', application.get_application_type_display()],
-            ['Status:', application.get_status_display()],
-        ]
-    
-    # Create table
-    table = Table(data, colWidths=[2.5*inch, 4*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    
-    elements.append(table)
-    elements.append(Spacer(1, 0.5*inch))
-    
-    # Footer
-    elements.append(Paragraph("This is a computer-generated certificate.", styles['Normal']))
-    elements.append(Spacer(1, 0.2*inch))
-    elements.append(Paragraph(f"Generated on: {timezone.now().strftime('%B %d, %Y')}", styles['Normal']))
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Return PDF response
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="certificate_{application.application_number}.pdf"'
-    
+        pdf.close()
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
     return response
 
 